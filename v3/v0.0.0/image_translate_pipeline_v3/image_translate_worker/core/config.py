@@ -10,6 +10,36 @@ LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
 GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY")
 GEMINI_MODEL_NAME = os.environ.get("GEMINI_MODEL_NAME", "gemini-2.0-flash")
 TRANSLATION_RPS = float(os.environ.get("TRANSLATION_RPS", "1.0"))  # 초당 요청 수
+# 초당 요청 수 버킷 크기 (쉬고 난 뒤 연속으로 바로 보낼 수 있는 호출 수)
+TRANSLATION_RPS_BURST = float(os.environ.get("TRANSLATION_RPS_BURST", "1"))
+# 분당 토큰 수 제한 (추정치 기준, 0이면 제한 없음)
+TRANSLATION_TPM = float(os.environ.get("TRANSLATION_TPM", "0"))
+# 여러 요청의 문자열을 한 번의 호출로 합칠 때 호출당 최대 문자열 수 / 최대 추정 토큰 수
+TRANSLATION_BATCH_MAX_ITEMS = int(os.environ.get("TRANSLATION_BATCH_MAX_ITEMS", "200"))
+TRANSLATION_BATCH_MAX_TOKENS = int(os.environ.get("TRANSLATION_BATCH_MAX_TOKENS", "8000"))
+# 첫 요청 도착 후 다른 요청을 모으는 최대 대기 시간 (초)
+TRANSLATION_BATCH_MAX_WAIT = float(os.environ.get("TRANSLATION_BATCH_MAX_WAIT", "0.05"))
+# 동시에 진행할 수 있는 번역 API 호출 수
+TRANSLATION_MAX_CONCURRENT_CALLS = int(os.environ.get("TRANSLATION_MAX_CONCURRENT_CALLS", "8"))
+# Gemini 연결 풀 크기 (워커 전체가 하나의 세션을 공유)
+TRANSLATION_MAX_CONNECTIONS = int(os.environ.get("TRANSLATION_MAX_CONNECTIONS", "16"))
+# 유휴 연결 유지 시간 (초) - 다음 요청이 TLS 핸드셰이크 없이 재사용
+TRANSLATION_KEEPALIVE_TIMEOUT = float(os.environ.get("TRANSLATION_KEEPALIVE_TIMEOUT", "60"))
+# 요청 전체 / 연결 수립 타임아웃 (초)
+TRANSLATION_REQUEST_TIMEOUT = float(os.environ.get("TRANSLATION_REQUEST_TIMEOUT", "60"))
+TRANSLATION_CONNECT_TIMEOUT = float(os.environ.get("TRANSLATION_CONNECT_TIMEOUT", "10"))
+# 일시적 오류(연결/타임아웃, 429/5xx, 잘못된 응답) 재시도 횟수와 대기 시간 (초, 지수 증가 + 지터)
+TRANSLATION_MAX_RETRIES = int(os.environ.get("TRANSLATION_MAX_RETRIES", "3"))
+TRANSLATION_RETRY_BASE_DELAY = float(os.environ.get("TRANSLATION_RETRY_BASE_DELAY", "0.5"))
+TRANSLATION_RETRY_MAX_DELAY = float(os.environ.get("TRANSLATION_RETRY_MAX_DELAY", "8"))
+# 번역 메모리 (원문 정확 일치 캐시: 로컬 LRU + 공유 Redis) 사용 여부
+TRANSLATION_MEMORY_ENABLED = os.environ.get("TRANSLATION_MEMORY_ENABLED", "1") == "1"
+# 번역 메모리 Redis 키 접두사 (키 = 접두사 + 모델/프롬프트 버전 + ":" + 원문 SHA-1)
+TRANSLATION_MEMORY_KEY_PREFIX = "translation_memory:"
+# 프로세스 로컬 LRU 최대 항목 수
+TRANSLATION_MEMORY_LOCAL_SIZE = int(os.environ.get("TRANSLATION_MEMORY_LOCAL_SIZE", "50000"))
+# Redis 항목별 만료 시간 (초, 항목의 마지막 쓰기 기준, 기본 30일)
+TRANSLATION_MEMORY_TTL = int(os.environ.get("TRANSLATION_MEMORY_TTL", str(30 * 24 * 3600)))
 
 # === Worker 공통 설정 ===
 # CPU 집약적 작업을 처리할 스레드 수 (시스템 코어 수에 맞춰 조절)
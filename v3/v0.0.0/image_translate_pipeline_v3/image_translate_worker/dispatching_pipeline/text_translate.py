@@ -1,13 +1,8 @@
 import os
 import sys
-import json
 import logging
-import asyncio
-import time
 import re
-from typing import List
-
-import aiohttp
+from typing import List, Optional, Union
 
 # 프로젝트 루트 설정
 WORKER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -15,11 +10,18 @@ ROOT_DIR = os.path.dirname(os.path.dirname(WORKER_DIR))
 sys.path.insert(0, ROOT_DIR)
 
 from core.config import (
-    GEMINI_API_KEY, GEMINI_MODEL_NAME, TRANSLATION_RPS
+    GEMINI_API_KEY, GEMINI_MODEL_NAME, TRANSLATION_RPS, TRANSLATION_RPS_BURST, TRANSLATION_TPM,
+    TRANSLATION_BATCH_MAX_ITEMS, TRANSLATION_BATCH_MAX_TOKENS, TRANSLATION_BATCH_MAX_WAIT, TRANSLATION_MAX_CONCURRENT_CALLS,
+    TRANSLATION_MAX_CONNECTIONS, TRANSLATION_KEEPALIVE_TIMEOUT, TRANSLATION_REQUEST_TIMEOUT,
+    TRANSLATION_CONNECT_TIMEOUT, TRANSLATION_MAX_RETRIES, TRANSLATION_RETRY_BASE_DELAY, TRANSLATION_RETRY_MAX_DELAY,
+    TRANSLATION_MEMORY_ENABLED, TRANSLATION_MEMORY_KEY_PREFIX, TRANSLATION_MEMORY_LOCAL_SIZE, TRANSLATION_MEMORY_TTL
 )
 from core.redis_client import enqueue_error_result, enqueue_success_result
 from hosting.r2hosting import R2ImageHosting
 from dispatching_pipeline.mask import filter_chinese_ocr_result
+from dispatching_pipeline.translation_client import GeminiTranslationClient, TRANSLATION_LIST_SCHEMA
+from dispatching_pipeline.translation_memory import TranslationMemory, translation_memory_version
+from dispatching_pipeline.translation_scheduler import TranslationScheduler
 
 logger = logging.getLogger(__name__)
 
@@ -33,18 +35,12 @@ if not GEMINI_API_KEY:
 # Gemini API 엔드포인트
 API_URL = f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_MODEL_NAME}:generateContent?key={GEMINI_API_KEY}"
 
-# Rate limit 관리용 변수
-_last_request_time = 0
-_rate_limit_lock = asyncio.Lock()
-
-# JSON 응답 스키마 정의 (문자열 배열)
-TRANSLATION_LIST_SCHEMA = {
-    "type": "ARRAY",
-    "description": "입력된 텍스트 배열에 대한 번역된 텍스트 문자열 배열. 순서는 원본 배열과 동일해야 합니다.",
-    "items": {
-        "type": "STRING"
-    }
-}
+# 번역 지침 (시스템 프롬프트)
+SYSTEM_INSTRUCTION = (
+    "You are a helpful translation assistant for e-commerce. "
+    "Translate the texts from product detail images into Korean. "
+    "The translation should be natural, polite, and concise, suitable for marketing content."
+)
 
 # R2 호스팅 인스턴스 생성
 r2_hosting = R2ImageHosting()
@@ -56,153 +52,46 @@ def contains_chinese(text: str) -> bool:
     # CJK 통합 한자 범위 (가장 일반적인 경우)
     return bool(re.search(r'[\u4e00-\u9fff]', text))
 
-async def wait_for_rate_limit(request_id: str = "N/A"):
-    """
-    초당 요청 수 제한에 따라 API 호출을 제어합니다.
-    """
-    async with _rate_limit_lock:
-        global _last_request_time
-        current_time = time.time()
-        
-        # 마지막 요청 이후 경과 시간 계산
-        time_since_last = current_time - _last_request_time
-        min_interval = 1.0 / TRANSLATION_RPS  # 요청 간 최소 간격
-        
-        if time_since_last < min_interval:
-            wait_time = min_interval - time_since_last
-            logger.info(f"[{request_id}] Rate limit: waiting {wait_time:.2f}s (RPS: {TRANSLATION_RPS})")
-            await asyncio.sleep(wait_time)
-        
-        _last_request_time = time.time()
-        logger.debug(f"[{request_id}] Rate limit check passed (RPS: {TRANSLATION_RPS})")
-
-async def call_gemini_translate_list(texts_to_translate: List[str], request_id: str = "N/A") -> List[str]:
-    """
-    Gemini API를 JSON 모드로 호출하여 텍스트 리스트 전체를 번역합니다.
-
-    Args:
-        texts_to_translate: 번역할 텍스트 문자열 리스트.
-        request_id: 로깅을 위한 요청 ID.
-
-    Returns:
-        번역된 텍스트 문자열 리스트.
-
-    Raises:
-        aiohttp.ClientError: 네트워크 또는 API 호출 중 에러 발생 시.
-        ValueError: API 응답 구문 분석 실패, 스키마 불일치, 길이 불일치 또는 API 에러 메시지 포함 시.
-        json.JSONDecodeError: 입력 리스트를 JSON으로 변환 실패 시.
-    """
-    if not texts_to_translate:
-        logger.info(f"[{request_id}] 번역할 텍스트 리스트가 비어있습니다. 빈 리스트 반환.")
-        return []
-
-    # 시스템 지침 정의
-    system_instruction = (
-        "You are a helpful translation assistant for e-commerce. "
-        "Translate the texts from product detail images into Korean. "
-        "The translation should be natural, polite, and concise, suitable for marketing content."
+def create_translation_client() -> GeminiTranslationClient:
+    """설정값으로 워커 전체가 공유할 번역 클라이언트를 만듭니다."""
+    return GeminiTranslationClient(
+        api_url=API_URL,
+        system_instruction=SYSTEM_INSTRUCTION,
+        max_connections=TRANSLATION_MAX_CONNECTIONS,
+        keepalive_timeout=TRANSLATION_KEEPALIVE_TIMEOUT,
+        request_timeout=TRANSLATION_REQUEST_TIMEOUT,
+        connect_timeout=TRANSLATION_CONNECT_TIMEOUT,
+        max_retries=TRANSLATION_MAX_RETRIES,
+        retry_base_delay=TRANSLATION_RETRY_BASE_DELAY,
+        retry_max_delay=TRANSLATION_RETRY_MAX_DELAY
     )
 
-    # 입력 텍스트 리스트를 JSON 문자열로 변환
-    try:
-        prompt_content = json.dumps(texts_to_translate, ensure_ascii=False)
-    except json.JSONDecodeError as e:
-        logger.error(f"[{request_id}] 입력 텍스트 리스트를 JSON으로 변환 실패: {e}")
-        raise e
-
-    headers = {
-        'Content-Type': 'application/json'
-    }
-    request_data = {
-        "system_instruction": {
-            "parts": [{"text": system_instruction}]
-        },
-        "contents": [
-            {
-                "role": "user",
-                "parts": [{"text": prompt_content}]
-            }
-        ],
-        "generationConfig": {
-            "responseMimeType": "application/json",
-            "responseSchema": TRANSLATION_LIST_SCHEMA
-        }
-    }
-
-    logger.debug(f"[{request_id}] Calling Gemini API (JSON List). URL: {API_URL.split('?')[0]}, Num Texts: {len(texts_to_translate)}, Prompt (partial): {prompt_content[:100]}...")
-
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.post(API_URL, headers=headers, json=request_data) as response:
-                response_text = await response.text()
-                response.raise_for_status()
-
-                try:
-                    response_data = json.loads(response_text)
-                except json.JSONDecodeError:
-                    logger.error(f"[{request_id}] Gemini API JSON 응답 파싱 실패 (List). 응답: {response_text}")
-                    raise ValueError("Failed to parse Gemini API JSON response (List)")
-
-                # JSON 모드 응답 구조 파싱
-                if response_data.get("candidates") and \
-                   len(response_data["candidates"]) > 0 and \
-                   response_data["candidates"][0].get("content") and \
-                   response_data["candidates"][0]["content"].get("parts") and \
-                   len(response_data["candidates"][0]["content"]["parts"]) > 0 and \
-                   isinstance(response_data["candidates"][0]["content"]["parts"][0].get("text"), str):
-
-                    translated_list_json = response_data["candidates"][0]["content"]["parts"][0]["text"]
-                    try:
-                        translated_list = json.loads(translated_list_json)
-                    except json.JSONDecodeError:
-                        logger.error(f"[{request_id}] Gemini API 반환 JSON 내부 파싱 실패 (List). 내부 JSON: {translated_list_json}")
-                        raise ValueError("Failed to parse inner JSON from Gemini API response (List)")
-
-                    # 반환된 것이 리스트인지 확인
-                    if not isinstance(translated_list, list):
-                        logger.error(f"[{request_id}] Gemini API가 JSON 배열을 반환하지 않음 (List). 반환값 타입: {type(translated_list)}")
-                        raise ValueError("Gemini API did not return a JSON array as expected (List)")
-
-                    # 입력과 출력 리스트 길이 비교
-                    if len(translated_list) != len(texts_to_translate):
-                         return []
-
-                    logger.debug(f"[{request_id}] Gemini API 응답 수신 (List). 번역된 항목 수: {len(translated_list)}")
-                    return translated_list
-                else:
-                    logger.error(f"[{request_id}] Gemini API 응답 구조가 예상과 다릅니다 (List): {response_data}")
-                    if response_data.get("promptFeedback") and response_data["promptFeedback"].get("blockReason"):
-                        reason = response_data['promptFeedback']['blockReason']
-                        ratings = response_data['promptFeedback'].get('safetyRatings', 'N/A')
-                        logger.error(f"[{request_id}] Gemini API 요청 차단됨 (List): {reason}, 이유: {ratings}")
-                        raise ValueError(f"Gemini API request blocked (List): {reason}")
-                    raise ValueError("Unexpected Gemini API response structure (List)")
-
-        except aiohttp.ClientResponseError as e:
-            logger.error(f"[{request_id}] Gemini API HTTP 에러 (List): {e.status} {e.message}. 응답: {response_text}")
-            try:
-                error_details = json.loads(response_text)
-                if error_details.get("error") and error_details["error"].get("message"):
-                    logger.error(f"[{request_id}] 상세 Gemini API 에러 (List): {error_details['error']['message']}")
-                    raise ValueError(f"Gemini API Error (List): {error_details['error']['message']}") from e
-            except json.JSONDecodeError:
-                pass
-            raise e
-        except aiohttp.ClientError as e:
-            logger.error(f"[{request_id}] Gemini API 호출 중 네트워크/클라이언트 에러 (List): {e}")
-            raise e
-        except Exception as e:
-             logger.error(f"[{request_id}] Gemini API 호출 중 예상치 못한 에러 (List): {e}", exc_info=True)
-             raise e
+def create_translation_scheduler(translation_client: GeminiTranslationClient) -> TranslationScheduler:
+    """여러 요청의 번역을 합쳐 보내고 RPS/TPM 한도를 지키는 스케줄러를 만듭니다."""
+    return TranslationScheduler(
+        translation_client,
+        max_items=TRANSLATION_BATCH_MAX_ITEMS,
+        max_tokens=TRANSLATION_BATCH_MAX_TOKENS,
+        max_wait=TRANSLATION_BATCH_MAX_WAIT,
+        requests_per_second=TRANSLATION_RPS,
+        request_burst=TRANSLATION_RPS_BURST,
+        tokens_per_minute=TRANSLATION_TPM,
+        max_concurrent_calls=TRANSLATION_MAX_CONCURRENT_CALLS
+    )
 
-async def call_translation_api(texts: List[str], request_id: str) -> List[str]:
+async def call_translation_api(texts: List[str], request_id: str, translation_client: Union[GeminiTranslationClient, TranslationScheduler],
+                               translation_memory: Optional[TranslationMemory] = None) -> List[str]:
     """
-    Gemini API (JSON 모드)를 호출하여 텍스트 리스트 전체를 한 번에 번역합니다.
-    API 호출 실패 시 한 번 재시도하며, 최종 실패 시 빈 리스트를 반환합니다.
+    공유 번역 클라이언트(또는 스케줄러)로 텍스트 리스트 전체를 번역합니다.
+    번역 메모리가 있으면 캐시에 없는 원문(중복 제거)만 API로 보내고 결과를 원래 순서로 합칩니다.
+    일시적 오류는 클라이언트가 백오프와 함께 재시도하며, 최종 실패 시 빈 리스트를 반환합니다.
 
     Args:
         texts: 번역할 텍스트 문자열 리스트.
         request_id: 로깅을 위한 요청 ID.
+        translation_client: 워커가 소유한 TranslationScheduler (다른 요청과 합쳐 호출, 속도 제한 적용)
+            또는 GeminiTranslationClient (바로 호출).
+        translation_memory: 워커가 소유한 TranslationMemory (None이면 캐시 미사용).
 
     Returns:
         번역된 텍스트 문자열 리스트. 최종 실패 시 빈 리스트 `[]` 반환.
@@ -211,31 +100,43 @@ async def call_translation_api(texts: List[str], request_id: str) -> List[str]:
         logger.info(f"[{request_id}] No texts provided for translation.")
         return []
 
-    logger.info(f"[{request_id}] Calling Gemini translation API (JSON List) for {len(texts)} texts...")
-
-    max_retries = 1
-    for attempt in range(max_retries + 1):
-        try:
-            # Rate limit 적용
-            await wait_for_rate_limit(request_id)
-            
-            translated_texts = await call_gemini_translate_list(
-                texts_to_translate=texts,
-                request_id=request_id
-            )
-            logger.info(f"[{request_id}] Gemini translation (JSON List) finished on attempt {attempt + 1}. Processed {len(texts)} texts, received {len(translated_texts)} translations.")
-            return translated_texts
+    cached = await translation_memory.lookup(texts) if translation_memory else {}
+    to_translate = [text for text in dict.fromkeys(texts) if text not in cached]
+    if not to_translate:
+        logger.info(f"[{request_id}] All {len(texts)} texts served from translation memory.")
+        return [cached[text] for text in texts]
 
-        except Exception as e:
-            logger.error(f"[{request_id}] Attempt {attempt + 1} failed to translate text list using Gemini API (JSON List): {e}", exc_info=False)
-            if attempt < max_retries:
-                logger.info(f"[{request_id}] Retrying translation...")
-                await asyncio.sleep(1)
-            else:
-                logger.error(f"[{request_id}] All translation attempts failed.")
-                return []
+    logger.info(
+        f"[{request_id}] Calling Gemini translation API (JSON List) for {len(to_translate)} texts "
+        f"({len(texts)} requested, {len(cached)} cached)..."
+    )
+    try:
+        translated_texts = await translation_client.translate_list(to_translate, request_id)
+        logger.info(f"[{request_id}] Gemini translation (JSON List) finished. Processed {len(to_translate)} texts, received {len(translated_texts)} translations.")
+    except Exception as e:
+        logger.error(f"[{request_id}] All translation attempts failed: {e}")
+        return []
 
-    return []
+    fresh = dict(zip(to_translate, translated_texts))
+    if translation_memory:
+        # 빈 번역이나 중국어가 남은 번역(렌더링 시 제외됨)은 저장하지 않음
+        await translation_memory.store({
+            text: translated for text, translated in fresh.items()
+            if isinstance(translated, str) and translated.strip() and not contains_chinese(translated)
+        })
+    cached.update(fresh)
+    return [cached[text] for text in texts]
+
+def create_translation_memory() -> Optional[TranslationMemory]:
+    """설정값으로 워커 전체가 공유할 번역 메모리를 만듭니다 (비활성화 시 None)."""
+    if not TRANSLATION_MEMORY_ENABLED:
+        return None
+    return TranslationMemory(
+        version=translation_memory_version(GEMINI_MODEL_NAME, SYSTEM_INSTRUCTION, TRANSLATION_LIST_SCHEMA),
+        key_prefix=TRANSLATION_MEMORY_KEY_PREFIX,
+        max_local_entries=TRANSLATION_MEMORY_LOCAL_SIZE,
+        ttl_seconds=TRANSLATION_MEMORY_TTL
+    )
 
 async def save_result_to_internal_storage(result_checker, request_id: str, result_data: dict):
     """번역 결과를 ResultChecker의 내부 메모리 저장소에 저장합니다."""
@@ -247,10 +148,14 @@ async def save_result_to_internal_storage(result_checker, request_id: str, resul
         logger.error(f"[{request_id}] Failed to save result to internal storage: {e}", exc_info=True)
         return False
 
-async def process_and_save_translation(task_data: dict, image_url: str, result_checker):
+async def process_and_save_translation(task_data: dict, image_url: str, result_checker,
+                                      translation_client: Union[GeminiTranslationClient, TranslationScheduler],
+                                      translation_memory: Optional[TranslationMemory] = None):
     """
     번역의 전체 과정을 처리하고, 결과를 ResultChecker의 내부 저장소에 저장합니다.
     result_checker: ResultChecker 인스턴스 (내부 저장소 접근용)
+    translation_client: 워커가 소유한 번역 스케줄러/클라이언트 (연결 풀 공유)
+    translation_memory: 워커가 소유한 번역 메모리 (None이면 캐시 미사용)
     """
     request_id = task_data.get("request_id")
     image_id = task_data.get("image_id")
@@ -287,7 +192,7 @@ async def process_and_save_translation(task_data: dict, image_url: str, result_c
             if texts_to_translate:
                 # 번역 API 호출 (순수 async I/O)
                 logger.info(f"[{request_id}] Calling translation API for {len(texts_to_translate)} texts")
-                translated_texts = await call_translation_api(texts_to_translate, request_id)
+                translated_texts = await call_translation_api(texts_to_translate, request_id, translation_client, translation_memory)
 
                 # 번역 결과 처리
                 translate_result_for_rendering = []
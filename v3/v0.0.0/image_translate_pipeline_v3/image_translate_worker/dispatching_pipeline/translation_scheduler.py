@@ -0,0 +1,291 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+from dispatching_pipeline.translation_client import GeminiTranslationClient
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(texts: List[str]) -> int:
+    """
+    번역 호출 한 번이 쓰는 토큰 수의 대략적인 추정치 (입력 + 출력).
+    중국어/한국어는 글자당 약 1토큰이므로 원문 글자 수의 2배(입력 + 번역문)에 항목별 JSON 구분자 몫을 더합니다.
+    """
+    return sum(2 * len(text) + 4 for text in texts)
+
+
+class TokenBucket:
+    """
+    비동기 토큰 버킷 (예약 방식).
+
+    acquire()는 필요한 토큰을 즉시 차감(잔량이 음수가 될 수 있음)하고 부족분이 채워질 때까지 잠듭니다.
+    호출자들이 하나의 잠금 뒤에 줄 서지 않고 각자 필요한 만큼만 기다리며, 버스트는 capacity까지 허용됩니다.
+    하나의 이벤트 루프에서만 사용합니다.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Args:
+            rate: 초당 채워지는 토큰 수 (0 이하이면 제한 없음)
+            capacity: 버킷 최대 크기 (버스트 허용량)
+        """
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1.0) -> float:
+        """토큰을 예약하고 사용 가능해질 때까지 기다립니다. 기다린 시간(초)을 반환합니다."""
+        if self.rate <= 0:
+            return 0.0
+        self._refill(time.monotonic())
+        self._tokens -= amount
+        if self._tokens >= 0:
+            return 0.0
+        wait = -self._tokens / self.rate
+        await asyncio.sleep(wait)
+        return wait
+
+
+class _PendingRequest:
+    __slots__ = ("texts", "request_id", "future", "enqueued_at", "tokens")
+
+    def __init__(self, texts: List[str], request_id: str, future: asyncio.Future):
+        self.texts = texts
+        self.request_id = request_id
+        self.future = future
+        self.enqueued_at = time.monotonic()
+        self.tokens = estimate_tokens(texts)
+
+
+class TranslationScheduler:
+    """
+    여러 요청의 번역 문자열을 모아 Gemini 호출 한 번으로 보내는 마이크로 배치 스케줄러.
+
+    - 첫 요청이 들어온 뒤 max_wait 동안, 또는 항목 수(max_items)/추정 토큰(max_tokens) 한도에 닿을 때까지 요청을 모읍니다.
+      요청은 나누지 않으며, 한도보다 큰 요청은 혼자 보냅니다. 같은 배치 안의 중복 문자열은 한 번만 보냅니다.
+    - 반환된 배열은 요청별로 다시 나눠 각 요청의 Future에 돌려줍니다.
+    - 초당 호출 수(RPS)와 분당 토큰 수(TPM)는 전역 잠금 대신 토큰 버킷 두 개로 제한하므로
+      한도 안에서는 여러 호출이 동시에 진행됩니다 (동시 호출 수는 max_concurrent_calls로 제한).
+    - 합친 호출이 실패하면 요청별 호출로 한 번 더 시도해, 한 요청의 문제로 배치 전체가 실패하지 않게 합니다.
+
+    translate_list()는 GeminiTranslationClient와 같은 형태이므로 call_translation_api에 클라이언트 대신 넘길 수 있습니다.
+    """
+
+    def __init__(
+        self,
+        client: GeminiTranslationClient,
+        max_items: int = 200,
+        max_tokens: int = 8000,
+        max_wait: float = 0.05,
+        requests_per_second: float = 1.0,
+        request_burst: float = 1.0,
+        tokens_per_minute: float = 0.0,
+        max_concurrent_calls: int = 8
+    ):
+        """
+        Args:
+            client: 실제 API 호출에 사용할 번역 클라이언트
+            max_items: 호출 한 번에 보낼 최대 문자열 수
+            max_tokens: 호출 한 번의 최대 추정 토큰 수
+            max_wait: 첫 요청 도착 후 배치를 모으는 최대 시간 (초)
+            requests_per_second: 초당 API 호출 수 제한 (0 이하이면 제한 없음)
+            request_burst: 호출 수 버킷 크기 (연속으로 바로 보낼 수 있는 호출 수)
+            tokens_per_minute: 분당 추정 토큰 수 제한 (0 이하이면 제한 없음)
+            max_concurrent_calls: 동시에 진행할 수 있는 API 호출 수
+        """
+        self.client = client
+        self.max_items = max(1, max_items)
+        self.max_tokens = max(1, max_tokens)
+        self.max_wait = max_wait
+        self.request_bucket = TokenBucket(requests_per_second, request_burst)
+        self.token_bucket = TokenBucket(tokens_per_minute / 60.0, tokens_per_minute)
+        self.max_concurrent_calls = max(1, max_concurrent_calls)
+
+        self._pending: deque = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._call_slots: Optional[asyncio.Semaphore] = None
+        self._loop_task: Optional[asyncio.Task] = None
+        self._call_tasks: set = set()
+        self._call_seq = 0
+
+        # 지표
+        self.calls = 0
+        self.fallback_calls = 0
+        self._batch_items = deque(maxlen=1024)      # 호출별 전송 문자열 수
+        self._batch_requests = deque(maxlen=1024)   # 호출별 합쳐진 요청 수
+        self._queue_delays = deque(maxlen=4096)     # 요청별 대기 시간 (도착 -> API 전송, 초)
+        self._rate_waits = deque(maxlen=1024)       # 호출별 속도 제한 대기 시간 (초)
+
+    def _ensure_started(self):
+        if self._loop_task is None or self._loop_task.done():
+            self._wakeup = asyncio.Event()
+            self._call_slots = asyncio.Semaphore(self.max_concurrent_calls)
+            self._loop_task = asyncio.create_task(self._batch_loop())
+
+    async def translate_list(self, texts: List[str], request_id: str = "N/A") -> List[str]:
+        """
+        다른 요청들과 합쳐서 번역하고, 이 요청의 번역 결과만 원래 순서로 반환합니다.
+
+        Raises:
+            Exception: 합친 호출과 개별 재시도 모두 실패한 경우 마지막 오류.
+        """
+        if not texts:
+            return []
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(_PendingRequest(list(texts), request_id, future))
+        self._wakeup.set()
+        return await future
+
+    def _batch_is_full(self) -> bool:
+        items = tokens = 0
+        for pending in self._pending:
+            items += len(pending.texts)
+            tokens += pending.tokens
+            if items >= self.max_items or tokens >= self.max_tokens:
+                return True
+        return False
+
+    def _take_batch(self) -> List[_PendingRequest]:
+        """한도 안에 들어가는 만큼 대기 요청을 꺼냅니다 (최소 1개)."""
+        batch = [self._pending.popleft()]
+        items, tokens = len(batch[0].texts), batch[0].tokens
+        while self._pending:
+            nxt = self._pending[0]
+            if items + len(nxt.texts) > self.max_items or tokens + nxt.tokens > self.max_tokens:
+                break
+            batch.append(self._pending.popleft())
+            items += len(nxt.texts)
+            tokens += nxt.tokens
+        return batch
+
+    async def _batch_loop(self):
+        while True:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            # 가장 오래된 요청 기준으로 max_wait까지 더 모음 (한도에 닿으면 바로 전송)
+            deadline = self._pending[0].enqueued_at + self.max_wait
+            while not self._batch_is_full():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+
+            # 동시 호출 수 / 초당 호출 수 한도를 먼저 통과한 뒤 배치를 꺼냄 (기다리는 동안 도착한 요청도 같은 호출에 합류)
+            await self._call_slots.acquire()
+            try:
+                request_wait = await self.request_bucket.acquire(1)
+            except BaseException:
+                self._call_slots.release()
+                raise
+            batch = self._take_batch()
+            task = asyncio.create_task(self._dispatch(batch, request_wait))
+            self._call_tasks.add(task)
+            task.add_done_callback(self._call_tasks.discard)
+
+    async def _call(self, texts: List[str], label: str) -> List[str]:
+        """속도 제한(호출 수, 토큰 수)을 통과한 뒤 API를 호출합니다."""
+        await self.request_bucket.acquire(1)
+        await self.token_bucket.acquire(estimate_tokens(texts))
+        return await self.client.translate_list(texts, label)
+
+    async def _dispatch(self, batch: List[_PendingRequest], request_wait: float):
+        try:
+            self._call_seq += 1
+            label = f"tbatch-{self._call_seq}" if len(batch) > 1 else batch[0].request_id
+            unique_texts = list(dict.fromkeys(text for pending in batch for text in pending.texts))
+            try:
+                rate_wait = request_wait + await self.token_bucket.acquire(estimate_tokens(unique_texts))
+                # 대기 시간 = 도착 ~ 속도 제한 통과 후 API 전송 시점
+                sent_at = time.monotonic()
+                queue_delays = [sent_at - pending.enqueued_at for pending in batch]
+                translated = await self.client.translate_list(unique_texts, label)
+                self._record(batch, len(unique_texts), queue_delays, rate_wait)
+                mapping = dict(zip(unique_texts, translated))
+                for pending in batch:
+                    if not pending.future.done():
+                        pending.future.set_result([mapping[text] for text in pending.texts])
+                logger.info(
+                    f"[{label}] Translation call: {len(batch)} requests, {len(unique_texts)} texts "
+                    f"(~{estimate_tokens(unique_texts)} tokens), rate_wait={rate_wait:.3f}s, "
+                    f"max_queue_delay={max(queue_delays):.3f}s, call={time.monotonic() - sent_at:.3f}s"
+                )
+                return
+            except Exception as e:
+                if len(batch) == 1:
+                    if not batch[0].future.done():
+                        batch[0].future.set_exception(e)
+                    return
+                logger.warning(f"[{label}] Combined translation of {len(batch)} requests failed, retrying per request: {e}")
+
+            await asyncio.gather(*(self._dispatch_single(pending) for pending in batch))
+        finally:
+            self._call_slots.release()
+
+    async def _dispatch_single(self, pending: _PendingRequest):
+        try:
+            unique_texts = list(dict.fromkeys(pending.texts))
+            translated = await self._call(unique_texts, pending.request_id)
+            self.fallback_calls += 1
+            mapping = dict(zip(unique_texts, translated))
+            if not pending.future.done():
+                pending.future.set_result([mapping[text] for text in pending.texts])
+        except Exception as e:
+            if not pending.future.done():
+                pending.future.set_exception(e)
+
+    def _record(self, batch: List[_PendingRequest], unique_items: int, queue_delays: List[float], rate_wait: float):
+        self.calls += 1
+        self._batch_items.append(unique_items)
+        self._batch_requests.append(len(batch))
+        self._rate_waits.append(rate_wait)
+        self._queue_delays.extend(queue_delays)
+
+    def stats(self) -> Dict[str, Any]:
+        """호출 수, 호출별 배치 크기(문자열/요청 수)와 요청별 대기 시간(초) 지표를 반환합니다."""
+        result: Dict[str, Any] = {
+            "calls": self.calls,
+            "fallback_calls": self.fallback_calls,
+            "pending": len(self._pending)
+        }
+        if self._batch_items:
+            result.update({
+                "avg_batch_items": float(np.mean(self._batch_items)),
+                "max_batch_items": int(np.max(self._batch_items)),
+                "avg_batch_requests": float(np.mean(self._batch_requests)),
+                "avg_rate_wait": float(np.mean(self._rate_waits))
+            })
+        if self._queue_delays:
+            p50, p90, p99 = np.percentile(np.array(self._queue_delays), [50, 90, 99])
+            result.update({"queue_delay_p50": p50, "queue_delay_p90": p90, "queue_delay_p99": p99})
+        return result
+
+    async def close(self):
+        """배치 루프를 멈추고 진행 중인 호출이 끝나길 기다립니다. 아직 보내지 않은 요청은 실패 처리합니다."""
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            await asyncio.gather(self._loop_task, return_exceptions=True)
+            self._loop_task = None
+        if self._call_tasks:
+            await asyncio.gather(*self._call_tasks, return_exceptions=True)
+        while self._pending:
+            pending = self._pending.popleft()
+            if not pending.future.done():
+                pending.future.set_exception(RuntimeError("Translation scheduler closed"))
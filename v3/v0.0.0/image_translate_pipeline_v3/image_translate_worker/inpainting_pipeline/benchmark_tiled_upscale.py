@@ -0,0 +1,148 @@
+"""
+타일 업스케일링 벤치마크: 타일 크기별 최대 메모리(peak RSS)와 처리량 비교 (CPUExecutionProvider)
+
+설정마다 별도 프로세스에서 세션을 로드/워밍업한 뒤 긴 이미지를 업스케일링하고,
+워밍업 후 RSS, 최대 RSS(ru_maxrss), 이미지당 처리 시간을 측정합니다.
+tile=0은 기존처럼 이미지 전체를 한 번에 추론하는 경우입니다.
+
+업스케일 모델 파일이 없으면 같은 입출력 형식(fp16 NCHW, 2배)을 가진 합성 conv 모델을 만들어 사용합니다.
+
+사용법 (image_translate_worker 디렉토리에서):
+    python -m inpainting_pipeline.benchmark_tiled_upscale --height 4096 --width 896 --tile-sizes 0,128,256,512
+"""
+import argparse
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from .image_inpainter import DEFAULT_UPSCALE_MODEL
+from .modules.postprocessing.session_registry import UpscaleSessionRegistry
+from .modules.postprocessing.upscaler import upscale_with_onnx, upscale_tiled_with_onnx
+
+WORKER_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def build_synthetic_model(path, channels=32, blocks=4, seed=0):
+    """fp16 입력 -> conv 블록 -> PixelShuffle(2) -> fp16 출력 형태의 합성 2배 업스케일 모델을 저장합니다."""
+    import onnx
+    from onnx import helper, numpy_helper, TensorProto
+
+    rng = np.random.default_rng(seed)
+    nodes = [helper.make_node('Cast', ['input'], ['x0'], to=TensorProto.FLOAT)]
+    initializers = []
+    in_ch, prev = 3, 'x0'
+    layer_channels = [channels] * blocks + [3 * 4]
+    for k, out_ch in enumerate(layer_channels):
+        weight = (rng.standard_normal((out_ch, in_ch, 3, 3)) * 0.05).astype(np.float32)
+        initializers.append(numpy_helper.from_array(weight, f'w{k}'))
+        initializers.append(numpy_helper.from_array(np.zeros(out_ch, np.float32), f'b{k}'))
+        nodes.append(helper.make_node('Conv', [prev, f'w{k}', f'b{k}'], [f'c{k}'], pads=[1, 1, 1, 1]))
+        prev = f'c{k}'
+        if k < len(layer_channels) - 1:
+            nodes.append(helper.make_node('Relu', [prev], [f'r{k}']))
+            prev = f'r{k}'
+        in_ch = out_ch
+    nodes.append(helper.make_node('DepthToSpace', [prev], ['up'], blocksize=2, mode='CRD'))
+    nodes.append(helper.make_node('Sigmoid', ['up'], ['sig']))
+    nodes.append(helper.make_node('Cast', ['sig'], ['output'], to=TensorProto.FLOAT16))
+
+    graph = helper.make_graph(
+        nodes, 'synthetic_upscaler',
+        [helper.make_tensor_value_info('input', TensorProto.FLOAT16, ['N', 3, 'H', 'W'])],
+        [helper.make_tensor_value_info('output', TensorProto.FLOAT16, ['N', 3, 'H2', 'W2'])],
+        initializer=initializers,
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid('', 17)])
+    model.ir_version = 8
+    onnx.save(model, path)
+
+
+def current_rss_mb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def run_child(args):
+    """한 가지 타일 설정을 측정하고 결과를 JSON 한 줄로 출력합니다 (별도 프로세스에서 실행)."""
+    logging.disable(logging.WARNING)
+    registry = UpscaleSessionRegistry(max_concurrent_runs=1, providers=['CPUExecutionProvider'])
+    session = registry.get(args.model)
+    session.warm_up()
+
+    image = np.random.default_rng(args.seed).integers(0, 256, (args.height, args.width, 3), dtype=np.uint8)
+    rss_after_load = current_rss_mb()
+
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        if args.child_tile == 0:
+            upscale_with_onnx(session, image)
+        else:
+            upscale_tiled_with_onnx(session, image, 2, args.child_tile, args.overlap, args.tiles_per_batch)
+        timings.append(time.perf_counter() - start)
+
+    print(json.dumps({
+        "tile": args.child_tile,
+        "seconds": float(np.median(timings)),
+        "rss_after_load_mb": rss_after_load,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="타일 업스케일링 메모리/처리량 벤치마크")
+    parser.add_argument("--model", default=DEFAULT_UPSCALE_MODEL, help="업스케일 ONNX 모델 경로 (없으면 합성 모델)")
+    parser.add_argument("--height", type=int, default=4096, help="입력 이미지 높이 (64의 배수)")
+    parser.add_argument("--width", type=int, default=896, help="입력 이미지 너비 (64의 배수)")
+    parser.add_argument("--tile-sizes", default="0,128,256,512", help="비교할 타일 크기 목록 (0 = 전체 이미지)")
+    parser.add_argument("--overlap", type=int, default=32)
+    parser.add_argument("--tiles-per-batch", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--child-tile", type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child_tile is not None:
+        run_child(args)
+        return
+
+    model_path = args.model
+    if not os.path.exists(model_path):
+        model_path = os.path.join(tempfile.mkdtemp(), "synthetic_upscaler.onnx")
+        build_synthetic_model(model_path)
+        print(f"업스케일 모델이 없어 합성 모델을 사용합니다: {model_path}")
+
+    megapixels = args.height * args.width / 1e6
+    print(f"input={args.width}x{args.height} ({megapixels:.2f} MP), overlap={args.overlap}, "
+          f"tiles_per_batch={args.tiles_per_batch}, provider=CPUExecutionProvider")
+    print(f"{'tile':>6} {'sec/img':>9} {'MP/s':>7} {'RSS load MB':>12} {'peak RSS MB':>12} {'peak-load MB':>13}")
+
+    for tile in [int(t) for t in args.tile_sizes.split(",")]:
+        cmd = [
+            sys.executable, "-m", "inpainting_pipeline.benchmark_tiled_upscale",
+            "--model", model_path, "--height", str(args.height), "--width", str(args.width),
+            "--overlap", str(args.overlap), "--tiles-per-batch", str(args.tiles_per_batch),
+            "--repeat", str(args.repeat), "--seed", str(args.seed), "--child-tile", str(tile),
+        ]
+        completed = subprocess.run(cmd, cwd=WORKER_ROOT, capture_output=True, text=True)
+        if completed.returncode != 0:
+            print(f"{tile:>6} 실패: {completed.stderr.strip().splitlines()[-1:]}")
+            continue
+        r = json.loads(completed.stdout.strip().splitlines()[-1])
+        print(f"{'full' if tile == 0 else tile:>6} {r['seconds']:9.3f} {megapixels / r['seconds']:7.2f} "
+              f"{r['rss_after_load_mb']:12.0f} {r['peak_rss_mb']:12.0f} "
+              f"{r['peak_rss_mb'] - r['rss_after_load_mb']:13.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -60,7 +60,9 @@ def setup_thread_pool(max_workers: int = 4) -> ThreadPoolExecutor:
 # --- 파이프라인 모듈 임포트 ---
 from .modules.preprocessing.preprocessor import preprocess_image
 from .modules.inpaint_gpu.batch_inpainting import inpaint_batch_gpu
-from .modules.postprocessing.postprocessor import run_postprocessing
+from .modules.postprocessing.postprocessor import run_postprocessing, run_postprocessing_batch, get_upscale_input_shape
+from .modules.postprocessing.session_registry import UpscaleSessionRegistry
+from .modules.postprocessing.upscaler import DEFAULT_TILE_SIZE, DEFAULT_TILE_OVERLAP, DEFAULT_TILES_PER_BATCH
 
 # --- 모델 경로 상수 ---
 # 이 파일의 위치를 기준으로 패키지 루트 디렉토리를 동적으로 찾습니다.
@@ -73,7 +75,18 @@ class ImageInpainter:
     """
     이미지 인페인팅 및 후처리 파이프라인을 관리하는 메인 클래스.
     """
-    def __init__(self, executor: Optional[ThreadPoolExecutor] = None, max_workers: int = 4):
+    def __init__(
+        self,
+        executor: Optional[ThreadPoolExecutor] = None,
+        max_workers: int = 4,
+        upscale_model_path: str = DEFAULT_UPSCALE_MODEL,
+        upscale_max_concurrency: int = 2,
+        max_upscale_batch: int = 4,
+        upscale_tile_size: int = DEFAULT_TILE_SIZE,
+        upscale_tile_overlap: int = DEFAULT_TILE_OVERLAP,
+        upscale_tiles_per_batch: int = DEFAULT_TILES_PER_BATCH,
+        warm_up: bool = True,
+    ):
         """
         ImageInpainter 초기화. 모델 로드 및 스레드 풀을 설정합니다.
         외부 스레드 풀 실행자를 받아 공유할 수 있습니다.
@@ -81,10 +94,25 @@ class ImageInpainter:
         Args:
             executor (Optional[ThreadPoolExecutor]): 공유할 스레드 풀 실행자.
             max_workers (int): `executor`가 제공되지 않을 경우 생성할 스레드 풀의 최대 스레드 수.
+            upscale_model_path (str): AI 업스케일 ONNX 모델 경로.
+            upscale_max_concurrency (int): 업스케일 세션의 동시 추론 실행 수 제한.
+            max_upscale_batch (int): 한 번의 업스케일 추론에 묶을 최대 이미지 수.
+            upscale_tile_size (int): 이 크기(64의 배수)보다 큰 이미지는 타일로 나누어 업스케일링.
+            upscale_tile_overlap (int): 업스케일 타일 간 최소 겹침 (픽셀).
+            upscale_tiles_per_batch (int): 한 번의 업스케일 추론에 묶을 최대 타일 수.
+            warm_up (bool): True이면 시작 시 업스케일 모델을 로드하고 더미 추론을 실행합니다.
         """
         self.inpaint_session = load_models_on_gpu(DEFAULT_INPAINT_MODEL)
         if not self.inpaint_session:
             raise ValueError("인페인팅 모델 로딩에 실패했습니다. 파이프라인을 시작할 수 없습니다.")
+
+        # 업스케일 세션은 한 번만 로드하여 모든 후처리 스레드가 공유
+        self.upscale_model_path = upscale_model_path
+        self.max_upscale_batch = max(1, max_upscale_batch)
+        self.upscale_tiling = (upscale_tile_size, upscale_tile_overlap, upscale_tiles_per_batch)
+        self.upscale_registry = UpscaleSessionRegistry(max_concurrent_runs=upscale_max_concurrency)
+        if warm_up:
+            self.upscale_registry.warm_up(self.upscale_model_path)
         
         if executor:
             self.executor = executor
@@ -164,6 +192,12 @@ class ImageInpainter:
         # 2. & 3. 인페인팅과 후처리를 병렬로 실행
         logging.info(f"GPU 인페인팅과 CPU 후처리를 병렬로 시작합니다 (배치 크기: {batch_size})...")
         
+        # 업스케일 세션 (로드 실패 시 None -> 후처리에서 단순 리사이즈로 대체)
+        try:
+            upscale_session = self.upscale_registry.get(self.upscale_model_path)
+        except RuntimeError:
+            upscale_session = None
+
         postprocess_futures = {}
         for i in range(0, num_images, batch_size):
             batch_end = min(i + batch_size, num_images)
@@ -176,30 +210,57 @@ class ImageInpainter:
             
             # 인페인팅이 끝난 배치를 즉시 후처리 작업으로 제출
             logging.info(f"  - 후처리 작업 제출 중: {i+1}-{batch_end} / {num_images}")
+            # 업스케일 입력 크기(64배수)가 같은 이미지는 묶어서 한 번의 추론으로 처리
+            upscale_groups = {}
             for j, inpainted_img in enumerate(inpainted_batch):
                 original_index = i + j
+                if scale_factors[original_index] > 1:
+                    shape = get_upscale_input_shape(sizes_before_padding[original_index])
+                    upscale_groups.setdefault(shape, []).append(original_index)
+                    continue
                 future = self.executor.submit(
                     run_postprocessing, 
                     inpainted_img, 
                     sizes_before_padding[original_index], 
                     scale_factors[original_index],
-                    DEFAULT_UPSCALE_MODEL,
+                    upscale_session,
+                    *self.upscale_tiling,
                 )
-                postprocess_futures[future] = original_index
+                postprocess_futures[future] = [original_index]
+
+            for shape, indices in upscale_groups.items():
+                # 타일 업스케일링 대상은 타일끼리 배치로 묶이므로 이미지는 한 장씩 제출
+                chunk_size = 1 if max(shape) > self.upscale_tiling[0] else self.max_upscale_batch
+                for k in range(0, len(indices), chunk_size):
+                    chunk = indices[k:k + chunk_size]
+                    future = self.executor.submit(
+                        run_postprocessing_batch,
+                        [inpainted_batch[idx - i] for idx in chunk],
+                        [sizes_before_padding[idx] for idx in chunk],
+                        [scale_factors[idx] for idx in chunk],
+                        upscale_session,
+                        *self.upscale_tiling,
+                    )
+                    postprocess_futures[future] = chunk
 
         # 모든 후처리 작업이 제출된 후, 완료되는 순서대로 결과를 반환
         logging.info("모든 작업이 제출되었습니다. 완료되는 대로 결과를 반환합니다...")
         for future in as_completed(postprocess_futures):
-            original_index = postprocess_futures[future]
+            original_indices = postprocess_futures[future]
             try:
-                result_image = future.result()
+                result = future.result()
+            except Exception as e:
+                for original_index in original_indices:
+                    logging.error(f"이미지 {original_index + 1} 후처리 중 오류 발생: {e}")
+                continue
+            result_images = result if isinstance(result, list) else [result]
+            for original_index, result_image in zip(original_indices, result_images):
                 logging.info(f"이미지 {original_index + 1}의 후처리가 완료되어 반환합니다.")
                 yield original_index, result_image
-            except Exception as e:
-                logging.error(f"이미지 {original_index + 1} 후처리 중 오류 발생: {e}")
 
     def close(self):
-        """파이프라인 종료 시 스레드 풀을 안전하게 닫습니다."""
+        """파이프라인 종료 시 업스케일 세션을 해제하고 스레드 풀을 안전하게 닫습니다."""
+        self.upscale_registry.close()
         if self._created_executor:
             logging.info("내부적으로 생성된 스레드 풀을 종료합니다.")
             self.executor.shutdown()
@@ -1,75 +1,155 @@
 import cv2
 import numpy as np
-import onnxruntime
 import logging
 import math
-from typing import Tuple
+from typing import Tuple, List, Union, Optional
 
 # 내부 모듈 임포트
 from .resize import crop_padding
 from .simple_upscaler import upscale_simple
-from .upscaler import upscale_with_onnx
+from .upscaler import (
+    upscale_batch_with_onnx, upscale_tiled_with_onnx,
+    DEFAULT_TILE_SIZE, DEFAULT_TILE_OVERLAP, DEFAULT_TILES_PER_BATCH,
+)
+from .session_registry import UpscaleSession, UpscaleSessionRegistry
 
 # AI 업스케일러의 배율을 상수로 정의
 AI_UPSCALE_FACTOR = 2
 
-def run_postprocessing(
-    inpainted_image: np.ndarray,
-    size_before_padding: Tuple[int, int],
-    scale_factor: int,
-    upscale_model_path: str,
-) -> np.ndarray:
+# 모델 경로(str)로 호출하는 기존 방식을 위한 프로세스 공용 레지스트리
+_default_registry = UpscaleSessionRegistry()
+
+def get_upscale_input_shape(size_before_padding: Tuple[int, int]) -> Tuple[int, int]:
     """
-    인페인팅된 이미지에 대한 전체 후처리 파이프라인을 실행합니다.
-    AI 업스케일링을 위해 이미지를 64배수로 패딩하고, 처리 후 패딩을 제거합니다.
+    패딩 전 크기(w, h)에 대해 AI 업스케일링 입력 크기(64배수, (h, w))를 반환합니다.
+    이 크기가 같은 이미지끼리는 하나의 배치로 업스케일링할 수 있습니다.
     """
-    # 1. 패딩 제거하여 원본 비율의 이미지 복원
-    restored_image = crop_padding(inpainted_image, size_before_padding)
+    w, h = size_before_padding
+    return math.ceil(h / 64) * 64, math.ceil(w / 64) * 64
 
-    if scale_factor <= 1:
-        return restored_image
-
-    # 2. AI 업스케일링을 위해 64배수 크기로 패딩
+def _pad_for_upscale(restored_image: np.ndarray) -> np.ndarray:
+    """AI 업스케일링을 위해 64배수 크기로 패딩합니다."""
     h, w = restored_image.shape[:2]
-    target_h = math.ceil(h / 64) * 64
-    target_w = math.ceil(w / 64) * 64
+    target_h, target_w = get_upscale_input_shape((w, h))
     pad_h = target_h - h
     pad_w = target_w - w
 
     if pad_h > 0 or pad_w > 0:
         logging.info(f"AI 업스케일링을 위해 패딩 추가: {w}x{h} -> {target_w}x{target_h}")
-        image_to_upscale = cv2.copyMakeBorder(restored_image, 0, pad_h, 0, pad_w, cv2.BORDER_REFLECT)
-    else:
-        image_to_upscale = restored_image
-
-    # 3. AI 업스케일링 수행
-    try:
-        providers = ['CUDAExecutionProvider', 'CPUExecutionProvider']
-        upscale_session = onnxruntime.InferenceSession(upscale_model_path, providers=providers)
-        
-        upscaled_padded_image = upscale_with_onnx(
-            session=upscale_session,
-            image_np=image_to_upscale,
-        )
-    except Exception as e:
-        logging.error(f"AI 업스케일링 실패: {e}. 단순 리사이즈로 대체합니다.")
-        return upscale_simple(restored_image, scale_factor)
-
-    # 4. AI 업스케일링 후 패딩 제거
-    if pad_h > 0 or pad_w > 0:
-        h_upscaled, w_upscaled = h * AI_UPSCALE_FACTOR, w * AI_UPSCALE_FACTOR
+        return cv2.copyMakeBorder(restored_image, 0, pad_h, 0, pad_w, cv2.BORDER_REFLECT)
+    return restored_image
+
+def _finish_upscale(upscaled_padded_image: np.ndarray, h: int, w: int, scale_factor: int) -> np.ndarray:
+    """AI 업스케일링 결과의 패딩을 제거하고 남은 배율만큼 단순 확대합니다."""
+    # AI 업스케일링 후 패딩 제거
+    h_upscaled, w_upscaled = h * AI_UPSCALE_FACTOR, w * AI_UPSCALE_FACTOR
+    if upscaled_padded_image.shape[:2] != (h_upscaled, w_upscaled):
         current_image = upscaled_padded_image[:h_upscaled, :w_upscaled, :]
         logging.info(f"AI 업스케일링 후 패딩 제거: {upscaled_padded_image.shape[1]}x{upscaled_padded_image.shape[0]} -> {current_image.shape[1]}x{current_image.shape[0]}")
     else:
         current_image = upscaled_padded_image
 
-    # 5. 최종 크기를 원본 배율에 맞게 조절
+    # 최종 크기를 원본 배율에 맞게 조절
     remaining_scale = scale_factor / AI_UPSCALE_FACTOR
 
     if remaining_scale > 1.0:
         logging.info(f"AI 업스케일링 후 추가 리사이즈 (배율: {remaining_scale:.2f})")
-        final_image = upscale_simple(current_image, remaining_scale)
-    else:
-        final_image = current_image
+        return upscale_simple(current_image, remaining_scale)
+    return current_image
+
+def _resolve_session(upscaler: Optional[Union[UpscaleSession, str]]) -> UpscaleSession:
+    if upscaler is None:
+        raise RuntimeError("사용 가능한 업스케일 세션이 없습니다")
+    if isinstance(upscaler, UpscaleSession):
+        return upscaler
+    if isinstance(upscaler, str):
+        return _default_registry.get(upscaler)
+    raise TypeError(f"지원하지 않는 업스케일러 타입입니다: {type(upscaler).__name__}")
+
+def run_postprocessing_batch(
+    inpainted_images: List[np.ndarray],
+    sizes_before_padding: List[Tuple[int, int]],
+    scale_factors: List[int],
+    upscaler: Optional[Union[UpscaleSession, str]],
+    tile_size: int = DEFAULT_TILE_SIZE,
+    tile_overlap: int = DEFAULT_TILE_OVERLAP,
+    tiles_per_batch: int = DEFAULT_TILES_PER_BATCH,
+) -> List[np.ndarray]:
+    """
+    인페인팅된 이미지 여러 장에 대해 후처리를 실행합니다.
+    업스케일링이 필요한 이미지 중 64배수 패딩 크기가 같은 것들은 한 번의 session.run으로 처리하고,
+    tile_size보다 큰 이미지는 타일로 나누어 업스케일링하여 최대 메모리를 제한합니다.
+
+    Args:
+        inpainted_images (List[np.ndarray]): 인페인팅된 (패딩 포함) 이미지 리스트.
+        sizes_before_padding (List[Tuple[int, int]]): 이미지별 패딩 전 크기 (너비, 높이).
+        scale_factors (List[int]): 이미지별 전처리 축소 배율.
+        upscaler (Optional[Union[UpscaleSession, str]]): 공유 업스케일 세션 (또는 모델 경로).
+            None이면 단순 리사이즈로 확대합니다.
+        tile_size (int): 이 크기(64의 배수)보다 큰 이미지는 타일 업스케일링.
+        tile_overlap (int): 타일 간 최소 겹침 (입력 픽셀 기준).
+        tiles_per_batch (int): 한 번의 추론에 묶을 최대 타일 수.
 
-    return final_image
+    Returns:
+        List[np.ndarray]: 후처리된 이미지 리스트 (입력 순서 유지).
+    """
+    # 1. 패딩 제거하여 원본 비율의 이미지 복원
+    restored_images = [
+        crop_padding(img, size) for img, size in zip(inpainted_images, sizes_before_padding)
+    ]
+    results = list(restored_images)
+
+    # 2. 업스케일링이 필요한 이미지를 64배수 입력 크기별로 묶음
+    groups = {}
+    for i, scale_factor in enumerate(scale_factors):
+        if scale_factor > 1:
+            h, w = restored_images[i].shape[:2]
+            groups.setdefault(get_upscale_input_shape((w, h)), []).append(i)
+
+    for indices in groups.values():
+        # 3. AI 업스케일링 수행 (실패 시 단순 리사이즈로 대체)
+        try:
+            session = _resolve_session(upscaler)
+            padded_list = [_pad_for_upscale(restored_images[i]) for i in indices]
+            if max(padded_list[0].shape[:2]) > tile_size:
+                upscaled_list = [
+                    upscale_tiled_with_onnx(
+                        session, padded, AI_UPSCALE_FACTOR, tile_size, tile_overlap, tiles_per_batch
+                    )
+                    for padded in padded_list
+                ]
+            else:
+                upscaled_list = upscale_batch_with_onnx(session, padded_list)
+        except Exception as e:
+            logging.error(f"AI 업스케일링 실패: {e}. 단순 리사이즈로 대체합니다.")
+            for i in indices:
+                results[i] = upscale_simple(restored_images[i], scale_factors[i])
+            continue
+
+        # 4. 패딩 제거 및 최종 크기 조절
+        for i, upscaled in zip(indices, upscaled_list):
+            h, w = restored_images[i].shape[:2]
+            results[i] = _finish_upscale(upscaled, h, w, scale_factors[i])
+
+    return results
+
+def run_postprocessing(
+    inpainted_image: np.ndarray,
+    size_before_padding: Tuple[int, int],
+    scale_factor: int,
+    upscaler: Optional[Union[UpscaleSession, str]],
+    tile_size: int = DEFAULT_TILE_SIZE,
+    tile_overlap: int = DEFAULT_TILE_OVERLAP,
+    tiles_per_batch: int = DEFAULT_TILES_PER_BATCH,
+) -> np.ndarray:
+    """
+    인페인팅된 이미지에 대한 전체 후처리 파이프라인을 실행합니다.
+    AI 업스케일링을 위해 이미지를 64배수로 패딩하고, 처리 후 패딩을 제거합니다.
+
+    upscaler로 ImageInpainter가 관리하는 공유 세션을 전달합니다.
+    모델 경로(str)를 전달하면 프로세스 공용 레지스트리에서 한 번만 로드한 세션을 사용합니다.
+    """
+    return run_postprocessing_batch(
+        [inpainted_image], [size_before_padding], [scale_factor], upscaler,
+        tile_size, tile_overlap, tiles_per_batch,
+    )[0]
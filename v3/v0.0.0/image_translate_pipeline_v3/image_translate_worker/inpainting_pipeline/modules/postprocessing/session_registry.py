@@ -0,0 +1,119 @@
+import os
+import logging
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+import onnxruntime
+
+
+def get_execution_providers() -> List[str]:
+    """사용 가능한 경우 CUDA를, 아니면 CPU 실행 프로바이더를 반환합니다."""
+    if 'CUDAExecutionProvider' in onnxruntime.get_available_providers():
+        return ['CUDAExecutionProvider', 'CPUExecutionProvider']
+    return ['CPUExecutionProvider']
+
+
+class UpscaleSession:
+    """
+    로드된 업스케일 ONNX 세션 하나를 감싸는 클래스.
+
+    InferenceSession.run은 여러 스레드에서 동시에 호출해도 안전하지만,
+    GPU 메모리를 보호하기 위해 동시에 실행되는 run 수를 max_concurrent_runs로 제한합니다.
+    """
+    def __init__(self, model_path: str, session: onnxruntime.InferenceSession, max_concurrent_runs: int = 2):
+        self.model_path = model_path
+        self.session = session
+        self.input_name = session.get_inputs()[0].name
+        self.output_name = session.get_outputs()[0].name
+        # 모델 입력 타입(fp16 / fp32 모델 모두 지원)
+        self.input_dtype = np.float16 if session.get_inputs()[0].type == 'tensor(float16)' else np.float32
+        # 배치 차원이 1로 고정된 모델은 여러 이미지를 한 번에 넣을 수 없음
+        batch_dim = session.get_inputs()[0].shape[0]
+        self.supports_batching = not isinstance(batch_dim, int) or batch_dim > 1
+        self._run_slots = threading.BoundedSemaphore(max(1, max_concurrent_runs))
+
+    def run(self, input_batch: np.ndarray) -> np.ndarray:
+        """NCHW 입력 배치로 추론을 실행합니다 (동시 실행 수 제한 적용)."""
+        with self._run_slots:
+            return self.session.run([self.output_name], {self.input_name: input_batch})[0]
+
+    def warm_up(self, size: int = 64):
+        """더미 입력으로 한 번 실행하여 CUDA 커널 선택/메모리 할당을 첫 요청 전에 끝냅니다."""
+        dummy = np.zeros((1, 3, size, size), dtype=self.input_dtype)
+        self.run(dummy)
+
+
+class UpscaleSessionRegistry:
+    """
+    모델 경로별 업스케일 세션을 한 번만 로드하여 여러 스레드가 공유하도록 관리합니다.
+    로드에 실패한 모델은 실패를 기억해 두고 매 이미지마다 다시 로드를 시도하지 않습니다.
+    """
+    def __init__(self, max_concurrent_runs: int = 2, providers: Optional[List[str]] = None):
+        """
+        Args:
+            max_concurrent_runs (int): 세션별 동시 추론 실행 수 제한.
+            providers (Optional[List[str]]): 사용할 실행 프로바이더 (기본값: CUDA 사용 가능 시 CUDA, 아니면 CPU).
+        """
+        self.max_concurrent_runs = max_concurrent_runs
+        self.providers = providers
+        self._sessions: Dict[str, UpscaleSession] = {}
+        self._failures: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_path: str) -> UpscaleSession:
+        """
+        모델 경로에 해당하는 세션을 반환합니다 (최초 호출 시 로드).
+
+        Raises:
+            RuntimeError: 모델 로드에 실패한 경우.
+        """
+        session = self._sessions.get(model_path)
+        if session is not None:
+            return session
+
+        with self._lock:
+            session = self._sessions.get(model_path)
+            if session is not None:
+                return session
+            if model_path in self._failures:
+                raise RuntimeError(self._failures[model_path])
+
+            try:
+                if not os.path.exists(model_path):
+                    raise FileNotFoundError(f"업스케일 모델을 찾을 수 없습니다: {model_path}")
+                logging.info(f"업스케일 모델 로딩: {model_path}")
+                onnx_session = onnxruntime.InferenceSession(
+                    model_path, providers=self.providers or get_execution_providers()
+                )
+            except Exception as e:
+                self._failures[model_path] = f"업스케일 모델 로딩 실패: {e}"
+                logging.error(self._failures[model_path])
+                raise RuntimeError(self._failures[model_path]) from e
+
+            session = UpscaleSession(model_path, onnx_session, self.max_concurrent_runs)
+            self._sessions[model_path] = session
+            logging.info(f"업스케일 모델을 성공적으로 로드했습니다. (배치 지원: {session.supports_batching})")
+            return session
+
+    def warm_up(self, model_path: str) -> Optional[UpscaleSession]:
+        """
+        시작 시 모델을 미리 로드하고 더미 추론을 실행합니다.
+
+        Returns:
+            Optional[UpscaleSession]: 성공 시 세션, 실패 시 None (실패해도 파이프라인은 단순 리사이즈로 동작).
+        """
+        try:
+            session = self.get(model_path)
+            session.warm_up()
+            logging.info("업스케일 모델 워밍업 완료.")
+            return session
+        except Exception as e:
+            logging.error(f"업스케일 모델 워밍업 실패: {e}")
+            return None
+
+    def close(self):
+        """로드된 세션을 모두 해제합니다."""
+        with self._lock:
+            self._sessions.clear()
+            self._failures.clear()
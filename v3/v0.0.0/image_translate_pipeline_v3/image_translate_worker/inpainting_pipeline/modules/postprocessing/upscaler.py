@@ -1,9 +1,56 @@
 import numpy as np
-import onnxruntime
 import logging
+import math
+from typing import List, Tuple
+
+from .session_registry import UpscaleSession
+
+# 타일 업스케일링 기본값 (타일 크기는 모델 입력 조건에 맞게 64의 배수)
+DEFAULT_TILE_SIZE = 512
+DEFAULT_TILE_OVERLAP = 32
+DEFAULT_TILES_PER_BATCH = 4
+
+def upscale_batch_with_onnx(
+    session: UpscaleSession,
+    image_list: List[np.ndarray],
+) -> List[np.ndarray]:
+    """
+    크기가 같은 여러 이미지를 하나의 배치로 묶어 ONNX 모델로 한 번에 업스케일링합니다.
+    모델의 배치 차원이 1로 고정되어 있으면 이미지별로 나누어 실행합니다.
+    (메모리 부족에 주의)
+
+    Args:
+        session (UpscaleSession): 공유 업스케일 세션.
+        image_list (List[np.ndarray]): 업스케일링할 BGR 이미지(uint8) 리스트. 모두 같은 크기여야 합니다.
+
+    Returns:
+        List[np.ndarray]: 업스케일링된 BGR 이미지(uint8) 리스트 (입력 순서 유지).
+    """
+    if not image_list:
+        return []
+    h, w = image_list[0].shape[:2]
+    if any(img.shape != image_list[0].shape for img in image_list):
+        raise ValueError("배치 업스케일링은 같은 크기의 이미지만 지원합니다.")
+
+    logging.info(f"ONNX 모델로 {len(image_list)}개 이미지({w}x{h}) 업스케일링 시작...")
+
+    # 모델 입력에 맞게 NCHW, float16(또는 float32) 타입으로 변환하고 [0, 1] 범위로 정규화
+    img_batch = np.stack(image_list).transpose(0, 3, 1, 2).astype(session.input_dtype) / 255.0
+
+    # ONNX 런타임으로 추론 실행
+    if session.supports_batching:
+        result = session.run(img_batch)
+    else:
+        result = np.concatenate([session.run(img_batch[i:i + 1]) for i in range(len(image_list))])
+
+    # 모델 출력을 다시 [0, 255] 범위의 uint8 이미지로 변환
+    output_batch = (np.transpose(result, (0, 2, 3, 1)) * 255.0 + 0.5).clip(0, 255).astype(np.uint8)
+
+    logging.info(f"업스케일링 완료. 최종 크기: {output_batch.shape[2]}x{output_batch.shape[1]}")
+    return list(output_batch)
 
 def upscale_with_onnx(
-    session: onnxruntime.InferenceSession,
+    session: UpscaleSession,
     image_np: np.ndarray,
 ) -> np.ndarray:
     """
@@ -11,26 +58,129 @@ def upscale_with_onnx(
     (메모리 부족에 주의)
 
     Args:
-        session (onnxruntime.InferenceSession): 업스케일링 모델의 ONNX 세션.
+        session (UpscaleSession): 공유 업스케일 세션.
         image_np (np.ndarray): 업스케일링할 BGR 이미지(uint8) NumPy 배열.
 
     Returns:
         np.ndarray: 업스케일링된 BGR 이미지(uint8) NumPy 배열.
     """
-    logging.info(f"ONNX 모델로 전체 이미지({image_np.shape[1]}x{image_np.shape[0]}) 업스케일링 시작...")
-    
-    input_name = session.get_inputs()[0].name
-    output_name = session.get_outputs()[0].name
+    return upscale_batch_with_onnx(session, [image_np])[0]
 
-    # 모델 입력에 맞게 float16 타입으로 변환하고 [0, 1] 범위로 정규화
-    img_preprocessed = np.transpose(image_np, (2, 0, 1)).astype(np.float16) / 255.0
-    img_batch = np.expand_dims(img_preprocessed, axis=0)
+def _tile_starts(length: int, tile: int, overlap: int) -> List[int]:
+    """길이 length를 덮는 타일 시작 위치 (이웃 타일은 최소 overlap만큼 겹치고, 마지막 타일은 끝에 맞춤)."""
+    if length <= tile:
+        return [0]
+    count = math.ceil((length - overlap) / (tile - overlap))
+    return [round(i * (length - tile) / (count - 1)) for i in range(count)]
 
-    # ONNX 런타임으로 추론 실행
-    result = session.run([output_name], {input_name: img_batch})[0]
+def _blend_ramp(length: int, ramp: int, fade_in: bool, fade_out: bool) -> np.ndarray:
+    """타일 한 축의 블렌딩 가중치. 이웃 타일과 겹치는 쪽 가장자리는 ramp 길이만큼 선형으로 증가/감소합니다."""
+    weights = np.ones(length, dtype=np.float32)
+    ramp = min(ramp, length // 2)
+    if ramp > 0:
+        edge = (np.arange(ramp, dtype=np.float32) + 0.5) / ramp
+        if fade_in:
+            weights[:ramp] = edge
+        if fade_out:
+            weights[-ramp:] = edge[::-1]
+    return weights
 
-    # 모델 출력을 다시 [0, 255] 범위의 uint8 이미지로 변환
-    output_image = (np.transpose(result[0], (1, 2, 0)) * 255.0).clip(0, 255).astype(np.uint8)
+def upscale_tiled_with_onnx(
+    session: UpscaleSession,
+    image_np: np.ndarray,
+    scale: int = 2,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    overlap: int = DEFAULT_TILE_OVERLAP,
+    tiles_per_batch: int = DEFAULT_TILES_PER_BATCH,
+) -> np.ndarray:
+    """
+    이미지를 겹치는 타일로 나누어 업스케일링하고, 겹치는 영역은 선형 가중치로 블렌딩하여 이어 붙입니다.
+
+    타일은 행 순서대로 tiles_per_batch개씩 묶어 한 번의 session.run으로 처리하며,
+    블렌딩용 float 버퍼는 현재 타일 행 높이만큼만 유지하고 끝난 행은 바로 uint8 결과에 기록합니다.
+    따라서 이미지 크기와 무관하게 최대 메모리는
+    (tiles_per_batch x tile_size^2 크기의 추론 입력/출력 + 타일 행 하나 높이의 float 버퍼 + 최종 uint8 결과)로 제한됩니다.
+
+    Args:
+        session (UpscaleSession): 공유 업스케일 세션.
+        image_np (np.ndarray): 업스케일링할 BGR 이미지(uint8). 높이/너비는 64의 배수여야 합니다.
+        scale (int): 모델의 업스케일 배율.
+        tile_size (int): 타일 한 변의 길이 (64의 배수).
+        overlap (int): 이웃 타일이 겹치는 최소 길이 (입력 픽셀 기준).
+        tiles_per_batch (int): 한 번의 추론에 묶을 최대 타일 수.
+
+    Returns:
+        np.ndarray: 업스케일링된 BGR 이미지(uint8) NumPy 배열.
+    """
+    if tile_size <= 0 or tile_size % 64 != 0:
+        raise ValueError(f"타일 크기는 64의 배수여야 합니다: {tile_size}")
+    if not 0 <= overlap < tile_size // 2:
+        raise ValueError(f"타일 겹침은 0 이상, 타일 크기의 절반 미만이어야 합니다: {overlap}")
+
+    h, w = image_np.shape[:2]
+    if h <= tile_size and w <= tile_size:
+        return upscale_with_onnx(session, image_np)
+
+    tile_h, tile_w = min(tile_size, h), min(tile_size, w)
+    ys = _tile_starts(h, tile_h, overlap)
+    xs = _tile_starts(w, tile_w, overlap)
+    logging.info(
+        f"ONNX 모델로 이미지({w}x{h})를 {len(xs)}x{len(ys)}개 타일({tile_w}x{tile_h}, 겹침 {overlap})로 업스케일링 시작..."
+    )
+
+    # 타일 위치별 블렌딩 가중치 (가로/세로 가중치의 곱)
+    ramp = overlap * scale
+    wx = [_blend_ramp(tile_w * scale, ramp, i > 0, i < len(xs) - 1) for i in range(len(xs))]
+    wy = [_blend_ramp(tile_h * scale, ramp, j > 0, j < len(ys) - 1) for j in range(len(ys))]
+
+    output = np.empty((h * scale, w * scale, 3), dtype=np.uint8)
+    # 아직 확정되지 않은 출력 행 [band_top, band_top + 버퍼 높이)의 가중합/가중치 합
+    band_top = 0
+    band_acc = np.zeros((tile_h * scale, w * scale, 3), dtype=np.float32)
+    band_weight = np.zeros((tile_h * scale, w * scale, 1), dtype=np.float32)
+    current_row = 0
+
+    def flush_until(out_y: int):
+        """out_y 이전 출력 행을 확정하여 uint8 결과에 기록하고 버퍼를 앞으로 당깁니다."""
+        nonlocal band_top, band_acc, band_weight
+        done = out_y - band_top
+        if done <= 0:
+            return
+        finished = band_acc[:done] / band_weight[:done]
+        output[band_top:out_y] = (finished * 255.0 + 0.5).clip(0, 255).astype(np.uint8)
+        band_acc = np.concatenate([band_acc[done:], np.zeros_like(band_acc[:done])])
+        band_weight = np.concatenate([band_weight[done:], np.zeros_like(band_weight[:done])])
+        band_top = out_y
+
+    tiles: List[Tuple[int, int]] = [(j, i) for j in range(len(ys)) for i in range(len(xs))]
+    for start in range(0, len(tiles), max(1, tiles_per_batch)):
+        batch_tiles = tiles[start:start + max(1, tiles_per_batch)]
+
+        # 타일 단위로만 NCHW 변환 (전체 프레임 변환/복사 없음)
+        img_batch = np.empty((len(batch_tiles), 3, tile_h, tile_w), dtype=session.input_dtype)
+        for n, (j, i) in enumerate(batch_tiles):
+            tile = image_np[ys[j]:ys[j] + tile_h, xs[i]:xs[i] + tile_w]
+            img_batch[n] = np.transpose(tile, (2, 0, 1))
+        img_batch /= session.input_dtype(255.0)
+
+        if session.supports_batching:
+            result = session.run(img_batch)
+        else:
+            result = np.concatenate([session.run(img_batch[n:n + 1]) for n in range(len(batch_tiles))])
+
+        for n, (j, i) in enumerate(batch_tiles):
+            if j != current_row:
+                # 새 타일 행 시작: 이 행이 시작되는 위치 이전의 출력은 더 이상 바뀌지 않음
+                flush_until(ys[j] * scale)
+                current_row = j
+            weight = (wy[j][:, None] * wx[i][None, :])[:, :, None]
+            top = ys[j] * scale - band_top
+            left = xs[i] * scale
+            band_acc[top:top + tile_h * scale, left:left + tile_w * scale] += (
+                np.transpose(result[n], (1, 2, 0)).astype(np.float32) * weight
+            )
+            band_weight[top:top + tile_h * scale, left:left + tile_w * scale] += weight
 
-    logging.info(f"업스케일링 완료. 최종 크기: {output_image.shape[1]}x{output_image.shape[0]}")
-    return output_image
+    flush_until(h * scale)
+    logging.info(f"타일 업스케일링 완료. 최종 크기: {output.shape[1]}x{output.shape[0]}")
+    return output
@@ -39,7 +39,9 @@ from core.config import (
 from core.redis_client import initialize_redis, close_redis, get_redis_client, enqueue_error_result, enqueue_success_result, set_task_completion_callback
 from core.image_downloader import download_image_async
 from dispatching_pipeline.mask import filter_chinese_ocr_result, generate_mask_pure_sync
-from dispatching_pipeline.text_translate import process_and_save_translation
+from dispatching_pipeline.text_translate import (
+    process_and_save_translation, create_translation_client, create_translation_memory, create_translation_scheduler
+)
 from dispatching_pipeline.resize_handler import handle_no_chinese_text_sync
 from hosting.r2hosting import R2ImageHosting
 from rendering_pipeline.result_check import ResultChecker
@@ -82,6 +84,12 @@ class AsyncInpaintingWorker:
 
         self.r2_hosting = R2ImageHosting()
         self.http_session: Optional[aiohttp.ClientSession] = None
+        # 번역 API 클라이언트 (연결 풀을 가진 세션은 첫 요청 때 이벤트 루프 안에서 생성)
+        self.translation_client = create_translation_client()
+        # 여러 요청의 번역을 합쳐 보내는 스케줄러 (RPS/TPM 토큰 버킷 적용)
+        self.translation_scheduler = create_translation_scheduler(self.translation_client)
+        # 번역 메모리 (반복되는 원문은 API를 호출하지 않음)
+        self.translation_memory = create_translation_memory()
         self._running = False
         self._workers: List[asyncio.Task] = []
         self.rendering_processor: Optional[RenderingProcessor] = None
@@ -127,6 +135,12 @@ class AsyncInpaintingWorker:
         
         if self.http_session:
             await self.http_session.close()
+        await self.translation_scheduler.close()
+        logger.info(f"Translation scheduler stats: {self.translation_scheduler.stats()}")
+        logger.info(f"Translation client stats: {self.translation_client.stats()}")
+        await self.translation_client.close()
+        if self.translation_memory:
+            logger.info(f"Translation memory stats: {self.translation_memory.stats()}")
         
         self.cpu_executor.shutdown(wait=True)
         self.gpu_executor.shutdown(wait=True)
@@ -186,7 +200,9 @@ class AsyncInpaintingWorker:
 
             # 번역 작업 (기존 코드와 같이 filtered_ocr을 task_data에 추가)
             task_data["filtered_ocr_result"] = filtered_ocr
-            await process_and_save_translation(task_data, image_url, self.result_checker)
+            await process_and_save_translation(
+                task_data, image_url, self.result_checker, self.translation_scheduler, self.translation_memory
+            )
 
             # 인페인팅 배치에 추가
             task_info = {"request_id": request_id, "image_id": image_id, "is_long": is_long}
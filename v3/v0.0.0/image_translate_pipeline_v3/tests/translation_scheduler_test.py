@@ -0,0 +1,175 @@
+import unittest
+import asyncio
+import os
+import sys
+import time
+
+# image_translate_worker 경로 추가
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+WORKER_DIR = os.path.join(os.path.dirname(TESTS_DIR), "image_translate_worker")
+sys.path.insert(0, WORKER_DIR)
+
+from dispatching_pipeline.translation_scheduler import TranslationScheduler, TokenBucket, estimate_tokens
+
+
+class FakeTranslationClient:
+    """API 대신 호출(원문 리스트, 라벨)을 기록하고 "KO:"를 붙여 돌려주는 번역 클라이언트"""
+
+    def __init__(self, fail_when=None, delay=0.0):
+        self.calls = []
+        self.fail_when = fail_when  # 원문 리스트를 받아 True면 호출 실패
+        self.delay = delay
+
+    async def translate_list(self, texts, request_id="N/A"):
+        self.calls.append((list(texts), request_id))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail_when and self.fail_when(texts):
+            raise ValueError(f"translation failed for {request_id}")
+        return [f"KO:{t}" for t in texts]
+
+
+class TestTokenBucket(unittest.IsolatedAsyncioTestCase):
+
+    async def test_burst_then_waits_for_refill(self):
+        bucket = TokenBucket(rate=20, capacity=2)
+        self.assertEqual(await bucket.acquire(1), 0.0)
+        self.assertEqual(await bucket.acquire(1), 0.0)
+        # 버스트를 다 쓰면 1토큰이 채워질 때까지 (1/20초) 기다림
+        start = time.monotonic()
+        wait = await bucket.acquire(1)
+        self.assertAlmostEqual(wait, 0.05, delta=0.01)
+        self.assertGreaterEqual(time.monotonic() - start, 0.04)
+
+    async def test_zero_rate_is_unlimited(self):
+        bucket = TokenBucket(rate=0, capacity=0)
+        for _ in range(100):
+            self.assertEqual(await bucket.acquire(1000), 0.0)
+
+
+class TestTranslationScheduler(unittest.IsolatedAsyncioTestCase):
+
+    def make_scheduler(self, client, **kwargs):
+        options = {"max_wait": 0.05, "requests_per_second": 0}
+        options.update(kwargs)
+        scheduler = TranslationScheduler(client, **options)
+        self.addAsyncCleanup(scheduler.close)
+        return scheduler
+
+    async def test_concurrent_requests_share_one_call(self):
+        client = FakeTranslationClient()
+        scheduler = self.make_scheduler(client)
+
+        results = await asyncio.gather(
+            scheduler.translate_list(["包邮", "新品"], "r1"),
+            scheduler.translate_list(["新品"], "r2"),
+            scheduler.translate_list(["尺码表", "包邮", "包邮"], "r3")
+        )
+
+        self.assertEqual(results, [["KO:包邮", "KO:新品"], ["KO:新品"], ["KO:尺码表", "KO:包邮", "KO:包邮"]])
+        # 중복 원문은 한 번만 보내고, 합친 호출은 배치 라벨을 사용
+        self.assertEqual(client.calls, [(["包邮", "新品", "尺码表"], "tbatch-1")])
+        stats = scheduler.stats()
+        self.assertEqual((stats["calls"], stats["fallback_calls"], stats["pending"]), (1, 0, 0))
+        self.assertEqual(stats["max_batch_items"], 3)
+        self.assertEqual(stats["avg_batch_requests"], 3.0)
+        self.assertGreaterEqual(stats["queue_delay_p99"], stats["queue_delay_p50"])
+
+    async def test_item_limit_splits_batches_without_splitting_requests(self):
+        client = FakeTranslationClient()
+        scheduler = self.make_scheduler(client, max_items=3)
+
+        results = await asyncio.gather(*(scheduler.translate_list([f"a{i}", f"b{i}"], f"r{i}") for i in range(3)))
+
+        self.assertEqual(results, [[f"KO:a{i}", f"KO:b{i}"] for i in range(3)])
+        # 요청 하나(2개)씩만 한도(3개) 안에 들어감
+        self.assertEqual([len(texts) for texts, _ in client.calls], [2, 2, 2])
+        self.assertEqual(scheduler.stats()["max_batch_items"], 2)
+
+    async def test_single_request_keeps_its_own_label(self):
+        client = FakeTranslationClient()
+        scheduler = self.make_scheduler(client, max_wait=0.0)
+        self.assertEqual(await scheduler.translate_list(["你好"], "r1"), ["KO:你好"])
+        self.assertEqual(client.calls, [(["你好"], "r1")])
+
+    async def test_request_rate_limit_delays_next_call(self):
+        client = FakeTranslationClient()
+        scheduler = self.make_scheduler(client, max_wait=0.0, requests_per_second=10, request_burst=1)
+
+        start = time.monotonic()
+        await scheduler.translate_list(["a"], "r1")
+        await scheduler.translate_list(["b"], "r2")
+        # 버스트 1개를 쓴 뒤 두 번째 호출은 1/10초 기다림
+        self.assertGreaterEqual(time.monotonic() - start, 0.08)
+        stats = scheduler.stats()
+        self.assertEqual(stats["calls"], 2)
+        self.assertAlmostEqual(stats["avg_rate_wait"], 0.05, delta=0.02)
+
+    async def test_token_rate_limit_delays_call(self):
+        client = FakeTranslationClient()
+        # 분당 600토큰 = 초당 10토큰, 버킷 크기 600
+        scheduler = self.make_scheduler(client, max_wait=0.0, tokens_per_minute=600)
+        scheduler.token_bucket._tokens = 0.0
+        texts = ["a"]  # 추정 6토큰 -> 약 0.6초 대기
+        self.assertEqual(estimate_tokens(texts), 6)
+
+        start = time.monotonic()
+        await scheduler.translate_list(texts, "r1")
+        self.assertGreaterEqual(time.monotonic() - start, 0.5)
+        self.assertAlmostEqual(scheduler.stats()["avg_rate_wait"], 0.6, delta=0.05)
+
+    async def test_failed_batch_falls_back_to_each_request(self):
+        # 나쁜 원문이 섞인 호출은 실패 -> 요청별로 다시 보내 정상 요청은 성공
+        client = FakeTranslationClient(fail_when=lambda texts: "BAD" in texts)
+        scheduler = self.make_scheduler(client)
+
+        outcomes = await asyncio.gather(
+            scheduler.translate_list(["包邮"], "r1"),
+            scheduler.translate_list(["BAD", "新品"], "r2"),
+            scheduler.translate_list(["新品"], "r3"),
+            return_exceptions=True
+        )
+
+        self.assertEqual(outcomes[0], ["KO:包邮"])
+        self.assertIsInstance(outcomes[1], ValueError)
+        self.assertIn("r2", str(outcomes[1]))
+        self.assertEqual(outcomes[2], ["KO:新品"])
+        self.assertEqual(client.calls[0][1], "tbatch-1")
+        self.assertEqual(sorted(label for _, label in client.calls[1:]), ["r1", "r2", "r3"])
+        stats = scheduler.stats()
+        # 실패한 합친 호출은 배치 지표에 넣지 않음
+        self.assertEqual((stats["calls"], stats["fallback_calls"]), (0, 2))
+
+    async def test_single_request_failure_is_not_retried(self):
+        client = FakeTranslationClient(fail_when=lambda texts: True)
+        scheduler = self.make_scheduler(client, max_wait=0.0)
+        with self.assertRaises(ValueError):
+            await scheduler.translate_list(["a"], "r1")
+        self.assertEqual(len(client.calls), 1)
+        self.assertEqual(scheduler.stats()["fallback_calls"], 0)
+
+    async def test_close_waits_for_calls_and_fails_unsent_requests(self):
+        client = FakeTranslationClient(delay=0.05)
+        scheduler = TranslationScheduler(client, max_wait=0.0, requests_per_second=0, max_concurrent_calls=1)
+
+        first = asyncio.create_task(scheduler.translate_list(["a"], "r1"))
+        await asyncio.sleep(0.01)
+        # 동시 호출 한도(1)에 막혀 아직 보내지 못한 요청
+        second = asyncio.create_task(scheduler.translate_list(["b"], "r2"))
+        await asyncio.sleep(0.01)
+        await scheduler.close()
+
+        self.assertEqual(await first, ["KO:a"])
+        with self.assertRaises(RuntimeError):
+            await second
+        self.assertEqual(len(client.calls), 1)
+
+    async def test_empty_request_skips_scheduler(self):
+        client = FakeTranslationClient()
+        scheduler = self.make_scheduler(client)
+        self.assertEqual(await scheduler.translate_list([], "r1"), [])
+        self.assertEqual(client.calls, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -66,8 +66,28 @@ USE_FP16 = os.environ.get("USE_FP16", "1") == "1"
 RENDERING_TASKS_QUEUE = os.environ.get("RENDERING_TASKS_QUEUE", "rendering_tasks")
 # 렌더링 결과 저장용 Redis Hash 키 접두사
 RENDERING_RESULT_HASH_PREFIX = "rendering_result:"
+# 인페인팅 결과 저장용 Redis Hash 키 접두사 (번역 결과와 조인)
+INPAINTING_RESULT_HASH_PREFIX = "inpainting_result:"
+# 렌더링 큐에 추가된 요청 표시 키 접두사 (늦게 도착한 중복 결과가 다시 큐에 넣지 않도록)
+RENDERING_QUEUED_MARKER_PREFIX = "rendering_queued:"
+# 한쪽 결과만 도착한 요청의 색인 (Sorted Set, 점수 = 첫 결과 도착 시각)
+RENDER_JOIN_PENDING_KEY = "render_join:pending"
+# 한쪽 결과만 도착한 뒤 이 시간(초)이 지나면 ResultChecker가 만료 처리
+RENDER_JOIN_TIMEOUT = int(os.environ.get("RENDER_JOIN_TIMEOUT", "600"))
 # 출력 이미지 저장 디렉토리
 RENDERING_OUTPUT_DIR = os.environ.get("RENDERING_OUTPUT_DIR", "output")
 
 # 메인, 옵션 이미지 리사이즈 크기
 RESIZE_TARGET_SIZE = (1000, 1000)
+
+# === 작업 큐 설정 (core/task_queue.py) ===
+# "list"(RPUSH/BLPOP, 기존 방식) 또는 "stream"(Redis Streams 컨슈머 그룹, Redis 6.2 이상). API 서버와 모든 워커가 같은 값 사용
+QUEUE_BACKEND = os.environ.get("QUEUE_BACKEND", "list")
+# 스트림 백엔드에서 한 번에 가져오는 최대 작업 수 (ack가 없는 리스트 백엔드는 하나씩)
+QUEUE_READ_BATCH = int(os.environ.get("QUEUE_READ_BATCH", "4"))
+# 이 시간 이상 ack되지 않은 작업은 죽은 워커의 것으로 보고 다시 가져옴 (ms)
+QUEUE_CLAIM_IDLE_MS = int(os.environ.get("QUEUE_CLAIM_IDLE_MS", "120000"))
+# 최대 전달 횟수 (넘으면 DEAD_LETTER_QUEUE로 에러 메시지 전송)
+QUEUE_MAX_DELIVERIES = int(os.environ.get("QUEUE_MAX_DELIVERIES", "3"))
+# 전달 횟수를 넘은 작업의 에러 메시지를 보내는 리스트
+DEAD_LETTER_QUEUE = os.environ.get("DEAD_LETTER_QUEUE", "img:translate:error")
@@ -0,0 +1,151 @@
+import time
+import logging
+from typing import Dict, Any, Optional, Tuple
+
+from core.config import (
+    TRANSLATE_TEXT_RESULT_HASH_PREFIX, INPAINTING_RESULT_HASH_PREFIX, RENDERING_QUEUED_MARKER_PREFIX,
+    RENDER_JOIN_PENDING_KEY, RENDER_JOIN_TIMEOUT, RENDERING_TASKS_QUEUE
+)
+
+logger = logging.getLogger(__name__)
+
+# record_*_result() 반환값
+JOIN_PENDING = 0      # 반대쪽 결과를 기다리는 중
+JOIN_QUEUED = 1       # 두 결과가 모여 이번 호출이 렌더링 작업을 큐에 추가함
+JOIN_DUPLICATE = -1   # 이미 렌더링 큐에 추가된 요청 (늦게 온 중복 결과는 무시)
+
+# 번역/인페인팅 결과 중 한쪽을 기록하고, 두 결과가 모두 있으면 렌더링 작업을 한 번만 큐에 추가합니다.
+# KEYS[1]: translate_text_result:{id}, KEYS[2]: inpainting_result:{id}, KEYS[3]: 렌더링 큐,
+# KEYS[4]: 대기 색인(zset), KEYS[5]: 큐 추가 표시
+# ARGV[1]: request_id, ARGV[2]: 기록할 해시 (1=번역, 2=인페인팅), ARGV[3]: 부분 결과 TTL(초),
+# ARGV[4]: 현재 시각, ARGV[5..]: 필드/값 쌍
+_RECORD_SCRIPT = """
+if redis.call('EXISTS', KEYS[5]) == 1 then
+    return -1
+end
+local own = KEYS[tonumber(ARGV[2])]
+for i = 5, #ARGV, 2 do
+    redis.call('HSET', own, ARGV[i], ARGV[i + 1])
+end
+local t = redis.call('HMGET', KEYS[1], 'data', 'original_shm_info')
+local p = redis.call('HMGET', KEYS[2], 'image_id', 'inpaint_shm_info', 'is_long')
+if not (t[1] and t[2] and p[1] and p[2]) or t[1] == '' or t[2] == '' or p[1] == '' or p[2] == '' then
+    redis.call('EXPIRE', own, ARGV[3])
+    redis.call('ZADD', KEYS[4], 'NX', ARGV[4], ARGV[1])
+    return 0
+end
+local task = cjson.encode({
+    request_id = ARGV[1],
+    image_id = p[1],
+    translate_data = t[1],
+    inpaint_shm_info = p[2],
+    original_shm_info = t[2],
+    is_long = string.lower(p[3] or 'false') == 'true'
+})
+redis.call('LPUSH', KEYS[3], task)
+redis.call('SET', KEYS[5], 1, 'EX', 86400)
+redis.call('DEL', KEYS[1], KEYS[2])
+redis.call('ZREM', KEYS[4], ARGV[1])
+return 1
+"""
+
+# 기준 시각보다 오래 기다린 부분 결과를 꺼내고 지웁니다 (그 사이 조인이 끝났으면 아무것도 하지 않음).
+# KEYS[1]: translate_text_result:{id}, KEYS[2]: inpainting_result:{id}, KEYS[3]: 대기 색인(zset)
+# ARGV[1]: request_id, ARGV[2]: 기준 시각
+# 반환: 만료하지 않았으면 nil, 만료했으면 {번역 해시 필드/값, 인페인팅 해시 필드/값}
+_EXPIRE_SCRIPT = """
+local score = redis.call('ZSCORE', KEYS[3], ARGV[1])
+if not score or tonumber(score) > tonumber(ARGV[2]) then
+    return nil
+end
+local t = redis.call('HGETALL', KEYS[1])
+local p = redis.call('HGETALL', KEYS[2])
+redis.call('DEL', KEYS[1], KEYS[2])
+redis.call('ZREM', KEYS[3], ARGV[1])
+return {t, p}
+"""
+
+# 스크립트 객체 (처음 사용한 클라이언트로 등록, 호출 시 client를 넘기므로 NOSCRIPT는 자동 재로드)
+_scripts: Dict[str, Any] = {}
+
+
+def _script(redis_client, source: str):
+    script = _scripts.get(source)
+    if script is None:
+        script = _scripts[source] = redis_client.register_script(source)
+    return script
+
+
+def _join_keys(request_id: str):
+    return [
+        f"{TRANSLATE_TEXT_RESULT_HASH_PREFIX}{request_id}",
+        f"{INPAINTING_RESULT_HASH_PREFIX}{request_id}",
+        RENDERING_TASKS_QUEUE,
+        RENDER_JOIN_PENDING_KEY,
+        f"{RENDERING_QUEUED_MARKER_PREFIX}{request_id}"
+    ]
+
+
+async def _record(redis_client, request_id: str, own_index: int, mapping: Dict[str, Any]) -> int:
+    args = [request_id, own_index, RENDER_JOIN_TIMEOUT * 2, time.time()]
+    for field, value in mapping.items():
+        args.extend((field, value))
+    result = int(await _script(redis_client, _RECORD_SCRIPT)(keys=_join_keys(request_id), args=args, client=redis_client))
+    if result == JOIN_QUEUED:
+        logger.debug(f"[{request_id}] Both results present, rendering task queued to {RENDERING_TASKS_QUEUE}")
+    elif result == JOIN_DUPLICATE:
+        logger.warning(f"[{request_id}] Result arrived after rendering was already queued. Ignored.")
+    return result
+
+
+async def record_translation_result(redis_client, request_id: str, data: bytes, original_shm_info: Optional[str]) -> int:
+    """
+    Processor 워커: 번역 결과를 기록합니다. 인페인팅 결과가 이미 있으면 같은 스크립트 안에서 렌더링 작업을 큐에 추가합니다.
+
+    Returns:
+        JOIN_PENDING / JOIN_QUEUED / JOIN_DUPLICATE
+    """
+    mapping = {"data": data}
+    if original_shm_info:
+        mapping["original_shm_info"] = original_shm_info
+    return await _record(redis_client, request_id, 1, mapping)
+
+
+async def record_inpainting_result(redis_client, request_id: str, image_id: str, inpaint_shm_info: str, is_long: bool) -> int:
+    """
+    Inpainting 워커: 인페인팅 결과를 기록합니다. 번역 결과가 이미 있으면 같은 스크립트 안에서 렌더링 작업을 큐에 추가합니다.
+
+    Returns:
+        JOIN_PENDING / JOIN_QUEUED / JOIN_DUPLICATE
+    """
+    mapping = {
+        "image_id": image_id,
+        "inpaint_shm_info": inpaint_shm_info,
+        "is_long": str(is_long).lower()  # 명시적으로 "true" 또는 "false" 문자열로 저장
+    }
+    return await _record(redis_client, request_id, 2, mapping)
+
+
+def _pairs_to_dict(pairs) -> Dict[str, str]:
+    items = [item.decode("utf-8") if isinstance(item, bytes) else item for item in pairs or []]
+    return dict(zip(items[0::2], items[1::2]))
+
+
+async def expire_partial_join(redis_client, request_id: str, cutoff: float) -> Optional[Tuple[Dict[str, str], Dict[str, str]]]:
+    """
+    cutoff 이전에 첫 결과가 도착했는데 아직 조인되지 않은 요청을 지우고 (번역 해시, 인페인팅 해시)를 반환합니다.
+    그 사이 조인이 끝났거나 더 늦게 등록된 요청이면 None.
+    """
+    keys = _join_keys(request_id)
+    result = await _script(redis_client, _EXPIRE_SCRIPT)(
+        keys=[keys[0], keys[1], RENDER_JOIN_PENDING_KEY], args=[request_id, cutoff], client=redis_client
+    )
+    if result is None:
+        return None
+    return _pairs_to_dict(result[0]), _pairs_to_dict(result[1])
+
+
+async def stale_join_ids(redis_client, cutoff: float, limit: int = 100):
+    """cutoff 이전부터 반대쪽 결과를 기다리는 request_id 목록 (대기 색인 조회, 키 스캔 없음)."""
+    members = await redis_client.zrangebyscore(RENDER_JOIN_PENDING_KEY, "-inf", cutoff, start=0, num=limit)
+    return [member.decode("utf-8") if isinstance(member, bytes) else member for member in members]
@@ -1,4 +1,7 @@
 // redis 스키마 큐를 기록해 두는 파일
+// ocr_tasks, ocr_results는 QUEUE_BACKEND에 따라 리스트(RPUSH/BLPOP) 또는 스트림(XADD/XREADGROUP, 엔트리의 data 필드에 JSON)
+// 스트림에서 QUEUE_MAX_DELIVERIES를 넘게 전달된 작업은 DEAD_LETTER_QUEUE(img:translate:error)에 {request_id, image_id, error_message, timestamp}로 기록
+// rendering_tasks는 core/result_join.py의 Lua 스크립트가 LPUSH하므로 리스트로 유지
 
 const ocr_tasks = {
     "request_id": request_id,
@@ -174,6 +177,11 @@ const translate_text_result_hash_data_field = { // Redis Hash의 필드 구조 (
     }) 
 };
 
+// 두 해시는 core/result_join.py의 Lua 스크립트로만 기록합니다. 나중에 기록하는 쪽이 같은 스크립트 안에서
+// rendering_tasks에 작업을 추가하고 두 해시를 삭제하며, rendering_queued:{request_id}(1일 TTL)를 남깁니다.
+// 한쪽만 도착한 동안에는 render_join:pending (Sorted Set, member=request_id, score=첫 도착 시각)에 등록되고,
+// RENDER_JOIN_TIMEOUT이 지나면 ResultChecker가 해시를 지우고 공유 메모리를 해제합니다.
+
 // Hash 키: inpainting_result:{request_id}
 // 필드: image_id, inpaint_shm_info, is_long
 // 설명: Inpainting 워커가 생성한 결과 이미지 데이터를 저장하는 Hash.
@@ -0,0 +1,124 @@
+import unittest
+import asyncio
+import json
+import os
+import sys
+import time
+import importlib.util
+
+# 프로젝트 루트 경로 추정 (tests/unit 디렉토리 기준)
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+UNIT_TEST_DIR = os.path.dirname(TESTS_DIR)
+PROJECT_ROOT = os.path.dirname(UNIT_TEST_DIR)
+sys.path.insert(0, PROJECT_ROOT)
+
+from core import config
+from core.result_join import (
+    record_translation_result, record_inpainting_result, expire_partial_join, stale_join_ids,
+    JOIN_PENDING, JOIN_QUEUED, JOIN_DUPLICATE
+)
+
+# Lua 지원 fakeredis(lupa 필요)로 실행. 없으면 REDIS_TEST_URL의 로컬 redis-server 사용
+try:
+    import fakeredis
+    # fakeredis의 EVAL 지원 여부만 확인 (import하지 않음)
+    HAS_FAKEREDIS = importlib.util.find_spec("lupa") is not None
+except ImportError:
+    HAS_FAKEREDIS = False
+REDIS_TEST_URL = os.environ.get("REDIS_TEST_URL")
+
+
+def create_client():
+    if HAS_FAKEREDIS:
+        return fakeredis.FakeAsyncRedis()
+    import redis.asyncio as redis
+    return redis.from_url(REDIS_TEST_URL)
+
+
+ORIGINAL_SHM = json.dumps({"shm_name": "img_shm_original", "shape": [10, 10, 3], "dtype": "uint8", "size": 300})
+INPAINT_SHM = json.dumps({"shm_name": "img_shm_inpaint", "shape": [10, 10, 3], "dtype": "uint8", "size": 300})
+TRANSLATE_DATA = json.dumps({"image_id": "a.jpg", "translate_result": []}).encode("utf-8")
+
+
+@unittest.skipUnless(HAS_FAKEREDIS or REDIS_TEST_URL, "Requires fakeredis with lupa or REDIS_TEST_URL")
+class TestResultJoin(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.redis = create_client()
+        await self.redis.flushdb()
+
+    async def asyncTearDown(self):
+        await self.redis.flushdb()
+        await self.redis.aclose()
+
+    async def rendering_tasks(self):
+        return [json.loads(item) for item in await self.redis.lrange(config.RENDERING_TASKS_QUEUE, 0, -1)]
+
+    async def test_second_half_queues_rendering_once(self):
+        self.assertEqual(await record_translation_result(self.redis, "r1", TRANSLATE_DATA, ORIGINAL_SHM), JOIN_PENDING)
+        self.assertEqual(await self.rendering_tasks(), [])
+        self.assertEqual(await record_inpainting_result(self.redis, "r1", "a.jpg", INPAINT_SHM, True), JOIN_QUEUED)
+
+        self.assertEqual(await self.rendering_tasks(), [{
+            "request_id": "r1",
+            "image_id": "a.jpg",
+            "translate_data": TRANSLATE_DATA.decode("utf-8"),
+            "inpaint_shm_info": INPAINT_SHM,
+            "original_shm_info": ORIGINAL_SHM,
+            "is_long": True
+        }])
+        # 조인이 끝나면 부분 결과와 대기 색인이 정리됨
+        self.assertFalse(await self.redis.exists(f"{config.TRANSLATE_TEXT_RESULT_HASH_PREFIX}r1"))
+        self.assertFalse(await self.redis.exists(f"{config.INPAINTING_RESULT_HASH_PREFIX}r1"))
+        self.assertEqual(await self.redis.zcard(config.RENDER_JOIN_PENDING_KEY), 0)
+
+        # 늦게 도착한 중복 결과는 다시 큐에 넣지 않음
+        self.assertEqual(await record_inpainting_result(self.redis, "r1", "a.jpg", INPAINT_SHM, True), JOIN_DUPLICATE)
+        self.assertEqual(len(await self.rendering_tasks()), 1)
+
+    async def test_inpainting_first_then_translation(self):
+        self.assertEqual(await record_inpainting_result(self.redis, "r2", "b.jpg", INPAINT_SHM, False), JOIN_PENDING)
+        self.assertEqual(await record_translation_result(self.redis, "r2", TRANSLATE_DATA, ORIGINAL_SHM), JOIN_QUEUED)
+        tasks = await self.rendering_tasks()
+        self.assertEqual(tasks[0]["image_id"], "b.jpg")
+        self.assertIs(tasks[0]["is_long"], False)
+
+    async def test_concurrent_producers_queue_exactly_once(self):
+        request_ids = [f"c{i}" for i in range(50)]
+        calls = []
+        for request_id in request_ids:
+            calls.append(record_translation_result(self.redis, request_id, TRANSLATE_DATA, ORIGINAL_SHM))
+            calls.append(record_inpainting_result(self.redis, request_id, "c.jpg", INPAINT_SHM, False))
+        results = await asyncio.gather(*calls)
+
+        self.assertEqual(results.count(JOIN_QUEUED), len(request_ids))
+        self.assertEqual(sorted(task["request_id"] for task in await self.rendering_tasks()), sorted(request_ids))
+
+    async def test_missing_original_shm_info_never_joins(self):
+        await record_translation_result(self.redis, "r3", TRANSLATE_DATA, None)
+        self.assertEqual(await record_inpainting_result(self.redis, "r3", "d.jpg", INPAINT_SHM, False), JOIN_PENDING)
+        self.assertEqual(await self.rendering_tasks(), [])
+
+    async def test_partial_join_is_expired_only_after_cutoff(self):
+        await record_inpainting_result(self.redis, "r4", "e.jpg", INPAINT_SHM, False)
+        self.assertTrue(await self.redis.ttl(f"{config.INPAINTING_RESULT_HASH_PREFIX}r4") > 0)
+
+        self.assertEqual(await stale_join_ids(self.redis, time.time() - 60), [])
+        self.assertIsNone(await expire_partial_join(self.redis, "r4", time.time() - 60))
+
+        cutoff = time.time() + 1
+        self.assertEqual(await stale_join_ids(self.redis, cutoff), ["r4"])
+        translate_info, inpaint_info = await expire_partial_join(self.redis, "r4", cutoff)
+        self.assertEqual(translate_info, {})
+        self.assertEqual(inpaint_info["inpaint_shm_info"], INPAINT_SHM)
+        self.assertFalse(await self.redis.exists(f"{config.INPAINTING_RESULT_HASH_PREFIX}r4"))
+        self.assertEqual(await stale_join_ids(self.redis, cutoff), [])
+
+        # 이미 조인된 요청은 만료 대상이 아님
+        await record_translation_result(self.redis, "r5", TRANSLATE_DATA, ORIGINAL_SHM)
+        await record_inpainting_result(self.redis, "r5", "f.jpg", INPAINT_SHM, False)
+        self.assertIsNone(await expire_partial_join(self.redis, "r5", time.time() + 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
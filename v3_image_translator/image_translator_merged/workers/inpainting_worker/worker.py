@@ -32,6 +32,7 @@ from core.config import (
 )
 from core.shm_manager import get_array_from_shm, create_shm_from_array, cleanup_shm
 from core.redis_client import initialize_redis, close_redis, get_redis_client
+from core.result_join import record_inpainting_result
 # 통합된 LaMa 추론 모듈 사용
 from lama.bin.inference import load_lama_model, batch_inference
 
@@ -193,15 +194,11 @@ async def process_batch(batch_tasks: List[Dict[str, Any]]) -> bool:
                 # 결과를 공유 메모리에 저장
                 inpaint_shm_info = create_shm_from_array(restored_result_bgr)
                 
-                # 결과를 Redis Hash에 저장
+                # 결과를 Redis Hash에 저장하고, 번역 결과가 이미 있으면 같은 Lua 스크립트에서 렌더링 작업 추가
                 result_hash_key = f"inpainting_result:{request_id}"
-                result_data = {
-                    "image_id": image_id,
-                    "inpaint_shm_info": json.dumps(inpaint_shm_info),
-                    "is_long": str(is_long).lower()  # 명시적으로 "true" 또는 "false" 문자열로 저장
-                }
-                
-                await redis_client.hset(result_hash_key, mapping=result_data)
+                await record_inpainting_result(
+                    redis_client, request_id, image_id, json.dumps(inpaint_shm_info), is_long
+                )
                 logger.info(f"[{request_id}] 인페인팅 결과 저장 완료: {result_hash_key}")
                 
             except Exception as e:
@@ -7,9 +7,13 @@ import numpy as np
 from paddleocr import PaddleOCR
 import os
 
-from core.redis_client import initialize_redis, close_redis, get_redis_client
+from core.redis_client import initialize_redis, close_redis
 from core.shm_manager import get_array_from_shm
-from core.config import OCR_TASK_QUEUE, LOG_LEVEL ,OCR_RESULT_QUEUE
+from core.config import (
+    OCR_TASK_QUEUE, LOG_LEVEL ,OCR_RESULT_QUEUE, QUEUE_BACKEND, QUEUE_READ_BATCH, QUEUE_CLAIM_IDLE_MS,
+    QUEUE_MAX_DELIVERIES, DEAD_LETTER_QUEUE
+)
+from core.task_queue import create_task_queue, LIST_BACKEND
 
 # 로깅 설정
 logging.basicConfig(level=LOG_LEVEL)
@@ -56,17 +60,17 @@ except Exception as e:
     # 모델 로드 실패 시 워커를 시작할 수 없음
     exit(1)
 
-async def enqueue_ocr_result(redis_client, result_data: dict):
-    """OCR 처리 결과를 JSON으로 직렬화하여 Redis 큐에 추가합니다."""
+async def enqueue_ocr_result(result_queue, result_data: dict):
+    """OCR 처리 결과를 JSON으로 직렬화하여 결과 큐에 추가합니다."""
     try:
         result_json = json.dumps(result_data).encode('utf-8')
-        await redis_client.rpush(OCR_RESULT_QUEUE, result_json)
-        logger.info(f"[{result_data.get('request_id')}] OCR result enqueued to {OCR_RESULT_QUEUE} (RPUSH)")
+        await result_queue.put(result_json)
+        logger.info(f"[{result_data.get('request_id')}] OCR result enqueued to {OCR_RESULT_QUEUE} ({result_queue.backend})")
     except Exception as e:
         logger.error(f"[{result_data.get('request_id')}] Failed to enqueue OCR result: {e}", exc_info=True)
         # 여기서 에러 발생 시 재시도 로직 등을 고려할 수 있음
 
-async def process_ocr_task(task_data: dict):
+async def process_ocr_task(task_data: dict, result_queue):
     """단일 OCR 작업을 처리합니다."""
     request_id = task_data.get("request_id")
     image_id = task_data.get("image_id")
@@ -124,8 +128,7 @@ async def process_ocr_task(task_data: dict):
         }
 
         # 4. 결과 큐에 저장
-        redis_client = get_redis_client()
-        await enqueue_ocr_result(redis_client, result_data)
+        await enqueue_ocr_result(result_queue, result_data)
 
     except FileNotFoundError:
         logger.error(f"[{request_id}] Shared memory {shm_name} not found. It might have been cleaned up already.")
@@ -146,8 +149,17 @@ async def process_ocr_task(task_data: dict):
 async def main():
     """메인 워커 루프"""
     await initialize_redis()
-    redis_client = get_redis_client()
-    logger.info(f"OCR Worker started. Listening to queue: {OCR_TASK_QUEUE}")
+    # 작업 큐 (스트림 백엔드면 처리 후 ack, 처리 중 죽은 워커의 작업은 다른 워커가 다시 가져감)
+    task_queue = create_task_queue(
+        OCR_TASK_QUEUE, QUEUE_BACKEND, group="ocr_worker", claim_idle_ms=QUEUE_CLAIM_IDLE_MS,
+        max_deliveries=QUEUE_MAX_DELIVERIES, dead_letter_queue=DEAD_LETTER_QUEUE
+    )
+    await task_queue.ensure()
+    result_queue = create_task_queue(OCR_RESULT_QUEUE, QUEUE_BACKEND)
+    # 리스트 백엔드는 ack/재전달이 없어, 여러 개를 미리 꺼내 두면 처리 중 죽을 때 꺼낸 작업이 모두 사라짐.
+    # 순차 처리 루프이므로 리스트 백엔드는 이전처럼 하나씩 가져옴
+    read_count = 1 if task_queue.backend == LIST_BACKEND else QUEUE_READ_BATCH
+    logger.info(f"OCR Worker started. Listening to queue: {OCR_TASK_QUEUE} ({QUEUE_BACKEND})")
 
     stop_event = asyncio.Event()
 
@@ -161,20 +173,22 @@ async def main():
 
     while not stop_event.is_set():
         try:
-            # Redis 큐에서 작업 가져오기 (BLPOP, 타임아웃 2초)
+            # 작업 큐에서 최대 read_count개 가져오기 (타임아웃 2초)
             # 타임아웃을 짧게 하여 종료 시그널을 더 빨리 감지
-            task_tuple = await redis_client.blpop([OCR_TASK_QUEUE], timeout=2)
-            if task_tuple:
-                list_key, task_bytes = task_tuple
+            messages = await task_queue.get(read_count, block_ms=2000)
+            for message in messages:
+                task_bytes = message.data
                 try:
                     task_data = json.loads(task_bytes.decode('utf-8'))
                     # 작업 처리 함수 비동기 실행 (await하지 않아 여러 작업 동시 처리 가능, 단 리소스 제한 필요)
                     # 여기서는 간단하게 await으로 순차 처리
-                    await process_ocr_task(task_data)
+                    await process_ocr_task(task_data, result_queue)
                 except json.JSONDecodeError as e:
                     logger.error(f"Failed to decode task JSON: {e}. Raw data: {task_bytes}")
                 except Exception as e:
                     logger.error(f"Error processing task: {e}", exc_info=True)
+                # 처리(또는 처리 불가 판정)가 끝난 작업만 ack
+                await task_queue.ack(message)
             # 타임아웃 시에는 루프 계속 진행 (stop_event 체크)
 
         except asyncio.CancelledError:
@@ -185,6 +199,7 @@ async def main():
             # 잠시 대기 후 재시도 (Redis 연결 문제 등)
             await asyncio.sleep(5)
 
+    logger.info(f"Task queue stats: {task_queue.stats()}")
     logger.info("Closing Redis connection...")
     await close_redis()
     logger.info("OCR Worker stopped.")
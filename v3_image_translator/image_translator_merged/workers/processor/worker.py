@@ -35,11 +35,18 @@ from core.config import (
     MOCK_TRANSLATION_DELAY, # 번역 API 호출을 대신 가정한 지연시간
     LOG_LEVEL, 
     SHM_NAME_PREFIX, # @deprecated: create_shm_from_array 함수로 대체
-    MASK_PADDING_PIXELS # 마스크 패딩 픽셀 설정 추가
+    MASK_PADDING_PIXELS, # 마스크 패딩 픽셀 설정 추가
+    QUEUE_BACKEND,
+    QUEUE_READ_BATCH,
+    QUEUE_CLAIM_IDLE_MS,
+    QUEUE_MAX_DELIVERIES,
+    DEAD_LETTER_QUEUE
 )
 from core.shm_manager import get_array_from_shm, create_shm_from_array, cleanup_shm
 # ---> core.redis_client 임포트 추가 < ---
 from core.redis_client import initialize_redis, close_redis, get_redis_client
+from core.result_join import record_translation_result
+from core.task_queue import create_task_queue, LIST_BACKEND
 
 # 로깅 설정
 logging.basicConfig(level=LOG_LEVEL)
@@ -91,12 +98,10 @@ async def save_result_to_hash(request_id: str, result_data: dict):
         
         hash_key = f"{TRANSLATE_TEXT_RESULT_HASH_PREFIX}{request_id}"
         
-        # hset 명령어 수정: data와 original_shm_info(JSON)를 별도 필드로 저장
-        mapping_to_save = {"data": result_json}
-        if original_shm_info: # original_shm_info가 존재할 경우 JSON 문자열로 변환하여 추가
-            mapping_to_save["original_shm_info"] = json.dumps(original_shm_info)
-            
-        await redis_client.hset(hash_key, mapping=mapping_to_save)
+        # data와 original_shm_info(JSON)를 별도 필드로 저장하고, 인페인팅 결과가 이미 있으면 같은 Lua 스크립트에서 렌더링 작업 추가
+        await record_translation_result(
+            redis_client, request_id, result_json, json.dumps(original_shm_info) if original_shm_info else None
+        )
         
         logger.debug(f"[{request_id}] Result saved to Redis Hash with key {hash_key} (original_shm_info included: {bool(original_shm_info)})")
         return True
@@ -418,19 +423,24 @@ async def run_worker(stop_event: asyncio.Event):
         logger.critical(f"Unexpected error during Redis initialization: {e}", exc_info=True)
         return
 
-    logger.info(f"Processor Worker started. Listening to queue: {PROCESSOR_TASK_QUEUE}")
+    # 입력 큐 (스트림 백엔드면 처리 후 ack, 처리 중 죽은 워커의 작업은 다른 워커가 다시 가져감)
+    task_queue = create_task_queue(
+        PROCESSOR_TASK_QUEUE, QUEUE_BACKEND, group="processor", claim_idle_ms=QUEUE_CLAIM_IDLE_MS,
+        max_deliveries=QUEUE_MAX_DELIVERIES, dead_letter_queue=DEAD_LETTER_QUEUE
+    )
+    # 리스트 백엔드는 ack/재전달이 없어, 여러 개를 미리 꺼내 두면 처리 중 죽을 때 꺼낸 작업이 모두 사라짐.
+    # 순차 처리 루프이므로 리스트 백엔드는 이전처럼 하나씩 가져옴
+    read_count = 1 if task_queue.backend == LIST_BACKEND else QUEUE_READ_BATCH
+    logger.info(f"Processor Worker started. Listening to queue: {PROCESSOR_TASK_QUEUE} ({QUEUE_BACKEND})")
 
     while not stop_event.is_set():
         task_data = None
         try:
-            # Redis 클라이언트 가져오기 (이미 초기화되었으므로 에러는 발생하지 않을 것으로 기대)
-            redis_client = get_redis_client()
-
-            task_tuple = await redis_client.blpop([PROCESSOR_TASK_QUEUE], timeout=1)
+            messages = await task_queue.get(read_count, block_ms=1000)
 
-            if task_tuple:
-                # task_tuple[0]은 큐 이름(바이트), task_tuple[1]은 데이터(바이트)
-                task_bytes = task_tuple[1]
+            for message in messages:
+                task_data = None
+                task_bytes = message.data
                 try:
                     task_data = json.loads(task_bytes.decode('utf-8'))
                     await process_ocr_result_task(task_data)
@@ -439,6 +449,8 @@ async def run_worker(stop_event: asyncio.Event):
                 except Exception as e:
                     req_id = task_data.get('request_id', 'N/A') if task_data else 'N/A'
                     logger.error(f"[{req_id}] Error processing task in main loop: {e}", exc_info=True)
+                # 처리(또는 처리 불가 판정)가 끝난 작업만 ack
+                await task_queue.ack(message)
 
         except asyncio.CancelledError:
             logger.info("Main loop cancelled.")
@@ -454,7 +466,7 @@ async def run_worker(stop_event: asyncio.Event):
             logger.error(f"[{req_id_for_log}] An unexpected error occurred in the main loop: {e}", exc_info=True)
             await asyncio.sleep(1)
 
-    logger.info("Worker loop is stopping...")
+    logger.info(f"Worker loop is stopping... Task queue stats: {task_queue.stats()}")
     if redis_initialized:
         await close_redis()
 
@@ -16,3 +16,11 @@ LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
 # 이미지 출력 설정
 OUTPUT_DIR = os.environ.get("OUTPUT_DIR", "./output/translated")
 JPEG_QUALITY = int(os.environ.get("JPEG_QUALITY", "80"))
+
+# 결과 저장소 설정 (SQLite, WAL 모드)
+RESULTS_DB_PATH = os.environ.get("RESULTS_DB_PATH", os.path.join(OUTPUT_DIR, "results.db"))
+# 한 번에 커밋할 최대 결과 수 / 첫 결과 후 커밋까지 기다리는 최대 시간(ms)
+RESULTS_COMMIT_BATCH = int(os.environ.get("RESULTS_COMMIT_BATCH", "64"))
+RESULTS_COMMIT_DELAY_MS = float(os.environ.get("RESULTS_COMMIT_DELAY_MS", "50"))
+# 종료 시 레거시 results.json 내보내기 여부 (필요할 때는 python -m core.results_store export로도 가능)
+RESULTS_EXPORT_ON_EXIT = os.environ.get("RESULTS_EXPORT_ON_EXIT", "0") == "1"
@@ -1,5 +1,4 @@
 import os
-import json
 import logging
 import asyncio
 import numpy as np
@@ -25,9 +24,6 @@ class ImageUtils:
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.jpeg_quality = jpeg_quality
         
-        # 결과 저장을 위한 JSON 파일 경로
-        self.results_file = self.output_dir / 'results.json'
-        
         logger.info(f"ImageUtils 초기화 완료 - 출력 디렉토리: {self.output_dir}")
     
     async def download_image_from_url(self, image_url: str, request_id: str) -> Optional[np.ndarray]:
@@ -109,38 +105,3 @@ class ImageUtils:
             error_msg = f"이미지 저장 중 오류: {str(e)}"
             logger.error(error_msg, exc_info=True)
             return False, error_msg
-    
-    async def save_result_to_json(self, image_id: str, file_path: str, request_id: str):
-        """
-        결과를 JSON 파일에 저장
-        
-        Args:
-            image_id: 이미지 ID
-            file_path: 저장된 파일 경로
-            request_id: 요청 ID
-        """
-        try:
-            # 기존 결과 로드
-            results = []
-            if self.results_file.exists():
-                with open(self.results_file, 'r', encoding='utf-8') as f:
-                    results = json.load(f)
-            
-            # 새 결과 추가
-            new_result = {
-                "timestamp": datetime.now().isoformat(),
-                "request_id": request_id,
-                "image_id": image_id,
-                "file_path": file_path,
-                "status": "completed"
-            }
-            results.append(new_result)
-            
-            # 결과 저장
-            with open(self.results_file, 'w', encoding='utf-8') as f:
-                json.dump(results, f, ensure_ascii=False, indent=2)
-                
-            logger.info(f"결과 JSON에 저장됨: {image_id}")
-            
-        except Exception as e:
-            logger.error(f"결과 JSON 저장 중 오류: {str(e)}", exc_info=True) 
\ No newline at end of file
@@ -0,0 +1,221 @@
+import os
+import json
+import sqlite3
+import asyncio
+import logging
+import argparse
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 결과 컬럼 순서 (레거시 results.json 항목의 키 순서와 같음)
+RESULT_FIELDS = ("timestamp", "request_id", "image_id", "file_path", "status")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    request_id TEXT NOT NULL,
+    image_id TEXT NOT NULL,
+    file_path TEXT NOT NULL,
+    status TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_request_id ON results (request_id);
+CREATE INDEX IF NOT EXISTS idx_results_image_id ON results (image_id);
+"""
+
+
+class ResultsStore:
+    """
+    저장 결과 기록용 SQLite 저장소 (WAL 모드, request_id/image_id 색인).
+
+    - 기존 results.json은 결과마다 파일 전체를 읽고 다시 쓰므로(O(n²)) 결과가 쌓일수록 느려지고,
+      쓰는 도중 죽으면 파일 전체가 깨졌습니다. 여기서는 한 행씩 INSERT만 하므로 기록 비용이 일정합니다.
+    - add()는 버퍼에 넣고, 자신이 포함된 커밋이 끝날 때까지 기다립니다 (그룹 커밋).
+      버퍼가 commit_batch개가 되거나 첫 기록 후 commit_delay_ms가 지나면 executemany + COMMIT 한 번으로 기록합니다.
+    - SQLite 호출은 이벤트 루프를 막지 않도록 스레드에서 실행합니다.
+    - 레거시 results.json이 필요하면 export_json()으로 만듭니다. 처음 열 때 DB가 비어 있고 legacy_json이 있으면 가져옵니다.
+    """
+
+    def __init__(self, db_path: str, commit_batch: int = 64, commit_delay_ms: float = 50.0,
+                 legacy_json: Optional[str] = None):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.commit_batch = commit_batch
+        self.commit_delay = commit_delay_ms / 1000
+
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # WAL에서는 NORMAL이어도 커밋 단위 일관성이 유지됨 (전원 장애 시 마지막 커밋만 잃을 수 있음)
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+        self._buffer: List[Tuple[Tuple[str, ...], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushing = set()
+        # 통계
+        self.written = 0
+        self.commits = 0
+        self.errors = 0
+        self.largest_batch = 0
+
+        if legacy_json:
+            self.import_json(legacy_json)
+
+    # === 기록 ===
+
+    async def add(self, request_id: str, image_id: str, file_path: str, status: str = "completed",
+                  timestamp: Optional[str] = None):
+        """결과 한 건을 기록합니다. 반환 시점에는 커밋되어 있습니다 (실패하면 예외)."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        row = (timestamp or datetime.now().isoformat(), request_id, image_id, file_path, status)
+        self._buffer.append((row, future))
+        if len(self._buffer) >= self.commit_batch:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.commit_delay, self._start_flush)
+        await future
+
+    def _start_flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._buffer = self._buffer, []
+        if batch:
+            task = asyncio.ensure_future(self._flush(batch))
+            self._flushing.add(task)
+            task.add_done_callback(self._flushing.discard)
+
+    async def _flush(self, batch: List[Tuple[Tuple[str, ...], asyncio.Future]]):
+        error = None
+        try:
+            await asyncio.to_thread(self._insert, [row for row, _ in batch])
+            self.written += len(batch)
+        except Exception as e:
+            error = e
+            self.errors += len(batch)
+            logger.error(f"결과 {len(batch)}건 커밋 실패: {e}")
+        self.commits += 1
+        self.largest_batch = max(self.largest_batch, len(batch))
+        for _, future in batch:
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(None)
+            else:
+                future.set_exception(error)
+
+    def _insert(self, rows: List[Tuple[str, ...]]):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT INTO results ({', '.join(RESULT_FIELDS)}) VALUES (?, ?, ?, ?, ?)", rows
+            )
+
+    async def flush(self):
+        """버퍼에 남은 결과를 커밋하고 진행 중인 커밋을 기다립니다."""
+        self._start_flush()
+        if self._flushing:
+            await asyncio.gather(*self._flushing, return_exceptions=True)
+
+    async def close(self):
+        """남은 결과를 커밋하고 연결을 닫습니다."""
+        await self.flush()
+        with self._lock:
+            self._conn.close()
+
+    # === 조회 ===
+
+    def _select(self, where: str = "", params: Tuple = ()) -> List[Dict[str, Any]]:
+        with self._lock:
+            cursor = self._conn.execute(f"SELECT {', '.join(RESULT_FIELDS)} FROM results {where} ORDER BY id", params)
+            return [dict(zip(RESULT_FIELDS, row)) for row in cursor.fetchall()]
+
+    def find_by_request(self, request_id: str) -> List[Dict[str, Any]]:
+        return self._select("WHERE request_id = ?", (request_id,))
+
+    def find_by_image(self, image_id: str) -> List[Dict[str, Any]]:
+        return self._select("WHERE image_id = ?", (image_id,))
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    # === 레거시 results.json ===
+
+    def export_json(self, path: str) -> int:
+        """
+        레거시 results.json 형식(항목 배열)으로 내보냅니다. 임시 파일에 쓴 뒤 교체하므로 도중에 죽어도 기존 파일은 그대로입니다.
+
+        Returns:
+            int: 내보낸 결과 수
+        """
+        path = Path(path)
+        tmp_path = path.with_name(path.name + ".tmp")
+        count = 0
+        with self._lock:
+            cursor = self._conn.execute(f"SELECT {', '.join(RESULT_FIELDS)} FROM results ORDER BY id")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                # 한 번에 메모리에 올리지 않고 항목 단위로 씀
+                f.write("[")
+                for row in cursor:
+                    entry = json.dumps(dict(zip(RESULT_FIELDS, row)), ensure_ascii=False, indent=2)
+                    f.write(("," if count else "") + "\n  " + entry.replace("\n", "\n  "))
+                    count += 1
+                f.write("\n]\n" if count else "]\n")
+        os.replace(tmp_path, path)
+        logger.info(f"결과 {count}건을 {path}로 내보냄")
+        return count
+
+    def import_json(self, path: str) -> int:
+        """DB가 비어 있을 때만 레거시 results.json을 가져옵니다 (이전 버전에서 옮겨올 때 한 번)."""
+        path = Path(path)
+        if not path.exists() or self.count() > 0:
+            return 0
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"레거시 결과 파일 {path}을 읽지 못해 가져오지 않음: {e}")
+            return 0
+        rows = [tuple(entry.get(field, "") for field in RESULT_FIELDS) for entry in entries if isinstance(entry, dict)]
+        self._insert(rows)
+        logger.info(f"레거시 결과 파일 {path}에서 {len(rows)}건 가져옴")
+        return len(rows)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "written": self.written,
+            "commits": self.commits,
+            "errors": self.errors,
+            "largest_batch": self.largest_batch,
+            "pending": len(self._buffer)
+        }
+
+
+def main():
+    """python -m core.results_store export [--db ...] [--out ...]: 레거시 results.json 내보내기"""
+    from core.config import RESULTS_DB_PATH, OUTPUT_DIR
+
+    parser = argparse.ArgumentParser(description="결과 저장소 도구")
+    parser.add_argument("command", choices=["export"])
+    parser.add_argument("--db", default=RESULTS_DB_PATH, help="결과 DB 경로")
+    parser.add_argument("--out", default=os.path.join(OUTPUT_DIR, "results.json"), help="내보낼 results.json 경로")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    store = ResultsStore(args.db)
+    try:
+        store.export_json(args.out)
+    finally:
+        asyncio.run(store.close())
+
+
+if __name__ == "__main__":
+    main()
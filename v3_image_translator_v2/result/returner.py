@@ -7,10 +7,14 @@ from pathlib import Path
 from dotenv import load_dotenv
 
 # 코어 모듈 임포트 (로컬 core 폴더에서)
-from core.config import REDIS_URL, HOSTING_TASKS_QUEUE, OUTPUT_DIR, JPEG_QUALITY
+from core.config import (
+    REDIS_URL, HOSTING_TASKS_QUEUE, OUTPUT_DIR, JPEG_QUALITY,
+    RESULTS_DB_PATH, RESULTS_COMMIT_BATCH, RESULTS_COMMIT_DELAY_MS, RESULTS_EXPORT_ON_EXIT
+)
 from core.redis_client import get_redis_client, initialize_redis, close_redis
 from core.shm_manager import get_array_from_shm, cleanup_shm
 from core.image_utils import ImageUtils
+from core.results_store import ResultsStore
 
 # 환경 변수 로드
 load_dotenv()
@@ -29,9 +33,19 @@ class ImageResultWorker:
         """초기화"""
         self.redis = get_redis_client()
         self.image_utils = ImageUtils(OUTPUT_DIR, JPEG_QUALITY)
+        # 저장 결과 기록 (이전 버전의 results.json이 있으면 처음 한 번 가져옴)
+        self.legacy_results_file = Path(OUTPUT_DIR) / 'results.json'
+        self.results_store = ResultsStore(
+            RESULTS_DB_PATH,
+            commit_batch=RESULTS_COMMIT_BATCH,
+            commit_delay_ms=RESULTS_COMMIT_DELAY_MS,
+            legacy_json=str(self.legacy_results_file)
+        )
         
         # 공유 메모리 객체 추적 (정리용)
         self.active_shm_objects = []
+        # 진행 중인 작업 태스크 (종료 시 결과 저장소를 닫기 전에 완료를 기다림)
+        self._processing_tasks = set()
         
         logger.info(f"ImageResultWorker 초기화 완료 - 출력 디렉토리: {OUTPUT_DIR}")
 
@@ -150,9 +164,9 @@ class ImageResultWorker:
                 logger.error(f"[{request_id}] 이미지 저장 실패: {result}")
                 return
                 
-            # 결과를 JSON 파일에 저장
+            # 결과 저장소에 기록
             file_path = result
-            await self.image_utils.save_result_to_json(image_id, file_path, request_id)
+            await self.results_store.add(request_id, image_id, file_path)
             
             logger.info(f"[{request_id}] 파일 저장 완료: {image_id}")
                 
@@ -201,7 +215,9 @@ class ImageResultWorker:
                         task_data = json.loads(task_data_bytes.decode('utf-8'))
                         
                         # 작업 처리 (작업마다 새 태스크 생성)
-                        asyncio.create_task(self.process_hosting_task(task_data))
+                        processing_task = asyncio.create_task(self.process_hosting_task(task_data))
+                        self._processing_tasks.add(processing_task)
+                        processing_task.add_done_callback(self._processing_tasks.discard)
                         
                     except json.JSONDecodeError as e:
                         logger.error(f"작업 데이터 디코딩 오류: {task_data_bytes}. 오류: {e}")
@@ -218,6 +234,20 @@ class ImageResultWorker:
         
         logger.info("이미지 파일 저장 워커 종료")
 
+    async def close(self):
+        """진행 중인 작업이 끝나길 기다린 뒤 남은 결과를 커밋하고, 설정된 경우 레거시 results.json을 내보냅니다."""
+        if self._processing_tasks:
+            logger.info(f"진행 중인 작업 {len(self._processing_tasks)}개 완료 대기 중...")
+            await asyncio.gather(*self._processing_tasks, return_exceptions=True)
+        await self.results_store.flush()
+        if RESULTS_EXPORT_ON_EXIT:
+            try:
+                self.results_store.export_json(str(self.legacy_results_file))
+            except Exception as e:
+                logger.error(f"results.json 내보내기 실패: {str(e)}", exc_info=True)
+        logger.info(f"결과 저장소 통계: {self.results_store.stats()}")
+        await self.results_store.close()
+
 async def main():
     """메인 함수"""
     logger.info("Redis 초기화 중...")
@@ -230,6 +260,7 @@ async def main():
         logger.error(f"Redis 초기화 실패: {str(e)}")
         return
     
+    worker = None
     worker_task = None
     
     try:
@@ -257,6 +288,10 @@ async def main():
             except asyncio.CancelledError:
                 pass
         
+        # 결과 저장소 정리
+        if worker:
+            await worker.close()
+        
         # Redis 연결 종료
         await close_redis()
         logger.info("Redis 연결 종료. 프로그램 종료.")
@@ -0,0 +1,120 @@
+import unittest
+import asyncio
+import os
+import sys
+
+# operate_worker 경로 추가
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+OPERATE_WORKER_DIR = os.path.join(os.path.dirname(TESTS_DIR), "workers", "operate_worker")
+sys.path.insert(0, OPERATE_WORKER_DIR)
+
+from logic.batch_scheduler import BatchScheduler
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def fake_inference(seconds_per_image):
+    """배치 크기에 비례해 걸리는 추론 대체 (걸린 시간만 반환)"""
+    def infer(tasks):
+        return seconds_per_image * len(tasks)
+    return infer
+
+
+class TestBatchScheduler(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.scheduler = BatchScheduler({"short": (8, 1.0, 32), "long": (2, 1.0, 32)}, max_queue_delay=0.2, clock=self.clock)
+
+    async def put_at(self, kind, *times):
+        for at in times:
+            self.clock.now = at
+            await self.scheduler.put(kind, {"at": at})
+
+    async def run_batch(self, infer):
+        """워커 루프와 같이 배치를 꺼내 추론하고 걸린 시간을 기록"""
+        kind, tasks = await asyncio.wait_for(self.scheduler.next_batch(), timeout=1)
+        self.scheduler.record_latency(kind, infer(tasks))
+        return kind, tasks
+
+    async def assert_no_batch(self):
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(self.scheduler.next_batch(), timeout=0.05)
+
+    async def test_full_batch_is_dispatched_immediately(self):
+        await self.put_at("long", 0.0, 0.001, 0.002)
+        kind, tasks = await self.run_batch(fake_inference(0.01))
+        self.assertEqual((kind, [t["at"] for t in tasks]), ("long", [0.0, 0.001]))
+        self.assertEqual(self.scheduler.stats()["long"]["reasons"], {"full": 1})
+        self.assertEqual(self.scheduler.qsize("long"), 1)
+
+    async def test_waits_for_expected_fill_then_flushes_at_deadline(self):
+        # 10ms 간격 도착 -> 나머지 6개가 60ms 안에 찰 것으로 예상되어 대기
+        await self.put_at("short", 0.0, 0.01)
+        await self.assert_no_batch()
+
+        # 더 도착하지 않은 채 SLO(200ms)에 도달하면 부분 배치를 내보냄
+        self.clock.now = 0.2
+        kind, tasks = await self.run_batch(fake_inference(0.01))
+        self.assertEqual((kind, len(tasks)), ("short", 2))
+        stats = self.scheduler.stats()["short"]
+        self.assertEqual(stats["reasons"], {"deadline": 1})
+        self.assertAlmostEqual(stats["max_wait"], 0.2)
+        self.assertAlmostEqual(stats["avg_fill_ratio"], 2 / 8)
+
+    async def test_slow_arrivals_flush_partial_batch(self):
+        # 100ms 간격이면 나머지 6개를 채우는 데 600ms가 걸리므로 남은 SLO 안에 찰 수 없음
+        await self.put_at("short", 0.0, 0.1)
+        kind, tasks = await self.run_batch(fake_inference(0.01))
+        self.assertEqual(len(tasks), 2)
+        self.assertEqual(self.scheduler.stats()["short"]["reasons"], {"partial": 1})
+
+    async def test_fast_measured_latency_stops_waiting(self):
+        # 측정된 추론 시간이 없으면 60ms 예상 채움 시간을 기다림
+        await self.put_at("short", 0.0, 0.01)
+        await self.assert_no_batch()
+
+        # 배치 하나가 30ms 걸리는 것으로 측정되면 60ms를 기다리는 대신 지금 있는 2개를 바로 처리
+        self.scheduler.record_latency("short", 0.03)
+        kind, tasks = await self.run_batch(fake_inference(0.01))
+        self.assertEqual(len(tasks), 2)
+        self.assertEqual(self.scheduler.stats()["short"]["reasons"], {"partial": 1})
+
+    async def test_latency_ewma_follows_slower_batches(self):
+        infer = fake_inference(0.025)
+        self.scheduler.record_latency("short", 0.03)
+        # 8장 배치가 200ms씩 걸리면 EWMA(alpha=0.2)가 점점 따라감
+        expected = 0.03
+        for _ in range(3):
+            self.scheduler.record_latency("short", infer([{}] * 8))
+            expected = 0.2 * 0.2 + 0.8 * expected
+        self.assertAlmostEqual(self.scheduler.stats()["short"]["batch_latency"], expected)
+
+        # 추정 지연시간(약 74ms)이 예상 채움 시간(60ms)보다 길어져 다시 채움을 기다림
+        await self.put_at("short", 0.0, 0.01)
+        await self.assert_no_batch()
+
+    async def test_arrival_rate_is_ewma_of_intervals(self):
+        await self.put_at("short", 0.0, 0.1, 0.2, 0.25)
+        # 간격 0.1, 0.1, 0.05 -> 0.1, 0.1, 0.2*0.05+0.8*0.1
+        self.assertAlmostEqual(self.scheduler.stats()["short"]["arrival_rate"], 1 / 0.09)
+
+    async def test_deadline_queue_is_preferred_over_full_queue(self):
+        await self.put_at("short", 0.0)
+        await self.put_at("long", 0.3, 0.3)
+        # short는 SLO 초과, long은 가득 참 -> SLO 초과 큐 먼저
+        kind, _ = await self.run_batch(fake_inference(0.01))
+        self.assertEqual(kind, "short")
+        kind, _ = await self.run_batch(fake_inference(0.01))
+        self.assertEqual(kind, "long")
+
+
+if __name__ == "__main__":
+    unittest.main()
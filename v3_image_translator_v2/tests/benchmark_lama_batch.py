@@ -0,0 +1,105 @@
+"""
+LaMa 배치 입출력 벤치마크: 사전 할당 워크스페이스 경로 vs 기존 샘플별 텐서 변환 경로
+
+batch_inference(use_workspace=True/False)를 같은 입력으로 반복 실행해 배치당 시간과 결과 일치 여부를 비교합니다.
+기본값은 호스트 단계(패딩, 텐서 변환, 업로드/다운로드)만 드러나도록 가벼운 대체 모델을 사용하며,
+--config/--checkpoint를 주면 실제 LaMa 모델로 측정합니다. lama 의존성이 설치된 환경(Operate Worker 이미지 등)에서 실행합니다.
+
+사용법:
+    python tests/benchmark_lama_batch.py --batch 4 --size 1024x1024 --iterations 20
+    python tests/benchmark_lama_batch.py --device cuda --config /model/config.yaml --checkpoint /model/models/best.ckpt
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+import logging
+
+import numpy as np
+import torch
+from omegaconf import OmegaConf
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+OPERATE_WORKER_DIR = os.path.join(os.path.dirname(TESTS_DIR), "workers", "operate_worker")
+sys.path.insert(0, OPERATE_WORKER_DIR)
+sys.path.insert(0, os.path.join(OPERATE_WORKER_DIR, "lama"))  # saicinpainting 패키지 (Docker의 PYTHONPATH와 같음)
+
+from lama.bin.inference import batch_inference, load_lama_model  # noqa: E402
+
+
+class IdentityModel(torch.nn.Module):
+    """입력 이미지를 그대로 돌려주는 대체 모델 (추론 비용을 빼고 입출력 경로만 측정하기 위함)"""
+
+    def forward(self, batch):
+        return {"inpainted": batch["image"]}
+
+
+def make_inputs(batch, height, width, rng):
+    images, masks = [], []
+    for _ in range(batch):
+        # 고정 입력 크기보다 조금 작은 이미지도 섞어 패딩 경로를 함께 측정
+        h = height - int(rng.integers(0, 16))
+        w = width - int(rng.integers(0, 16))
+        images.append(rng.integers(0, 256, size=(h, w, 3), dtype=np.uint8))
+        mask = np.zeros((h, w), dtype=np.uint8)
+        mask[h // 4:h // 2, w // 4:w // 2] = 255
+        masks.append(mask)
+    return images, masks
+
+
+def run(images, masks, model, train_config, device, use_workspace, iterations):
+    results = None
+    timings = []
+    for _ in range(iterations):
+        if device == "cuda":
+            torch.cuda.synchronize()
+        start = time.perf_counter()
+        # batch_inference의 진행 로그는 측정에서 제외
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = batch_inference(images, masks, model, train_config, device=device, use_workspace=use_workspace)
+        timings.append(time.perf_counter() - start)
+    # 첫 회는 워크스페이스 할당 등 준비 비용이 섞이므로 따로 보고
+    return results, timings[0], float(np.median(timings[1:])) if len(timings) > 1 else timings[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LaMa 배치 입출력 경로 비교 벤치마크")
+    parser.add_argument("--batch", type=int, default=4, help="배치 크기")
+    parser.add_argument("--size", default="1024x1024", help="입력 크기 HxW (예: 1024x1024, 1504x864)")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--device", default="cpu", choices=["cpu", "cuda"])
+    parser.add_argument("--config", help="LaMa config.yaml (지정하지 않으면 대체 모델 사용)")
+    parser.add_argument("--checkpoint", help="LaMa 체크포인트")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    height, width = (int(v) for v in args.size.lower().split("x"))
+    if args.config and args.checkpoint:
+        model, train_config = load_lama_model(args.config, args.checkpoint, args.device)
+    else:
+        model = IdentityModel().to(args.device).eval()
+        train_config = OmegaConf.create({
+            "data": {"visual_test": {"pad_out_to_modulo": 8}},
+            "evaluator": {"inpainted_key": "inpainted"}
+        })
+
+    images, masks = make_inputs(args.batch, height, width, np.random.default_rng(args.seed))
+    legacy, legacy_first, legacy_median = run(images, masks, model, train_config, args.device, False, args.iterations)
+    fast, fast_first, fast_median = run(images, masks, model, train_config, args.device, True, args.iterations)
+
+    identical = all(np.array_equal(a, b) for a, b in zip(legacy, fast))
+    max_diff = max(int(np.abs(a.astype(np.int16) - b.astype(np.int16)).max()) for a, b in zip(legacy, fast))
+
+    print(f"batch={args.batch}, size={height}x{width}, device={args.device}, "
+          f"model={'lama' if args.config else 'identity'}, iterations={args.iterations}")
+    print(f"legacy    first {legacy_first * 1e3:8.1f} ms, median {legacy_median * 1e3:8.1f} ms/batch")
+    print(f"workspace first {fast_first * 1e3:8.1f} ms, median {fast_median * 1e3:8.1f} ms/batch "
+          f"(x{legacy_median / fast_median:.1f})")
+    print(f"결과 동일: {identical} (최대 픽셀 차이 {max_diff})")
+
+
+if __name__ == "__main__":
+    main()
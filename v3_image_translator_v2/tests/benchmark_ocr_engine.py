@@ -0,0 +1,132 @@
+"""
+OCR 처리량 벤치마크 (CPU): 이미지별 ocr_model.ocr() 순차 호출 vs OCREngine 배치 처리
+
+번들된 샘플 이미지(또는 --images로 지정한 이미지)에서 크기가 조금씩 다른 입력을 만들어
+두 방식의 처리량(images/s)과 인식 결과 일치율을 비교합니다.
+paddleocr가 설치된 환경(OCR Worker 이미지 등)에서 실행합니다.
+
+사용법:
+    python tests/benchmark_ocr_engine.py --count 32 --max-batch-images 8
+    python tests/benchmark_ocr_engine.py --images a.jpg b.png --det-model-dir ... --rec-model-dir ...
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import logging
+
+import cv2
+import numpy as np
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+OCR_WORKER_DIR = os.path.join(os.path.dirname(TESTS_DIR), "workers", "ocr_worker")
+sys.path.append(OCR_WORKER_DIR)
+
+from ocr_engine import OCREngine, PaddleOCRBatchRunner  # noqa: E402
+
+DEFAULT_IMAGES = [os.path.join(os.path.dirname(TESTS_DIR), "workers", "KakaoTalk_20250612_224106169_03.jpg")]
+
+
+def load_model(args):
+    from paddleocr import PaddleOCR
+
+    # worker.py와 같은 설정, GPU만 끔
+    kwargs = dict(
+        det_algorithm="DB", det_max_side_len=1504, det_db_thresh=0.3, det_db_box_thresh=0.5,
+        det_db_unclip_ratio=2.0, use_dilation=False, rec_algorithm="SVTR_LCNet", rec_image_shape='3, 64, 480',
+        rec_char_type='ch', max_text_length=25, use_space_char=True, drop_score=0.5, lang="ch",
+        use_gpu=False, show_log=False, max_batch_size=args.rec_batch_size, rec_batch_num=args.rec_batch_size
+    )
+    if args.det_model_dir:
+        kwargs["det_model_dir"] = args.det_model_dir
+    if args.rec_model_dir:
+        kwargs["rec_model_dir"] = args.rec_model_dir
+    return PaddleOCR(**kwargs)
+
+
+def make_inputs(paths, count, rng):
+    """샘플 이미지를 무작위로 자르고 축소해 크기가 조금씩 다른 입력 count개를 만듭니다."""
+    sources = []
+    for path in paths:
+        image = cv2.imread(path)
+        if image is None:
+            raise SystemExit(f"이미지를 읽을 수 없습니다: {path}")
+        sources.append(image)
+
+    inputs = []
+    for i in range(count):
+        image = sources[i % len(sources)]
+        h, w = image.shape[:2]
+        crop_h, crop_w = int(h * rng.uniform(0.7, 1.0)), int(w * rng.uniform(0.85, 1.0))
+        top, left = int(rng.integers(0, h - crop_h + 1)), int(rng.integers(0, w - crop_w + 1))
+        crop = image[top:top + crop_h, left:left + crop_w]
+        scale = rng.uniform(0.8, 1.0)
+        inputs.append(cv2.resize(crop, (int(crop_w * scale), int(crop_h * scale)), interpolation=cv2.INTER_AREA))
+    return inputs
+
+
+def texts_of(result):
+    return [line[1][0] for line in (result or [])]
+
+
+def run_sequential(model, inputs):
+    start = time.perf_counter()
+    results = []
+    for image in inputs:
+        raw = model.ocr(image, True)
+        results.append(raw[0] if raw and raw[0] is not None else [])
+    return results, time.perf_counter() - start
+
+
+def run_engine(model, inputs, args):
+    runner = PaddleOCRBatchRunner(model, max_padding=args.max_padding, max_det_batch=args.max_batch_images)
+    engine = OCREngine(runner, max_batch_images=args.max_batch_images, batch_wait=args.batch_wait_ms / 1000,
+                       queue_size=max(len(inputs), 1))
+    engine.start()
+
+    async def submit_all():
+        return await asyncio.gather(*(engine.recognize(image) for image in inputs))
+
+    start = time.perf_counter()
+    results = asyncio.run(submit_all())
+    elapsed = time.perf_counter() - start
+    engine.close()
+    return results, elapsed, engine.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OCR 엔진 배치 처리량 벤치마크 (CPU)")
+    parser.add_argument("--images", nargs="+", default=DEFAULT_IMAGES, help="입력 이미지 경로")
+    parser.add_argument("--count", type=int, default=32, help="생성할 입력 이미지 수")
+    parser.add_argument("--max-batch-images", type=int, default=8)
+    parser.add_argument("--batch-wait-ms", type=int, default=20)
+    parser.add_argument("--max-padding", type=float, default=0.3)
+    parser.add_argument("--rec-batch-size", type=int, default=10)
+    parser.add_argument("--det-model-dir", default=None)
+    parser.add_argument("--rec-model-dir", default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    model = load_model(args)
+    inputs = make_inputs(args.images, args.count, np.random.default_rng(args.seed))
+
+    # 워밍업 (모델 초기화, 메모리 할당)
+    run_sequential(model, inputs[:2])
+
+    seq_results, seq_time = run_sequential(model, inputs)
+    eng_results, eng_time, stats = run_engine(model, inputs, args)
+
+    same = sum(texts_of(a) == texts_of(b) for a, b in zip(seq_results, eng_results))
+    lines = sum(len(r) for r in seq_results)
+    n = len(inputs)
+    print(f"images={n}, text lines={lines}, sizes={sorted({img.shape[:2] for img in inputs})[:3]}...")
+    print(f"sequential ocr()  {n / seq_time:6.2f} images/s ({seq_time * 1000 / n:7.1f} ms/image)")
+    print(f"OCREngine         {n / eng_time:6.2f} images/s ({eng_time * 1000 / n:7.1f} ms/image, x{seq_time / eng_time:.2f})")
+    print(f"동일 인식 결과 이미지: {same}/{n}")
+    print(f"engine stats: {stats}")
+
+
+if __name__ == "__main__":
+    main()
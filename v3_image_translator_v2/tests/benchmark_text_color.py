@@ -0,0 +1,154 @@
+"""
+텍스트 색상 선택 벤치마크: 배치 2-means 구현 vs 기존 박스별 sklearn KMeans 구현
+
+샘플 이미지 위에 알려진 색상으로 텍스트를 그려 원본으로 사용하고, 텍스트를 그리기 전 이미지를
+인페인팅 결과로 사용합니다. 두 구현의 처리 시간과 선택된 텍스트 색상을 비교합니다.
+
+사용법:
+    python tests/benchmark_text_color.py [이미지 경로 ...] --boxes 60 --repeat 5
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+OPERATE_WORKER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "workers", "operate_worker")
+sys.path.insert(0, OPERATE_WORKER_DIR)
+
+from rendering_worker.modules.selectTextColor import TextColorSelector  # noqa: E402
+
+DEFAULT_IMAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "workers", "KakaoTalk_20250612_224106169_03.jpg")
+
+
+class LegacyTextColorSelector:
+    """기존 구현 (박스마다 KMeans k=1, k=2를 n_init=10으로 수행) - 비교 기준용"""
+
+    def __init__(self):
+        from sklearn.cluster import KMeans
+        self._kmeans = KMeans
+
+    def _roi_pixels(self, image, box, num_clusters):
+        box = np.array(box, dtype=np.int32)
+        x_min = max(0, min(box[:, 0]))
+        y_min = max(0, min(box[:, 1]))
+        x_max = min(image.shape[1], max(box[:, 0]))
+        y_max = min(image.shape[0], max(box[:, 1]))
+        roi = image[y_min:y_max, x_min:x_max]
+        if roi.size == 0 or roi.shape[0] * roi.shape[1] < num_clusters:
+            return None
+        pixels = roi.reshape(-1, 3)
+        if pixels.shape[0] > 100:
+            sample_size = max(num_clusters, int(pixels.shape[0] * 0.1))
+            pixels = pixels[np.random.permutation(pixels.shape[0])[:sample_size]]
+        return pixels
+
+    def _centers(self, image, box, num_clusters):
+        pixels = self._roi_pixels(image, box, num_clusters)
+        if pixels is None:
+            return None
+        kmeans = self._kmeans(n_clusters=num_clusters, random_state=0, n_init=10)
+        kmeans.fit(pixels)
+        return [tuple(c) for c in kmeans.cluster_centers_.astype(int)]
+
+    @staticmethod
+    def _luminance(color):
+        channels = []
+        for c in (color[2], color[1], color[0]):
+            c = c / 255.0
+            channels.append(c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4)
+        return 0.2126 * channels[0] + 0.7152 * channels[1] + 0.0722 * channels[2]
+
+    def _contrast(self, c1, c2):
+        l1, l2 = self._luminance(c1) + 0.05, self._luminance(c2) + 0.05
+        return max(l1, l2) / min(l1, l2)
+
+    def select_text_color(self, request_id, translate_data, original_image, inpainted_image):
+        for item in translate_data["translate_result"]:
+            box = item["box"]
+            bg = (self._centers(inpainted_image, box, 1) or [(255, 255, 255)])[0]
+            candidates = self._centers(original_image, box, 2) or [(0, 0, 0)]
+            chosen = max(candidates, key=lambda c: self._contrast(c, bg))
+            if self._contrast(chosen, bg) < 4.5:
+                chosen = (0, 0, 0) if self._luminance(bg) > 0.5 else (255, 255, 255)
+            item["text_color"] = {"r": int(chosen[2]), "g": int(chosen[1]), "b": int(chosen[0])}
+            item["bg_color"] = {"r": int(bg[2]), "g": int(bg[1]), "b": int(bg[0])}
+            item["contrast_ratio"] = round(self._contrast(chosen, bg), 2)
+        return translate_data
+
+
+def make_sample(image, num_boxes, rng):
+    """이미지 위에 임의 색상의 텍스트를 그려 (원본, 인페인팅, 번역 데이터, 실제 텍스트 색상)을 만듭니다."""
+    inpainted = image.copy()
+    original = image.copy()
+    h, w = image.shape[:2]
+    items, truth = [], []
+    for _ in range(num_boxes):
+        bw, bh = int(rng.integers(80, max(81, w // 2))), int(rng.integers(20, 60))
+        x, y = int(rng.integers(0, max(1, w - bw))), int(rng.integers(0, max(1, h - bh)))
+        color = tuple(int(c) for c in rng.integers(0, 256, size=3))
+        scale = bh / 30.0
+        cv2.putText(original, "TEXT SAMPLE 123", (x, y + int(bh * 0.8)), cv2.FONT_HERSHEY_SIMPLEX,
+                    scale, color, max(1, int(scale * 2)), cv2.LINE_AA)
+        items.append({"box": [[x, y], [x + bw, y], [x + bw, y + bh], [x, y + bh]], "translated_text": "샘플"})
+        truth.append(color)
+    return original, inpainted, {"translate_result": items}, np.array(truth)
+
+
+def run(selector, original, inpainted, translate_data, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        data = {"translate_result": [dict(item) for item in translate_data["translate_result"]]}
+        start = time.perf_counter()
+        result = selector.select_text_color("bench", data, original, inpainted)
+        timings.append(time.perf_counter() - start)
+    return result, timings
+
+
+def colors(result, key):
+    return np.array([[item[key]["b"], item[key]["g"], item[key]["r"]] for item in result["translate_result"]])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="텍스트 색상 선택 구현 비교 벤치마크")
+    parser.add_argument("images", nargs="*", default=[DEFAULT_IMAGE], help="샘플 이미지 경로")
+    parser.add_argument("--boxes", type=int, default=60, help="이미지당 텍스트 박스 수")
+    parser.add_argument("--repeat", type=int, default=5, help="반복 횟수")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    fast = TextColorSelector()
+    legacy = LegacyTextColorSelector()
+
+    for path in args.images:
+        image = cv2.imread(path, cv2.IMREAD_COLOR)
+        if image is None:
+            print(f"이미지를 읽을 수 없습니다: {path}")
+            continue
+        original, inpainted, translate_data, truth = make_sample(image, args.boxes, rng)
+
+        fast_result, fast_times = run(fast, original, inpainted, translate_data, args.repeat)
+        legacy_result, legacy_times = run(legacy, original, inpainted, translate_data, args.repeat)
+
+        fast_text, legacy_text = colors(fast_result, "text_color"), colors(legacy_result, "text_color")
+        fast_bg, legacy_bg = colors(fast_result, "bg_color"), colors(legacy_result, "bg_color")
+        fast_contrast = np.array([item["contrast_ratio"] for item in fast_result["translate_result"]])
+        legacy_contrast = np.array([item["contrast_ratio"] for item in legacy_result["translate_result"]])
+
+        print(f"\n=== {os.path.basename(path)} {image.shape[1]}x{image.shape[0]}, boxes={args.boxes} ===")
+        print(f"legacy KMeans : median {np.median(legacy_times) * 1000:8.1f} ms")
+        print(f"batched       : median {np.median(fast_times) * 1000:8.1f} ms "
+              f"(x{np.median(legacy_times) / np.median(fast_times):.1f})")
+        print(f"배경색 최대 채널 차이             : {np.abs(fast_bg - legacy_bg).max()}")
+        print(f"텍스트 색상 평균 채널 차이 (legacy): {np.abs(fast_text - legacy_text).mean():.2f}")
+        print(f"텍스트 색상 평균 채널 오차 (실제) : batched {np.abs(fast_text - truth).mean():.2f}, "
+              f"legacy {np.abs(legacy_text - truth).mean():.2f}")
+        print(f"평균 대비율                      : batched {fast_contrast.mean():.2f}, legacy {legacy_contrast.mean():.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+폰트 크기 계산 마이크로 벤치마크: 추정 + 이진 탐색 구현 vs 기존 5% 축소 반복 구현
+
+(텍스트, 박스) 쌍 코퍼스를 만들어 두 구현의 처리 시간과 결과 크기를 비교합니다.
+새 구현은 박스에 맞는 가장 큰 정수 크기를 반환하므로 기존 구현 이상이어야 하며, 모두 박스 폭 안에 들어가야 합니다.
+
+사용법:
+    python tests/benchmark_text_size.py --pairs 2000 --font /path/to/font.ttf
+"""
+import argparse
+import os
+import sys
+import time
+import logging
+
+import numpy as np
+from PIL import ImageFont
+
+OPERATE_WORKER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "workers", "operate_worker")
+sys.path.insert(0, OPERATE_WORKER_DIR)
+
+from rendering_worker.modules.textsize import TextSizeCalculator  # noqa: E402
+
+DEFAULT_FONT = os.path.join(OPERATE_WORKER_DIR, "rendering_worker", "modules", "fonts", "GmarketSansTTFBold.ttf")
+
+WORDS = ["프리미엄", "천연", "가죽", "소재", "고급스러운", "디자인", "무료배송", "할인", "정품", "보장",
+         "100%", "면", "사이즈", "XL", "색상", "블랙", "화이트", "방수", "기능", "초경량", "휴대용", "세트"]
+
+
+class LegacyTextSizeCalculator:
+    """기존 구현 (박스 높이에서 시작해 5%씩 줄이며 getbbox 반복) - 비교 기준용"""
+
+    def __init__(self, font_path):
+        self.font_path = font_path
+        self.font_cache = {}
+
+    def _get_font(self, size):
+        if size not in self.font_cache:
+            self.font_cache[size] = ImageFont.truetype(self.font_path, size)
+        return self.font_cache[size]
+
+    def calculate_font_size(self, text, box):
+        box = np.array(box, dtype=np.float32)
+        box_width = box[:, 0].max() - box[:, 0].min()
+        box_height = box[:, 1].max() - box[:, 1].min()
+        size = max(1, int(box_height))
+        while size >= 1:
+            bbox = self._get_font(size).getbbox(text)
+            if bbox[2] - bbox[0] <= box_width:
+                return size
+            new_size = int(size * 0.95)
+            size = new_size if new_size < size else size - 1
+        return 1
+
+
+def make_corpus(count, rng):
+    corpus = []
+    for _ in range(count):
+        text = " ".join(rng.choice(WORDS, size=int(rng.integers(1, 12))))
+        width = float(rng.integers(60, 900))
+        height = float(rng.integers(12, 160))
+        corpus.append((text, [[0, 0], [width, 0], [width, height], [0, height]]))
+    return corpus
+
+
+def run(calculator, corpus):
+    start = time.perf_counter()
+    sizes = [calculator.calculate_font_size(text, box) for text, box in corpus]
+    return sizes, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="폰트 크기 계산 구현 비교 벤치마크")
+    parser.add_argument("--pairs", type=int, default=2000, help="(텍스트, 박스) 쌍 개수")
+    parser.add_argument("--font", default=DEFAULT_FONT, help="TTF 폰트 경로")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    corpus = make_corpus(args.pairs, np.random.default_rng(args.seed))
+    legacy = LegacyTextSizeCalculator(args.font)
+    fast = TextSizeCalculator(font_path=args.font)
+
+    # 1회차: 폰트/advance 캐시가 비어있는 상태, 2회차: 워커가 오래 떠 있는 상태
+    legacy_sizes, legacy_cold = run(legacy, corpus)
+    fast_sizes, fast_cold = run(fast, corpus)
+    _, legacy_warm = run(legacy, corpus)
+    _, fast_warm = run(fast, corpus)
+
+    legacy_sizes, fast_sizes = np.array(legacy_sizes), np.array(fast_sizes)
+    overflow = 0
+    for (text, box), size in zip(corpus, fast_sizes):
+        bbox = fast.font_cache.get(int(size)).getbbox(text)
+        if bbox[2] - bbox[0] > box[1][0] and size > 1:
+            overflow += 1
+
+    n = len(corpus)
+    print(f"pairs={n}, font={os.path.basename(args.font)}")
+    print(f"legacy  cold {legacy_cold * 1e6 / n:8.1f} us/pair, warm {legacy_warm * 1e6 / n:8.1f} us/pair")
+    print(f"search  cold {fast_cold * 1e6 / n:8.1f} us/pair, warm {fast_warm * 1e6 / n:8.1f} us/pair "
+          f"(warm x{legacy_warm / fast_warm:.1f})")
+    print(f"동일 크기 {np.mean(fast_sizes == legacy_sizes) * 100:.1f}%, "
+          f"더 큰 크기 {np.mean(fast_sizes > legacy_sizes) * 100:.1f}%, "
+          f"더 작은 크기 {np.mean(fast_sizes < legacy_sizes) * 100:.1f}%, "
+          f"평균 크기 {legacy_sizes.mean():.1f} -> {fast_sizes.mean():.1f}")
+    print(f"박스 폭 초과: {overflow}")
+    print(f"font cache: {fast.font_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import unittest
+import io
+import os
+import sys
+
+import numpy as np
+from PIL import Image
+
+# ocr_worker 경로 추가 (operate_worker의 core 패키지를 가리지 않도록 뒤에 추가)
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+OCR_WORKER_DIR = os.path.join(os.path.dirname(TESTS_DIR), "workers", "ocr_worker")
+sys.path.append(OCR_WORKER_DIR)
+
+from image_decode import decode_image, reduction_factor, scale_ocr_result
+
+
+def encode(image, fmt, **kwargs):
+    buffer = io.BytesIO()
+    image.save(buffer, fmt, **kwargs)
+    return buffer.getvalue()
+
+
+class TestDecodeImage(unittest.TestCase):
+
+    def setUp(self):
+        # 왼쪽 절반 빨강, 오른쪽 절반 파랑 (RGB)
+        rgb = np.zeros((60, 80, 3), dtype=np.uint8)
+        rgb[:, :40] = (255, 0, 0)
+        rgb[:, 40:] = (0, 0, 255)
+        self.image = Image.fromarray(rgb)
+
+    def assert_bgr_halves(self, img_array):
+        self.assertEqual(img_array.shape, (60, 80, 3))
+        np.testing.assert_allclose(img_array[30, 10], (0, 0, 255), atol=8)
+        np.testing.assert_allclose(img_array[30, 70], (255, 0, 0), atol=8)
+
+    def test_common_formats_decode_to_bgr(self):
+        for fmt, kwargs in [("PNG", {}), ("JPEG", {"quality": 95}), ("WEBP", {"lossless": True}), ("BMP", {})]:
+            with self.subTest(fmt=fmt):
+                img_array, scale = decode_image(encode(self.image, fmt, **kwargs))
+                self.assert_bgr_halves(img_array)
+                self.assertEqual(scale, (1.0, 1.0))
+
+    def test_gif_falls_back_to_pil(self):
+        img_array, _ = decode_image(encode(self.image, "GIF"))
+        self.assert_bgr_halves(img_array)
+
+    def test_rgba_png_drops_alpha(self):
+        img_array, _ = decode_image(encode(self.image.convert("RGBA"), "PNG"))
+        self.assert_bgr_halves(img_array)
+
+    def test_corrupt_bytes_raise_value_error(self):
+        with self.assertRaises(ValueError):
+            decode_image(b"not an image")
+        with self.assertRaises(ValueError):
+            decode_image(b"")
+
+    def test_large_jpeg_is_reduced_but_not_below_max_side(self):
+        big = Image.fromarray(np.full((1000, 3300, 3), 128, dtype=np.uint8))
+        img_array, scale = decode_image(encode(big, "JPEG"), max_side=800)
+        self.assertEqual(img_array.shape[:2], (250, 825))
+        self.assertAlmostEqual(scale[0], 4.0)
+        self.assertAlmostEqual(scale[1], 4.0)
+
+    def test_exif_rotation_is_applied_with_matching_scale(self):
+        big = Image.fromarray(np.full((400, 1700, 3), 128, dtype=np.uint8))
+        exif = Image.Exif()
+        exif[0x0112] = 6  # 90도 회전
+        img_array, scale = decode_image(encode(big, "JPEG", exif=exif.tobytes()), max_side=800)
+        self.assertEqual(img_array.shape[:2], (850, 200))
+        self.assertAlmostEqual(scale[0], 2.0)
+        self.assertAlmostEqual(scale[1], 2.0)
+
+
+class TestScaling(unittest.TestCase):
+
+    def test_reduction_factor(self):
+        self.assertEqual(reduction_factor(790, 1200, 1504), 1)
+        self.assertEqual(reduction_factor(790, 3100, 1504), 2)
+        self.assertEqual(reduction_factor(4000, 13000, 1504), 8)
+
+    def test_scale_ocr_result_maps_boxes_back(self):
+        result = [[[[1, 2], [3, 2], [3, 4], [1, 4]], ("文字", 0.9)]]
+        scaled = scale_ocr_result(result, (2.0, 4.0))
+        self.assertEqual(scaled[0][0], [[2, 8], [6, 8], [6, 16], [2, 16]])
+        self.assertEqual(scaled[0][1], ("文字", 0.9))
+        self.assertIs(scale_ocr_result(result, (1.0, 1.0)), result)
+
+
+if __name__ == "__main__":
+    unittest.main()
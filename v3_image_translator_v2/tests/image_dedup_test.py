@@ -0,0 +1,286 @@
+import unittest
+import asyncio
+import json
+import os
+import sys
+import filecmp
+
+# operate_worker 경로 추가
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+WORKERS_DIR = os.path.join(os.path.dirname(TESTS_DIR), "workers")
+OPERATE_WORKER_DIR = os.path.join(WORKERS_DIR, "operate_worker")
+sys.path.insert(0, OPERATE_WORKER_DIR)
+
+from core.image_dedup import (
+    ImageDedup, HIT, LEADER, WAITING, normalize_image_url, content_hash, dedup_version
+)
+
+
+class InMemoryRedis:
+    """ImageDedup이 사용하는 명령만 구현한 테스트용 Redis (만료는 EX 값만 기록)."""
+
+    def __init__(self):
+        self.values = {}
+        self.lists = {}
+        self.zsets = {}
+        self.expiry = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        if ex is not None:
+            self.expiry[key] = ex
+        return True
+
+    async def delete(self, key):
+        found = self.values.pop(key, None) is not None or self.lists.pop(key, None) is not None
+        return int(found)
+
+    async def exists(self, key):
+        return int(key in self.values or key in self.lists)
+
+    async def expire(self, key, seconds):
+        self.expiry[key] = seconds
+        return True
+
+    async def rpush(self, key, value):
+        self.lists.setdefault(key, []).append(value)
+        return len(self.lists[key])
+
+    async def lpop(self, key, count=None):
+        items = self.lists.get(key, [])
+        if not items:
+            return None
+        if count is None:
+            return items.pop(0)
+        popped, self.lists[key] = items[:count], items[count:]
+        return popped
+
+    async def lrem(self, key, count, value):
+        items = self.lists.get(key, [])
+        if value in items:
+            items.remove(value)
+            return 1
+        return 0
+
+    async def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    async def zrangebyscore(self, key, minimum, maximum):
+        return [member.encode("utf-8") for member, score in sorted(self.zsets.get(key, {}).items(), key=lambda item: item[1])
+                if score <= maximum]
+
+    async def zrem(self, key, member):
+        self.zsets.get(key, {}).pop(member, None)
+
+    def pipeline(self, transaction=True):
+        return _Pipeline(self)
+
+    def queue(self, key):
+        return [json.loads(item) for item in self.lists.get(key, [])]
+
+
+class _Pipeline:
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def rpush(self, key, value):
+        self.commands.append((key, value))
+
+    async def execute(self):
+        for key, value in self.commands:
+            await self.redis.rpush(key, value)
+
+
+def task(request_id, url="https://img.example.com/a.jpg"):
+    return {"request_id": request_id, "image_id": f"{request_id}-img", "image_url": url, "is_long": False}
+
+
+class TestImageDedup(unittest.TestCase):
+
+    def setUp(self):
+        self.redis = InMemoryRedis()
+        self.dedup = ImageDedup(redis_getter=lambda: self.redis)
+        self.version = "v1"
+        self.digest = content_hash(b"image")
+
+    def run_async(self, coro):
+        return asyncio.run(coro)
+
+    async def _complete_leader(self, request_id, final_url):
+        self.dedup.register_pending(request_id, f"{request_id}-img", {
+            "version": self.version, "hash": self.digest, "variant": "short", "url": task(request_id)["image_url"]
+        })
+        await self.dedup.complete_pending(request_id, f"{request_id}-img", final_url, "success")
+
+    def complete_leader(self, request_id, final_url):
+        self.run_async(self._complete_leader(request_id, final_url))
+
+    def test_first_request_leads_and_others_wait(self):
+        self.assertEqual(self.run_async(self.dedup.acquire(self.version, self.digest, "short", task("r1"))), (LEADER, None))
+        self.assertEqual(self.run_async(self.dedup.acquire(self.version, self.digest, "short", task("r2"))), (WAITING, None))
+        # 변형이 다르면 별도 작업
+        self.assertEqual(self.run_async(self.dedup.acquire(self.version, self.digest, "long", task("r3"))), (LEADER, None))
+        self.assertEqual(self.dedup.stats()["leaders"], 2)
+        self.assertEqual(self.dedup.stats()["waiters"], 1)
+
+    def test_completion_fans_out_to_waiters_and_serves_later_hits(self):
+        self.run_async(self.dedup.acquire(self.version, self.digest, "short", task("r1")))
+        self.run_async(self.dedup.acquire(self.version, self.digest, "short", task("r2")))
+        self.run_async(self.dedup.acquire(self.version, self.digest, "short", task("r3")))
+
+        self.complete_leader("r1", "https://r2.example.com/out.jpg")
+
+        self.assertEqual(self.redis.queue("success"), [
+            {"request_id": "r2", "image_id": "r2-img", "image_url": "https://r2.example.com/out.jpg"},
+            {"request_id": "r3", "image_id": "r3-img", "image_url": "https://r2.example.com/out.jpg"}
+        ])
+        self.assertEqual(
+            self.run_async(self.dedup.acquire(self.version, self.digest, "short", task("r4"))),
+            (HIT, "https://r2.example.com/out.jpg")
+        )
+        # 다른 버전에서는 재사용하지 않음
+        self.assertEqual(self.run_async(self.dedup.acquire("v2", self.digest, "short", task("r5"))), (LEADER, None))
+
+    def test_waiter_registering_after_completion_takes_result_itself(self):
+        self.run_async(self.dedup.acquire(self.version, self.digest, "short", task("r1")))
+        original_get = self.redis.get
+        calls = []
+
+        async def get_then_complete(key):
+            # 대기 요청의 첫 결과 조회 직후 leader가 완료되는 경쟁 상황 재현
+            value = await original_get(key)
+            calls.append(key)
+            if len(calls) == 1:
+                self.redis.get = original_get
+                await self._complete_leader("r1", "https://r2.example.com/out.jpg")
+            return value
+
+        self.redis.get = get_then_complete
+        self.redis.set = self._set_without_lock(self.redis.set)
+        status, url = self.run_async(self.dedup.acquire(self.version, self.digest, "short", task("r2")))
+        self.assertEqual((status, url), (HIT, "https://r2.example.com/out.jpg"))
+        # 대기 목록에서 빠졌으므로 중복 성공 메시지가 없음
+        self.assertEqual(self.redis.queue("success"), [])
+
+    def test_waiter_registered_before_completion_is_served_once_by_leader(self):
+        self.run_async(self.dedup.acquire(self.version, self.digest, "short", task("r1")))
+        original_rpush = self.redis.rpush
+
+        async def rpush_then_complete(key, value):
+            # 대기 등록 직후, 결과 재확인 전에 leader가 완료되는 경쟁 상황 재현
+            length = await original_rpush(key, value)
+            self.redis.rpush = original_rpush
+            await self._complete_leader("r1", "https://r2.example.com/out.jpg")
+            return length
+
+        self.redis.rpush = rpush_then_complete
+        self.assertEqual(self.run_async(self.dedup.acquire(self.version, self.digest, "short", task("r2"))), (WAITING, None))
+        self.assertEqual([m["request_id"] for m in self.redis.queue("success")], ["r2"])
+
+    def _set_without_lock(self, original_set):
+        async def set_(key, value, nx=False, ex=None):
+            if nx:
+                # leader 잠금이 아직 있는 것처럼 잠금 획득 실패
+                return None
+            return await original_set(key, value, nx=nx, ex=ex)
+        return set_
+
+    def test_failed_leader_waiter_is_redriven_by_sweep(self):
+        self.run_async(self.dedup.acquire(self.version, self.digest, "short", task("r1")))
+        self.run_async(self.dedup.acquire(self.version, self.digest, "short", task("r2")))
+        self.dedup.register_pending("r1", "r1-img", {"version": self.version, "hash": self.digest, "variant": "short"})
+
+        # 잠금이 있는 동안에는 다시 보내지 않음
+        self.assertEqual(self.run_async(self.dedup.sweep(self.version, "tasks", "success", min_age=0)), 0)
+
+        self.run_async(self.dedup.fail_pending("r1", "r1-img"))
+        self.assertEqual(self.run_async(self.dedup.sweep(self.version, "tasks", "success", min_age=0)), 1)
+        self.assertEqual(self.redis.queue("tasks"), [task("r2")])
+
+        # 다시 보낸 요청이 새 leader가 됨
+        self.assertEqual(self.run_async(self.dedup.acquire(self.version, self.digest, "short", task("r2"))), (LEADER, None))
+
+    def test_sweep_requeues_through_task_queue(self):
+        self.run_async(self.dedup.acquire(self.version, self.digest, "short", task("r1")))
+        self.run_async(self.dedup.acquire(self.version, self.digest, "short", task("r2")))
+        self.run_async(self.dedup.release(self.version, self.digest, "short"))
+        requeued = []
+
+        async def requeue(payload):
+            requeued.append(json.loads(payload))
+
+        self.assertEqual(self.run_async(self.dedup.sweep(self.version, "tasks", "success", min_age=0, requeue=requeue)), 1)
+        self.assertEqual(requeued, [task("r2")])
+        self.assertEqual(self.redis.queue("tasks"), [])
+
+    def test_sweep_delivers_result_left_for_waiters(self):
+        self.run_async(self.dedup.acquire(self.version, self.digest, "short", task("r1")))
+        self.run_async(self.dedup.acquire(self.version, self.digest, "short", task("r2")))
+        # 결과는 기록되었지만 대기 목록을 비우기 전에 잠금만 사라진 경우
+        self.redis.values[f"dedup:{self.version}:hash:{self.digest}:short"] = b"https://r2.example.com/out.jpg"
+        self.redis.values.pop(f"dedup:{self.version}:lock:{self.digest}:short")
+
+        self.assertEqual(self.run_async(self.dedup.sweep(self.version, "tasks", "success", min_age=0)), 0)
+        self.assertEqual([m["request_id"] for m in self.redis.queue("success")], ["r2"])
+        self.assertEqual(self.redis.queue("tasks"), [])
+
+    def test_url_fast_path_uses_normalized_url(self):
+        self.run_async(self.dedup.acquire(self.version, self.digest, "short", task("r1", "//IMG.example.com/a.jpg#x")))
+        self.dedup.register_pending("r1", "r1-img", {
+            "version": self.version, "hash": self.digest, "variant": "short", "url": "//IMG.example.com/a.jpg#x"
+        })
+        self.run_async(self.dedup.complete_pending("r1", "r1-img", "https://r2.example.com/out.jpg", "success"))
+
+        self.assertEqual(
+            self.run_async(self.dedup.lookup_url(self.version, "https://img.example.com/a.jpg", "short")),
+            "https://r2.example.com/out.jpg"
+        )
+        self.assertIsNone(self.run_async(self.dedup.lookup_url(self.version, "https://img.example.com/a.jpg", "long")))
+        self.assertIsNone(self.run_async(self.dedup.lookup_url(self.version, "https://img.example.com/a.jpg?v=2", "short")))
+
+    def test_non_leader_completion_is_ignored(self):
+        self.run_async(self.dedup.complete_pending("r9", "r9-img", "https://r2.example.com/out.jpg", "success"))
+        self.run_async(self.dedup.fail_pending("r9", "r9-img"))
+        self.assertEqual(self.redis.values, {})
+
+    def test_version_is_published_and_read(self):
+        self.assertIsNone(self.run_async(self.dedup.current_version()))
+        publisher = ImageDedup(redis_getter=lambda: self.redis)
+        self.run_async(publisher.publish_version("abc"))
+        reader = ImageDedup(redis_getter=lambda: self.redis)
+        self.assertEqual(self.run_async(reader.current_version()), "abc")
+
+
+class TestDedupHelpers(unittest.TestCase):
+
+    def test_normalize_image_url(self):
+        self.assertEqual(normalize_image_url("//IMG.Example.com/a/B.jpg#frag"), "https://img.example.com/a/B.jpg")
+        self.assertEqual(normalize_image_url("HTTPS://img.example.com/a.jpg?x=1"), "https://img.example.com/a.jpg?x=1")
+
+    def test_dedup_version_changes_with_any_part(self):
+        self.assertEqual(dedup_version("model", "font"), dedup_version("model", "font"))
+        self.assertNotEqual(dedup_version("model", "font"), dedup_version("model", "font2"))
+
+    def test_ocr_worker_copy_is_identical(self):
+        self.assertTrue(filecmp.cmp(
+            os.path.join(OPERATE_WORKER_DIR, "core", "image_dedup.py"),
+            os.path.join(WORKERS_DIR, "ocr_worker", "image_dedup.py"),
+            shallow=False
+        ))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import os
+import sys
+import time
+import tempfile
+import shutil
+import filecmp
+
+# operate_worker 경로 추가
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+WORKERS_DIR = os.path.join(os.path.dirname(TESTS_DIR), "workers")
+OPERATE_WORKER_DIR = os.path.join(WORKERS_DIR, "operate_worker")
+sys.path.insert(0, OPERATE_WORKER_DIR)
+
+from core.image_handoff import ImageHandoffStore
+
+
+class TestImageHandoffStore(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.store = ImageHandoffStore(os.path.join(self.root, "handoff"), ttl_seconds=60, max_bytes=1000)
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_put_then_get_round_trips_bytes(self):
+        handle = self.store.put(b"image-bytes")
+        self.assertEqual(self.store.get(handle), b"image-bytes")
+        self.assertEqual(len(os.listdir(self.store.root)), 1)
+        self.assertEqual(self.store.stats()["hits"], 1)
+
+    def test_identical_content_shares_one_file(self):
+        first = self.store.put(b"same")
+        second = self.store.put(b"same")
+        self.assertEqual(first["key"], second["key"])
+        self.assertEqual(self.store.stats()["reused"], 1)
+        self.assertEqual(len(os.listdir(self.store.root)), 1)
+
+    def test_missing_expired_or_forged_handles_return_none(self):
+        handle = self.store.put(b"data")
+        self.assertIsNone(self.store.get(None))
+        self.assertIsNone(self.store.get({"key": handle["key"]}))
+        self.assertIsNone(self.store.get(dict(handle, expires_at=time.time() - 1)))
+        self.assertIsNone(self.store.get(dict(handle, key="../../etc/passwd")))
+        self.assertIsNone(self.store.get(dict(handle, size=handle["size"] + 1)))
+        os.unlink(os.path.join(self.store.root, handle["key"] + ".img"))
+        self.assertIsNone(self.store.get(handle))
+
+    def test_put_is_skipped_when_store_is_full(self):
+        self.assertIsNotNone(self.store.put(b"a" * 600))
+        self.assertIsNone(self.store.put(b"b" * 600))
+        self.assertEqual(self.store.stats()["skipped"], 1)
+
+    def test_sweep_removes_expired_and_orphaned_temp_files(self):
+        fresh = self.store.put(b"fresh")
+        stale = self.store.put(b"stale")
+        orphan = os.path.join(self.store.root, ".deadbeef.1.2.tmp")
+        with open(orphan, "wb") as f:
+            f.write(b"partial")
+        old = time.time() - 120
+        os.utime(os.path.join(self.store.root, stale["key"] + ".img"), (old, old))
+        os.utime(orphan, (old, old))
+
+        self.assertEqual(self.store.sweep(), 2)
+        self.assertEqual(self.store.get(fresh), b"fresh")
+        self.assertIsNone(self.store.get(stale))
+        self.assertFalse(os.path.exists(orphan))
+
+    def test_sweep_evicts_oldest_files_over_limit(self):
+        store = ImageHandoffStore(self.store.root, ttl_seconds=60, max_bytes=10 ** 6)
+        handles = [store.put(bytes([i]) * 400) for i in range(3)]
+        for age, handle in zip((30, 20, 10), handles):
+            mtime = time.time() - age
+            os.utime(os.path.join(store.root, handle["key"] + ".img"), (mtime, mtime))
+        store.max_bytes = 1000
+        self.assertEqual(store.sweep(), 1)
+        self.assertIsNone(store.get(handles[0]))
+        self.assertIsNotNone(store.get(handles[2]))
+        self.assertEqual(store.stats()["bytes"], 800)
+
+    def test_ocr_worker_copy_is_identical(self):
+        self.assertTrue(filecmp.cmp(
+            os.path.join(OPERATE_WORKER_DIR, "core", "image_handoff.py"),
+            os.path.join(WORKERS_DIR, "ocr_worker", "image_handoff.py"),
+            shallow=False
+        ))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import unittest
+import asyncio
+import os
+import sys
+import threading
+
+import numpy as np
+
+# operate_worker 경로 추가
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+OPERATE_WORKER_DIR = os.path.join(os.path.dirname(TESTS_DIR), "workers", "operate_worker")
+sys.path.insert(0, OPERATE_WORKER_DIR)
+
+from logic.inference_engine import InferenceEngine
+
+
+class FakeStages:
+    """stage/run 단계 대체: 이미지마다 (배치 태그, 이미지 값)을 담은 배열을 돌려줍니다."""
+
+    def __init__(self, fail_stage_on=None, fail_run_on=None):
+        self.fail_stage_on = fail_stage_on
+        self.fail_run_on = fail_run_on
+        self.slots = []
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def stage(self, images_np, masks_np, slot):
+        if not images_np:
+            return None
+        if int(images_np[0][0, 0]) == self.fail_stage_on:
+            raise RuntimeError(f"stage failed for {self.fail_stage_on}")
+        with self._lock:
+            self.slots.append(slot)
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        return [(image + mask).copy() for image, mask in zip(images_np, masks_np)]
+
+    def run(self, staged, use_fp16):
+        try:
+            if int(staged[0][0, 0]) == self.fail_run_on:
+                raise RuntimeError(f"run failed for {self.fail_run_on}")
+            return [item * 2 for item in staged]
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+
+def batch(tag, count):
+    """태그 값으로 시작하고 이미지마다 값이 다른 배치"""
+    images = [np.full((2, 2), tag, dtype=np.int32) for _ in range(count)]
+    for index, image in enumerate(images):
+        image[1, 1] = index
+    masks = [np.zeros((2, 2), dtype=np.int32) for _ in range(count)]
+    return images, masks
+
+
+class TestInferenceEngine(unittest.IsolatedAsyncioTestCase):
+
+    def make_engine(self, stages, pipeline_depth=2):
+        engine = InferenceEngine(use_fp16=False, pipeline_depth=pipeline_depth, stage_fn=stages.stage, run_fn=stages.run)
+        self.addCleanup(engine.shutdown)
+        return engine
+
+    async def test_results_keep_input_order_per_batch(self):
+        stages = FakeStages()
+        engine = self.make_engine(stages)
+
+        submitted = [batch(tag, count) for tag, count in ((10, 3), (20, 1), (30, 4))]
+        outputs = await asyncio.gather(*(engine.infer(images, masks) for images, masks in submitted))
+
+        for (images, _), (results, timings) in zip(submitted, outputs):
+            self.assertEqual(len(results), len(images))
+            for image, result in zip(images, results):
+                np.testing.assert_array_equal(result, image * 2)
+            self.assertGreaterEqual(timings["total"], timings["compute"])
+
+        stats = engine.stats()
+        self.assertEqual((stats["batches"], stats["images"]), (3, 8))
+        # 워크스페이스 슬롯 수 이상으로 배치가 동시에 떠 있지 않음
+        self.assertLessEqual(stages.max_in_flight, 2)
+        self.assertTrue(set(stages.slots) <= {0, 1})
+
+    async def test_errors_reach_only_the_failing_callers(self):
+        stages = FakeStages(fail_stage_on=20, fail_run_on=30)
+        engine = self.make_engine(stages, pipeline_depth=1)
+
+        outcomes = await asyncio.gather(
+            engine.infer(*batch(10, 2)), engine.infer(*batch(20, 2)), engine.infer(*batch(30, 2)),
+            engine.infer(*batch(40, 1)), return_exceptions=True
+        )
+
+        self.assertEqual(len(outcomes[0][0]), 2)
+        self.assertIsInstance(outcomes[1], RuntimeError)
+        self.assertIn("stage failed for 20", str(outcomes[1]))
+        self.assertIsInstance(outcomes[2], RuntimeError)
+        self.assertIn("run failed for 30", str(outcomes[2]))
+        # 실패한 배치도 슬롯을 반납하므로 이후 배치가 처리됨
+        np.testing.assert_array_equal(outcomes[3][0][0], batch(40, 1)[0][0] * 2)
+        self.assertEqual(engine.stats()["batches"], 2)
+
+    async def test_empty_batch_resolves_without_compute(self):
+        stages = FakeStages()
+        engine = self.make_engine(stages)
+        results, timings = await engine.infer([], [])
+        self.assertEqual(results, [])
+        self.assertEqual(timings["compute"], 0.0)
+        self.assertEqual(engine.stats()["batches"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import unittest
+import asyncio
+import os
+import sys
+import threading
+
+import numpy as np
+
+# ocr_worker 경로 추가 (operate_worker의 core 패키지를 가리지 않도록 뒤에 추가)
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+OCR_WORKER_DIR = os.path.join(os.path.dirname(TESTS_DIR), "workers", "ocr_worker")
+sys.path.append(OCR_WORKER_DIR)
+
+from ocr_engine import OCREngine, group_by_shape
+
+
+class RecordingRunner:
+    """이미지 평균값을 텍스트로 돌려주는 가짜 OCR runner (배치 크기 기록)"""
+
+    def __init__(self, fail_value=None):
+        self.batch_sizes = []
+        self.fail_value = fail_value
+        self.release = threading.Event()
+        self.release.set()
+
+    def run(self, images):
+        self.release.wait()
+        self.batch_sizes.append(len(images))
+        results = []
+        for image in images:
+            value = int(image.mean())
+            if value == self.fail_value:
+                raise ValueError("bad image")
+            results.append([[[[0, 0], [1, 0], [1, 1], [0, 1]], (str(value), 0.9)]])
+        return results
+
+
+class TestGroupByShape(unittest.TestCase):
+
+    def test_similar_shapes_share_a_group(self):
+        shapes = [(960, 736), (960, 736), (960, 704), (1504, 1120)]
+        groups = group_by_shape(shapes, max_batch=8, max_padding=0.3)
+        self.assertEqual(sorted(sorted(g) for g in groups), [[0, 1, 2], [3]])
+
+    def test_group_size_is_capped(self):
+        groups = group_by_shape([(640, 640)] * 5, max_batch=2, max_padding=0.3)
+        self.assertEqual([len(g) for g in groups], [2, 2, 1])
+
+    def test_every_index_appears_once(self):
+        rng = np.random.default_rng(0)
+        shapes = [tuple(int(v) for v in rng.integers(1, 48, size=2) * 32) for _ in range(50)]
+        groups = group_by_shape(shapes, max_batch=8, max_padding=0.3)
+        self.assertEqual(sorted(i for g in groups for i in g), list(range(50)))
+        for group in groups:
+            padded = len(group) * max(shapes[i][0] for i in group) * max(shapes[i][1] for i in group)
+            content = sum(shapes[i][0] * shapes[i][1] for i in group)
+            self.assertTrue(len(group) == 1 or padded <= content * 1.3)
+
+
+class TestOCREngine(unittest.TestCase):
+
+    def setUp(self):
+        self.runner = RecordingRunner()
+        self.engine = OCREngine(self.runner, max_batch_images=4, batch_wait=0.05, queue_size=16)
+        self.engine.start()
+
+    def tearDown(self):
+        self.runner.release.set()
+        self.engine.close(timeout=5)
+
+    def image(self, value):
+        return np.full((8, 8, 3), value, dtype=np.uint8)
+
+    def test_concurrent_images_are_batched_and_results_routed(self):
+        async def scenario():
+            return await asyncio.gather(*(self.engine.recognize(self.image(v)) for v in range(10)))
+
+        results = asyncio.run(scenario())
+        self.assertEqual([r[0][1][0] for r in results], [str(v) for v in range(10)])
+        self.assertEqual(sum(self.runner.batch_sizes), 10)
+        self.assertLessEqual(max(self.runner.batch_sizes), 4)
+        self.assertGreater(max(self.runner.batch_sizes), 1)
+        self.assertEqual(self.engine.stats()["images"], 10)
+
+    def test_failing_image_only_fails_its_own_future(self):
+        self.runner.fail_value = 3
+        self.runner.release.clear()
+        futures = [self.engine.submit(self.image(v)) for v in range(4)]
+        self.runner.release.set()
+        self.assertEqual(futures[0].result(timeout=5)[0][1][0], "0")
+        with self.assertRaises(ValueError):
+            futures[3].result(timeout=5)
+        self.assertEqual(futures[2].result(timeout=5)[0][1][0], "2")
+        self.assertEqual(self.engine.stats()["failed"], 1)
+
+    def test_close_drains_queued_images(self):
+        futures = [self.engine.submit(self.image(v)) for v in range(6)]
+        self.engine.close(timeout=5)
+        self.assertTrue(all(f.done() for f in futures))
+
+    def test_short_batch_result_is_retried_per_image(self):
+        # 배치 결과가 하나 모자라면 짝을 지을 수 없으므로 이미지별로 다시 실행
+        run = self.runner.run
+        self.runner.run = lambda images: run(images)[:-1] if len(images) > 1 else run(images)
+        self.runner.release.clear()
+        futures = [self.engine.submit(self.image(v)) for v in range(3)]
+        self.runner.release.set()
+        self.assertEqual([f.result(timeout=5)[0][1][0] for f in futures], ["0", "1", "2"])
+
+    def test_missing_results_fail_instead_of_hanging(self):
+        self.runner.run = lambda images: []
+        futures = [self.engine.submit(self.image(v)) for v in range(2)]
+        for future in futures:
+            with self.assertRaises(ValueError):
+                future.result(timeout=5)
+        self.assertEqual(self.engine.stats()["failed"], 2)
+
+    def test_submit_after_close_is_rejected(self):
+        self.engine.close(timeout=5)
+        with self.assertRaises(RuntimeError):
+            self.engine.submit(self.image(1))
+        with self.assertRaises(RuntimeError):
+            asyncio.run(self.engine.recognize(self.image(1)))
+
+
+if __name__ == "__main__":
+    unittest.main()
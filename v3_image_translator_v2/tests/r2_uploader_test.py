@@ -0,0 +1,127 @@
+import unittest
+import asyncio
+import os
+import sys
+
+from botocore.exceptions import ClientError
+
+# operate_worker 경로 추가
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+OPERATE_WORKER_DIR = os.path.join(os.path.dirname(TESTS_DIR), "workers", "operate_worker")
+sys.path.insert(0, OPERATE_WORKER_DIR)
+
+try:
+    from moto.server import ThreadedMotoServer
+except ImportError:  # moto[server]가 없으면 테스트 건너뜀
+    ThreadedMotoServer = None
+
+from hosting.r2hosting import R2ImageHosting
+from hosting.r2uploader import R2Uploader
+
+MOTO_PORT = 5123
+BUCKET = "test-bucket"
+
+
+class FlakyClient:
+    """처음 failures번의 put_object를 지정한 오류로 실패시키는 S3 클라이언트 래퍼"""
+
+    def __init__(self, client, failures, code="ServiceUnavailable", status=503):
+        self._client = client
+        self.failures = failures
+        self.code = code
+        self.status = status
+        self.calls = 0
+
+    def put_object(self, **kwargs):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ClientError(
+                {"Error": {"Code": self.code, "Message": "injected"}, "ResponseMetadata": {"HTTPStatusCode": self.status}},
+                "PutObject"
+            )
+        return self._client.put_object(**kwargs)
+
+
+@unittest.skipIf(ThreadedMotoServer is None, "moto[server] not installed")
+class TestR2Uploader(unittest.IsolatedAsyncioTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadedMotoServer(port=MOTO_PORT, verbose=False)
+        cls.server.start()
+        os.environ.update({
+            "R2_ENDPOINT": f"http://127.0.0.1:{MOTO_PORT}",
+            "CLOUDFLARE_ACCESS_KEY_ID": "test",
+            "CLOUDFLARE_SECRET_KEY": "test",
+            "R2_BUCKET_NAME": BUCKET,
+            "R2_DOMAIN": "https://img.example.com/",
+        })
+        cls.hosting = R2ImageHosting()
+        cls.hosting.s3_client.create_bucket(Bucket=BUCKET, CreateBucketConfiguration={"LocationConstraint": "auto"})
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.uploader = R2Uploader(self.hosting, max_concurrency=4, max_retries=2, retry_base_delay=0.01)
+
+    def tearDown(self):
+        self.uploader.shutdown()
+
+    async def test_upload_bytes_stores_object_and_returns_public_url(self):
+        result = await self.uploader.upload_bytes(
+            b"jpeg-bytes", image_id="abc-12345", sub_path="translated_image/2025-01-01/p1",
+            content_type="image/jpeg", metadata={"source": "rendering"}
+        )
+        self.assertTrue(result["success"])
+        self.assertEqual(result["url"], "https://img.example.com/translated_image/2025-01-01/p1/abc-12345.jpg")
+
+        obj = self.hosting.s3_client.get_object(Bucket=BUCKET, Key=result["s3_key"])
+        self.assertEqual(obj["Body"].read(), b"jpeg-bytes")
+        self.assertEqual(obj["ContentType"], "image/jpeg")
+        self.assertEqual(obj["CacheControl"], "public, max-age=31536000, immutable")
+        self.assertEqual(obj["Metadata"], {"source": "rendering"})
+
+    async def test_concurrent_uploads_report_latency_percentiles(self):
+        results = await asyncio.gather(*[
+            self.uploader.upload_bytes(b"x" * 1024, image_id=f"img-{i}", sub_path="bulk")
+            for i in range(20)
+        ])
+        self.assertTrue(all(r["success"] for r in results))
+
+        stats = self.uploader.stats()
+        self.assertEqual(stats["succeeded"], 20)
+        self.assertEqual(stats["in_flight"], 0)
+        self.assertEqual(stats["bytes_uploaded"], 20 * 1024)
+        self.assertLessEqual(stats["latency_p50"], stats["latency_p99"])
+
+    async def test_transient_errors_are_retried(self):
+        flaky = FlakyClient(self.hosting.s3_client, failures=2)
+        self.uploader.s3_client = flaky
+
+        result = await self.uploader.upload_bytes(b"data", image_id="retry", sub_path="retry")
+        self.assertTrue(result["success"])
+        self.assertEqual(flaky.calls, 3)
+        self.assertEqual(self.uploader.stats()["retries"], 2)
+
+    async def test_gives_up_after_max_retries(self):
+        flaky = FlakyClient(self.hosting.s3_client, failures=10)
+        self.uploader.s3_client = flaky
+
+        result = await self.uploader.upload_bytes(b"data", image_id="fail", sub_path="retry")
+        self.assertFalse(result["success"])
+        self.assertEqual(flaky.calls, 3)
+        self.assertEqual(self.uploader.stats()["failed"], 1)
+
+    async def test_permanent_errors_are_not_retried(self):
+        flaky = FlakyClient(self.hosting.s3_client, failures=10, code="AccessDenied", status=403)
+        self.uploader.s3_client = flaky
+
+        result = await self.uploader.upload_bytes(b"data", image_id="denied", sub_path="retry")
+        self.assertFalse(result["success"])
+        self.assertEqual(flaky.calls, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
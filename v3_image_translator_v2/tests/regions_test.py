@@ -0,0 +1,112 @@
+import unittest
+import os
+import sys
+
+import numpy as np
+import cv2
+
+# operate_worker 경로 추가
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+OPERATE_WORKER_DIR = os.path.join(os.path.dirname(TESTS_DIR), "workers", "operate_worker")
+sys.path.insert(0, OPERATE_WORKER_DIR)
+
+from logic.regions import plan_regions, choose_regions, build_region_tasks, restore_region, feather_alpha
+
+
+def make_mask(height, width, boxes):
+    mask = np.zeros((height, width), dtype=np.uint8)
+    for top, left, bottom, right in boxes:
+        mask[top:bottom, left:right] = 255
+    return mask
+
+
+class TestRegionPlanning(unittest.TestCase):
+
+    def test_regions_cover_mask_with_margin_and_alignment(self):
+        mask = make_mask(3000, 790, [(100, 50, 140, 400), (2500, 300, 2560, 700)])
+        regions = plan_regions(mask, margin=48, align=128)
+        self.assertEqual(len(regions), 2)
+        for top, left, bottom, right in regions:
+            self.assertTrue(0 <= top < bottom <= 3000 and 0 <= left < right <= 790)
+            self.assertEqual((bottom - top) % 128, 0)
+            self.assertEqual((right - left) % 128, 0)
+        # 마스크의 모든 픽셀이 (이미지 경계가 아닌 쪽으로) 여백만큼 안쪽에 있어야 함
+        dilated = cv2.dilate(mask, np.ones((2 * 48 + 1, 2 * 48 + 1), np.uint8))
+        covered = np.zeros_like(mask)
+        for top, left, bottom, right in regions:
+            covered[top:bottom, left:right] = 255
+        self.assertFalse(np.any(dilated & ~covered))
+
+    def test_nearby_boxes_are_merged_into_one_region(self):
+        mask = make_mask(1000, 1000, [(100, 100, 130, 300), (150, 120, 180, 320), (800, 800, 820, 900)])
+        regions = plan_regions(mask, margin=32, align=64)
+        self.assertEqual(len(regions), 2)
+        top, left, bottom, right = min(regions)
+        self.assertLessEqual(top, 100 - 32)
+        self.assertGreaterEqual(bottom, 180 + 32)
+
+    def test_small_mask_on_tall_image_uses_regions(self):
+        mask = make_mask(4000, 790, [(200, 100, 240, 500), (3500, 100, 3540, 500)])
+        self.assertIsNotNone(choose_regions(mask, is_long=True))
+
+    def test_mask_covering_most_of_image_falls_back_to_full_frame(self):
+        mask = make_mask(1000, 1000, [(50, 50, 950, 950)])
+        self.assertIsNone(choose_regions(mask, is_long=False))
+        self.assertIsNone(choose_regions(np.zeros((500, 500), dtype=np.uint8), is_long=False))
+
+
+class TestRegionAssembly(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.image = rng.integers(0, 256, size=(2000, 800, 3), dtype=np.uint8)
+        self.mask = make_mask(2000, 800, [(300, 100, 340, 600), (1500, 200, 1560, 500)])
+        self.regions = plan_regions(self.mask)
+
+    def inpaint_with_constant(self, region_tasks, value):
+        """LaMa 대신 마스크 영역을 상수 색으로 채우는 가짜 인페인팅 (RGB 입출력)"""
+        results = []
+        for task in region_tasks:
+            result = task["region_image"].copy()
+            result[task["region_mask"] > 0] = value
+            results.append(result)
+        return results
+
+    def test_composed_image_keeps_pixels_outside_mask_and_fills_mask(self):
+        tasks, assembly = build_region_tasks({"request_id": "r1", "image_id": "i1"}, False, self.image, self.mask, self.regions)
+        self.assertEqual(len(tasks), len(self.regions))
+
+        results = self.inpaint_with_constant(tasks, (10, 20, 30))
+        completed = [assembly.add(t["region_index"], restore_region(r, t["region_box"])) for t, r in zip(tasks, results)]
+        self.assertEqual(completed, [False] * (len(tasks) - 1) + [True])
+
+        composed = assembly.compose()
+        self.assertEqual(composed.shape, self.image.shape)
+        # 마스크 안은 인페인팅 결과 (RGB (10,20,30) -> BGR (30,20,10))
+        np.testing.assert_array_equal(composed[self.mask > 0], np.tile([30, 20, 10], (int((self.mask > 0).sum()), 1)))
+        # 블렌딩 폭 밖은 원본 그대로
+        far = cv2.dilate(self.mask, np.ones((41, 41), np.uint8)) == 0
+        np.testing.assert_array_equal(composed[far], self.image[far])
+
+    def test_oversized_region_is_downscaled_and_restored(self):
+        mask = make_mask(3000, 2500, [(100, 100, 2900, 2400)])
+        image = np.zeros((3000, 2500, 3), dtype=np.uint8)
+        regions = plan_regions(mask)
+        tasks, _ = build_region_tasks({"request_id": "r2"}, True, image, mask, regions)
+        self.assertLessEqual(max(tasks[0]["region_image"].shape[:2]), 1024)
+        restored = restore_region(tasks[0]["region_image"], tasks[0]["region_box"])
+        top, left, bottom, right = tasks[0]["region_box"]
+        self.assertEqual(restored.shape[:2], (bottom - top, right - left))
+
+    def test_feather_alpha_is_one_inside_mask_and_zero_far_away(self):
+        mask = make_mask(100, 100, [(40, 40, 60, 60)])
+        alpha = feather_alpha(mask, feather=8)[:, :, 0]
+        self.assertTrue(np.all(alpha[mask > 0] == 1.0))
+        self.assertEqual(alpha[0, 0], 0.0)
+        # 블렌딩은 마스크 바깥 가장자리까지 번지지만 약 3 * feather 픽셀 이후에는 원본 그대로
+        self.assertTrue(0.0 < alpha[50, 64] < 1.0)
+        self.assertEqual(alpha[50, 59 + 3 * 8 + 2], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
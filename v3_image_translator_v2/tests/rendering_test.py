@@ -0,0 +1,231 @@
+import unittest
+import asyncio
+import json
+import os
+import sys
+from unittest import mock
+
+import numpy as np
+import cv2
+from PIL import Image, ImageDraw
+
+# operate_worker 경로 추가
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+OPERATE_WORKER_DIR = os.path.join(os.path.dirname(TESTS_DIR), "workers", "operate_worker")
+sys.path.insert(0, OPERATE_WORKER_DIR)
+
+from rendering_worker.modules.fontcache import FontCache
+from rendering_worker.modules.textdraw import render_text_items
+from rendering_worker import rendering
+from rendering_worker.rendering import RenderingProcessor
+
+FONT_PATH = os.path.join(OPERATE_WORKER_DIR, "rendering_worker", "modules", "fonts", "GmarketSansTTFBold.ttf")
+
+
+def legacy_draw_text_on_image(image, text, box, text_color, font):
+    """기존 RenderingProcessor._draw_text_on_image_sync (항목마다 복사 + 색 변환) - 비교 기준"""
+    result_image = image.copy()
+    box = np.array(box, dtype=np.int32)
+    x_min, y_min = box.min(axis=0)
+    x_max, y_max = box.max(axis=0)
+    width = x_max - x_min
+    height = y_max - y_min
+
+    pil_image = Image.fromarray(cv2.cvtColor(result_image, cv2.COLOR_BGR2RGB))
+    draw = ImageDraw.Draw(pil_image)
+    rgb_text_color = (text_color.get("r", 0), text_color.get("g", 0), text_color.get("b", 0))
+
+    lines = text.split('\n')
+    total_text_width = 0
+    total_text_height = 0
+    line_heights = []
+    for line in lines:
+        text_bbox = draw.textbbox((0, 0), line, font=font)
+        total_text_width = max(total_text_width, text_bbox[2] - text_bbox[0])
+        line_heights.append(text_bbox[3] - text_bbox[1])
+        total_text_height += text_bbox[3] - text_bbox[1]
+
+    text_x = x_min + (width - total_text_width) // 2
+    text_y = y_min + (height - total_text_height) // 2
+    current_y = text_y
+    for i, line in enumerate(lines):
+        draw.text((text_x, current_y), line, fill=rgb_text_color, font=font)
+        current_y += line_heights[i]
+
+    return cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
+
+
+def legacy_render(image, items, font_cache):
+    rendered = image
+    for item in items:
+        text, box, text_color = item.get("translated_text"), item.get("box"), item.get("text_color")
+        if text and box and text_color:
+            font = font_cache.get(max(1, int(item.get("font_size_px", 20))))
+            rendered = legacy_draw_text_on_image(rendered, text, box, text_color, font)
+    return rendered
+
+
+def make_items(rng, width, height, count):
+    items = []
+    texts = ["프리미엄 천연 가죽", "무료배송\n당일출고", "100% 정품 보장", "사이즈 XL", "초경량 휴대용 세트"]
+    for i in range(count):
+        bw, bh = int(rng.integers(60, width // 2)), int(rng.integers(20, 120))
+        x, y = int(rng.integers(0, width - bw)), int(rng.integers(0, height - bh))
+        items.append({
+            "translated_text": texts[i % len(texts)],
+            "box": [[x, y], [x + bw, y], [x + bw, y + bh], [x, y + bh]],
+            "text_color": {"r": int(rng.integers(256)), "g": int(rng.integers(256)), "b": int(rng.integers(256))},
+            "font_size_px": int(rng.integers(8, 60))
+        })
+    return items
+
+
+class TestSinglePassRendering(unittest.TestCase):
+
+    def setUp(self):
+        self.font_cache = FontCache(FONT_PATH)
+        self.rng = np.random.default_rng(0)
+
+    def assert_matches_legacy(self, image, items):
+        expected = legacy_render(image, items, self.font_cache)
+        actual = render_text_items(image, items, self.font_cache.get)
+        self.assertEqual(actual.shape, expected.shape)
+        self.assertEqual(actual.dtype, expected.dtype)
+        np.testing.assert_array_equal(actual, expected)
+
+    def test_short_image_matches_per_item_path(self):
+        image = self.rng.integers(0, 256, size=(1024, 1024, 3), dtype=np.uint8)
+        self.assert_matches_legacy(image, make_items(self.rng, 1024, 1024, 40))
+
+    def test_long_image_matches_per_item_path(self):
+        image = self.rng.integers(0, 256, size=(3000, 864, 3), dtype=np.uint8)
+        self.assert_matches_legacy(image, make_items(self.rng, 864, 3000, 80))
+
+    def test_overlapping_boxes_drawn_in_order(self):
+        image = np.full((200, 300, 3), 255, dtype=np.uint8)
+        box = [[10, 10], [290, 10], [290, 190], [10, 190]]
+        items = [
+            {"translated_text": "가나다", "box": box, "text_color": {"r": 255, "g": 0, "b": 0}, "font_size_px": 60},
+            {"translated_text": "라마바", "box": box, "text_color": {"r": 0, "g": 0, "b": 255}, "font_size_px": 50},
+        ]
+        self.assert_matches_legacy(image, items)
+
+    def test_items_without_text_box_or_color_are_skipped(self):
+        image = np.zeros((100, 100, 3), dtype=np.uint8)
+        box = [[0, 0], [100, 0], [100, 100], [0, 100]]
+        items = [
+            {"translated_text": "", "box": box, "text_color": {"r": 255, "g": 255, "b": 255}},
+            {"translated_text": "텍스트", "box": None, "text_color": {"r": 255, "g": 255, "b": 255}},
+            {"translated_text": "텍스트", "box": box},
+        ]
+        np.testing.assert_array_equal(render_text_items(image, items, self.font_cache.get), image)
+
+    def test_input_image_is_not_modified(self):
+        image = np.zeros((100, 100, 3), dtype=np.uint8)
+        image.flags.writeable = False
+        items = [{"translated_text": "글자", "box": [[0, 0], [100, 0], [100, 100], [0, 100]],
+                  "text_color": {"r": 255, "g": 255, "b": 255}, "font_size_px": 30}]
+        rendered = render_text_items(image, items, self.font_cache.get)
+        self.assertFalse(image.any())
+        self.assertTrue(rendered.any())
+
+
+class FailingUploader:
+
+    async def upload_bytes(self, data, **kwargs):
+        raise ConnectionError("R2 unreachable")
+
+
+class SuccessfulUploader:
+
+    async def upload_bytes(self, data, **kwargs):
+        return {"success": True, "url": "https://r2.example.com/out.jpg"}
+
+
+class TestResultForwarding(unittest.IsolatedAsyncioTestCase):
+    """렌더링 후 업로드/결과 전송 코루틴이 실패하면 에러 큐로 보고되고 중복 제거 잠금 해제와 ack가 정확히 한 번씩 일어나는지 확인"""
+
+    async def asyncSetUp(self):
+        self.pushed = []
+        self.calls = []
+        self.failing_queues = set()
+        self.failing_calls = set()
+
+        async def push_result(queue, payload):
+            if queue in self.failing_queues:
+                raise ConnectionError(f"{queue} unavailable")
+            self.pushed.append((queue, json.loads(payload)))
+
+        def recorder(name):
+            async def record(*args):
+                self.calls.append((name,) + args[:2])
+                if name in self.failing_calls:
+                    raise ConnectionError(f"{name} failed")
+            return record
+
+        patches = [
+            mock.patch.object(rendering, "push_result", push_result),
+            mock.patch.object(rendering, "finish_task", recorder("finish")),
+            mock.patch.object(rendering, "fail_image_dedup", recorder("fail_dedup")),
+            mock.patch.object(rendering, "complete_image_dedup", recorder("complete_dedup")),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+        self.processor = RenderingProcessor.__new__(RenderingProcessor)
+        self.processor.main_loop = asyncio.get_running_loop()
+
+    def queues(self):
+        return [queue for queue, _ in self.pushed]
+
+    async def forward(self, uploader):
+        self.processor.uploader = uploader
+        await self.processor._upload_and_forward("r1", "p-1", b"jpg", "1-r1", "translated_image", "image/jpeg")
+
+    async def test_successful_upload_is_sent_to_hosting_queue(self):
+        await self.forward(SuccessfulUploader())
+        self.assertEqual(self.queues(), [rendering.HOSTING_TASKS_QUEUE])
+        self.assertEqual(self.pushed[0][1]["image_url"], "https://r2.example.com/out.jpg")
+        self.assertEqual(self.calls, [("complete_dedup", "r1", "p-1"), ("finish", "r1", "p-1")])
+
+    async def test_upload_exception_is_reported(self):
+        await self.forward(FailingUploader())
+        self.assertEqual(self.queues(), [rendering.ERROR_QUEUE])
+        self.assertIn("R2 unreachable", self.pushed[0][1]["error_message"])
+        self.assertEqual(self.calls, [("fail_dedup", "r1", "p-1"), ("finish", "r1", "p-1")])
+
+    async def test_hosting_push_failure_releases_dedup(self):
+        self.failing_queues.add(rendering.HOSTING_TASKS_QUEUE)
+        await self.forward(SuccessfulUploader())
+        self.assertEqual(self.queues(), [rendering.ERROR_QUEUE])
+        self.assertEqual(self.calls, [("fail_dedup", "r1", "p-1"), ("finish", "r1", "p-1")])
+
+    async def test_dedup_errors_do_not_escape(self):
+        self.failing_calls.update({"complete_dedup", "fail_dedup"})
+        await self.forward(SuccessfulUploader())
+        await self.forward(FailingUploader())
+        self.assertEqual(self.queues(), [rendering.HOSTING_TASKS_QUEUE, rendering.ERROR_QUEUE])
+        # 잠금 처리가 실패해도 ack는 경로마다 한 번
+        self.assertEqual([call for call in self.calls if call[0] == "finish"], [("finish", "r1", "p-1")] * 2)
+
+    async def test_escaped_forwarding_error_is_reported(self):
+        async def broken():
+            raise RuntimeError("unexpected")
+
+        future = asyncio.run_coroutine_threadsafe(broken(), self.processor.main_loop)
+        future.add_done_callback(lambda f: self.processor._on_forward_done("r1", "p-1", f))
+        with self.assertRaises(RuntimeError):
+            await asyncio.wrap_future(future)
+        # 콜백이 예약한 에러 전송이 끝날 때까지 대기
+        for _ in range(10):
+            if self.pushed:
+                break
+            await asyncio.sleep(0.01)
+        self.assertEqual(self.queues(), [rendering.ERROR_QUEUE])
+        self.assertIn("unexpected", self.pushed[0][1]["error_message"])
+        self.assertEqual(self.calls, [("fail_dedup", "r1", "p-1"), ("finish", "r1", "p-1")])
+
+
+if __name__ == "__main__":
+    unittest.main()
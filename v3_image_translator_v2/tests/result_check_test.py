@@ -0,0 +1,88 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+import concurrent.futures
+from unittest import mock
+
+import numpy as np
+
+# operate_worker 경로 추가
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+OPERATE_WORKER_DIR = os.path.join(os.path.dirname(TESTS_DIR), "workers", "operate_worker")
+sys.path.insert(0, OPERATE_WORKER_DIR)
+
+from rendering_worker import result_check
+from rendering_worker.result_check import ResultChecker
+
+
+class RecordingProcessor:
+
+    def __init__(self):
+        self.tasks = []
+
+    def process_rendering_sync(self, task):
+        self.tasks.append(task)
+
+
+class TestResultChecker(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self.spill_dir = tempfile.mkdtemp()
+        self.checker = ResultChecker(self.executor, RecordingProcessor(), http_session=None, join_timeout=60)
+
+    def tearDown(self):
+        self.executor.shutdown(wait=True)
+        shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+    def image(self, value=0):
+        return np.full((10, 10, 3), value, dtype=np.uint8)
+
+    async def test_redelivered_inpainting_result_is_counted_once(self):
+        await self.checker.save_inpainted_image("r1", self.image(1), "r1-img", False)
+        await self.checker.save_inpainted_image("r1", self.image(2), "r1-img", False)
+        self.assertEqual(self.checker.inpainted_resident_bytes, 300)
+        # 마지막 결과가 남음
+        self.assertEqual(self.checker.inpainting_results["r1"]["inpainted_image"][0, 0, 0], 2)
+
+    async def test_overwritten_spill_file_is_removed(self):
+        with mock.patch.object(result_check, "TEMP_OUTPUT_DIR", self.spill_dir), \
+                mock.patch.object(result_check, "INPAINTED_SPILL_TO_DISK", True):
+            self.checker.inpainted_memory_budget = 0
+            await self.checker.save_inpainted_image("r1", self.image(1), "r1-img", False)
+            spill_path = self.checker.inpainting_results["r1"]["spill_path"]
+            self.assertTrue(os.path.exists(spill_path))
+
+            # 한도가 늘어 두 번째 결과는 메모리에 보관 -> 이전 스필 파일 삭제
+            self.checker.inpainted_memory_budget = 1024
+            await self.checker.save_inpainted_image("r1", self.image(2), "r1-img", False)
+            self.assertFalse(os.path.exists(spill_path))
+            self.assertEqual(self.checker.inpainted_resident_bytes, 300)
+
+    async def test_half_joined_results_expire_after_timeout(self):
+        await self.checker.save_inpainted_image("r1", self.image(), "r1-img", False)
+        await self.checker.save_translation_result("r2", {"image_id": "r2-img", "image_url": "https://a/b.jpg"})
+        arrived_at = self.checker.first_arrival["r1"]
+
+        self.assertEqual(await self.checker.expire_stale_results(now=arrived_at + 30), [])
+        expired = await self.checker.expire_stale_results(now=arrived_at + 61)
+        self.assertEqual(sorted(expired), [("r1", "r1-img"), ("r2", "r2-img")])
+
+        self.assertEqual(self.checker.inpainted_resident_bytes, 0)
+        self.assertEqual(self.checker.stats(), {
+            "pending_translation": 0, "pending_inpainting": 0, "inpainted_resident_mb": 0.0, "expired": 2
+        })
+        self.assertEqual(self.checker.first_arrival, {})
+
+    async def test_joined_request_is_not_expired(self):
+        await self.checker.save_translation_result("r1", {"image_id": "r1-img"})
+        # 원본 URL이 없어 렌더링은 건너뛰지만 조인 후 정리는 됨
+        await self.checker.save_inpainted_image("r1", self.image(), "r1-img", False)
+        self.assertEqual(self.checker.inpainted_resident_bytes, 0)
+        self.assertEqual(await self.checker.expire_stale_results(now=float("inf")), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+import asyncio
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import importlib.util
+
+# result/core/results_store.py 경로 (operate_worker의 core 패키지와 이름이 겹치므로 파일 경로로 로드)
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_STORE_PATH = os.path.join(os.path.dirname(TESTS_DIR), "result", "core", "results_store.py")
+_spec = importlib.util.spec_from_file_location("result_results_store", RESULTS_STORE_PATH)
+results_store = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(results_store)
+ResultsStore = results_store.ResultsStore
+
+
+class TestResultsStore(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "results.db")
+        self.json_path = os.path.join(self.temp_dir, "results.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    async def test_concurrent_adds_share_one_commit(self):
+        store = ResultsStore(self.db_path, commit_batch=100, commit_delay_ms=5)
+        await asyncio.gather(*(store.add(f"r{i % 2}", f"img{i}", f"/out/img{i}.jpg") for i in range(10)))
+
+        self.assertEqual(store.count(), 10)
+        self.assertEqual([r["image_id"] for r in store.find_by_request("r1")], ["img1", "img3", "img5", "img7", "img9"])
+        self.assertEqual(store.find_by_image("img4")[0]["file_path"], "/out/img4.jpg")
+        stats = store.stats()
+        self.assertEqual((stats["written"], stats["commits"], stats["largest_batch"]), (10, 1, 10))
+        await store.close()
+
+    async def test_full_batch_commits_without_waiting(self):
+        store = ResultsStore(self.db_path, commit_batch=2, commit_delay_ms=60000)
+        await asyncio.wait_for(asyncio.gather(store.add("r1", "a", "/a.jpg"), store.add("r1", "b", "/b.jpg")), timeout=5)
+        self.assertEqual(store.count(), 2)
+        await store.close()
+
+    async def test_wal_mode_and_indexes(self):
+        store = ResultsStore(self.db_path)
+        await store.close()
+        conn = sqlite3.connect(self.db_path)
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        indexes = {row[1] for row in conn.execute("PRAGMA index_list(results)")}
+        self.assertEqual(indexes, {"idx_results_request_id", "idx_results_image_id"})
+        conn.close()
+
+    async def test_export_matches_legacy_format(self):
+        store = ResultsStore(self.db_path, commit_delay_ms=1)
+        await store.add("r1", "a", "/out/a.jpg", timestamp="2024-12-01T14:30:22")
+        await store.add("r2", "이미지", "/out/b.jpg", timestamp="2024-12-01T14:30:23")
+
+        self.assertEqual(store.export_json(self.json_path), 2)
+        with open(self.json_path, encoding="utf-8") as f:
+            text = f.read()
+        self.assertEqual(json.loads(text), [
+            {"timestamp": "2024-12-01T14:30:22", "request_id": "r1", "image_id": "a",
+             "file_path": "/out/a.jpg", "status": "completed"},
+            {"timestamp": "2024-12-01T14:30:23", "request_id": "r2", "image_id": "이미지",
+             "file_path": "/out/b.jpg", "status": "completed"}
+        ])
+        self.assertFalse(os.path.exists(self.json_path + ".tmp"))
+        await store.close()
+
+    async def test_empty_export_is_valid_json(self):
+        store = ResultsStore(self.db_path)
+        self.assertEqual(store.export_json(self.json_path), 0)
+        with open(self.json_path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f), [])
+        await store.close()
+
+    async def test_legacy_json_is_imported_once(self):
+        legacy = [{"timestamp": "t0", "request_id": "r0", "image_id": "x", "file_path": "/x.jpg", "status": "completed"}]
+        with open(self.json_path, "w", encoding="utf-8") as f:
+            json.dump(legacy, f)
+
+        store = ResultsStore(self.db_path, legacy_json=self.json_path)
+        self.assertEqual(store.find_by_request("r0"), legacy)
+        await store.close()
+
+        # 이미 결과가 있는 DB에는 다시 가져오지 않음
+        store = ResultsStore(self.db_path, legacy_json=self.json_path)
+        self.assertEqual(store.count(), 1)
+        await store.close()
+
+    async def test_results_survive_reopen(self):
+        store = ResultsStore(self.db_path, commit_delay_ms=1)
+        await store.add("r1", "a", "/a.jpg")
+        await store.close()
+        store = ResultsStore(self.db_path)
+        self.assertEqual([r["image_id"] for r in store.find_by_request("r1")], ["a"])
+        await store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
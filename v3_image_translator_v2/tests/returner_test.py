@@ -0,0 +1,106 @@
+import unittest
+import asyncio
+import json
+import os
+import sys
+import shutil
+import sqlite3
+import tempfile
+import importlib.util
+from unittest import mock
+
+import numpy as np
+
+# result/returner.py는 result/core 패키지를 쓰므로, operate_worker의 core 패키지와 섞이지 않게 잠시 바꿔 끼워 로드
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULT_DIR = os.path.join(os.path.dirname(TESTS_DIR), "result")
+
+
+def _load_returner():
+    saved = {name: module for name, module in sys.modules.items() if name == "core" or name.startswith("core.")}
+    for name in saved:
+        del sys.modules[name]
+    sys.path.insert(0, RESULT_DIR)
+    try:
+        spec = importlib.util.spec_from_file_location("result_returner", os.path.join(RESULT_DIR, "returner.py"))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+    finally:
+        sys.path.remove(RESULT_DIR)
+        for name in [name for name in sys.modules if name == "core" or name.startswith("core.")]:
+            del sys.modules[name]
+        sys.modules.update(saved)
+
+
+returner = _load_returner()
+
+
+class OneTaskRedis:
+    """작업 하나를 돌려준 뒤에는 빈 큐처럼 동작하는 BLPOP 대체"""
+
+    def __init__(self, task_data):
+        self.items = [json.dumps(task_data).encode("utf-8")]
+
+    async def blpop(self, queue, timeout=0):
+        if self.items:
+            return queue.encode("utf-8"), self.items.pop(0)
+        await asyncio.sleep(0.01)
+        return None
+
+    async def ping(self):
+        return True
+
+
+class SlowImageUtils:
+    """다운로드가 release 이벤트까지 걸리는 ImageUtils 대체"""
+
+    def __init__(self):
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def download_image_from_url(self, image_url, request_id):
+        self.started.set()
+        await self.release.wait()
+        return np.zeros((4, 4, 3), dtype=np.uint8)
+
+    async def save_image_to_file(self, image_array, image_id):
+        return True, f"/out/{image_id}.jpg"
+
+
+class TestImageResultWorker(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "results.db")
+        self.redis = OneTaskRedis({"request_id": "r1", "image_id": "img1", "image_url": "https://a/b.jpg"})
+        with mock.patch.object(returner, "get_redis_client", lambda: self.redis), \
+                mock.patch.object(returner, "OUTPUT_DIR", self.temp_dir), \
+                mock.patch.object(returner, "RESULTS_DB_PATH", self.db_path):
+            self.worker = returner.ImageResultWorker()
+        self.worker.image_utils = SlowImageUtils()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    async def test_close_waits_for_in_flight_tasks(self):
+        worker_task = asyncio.create_task(self.worker.start_worker(poll_interval=0.01))
+        await asyncio.wait_for(self.worker.image_utils.started.wait(), timeout=5)
+        worker_task.cancel()
+        await asyncio.gather(worker_task, return_exceptions=True)
+        self.assertEqual(len(self.worker._processing_tasks), 1)
+
+        # 저장소를 닫는 도중에 작업이 끝나도 결과가 기록됨
+        asyncio.get_running_loop().call_later(0.05, self.worker.image_utils.release.set)
+        with mock.patch.object(returner, "RESULTS_EXPORT_ON_EXIT", False):
+            await asyncio.wait_for(self.worker.close(), timeout=5)
+
+        self.assertEqual(self.worker._processing_tasks, set())
+        conn = sqlite3.connect(self.db_path)
+        rows = conn.execute("SELECT request_id, image_id, file_path FROM results").fetchall()
+        conn.close()
+        self.assertEqual(rows, [("r1", "img1", "/out/img1.jpg")])
+
+
+if __name__ == "__main__":
+    unittest.main()
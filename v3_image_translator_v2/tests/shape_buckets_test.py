@@ -0,0 +1,68 @@
+import unittest
+import asyncio
+import os
+import sys
+
+# operate_worker 경로 추가
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+OPERATE_WORKER_DIR = os.path.join(os.path.dirname(TESTS_DIR), "workers", "operate_worker")
+sys.path.insert(0, OPERATE_WORKER_DIR)
+
+from logic.shape_buckets import ShapeBuckets, parse_buckets, batch_padding, OVERFLOW_BUCKET
+from logic.batch_scheduler import BatchScheduler
+
+
+class TestShapeBuckets(unittest.TestCase):
+
+    def setUp(self):
+        self.buckets = ShapeBuckets(parse_buckets("512x512, 256x256,256x512,1024x1024"),
+                                    batch_pixels=4 * 1024 * 1024, max_batch=16)
+
+    def test_parse_sorts_by_area_and_rejects_bad_entries(self):
+        self.assertEqual(parse_buckets("512x512,256x256,256x256"), [(256, 256), (512, 512)])
+        with self.assertRaises(ValueError):
+            parse_buckets("256")
+        with self.assertRaises(ValueError):
+            parse_buckets("0x256")
+
+    def test_assign_picks_smallest_fitting_bucket(self):
+        self.assertEqual(self.buckets.assign(128, 256), "region_256x256")
+        self.assertEqual(self.buckets.assign(256, 384), "region_256x512")
+        self.assertEqual(self.buckets.assign(384, 256), "region_512x512")
+        self.assertEqual(self.buckets.assign(1024, 1024), "region_1024x1024")
+        self.assertEqual(self.buckets.assign(1152, 128), OVERFLOW_BUCKET)
+
+    def test_batch_size_follows_pixel_budget(self):
+        shapes = self.buckets.scheduler_shapes(weight=1.0, maxsize=10)
+        self.assertEqual(shapes["region_256x256"][0], 16)
+        self.assertEqual(shapes["region_512x512"][0], 16)
+        self.assertEqual(shapes["region_1024x1024"][0], 4)
+        self.assertEqual(shapes[OVERFLOW_BUCKET][0], 1)
+
+    def test_batch_padding_counts_modulo_and_letterbox(self):
+        # 두 입력 모두 (256, 512)로 패딩됨
+        content, computed = batch_padding([(250, 500), (128, 256)], [(250, 500), (128, 256)], modulo=8)
+        self.assertEqual(computed, 2 * 256 * 504)
+        self.assertEqual(content, 250 * 500 + 128 * 256)
+        # 레터박스 입력은 내용 크기만 유효
+        content, computed = batch_padding([(1024, 512)], [(1024, 1024)])
+        self.assertEqual((content, computed), (1024 * 512, 1024 * 1024))
+
+
+class TestPaddingWasteMetric(unittest.TestCase):
+
+    def test_scheduler_reports_padding_waste(self):
+        async def scenario():
+            scheduler = BatchScheduler({"short": (4, 1.0, 10), "region_256x256": (8, 1.0, 10)}, max_queue_delay=0.1)
+            scheduler.record_padding("short", 3, 4)
+            scheduler.record_padding("region_256x256", 1, 1)
+            return scheduler.stats(), scheduler.padding_waste()
+
+        stats, total = asyncio.run(scenario())
+        self.assertAlmostEqual(stats["short"]["padding_waste"], 25.0)
+        self.assertAlmostEqual(stats["region_256x256"]["padding_waste"], 0.0)
+        self.assertAlmostEqual(total, 20.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
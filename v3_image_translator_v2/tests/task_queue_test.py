@@ -0,0 +1,261 @@
+import unittest
+import asyncio
+import json
+import os
+import sys
+import filecmp
+
+# operate_worker 경로 추가
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+WORKERS_DIR = os.path.join(os.path.dirname(TESTS_DIR), "workers")
+OPERATE_WORKER_DIR = os.path.join(WORKERS_DIR, "operate_worker")
+sys.path.insert(0, OPERATE_WORKER_DIR)
+
+from core.task_queue import (
+    ListTaskQueue, StreamTaskQueue, ResultPusher, create_task_queue, track_task, finish_task, tracked_count
+)
+from redis.exceptions import ResponseError
+
+# 스트림 명령(XAUTOCLAIM 등)을 지원하는 fakeredis로 실행. 없으면 REDIS_TEST_URL의 로컬 redis-server 사용
+try:
+    import fakeredis
+    HAS_FAKEREDIS = True
+except ImportError:
+    HAS_FAKEREDIS = False
+REDIS_TEST_URL = os.environ.get("REDIS_TEST_URL")
+
+
+def create_client():
+    if HAS_FAKEREDIS:
+        return fakeredis.FakeAsyncRedis()
+    import redis.asyncio as redis
+    return redis.from_url(REDIS_TEST_URL)
+
+
+def task(request_id):
+    return json.dumps({"request_id": request_id, "image_id": f"{request_id}-img"}).encode("utf-8")
+
+
+@unittest.skipUnless(HAS_FAKEREDIS or REDIS_TEST_URL, "Requires fakeredis or REDIS_TEST_URL")
+class TestListTaskQueue(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.redis = create_client()
+        await self.redis.flushdb()
+        self.queue = ListTaskQueue("tasks", redis_getter=lambda: self.redis)
+
+    async def asyncTearDown(self):
+        await self.redis.flushdb()
+        await self.redis.aclose()
+
+    async def test_batch_read_is_fifo_and_bounded(self):
+        for i in range(5):
+            await self.queue.put(task(f"r{i}"))
+        messages = await self.queue.get(3, block_ms=100)
+        self.assertEqual([json.loads(m.data)["request_id"] for m in messages], ["r0", "r1", "r2"])
+        self.assertTrue(all(m.id is None for m in messages))
+        self.assertEqual(await self.redis.llen("tasks"), 2)
+        # BLMPOP 한 번으로 여러 작업을 가져옴
+        self.assertEqual(self.queue.stats()["round_trips"], 1)
+
+    async def test_empty_queue_returns_nothing(self):
+        self.assertEqual(await self.queue.get(4, block_ms=10), [])
+
+    async def test_falls_back_to_blpop_without_blmpop(self):
+        async def blmpop(*args, **kwargs):
+            raise ResponseError("unknown command 'BLMPOP'")
+
+        self.redis.blmpop = blmpop
+        for i in range(3):
+            await self.queue.put(task(f"r{i}"))
+        messages = await self.queue.get(2, block_ms=100)
+        self.assertEqual([json.loads(m.data)["request_id"] for m in messages], ["r0", "r1"])
+        messages = await self.queue.get(2, block_ms=100)
+        self.assertEqual([json.loads(m.data)["request_id"] for m in messages], ["r2"])
+
+
+@unittest.skipUnless(HAS_FAKEREDIS or REDIS_TEST_URL, "Requires fakeredis or REDIS_TEST_URL")
+class TestStreamTaskQueue(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.redis = create_client()
+        await self.redis.flushdb()
+
+    async def asyncTearDown(self):
+        await self.redis.flushdb()
+        await self.redis.aclose()
+
+    def consumer(self, name, **kwargs):
+        options = {"claim_idle_ms": 0, "claim_interval": 0, "max_deliveries": 2, "dead_letter_queue": "errors"}
+        options.update(kwargs)
+        return StreamTaskQueue("tasks", "workers", consumer=name, redis_getter=lambda: self.redis, **options)
+
+    async def test_unacked_task_stays_pending_until_ack(self):
+        queue = self.consumer("a", claim_idle_ms=60000)
+        await queue.ensure()
+        await queue.put(task("r1"))
+        await queue.put(task("r2"))
+
+        messages = await queue.get(5, block_ms=10)
+        self.assertEqual([json.loads(m.data)["request_id"] for m in messages], ["r1", "r2"])
+        self.assertEqual(await queue.pending(), {"backend": "stream", "queued": 0, "pending": 2, "consumers": {"a": 2}})
+
+        await queue.ack(messages[0])
+        self.assertEqual((await queue.pending())["pending"], 1)
+        # ack한 엔트리는 스트림에서도 지워짐
+        self.assertEqual(await self.redis.xlen("tasks"), 1)
+        # 아직 idle 시간이 지나지 않은 작업은 다시 전달되지 않음
+        self.assertEqual(await queue.get(5, block_ms=10), [])
+
+    async def test_stale_task_of_dead_consumer_is_claimed(self):
+        crashed = self.consumer("crashed")
+        await crashed.ensure()
+        await crashed.put(task("r1"))
+        self.assertEqual(len(await crashed.get(1, block_ms=10)), 1)
+
+        survivor = self.consumer("survivor")
+        messages = await survivor.get(1, block_ms=10)
+        self.assertEqual([json.loads(m.data)["request_id"] for m in messages], ["r1"])
+        self.assertEqual(messages[0].deliveries, 2)
+        self.assertEqual(survivor.stats()["claimed"], 1)
+        self.assertEqual((await survivor.pending())["consumers"], {"survivor": 1})
+
+    async def test_claim_scan_resumes_from_cursor(self):
+        crashed = self.consumer("crashed")
+        await crashed.ensure()
+        for request_id in ("r1", "r2", "r3"):
+            await crashed.put(task(request_id))
+        self.assertEqual(len(await crashed.get(3, block_ms=10)), 3)
+
+        # 한 번에 하나씩 회수해도 매번 처음부터 보지 않고 커서를 따라 다음 작업을 가져옴
+        survivor = self.consumer("survivor", max_deliveries=5)
+        claimed = []
+        for _ in range(3):
+            claimed += [json.loads(m.data)["request_id"] for m in await survivor.get(1, block_ms=10)]
+        self.assertEqual(claimed, ["r1", "r2", "r3"])
+
+        # PEL 끝에 닿으면 커서가 처음(0-0)으로 돌아가 다시 앞에서부터 확인
+        self.assertEqual(survivor._claim_cursor, "0-0")
+        messages = await survivor.get(1, block_ms=10)
+        self.assertEqual([json.loads(m.data)["request_id"] for m in messages], ["r1"])
+        self.assertEqual(messages[0].deliveries, 3)
+
+    async def test_task_over_max_deliveries_is_dead_lettered(self):
+        queue = self.consumer("a")
+        await queue.ensure()
+        await queue.put(task("r1"))
+        # 1회 전달 + 재전달 1회까지는 처리 대상
+        self.assertEqual(len(await queue.get(1, block_ms=10)), 1)
+        self.assertEqual(len(await queue.get(1, block_ms=10)), 1)
+        # 세 번째 전달은 dead-letter
+        self.assertEqual(await queue.get(1, block_ms=10), [])
+
+        errors = [json.loads(item) for item in await self.redis.lrange("errors", 0, -1)]
+        self.assertEqual(len(errors), 1)
+        self.assertEqual((errors[0]["request_id"], errors[0]["image_id"]), ("r1", "r1-img"))
+        self.assertEqual(await self.redis.xlen("tasks"), 0)
+        self.assertEqual((await queue.pending())["pending"], 0)
+        self.assertEqual(queue.stats()["dead_lettered"], 1)
+
+    async def test_consumers_in_group_share_tasks(self):
+        first, second = self.consumer("a", claim_idle_ms=60000), self.consumer("b", claim_idle_ms=60000)
+        await first.ensure()
+        await second.ensure()  # 이미 있는 그룹은 그대로 사용
+        for i in range(4):
+            await first.put(task(f"r{i}"))
+        a = await first.get(2, block_ms=10)
+        b = await second.get(5, block_ms=10)
+        self.assertEqual(len(a) + len(b), 4)
+        self.assertEqual({m.id for m in a} & {m.id for m in b}, set())
+
+    async def test_tracked_task_is_acked_by_finish(self):
+        queue = self.consumer("a", claim_idle_ms=60000)
+        await queue.ensure()
+        await queue.put(task("r1"))
+        message = (await queue.get(1, block_ms=10))[0]
+        track_task(queue, message, "r1", "r1-img")
+        self.assertEqual(tracked_count(), 1)
+
+        await finish_task("r1", "r1-img")
+        self.assertEqual(tracked_count(), 0)
+        self.assertEqual((await queue.pending())["pending"], 0)
+        # 이미 끝난 작업은 다시 ack하지 않음
+        await finish_task("r1", "r1-img")
+        self.assertEqual(queue.stats()["acked"], 1)
+
+    async def test_missing_ids_match_error_path_key(self):
+        queue = self.consumer("a", claim_idle_ms=60000)
+        await queue.ensure()
+        await queue.put(task("r1"))
+        message = (await queue.get(1, block_ms=10))[0]
+        # image_id가 없는 작업: 추적은 None, 에러 경로는 "N/A"로 불러도 같은 작업으로 ack
+        track_task(queue, message, "r1", None)
+        await finish_task("r1", "N/A")
+        self.assertEqual(tracked_count(), 0)
+        self.assertEqual((await queue.pending())["pending"], 0)
+
+
+@unittest.skipUnless(HAS_FAKEREDIS or REDIS_TEST_URL, "Requires fakeredis or REDIS_TEST_URL")
+class TestResultPusher(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.redis = create_client()
+        await self.redis.flushdb()
+
+    async def asyncTearDown(self):
+        await self.redis.flushdb()
+        await self.redis.aclose()
+
+    async def test_concurrent_pushes_share_one_flush(self):
+        pusher = ResultPusher(max_batch=100, max_delay_ms=5, redis_getter=lambda: self.redis)
+        stream = StreamTaskQueue("results", "workers", redis_getter=lambda: self.redis)
+        await asyncio.gather(
+            *(pusher.push("success", task(f"s{i}")) for i in range(5)),
+            pusher.push("error", task("e0")),
+            pusher.push(stream, task("o0"))
+        )
+        # push()가 반환되면 이미 기록되어 있음
+        self.assertEqual([json.loads(item)["request_id"] for item in await self.redis.lrange("success", 0, -1)],
+                         [f"s{i}" for i in range(5)])
+        self.assertEqual(await self.redis.llen("error"), 1)
+        self.assertEqual(await self.redis.xlen("results"), 1)
+
+        stats = pusher.stats()
+        self.assertEqual((stats["flushes"], stats["largest_batch"]), (1, 7))
+        self.assertEqual(stats["queues"]["success"], {"pushed": 5, "flushes": 1, "errors": 0})
+
+    async def test_full_batch_flushes_without_waiting(self):
+        pusher = ResultPusher(max_batch=2, max_delay_ms=60000, redis_getter=lambda: self.redis)
+        await asyncio.wait_for(asyncio.gather(pusher.push("success", b"1"), pusher.push("success", b"2")), timeout=1)
+        self.assertEqual(await self.redis.lrange("success", 0, -1), [b"1", b"2"])
+
+    async def test_flush_error_reaches_every_pusher(self):
+        pusher = ResultPusher(max_batch=10, max_delay_ms=1, redis_getter=lambda: self.redis)
+        await self.redis.set("success", "not a list")
+        results = await asyncio.gather(pusher.push("success", b"1"), pusher.push("success", b"2"), return_exceptions=True)
+        self.assertTrue(all(isinstance(result, Exception) for result in results))
+        self.assertEqual(pusher.stats()["queues"]["success"]["errors"], 2)
+        await pusher.close()
+
+
+class TestTaskQueueFactory(unittest.TestCase):
+
+    def test_backend_selection(self):
+        self.assertIsInstance(create_task_queue("tasks"), ListTaskQueue)
+        stream = create_task_queue("tasks", "stream", group="workers", max_deliveries=5)
+        self.assertIsInstance(stream, StreamTaskQueue)
+        self.assertEqual((stream.group, stream.max_deliveries), ("workers", 5))
+        with self.assertRaises(ValueError):
+            create_task_queue("tasks", "kafka")
+
+    def test_copies_are_identical(self):
+        source = os.path.join(OPERATE_WORKER_DIR, "core", "task_queue.py")
+        merged_core = os.path.join(
+            os.path.dirname(os.path.dirname(TESTS_DIR)), "v3_image_translator", "image_translator_merged", "core"
+        )
+        for copy in (os.path.join(WORKERS_DIR, "ocr_worker", "task_queue.py"), os.path.join(merged_core, "task_queue.py")):
+            self.assertTrue(filecmp.cmp(source, copy, shallow=False), copy)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import unittest
+import asyncio
+import json
+import os
+import sys
+
+from aiohttp import web
+
+# operate_worker 경로 추가
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+OPERATE_WORKER_DIR = os.path.join(os.path.dirname(TESTS_DIR), "workers", "operate_worker")
+sys.path.insert(0, OPERATE_WORKER_DIR)
+
+from logic.translation_client import GeminiTranslationClient, NonRetryableTranslationError
+
+
+def gemini_response(items):
+    """Gemini JSON 모드 응답 형태 (번역 배열이 text 안에 JSON 문자열로 들어 있음)"""
+    return {"candidates": [{"content": {"parts": [{"text": json.dumps(items, ensure_ascii=False)}]}}]}
+
+
+class StubGeminiServer:
+    """로컬 포트에서 Gemini generateContent를 흉내 내는 aiohttp 서버. 각 입력 앞에 "KO:"를 붙여 돌려줍니다."""
+
+    def __init__(self):
+        self.requests = 0
+        self.peers = set()
+        self.fail_statuses = []  # 앞에서부터 이 상태 코드로 실패 응답
+        self.response_override = None
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        self.peers.add(request.transport.get_extra_info("peername"))
+        if self.fail_statuses:
+            status = self.fail_statuses.pop(0)
+            return web.json_response({"error": {"message": f"stub error {status}"}}, status=status)
+        if self.response_override is not None:
+            return web.json_response(self.response_override)
+        body = await request.json()
+        texts = json.loads(body["contents"][0]["parts"][0]["text"])
+        return web.json_response(gemini_response([f"KO:{t}" for t in texts]))
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_post("/v1beta/models/test:generateContent", self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/v1beta/models/test:generateContent?key=test"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+class TestGeminiTranslationClient(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.server = StubGeminiServer()
+        url = await self.server.start()
+        self.client = GeminiTranslationClient(url, "translate", max_retries=2, retry_base_delay=0.01)
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.server.stop()
+
+    async def test_translates_and_reuses_connection(self):
+        for i in range(5):
+            result = await self.client.translate_list([f"文本{i}", "你好"], request_id=f"r{i}")
+            self.assertEqual(result, [f"KO:文本{i}", "KO:你好"])
+        self.assertEqual(self.server.requests, 5)
+        # 순차 요청은 keep-alive 연결 하나로 처리됨
+        self.assertEqual(len(self.server.peers), 1)
+
+    async def test_concurrent_requests_share_pool(self):
+        results = await asyncio.gather(*(self.client.translate_list([str(i)]) for i in range(20)))
+        self.assertEqual(results, [[f"KO:{i}"] for i in range(20)])
+        self.assertLessEqual(len(self.server.peers), self.client.max_connections)
+
+    async def test_retries_transient_errors(self):
+        self.server.fail_statuses = [503, 429]
+        self.assertEqual(await self.client.translate_list(["a"]), ["KO:a"])
+        self.assertEqual(self.client.stats()["retries"], 2)
+
+    async def test_does_not_retry_bad_request(self):
+        self.server.fail_statuses = [400]
+        with self.assertRaises(Exception) as ctx:
+            await self.client.translate_list(["a"])
+        self.assertEqual(getattr(ctx.exception, "status", None), 400)
+        self.assertEqual(self.server.requests, 1)
+
+    async def test_length_mismatch_gives_up_after_retries(self):
+        self.server.response_override = gemini_response(["only one"])
+        with self.assertRaises(ValueError):
+            await self.client.translate_list(["a", "b"])
+        self.assertEqual(self.server.requests, 3)
+        self.assertEqual(self.client.stats()["failed"], 1)
+
+    async def test_blocked_prompt_is_not_retried(self):
+        self.server.response_override = {"promptFeedback": {"blockReason": "SAFETY"}}
+        with self.assertRaises(NonRetryableTranslationError):
+            await self.client.translate_list(["a"])
+        self.assertEqual(self.server.requests, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
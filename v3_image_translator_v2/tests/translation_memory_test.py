@@ -0,0 +1,151 @@
+import unittest
+import os
+import sys
+
+# operate_worker 경로 추가
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+OPERATE_WORKER_DIR = os.path.join(os.path.dirname(TESTS_DIR), "workers", "operate_worker")
+sys.path.insert(0, OPERATE_WORKER_DIR)
+
+# text_translate 모듈은 import 시 API 키/R2 설정을 확인하므로 테스트용 값을 넣어 둠
+for key in ("GEMINI_API_KEY", "R2_ENDPOINT", "CLOUDFLARE_ACCESS_KEY_ID", "CLOUDFLARE_SECRET_KEY", "R2_BUCKET_NAME", "R2_DOMAIN"):
+    os.environ.setdefault(key, "http://test" if key in ("R2_ENDPOINT", "R2_DOMAIN") else "test")
+
+from logic.translation_memory import TranslationMemory, translation_memory_version
+from logic.text_translate import call_translation_api
+
+
+class InMemoryRedis:
+    """테스트용 비동기 Redis (MGET / 파이프라인 SET EX만 지원)"""
+
+    def __init__(self):
+        self.values = {}
+        self.ttls = {}
+        self.fail = False
+
+    async def mget(self, keys):
+        if self.fail:
+            raise ConnectionError("redis down")
+        return [self.values.get(key) for key in keys]
+
+    def expire_all(self):
+        """TTL이 모두 지난 상태를 흉내냄"""
+        for key in list(self.ttls):
+            self.values.pop(key, None)
+            self.ttls.pop(key)
+
+    def pipeline(self, transaction=True):
+        return _Pipeline(self)
+
+
+class _Pipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.ops = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def set(self, key, value, ex=None):
+        def op():
+            self.redis.values[key] = value
+            self.redis.ttls[key] = ex
+        self.ops.append(op)
+
+    async def execute(self):
+        if self.redis.fail:
+            raise ConnectionError("redis down")
+        for op in self.ops:
+            op()
+
+
+class RecordingClient:
+    """API 대신 호출된 원문 리스트를 기록하고 "KO:"를 붙여 돌려주는 번역 클라이언트"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def translate_list(self, texts, request_id="N/A"):
+        self.calls.append(list(texts))
+        return [f"KO:{t}" for t in texts]
+
+
+class TestTranslationMemory(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.redis = InMemoryRedis()
+        self.memory = TranslationMemory("v1", max_local_entries=100, ttl_seconds=60, redis_getter=lambda: self.redis)
+        self.client = RecordingClient()
+
+    async def test_only_misses_are_sent_and_order_is_kept(self):
+        await self.memory.store({"尺码表": "사이즈표"})
+        result = await call_translation_api(["包邮", "尺码表", "包邮", "新品"], "r1", self.client, self.memory)
+        self.assertEqual(result, ["KO:包邮", "사이즈표", "KO:包邮", "KO:新品"])
+        self.assertEqual(self.client.calls, [["包邮", "新品"]])
+
+        # 두 번째 요청은 전부 캐시에서
+        result = await call_translation_api(["新品", "尺码表"], "r2", self.client, self.memory)
+        self.assertEqual(result, ["KO:新品", "사이즈표"])
+        self.assertEqual(len(self.client.calls), 1)
+        # 원문마다 키 하나, 각각 TTL이 걸림
+        self.assertEqual(len(self.redis.values), 3)
+        self.assertEqual(set(self.redis.ttls.values()), {60})
+
+    async def test_shared_redis_serves_other_workers(self):
+        await call_translation_api(["发货"], "r1", self.client, self.memory)
+        other_worker = TranslationMemory("v1", redis_getter=lambda: self.redis)
+        self.assertEqual(await other_worker.lookup(["发货", "退货"]), {"发货": "KO:发货"})
+        stats = other_worker.stats()
+        self.assertEqual((stats["redis_hits"], stats["misses"]), (1, 1))
+        self.assertAlmostEqual(stats["hit_rate"], 0.5)
+        # Redis에서 읽은 값은 로컬 LRU에도 들어감
+        await other_worker.lookup(["发货"])
+        self.assertEqual(other_worker.stats()["local_hits"], 1)
+
+    async def test_version_change_isolates_entries(self):
+        await self.memory.store({"包邮": "무료배송"})
+        new_version = TranslationMemory("v2", redis_getter=lambda: self.redis)
+        self.assertEqual(await new_version.lookup(["包邮"]), {})
+        self.assertNotEqual(translation_memory_version("gemini-2.0-flash", "a"),
+                            translation_memory_version("gemini-2.0-flash", "b"))
+
+    async def test_entries_expire_individually(self):
+        await self.memory.store({"包邮": "무료배송"})
+        self.redis.expire_all()
+        await self.memory.store({"新品": "신상품"})
+
+        other_worker = TranslationMemory("v1", redis_getter=lambda: self.redis)
+        self.assertEqual(await other_worker.lookup(["包邮", "新品"]), {"新品": "신상품"})
+        # 새 쓰기가 만료된 항목을 되살리지 않음
+        self.assertEqual(list(self.redis.values), [other_worker._entry_key("新品")])
+
+    async def test_redis_failure_falls_back_to_api(self):
+        self.redis.fail = True
+        result = await call_translation_api(["包邮"], "r1", self.client, self.memory)
+        self.assertEqual(result, ["KO:包邮"])
+        self.assertEqual(self.memory.stats()["redis_errors"], 2)
+
+    async def test_local_lru_evicts_oldest(self):
+        memory = TranslationMemory("v1", max_local_entries=2, redis_getter=lambda: None)
+        await memory.store({"a": "A", "b": "B"})
+        await memory.lookup(["a"])
+        await memory.store({"c": "C"})
+        self.assertEqual(await memory.lookup(["a", "b", "c"]), {"a": "A", "c": "C"})
+
+    async def test_empty_translations_are_not_cached(self):
+        class BlankClient(RecordingClient):
+            async def translate_list(self, texts, request_id="N/A"):
+                self.calls.append(list(texts))
+                return [""] * len(texts)
+
+        client = BlankClient()
+        await call_translation_api(["包邮"], "r1", client, self.memory)
+        await call_translation_api(["包邮"], "r2", client, self.memory)
+        self.assertEqual(len(client.calls), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,6 +5,7 @@ REDIS_URL = os.environ.get("REDIS_URL")
 OCR_TASK_QUEUE = "img:translate:tasks"
 OCR_RESULT_QUEUE = "ocr:results"  # 내부 통신용 유지
 ERROR_QUEUE = "img:translate:error" 
+SUCCESS_QUEUE = "img:translate:success"  # 중복 이미지의 재사용 결과를 바로 보내는 큐 (operate_worker의 SUCCESS_QUEUE와 동일)
 
 # 로깅 설정
 LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
@@ -13,9 +14,39 @@ LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
 SHM_NAME_PREFIX = "img_shm_"
 
 # 이미지 처리 설정
-JPEG_QUALITY = int(os.environ.get("JPEG_QUALITY", "95"))  # JPEG 변환 품질 
+OCR_DECODE_WORKERS = int(os.environ.get("OCR_DECODE_WORKERS", "4"))  # 이미지 디코딩 스레드 수
+OCR_DET_MAX_SIDE_LEN = int(os.environ.get("OCR_DET_MAX_SIDE_LEN", "1504"))  # 검출 입력의 긴 변 최대 크기 (PaddleOCR det_max_side_len)
+OCR_DECODE_DOWNSCALE = os.environ.get("OCR_DECODE_DOWNSCALE", "0") == "1"  # 긴 변이 OCR_DET_MAX_SIDE_LEN 이상 남는 범위에서 1/2~1/8 축소 디코딩 (인식 crop 해상도도 낮아짐)
 
 # 비동기 처리 제어 설정
 MAX_CONCURRENT_DOWNLOADS = int(os.environ.get("MAX_CONCURRENT_DOWNLOADS", "5"))  # 동시 다운로드 최대 개수
 MAX_PENDING_IMAGES = int(os.environ.get("MAX_PENDING_IMAGES", "10"))  # 대기 이미지 최대 개수
-DOWNLOAD_COOLDOWN = int(os.environ.get("DOWNLOAD_COOLDOWN", "3"))  # 대기 이미지가 최대치일 때 휴식 시간(초) 
\ No newline at end of file
+DOWNLOAD_COOLDOWN = int(os.environ.get("DOWNLOAD_COOLDOWN", "3"))  # 대기 이미지가 최대치일 때 휴식 시간(초) 
+
+# OCR 엔진 배치 설정
+OCR_MAX_BATCH_IMAGES = int(os.environ.get("OCR_MAX_BATCH_IMAGES", "8"))  # 추론 스레드가 한 번에 처리할 최대 이미지 수
+OCR_BATCH_WAIT_MS = int(os.environ.get("OCR_BATCH_WAIT_MS", "20"))  # 첫 이미지 이후 배치를 채우기 위해 기다리는 최대 시간(ms)
+OCR_QUEUE_SIZE = int(os.environ.get("OCR_QUEUE_SIZE", "32"))  # 추론 스레드 입력 큐 최대 크기
+OCR_DET_MAX_PADDING = float(os.environ.get("OCR_DET_MAX_PADDING", "0.3"))  # 크기가 다른 이미지를 같은 검출 배치로 묶을 때 허용하는 패딩 픽셀 비율
+OCR_REC_BATCH_SIZE = int(os.environ.get("OCR_REC_BATCH_SIZE", "10"))  # 인식 배치 크기 (여러 이미지의 crop을 합쳐 이 단위로 추론)
+
+# 원본 이미지 핸드오프 설정 (같은 호스트의 operate_worker가 다시 다운로드하지 않도록 바이트 전달)
+IMAGE_HANDOFF_DIR = os.environ.get("IMAGE_HANDOFF_DIR", "")  # 저장 디렉토리 (tmpfs 권장, 예: /dev/shm/image_handoff). 비어 있으면 사용 안 함
+IMAGE_HANDOFF_TTL = float(os.environ.get("IMAGE_HANDOFF_TTL", "600"))  # 파일 유지 시간(초)
+IMAGE_HANDOFF_MAX_MB = int(os.environ.get("IMAGE_HANDOFF_MAX_MB", "1024"))  # 저장소 전체 크기 한도(MB)
+IMAGE_HANDOFF_SWEEP_INTERVAL = float(os.environ.get("IMAGE_HANDOFF_SWEEP_INTERVAL", "30"))  # janitor 실행 주기(초)
+
+# 이미지 중복 제거 설정 (같은 원본 이미지는 한 번만 처리하고 결과 URL 재사용, 버전은 operate_worker가 기록)
+IMAGE_DEDUP_ENABLED = os.environ.get("IMAGE_DEDUP_ENABLED", "1") == "1"  # 중복 제거 사용 여부
+IMAGE_DEDUP_TTL = int(os.environ.get("IMAGE_DEDUP_TTL", str(7 * 24 * 3600)))  # 결과 URL 재사용 기간(초)
+IMAGE_DEDUP_LOCK_TTL = int(os.environ.get("IMAGE_DEDUP_LOCK_TTL", "900"))  # leader 잠금 만료 시간(초, 전체 처리 시간보다 길게)
+IMAGE_DEDUP_SWEEP_INTERVAL = float(os.environ.get("IMAGE_DEDUP_SWEEP_INTERVAL", "30"))  # leader가 끝내지 못한 대기 요청을 다시 보내는 주기(초)
+
+# 작업 큐 설정 (task_queue.py, 같은 큐의 생산자/소비자는 같은 백엔드 사용)
+QUEUE_BACKEND = os.environ.get("QUEUE_BACKEND", "list")  # "list"(BLPOP, 기존 방식) 또는 "stream"(Redis Streams 컨슈머 그룹, Redis 6.2 이상)
+QUEUE_CONSUMER_GROUP = os.environ.get("QUEUE_CONSUMER_GROUP", "ocr_worker")  # img:translate:tasks 스트림의 컨슈머 그룹
+QUEUE_READ_BATCH = int(os.environ.get("QUEUE_READ_BATCH", "8"))  # 한 번에 가져오는 최대 작업 수 (남은 처리 용량 이내)
+QUEUE_CLAIM_IDLE_MS = int(os.environ.get("QUEUE_CLAIM_IDLE_MS", "120000"))  # 이 시간 이상 ack되지 않은 작업은 죽은 워커의 것으로 보고 다시 가져옴(ms)
+QUEUE_MAX_DELIVERIES = int(os.environ.get("QUEUE_MAX_DELIVERIES", "3"))  # 최대 전달 횟수 (넘으면 ERROR_QUEUE로 dead-letter)
+RESULT_PUSH_BATCH = int(os.environ.get("RESULT_PUSH_BATCH", "64"))  # 결과/에러 푸시를 파이프라인 한 번으로 묶는 최대 개수
+RESULT_PUSH_DELAY_MS = float(os.environ.get("RESULT_PUSH_DELAY_MS", "2"))  # 첫 푸시 후 묶음을 보내기까지 기다리는 최대 시간(ms)
@@ -0,0 +1,103 @@
+import io
+import logging
+from typing import Tuple, Optional
+
+import cv2
+import numpy as np
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# cv2.imdecode 축소 디코딩 플래그 (JPEG은 DCT 단계에서 축소되어 전체 해상도로 풀지 않음)
+_REDUCED_FLAGS = {
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8
+}
+
+# EXIF 방향 값 중 가로/세로가 바뀌는 값 (90/270도 회전)
+_TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
+
+
+def _header_size(image_bytes: bytes) -> Optional[Tuple[int, int]]:
+    """헤더만 읽어 EXIF 방향을 반영한 (너비, 높이)를 반환합니다 (읽을 수 없으면 None)."""
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as image:
+            width, height = image.size
+            orientation = image.getexif().get(0x0112, 1)
+    except Exception:
+        return None
+    if orientation in _TRANSPOSED_ORIENTATIONS:
+        return height, width
+    return width, height
+
+
+def reduction_factor(width: int, height: int, max_side: int) -> int:
+    """긴 변이 max_side 아래로 내려가지 않는 가장 큰 축소 배율(1, 2, 4, 8)을 고릅니다."""
+    for factor in (8, 4, 2):
+        if max(width, height) // factor >= max_side:
+            return factor
+    return 1
+
+
+def _decode_with_pil(image_bytes: bytes, factor: int) -> np.ndarray:
+    """cv2가 읽지 못하는 형식(GIF 등)을 PIL로 디코딩합니다. 애니메이션은 첫 프레임만 사용합니다."""
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        if factor > 1 and image.format == "JPEG":
+            # JPEG draft 모드: 디코더가 1/2, 1/4, 1/8 크기로 바로 디코딩
+            image.draft("RGB", (image.size[0] // factor, image.size[1] // factor))
+        image = ImageOps.exif_transpose(image)
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        img_array = cv2.cvtColor(np.asarray(image), cv2.COLOR_RGB2BGR)
+    if factor > 1:
+        height, width = img_array.shape[:2]
+        target = (-(-width // factor), -(-height // factor))
+        if target != (width, height):
+            img_array = cv2.resize(img_array, target, interpolation=cv2.INTER_AREA)
+    return img_array
+
+
+def decode_image(image_bytes: bytes, max_side: int = 0) -> Tuple[np.ndarray, Tuple[float, float]]:
+    """
+    다운로드한 이미지 바이트를 디스크를 거치지 않고 BGR NumPy 배열로 디코딩합니다.
+
+    cv2.imdecode(JPEG/PNG/WebP/BMP)를 먼저 시도하고, 실패하면 PIL(GIF 등)로 디코딩합니다.
+    operate_worker의 cv2.imdecode와 같은 방향이 되도록 EXIF 방향을 반영합니다.
+    max_side가 주어지면 긴 변이 max_side 이상으로 남는 범위에서 1/2, 1/4, 1/8로 축소 디코딩합니다.
+    CPU를 오래 쓰므로 이벤트 루프가 아닌 스레드 풀에서 호출해야 합니다.
+
+    Returns:
+        (BGR 이미지, (x 배율, y 배율)) - 배율은 원본 좌표 = 디코딩 좌표 * 배율 (축소하지 않았으면 1.0)
+
+    Raises:
+        ValueError: 어떤 디코더로도 읽을 수 없는 경우.
+    """
+    original_size = _header_size(image_bytes) if max_side > 0 else None
+    factor = reduction_factor(*original_size, max_side) if original_size else 1
+
+    buffer = np.frombuffer(image_bytes, dtype=np.uint8)
+    img_array = cv2.imdecode(buffer, _REDUCED_FLAGS.get(factor, cv2.IMREAD_COLOR)) if buffer.size else None
+    if img_array is None:
+        try:
+            img_array = _decode_with_pil(image_bytes, factor)
+        except Exception as e:
+            raise ValueError(f"Unsupported or corrupt image data ({len(image_bytes)} bytes): {e}")
+
+    if factor == 1 or original_size is None:
+        return img_array, (1.0, 1.0)
+    height, width = img_array.shape[:2]
+    scale = (original_size[0] / width, original_size[1] / height)
+    logger.debug(f"Decoded at 1/{factor}: {original_size} -> {(width, height)}")
+    return img_array, scale
+
+
+def scale_ocr_result(ocr_result: list, scale: Tuple[float, float]) -> list:
+    """축소 디코딩한 이미지의 OCR 박스 좌표를 원본 이미지 좌표로 되돌립니다."""
+    if scale == (1.0, 1.0):
+        return ocr_result
+    scale_x, scale_y = scale
+    return [
+        [[[x * scale_x, y * scale_y] for x, y in box], text_and_score]
+        for box, text_and_score in ocr_result
+    ]
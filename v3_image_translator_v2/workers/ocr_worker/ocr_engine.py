@@ -0,0 +1,333 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+import concurrent.futures
+from typing import List, Tuple, Dict, Any, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def group_by_shape(shapes: Sequence[Tuple[int, int]], max_batch: int, max_padding: float) -> List[List[int]]:
+    """
+    검출 입력 크기(높이, 너비) 목록을 비슷한 크기끼리 묶은 인덱스 그룹 목록으로 나눕니다.
+
+    그룹은 가장 큰 높이/너비로 패딩되어 한 번에 추론되므로, 패딩으로 늘어나는 픽셀이
+    실제 픽셀의 max_padding 비율을 넘지 않는 동안만 (면적 순으로) 이어 붙입니다.
+    """
+    order = sorted(range(len(shapes)), key=lambda i: (shapes[i][0] * shapes[i][1], shapes[i]))
+    groups: List[List[int]] = []
+    current: List[int] = []
+    for index in order:
+        candidate = current + [index]
+        padded_h = max(shapes[i][0] for i in candidate)
+        padded_w = max(shapes[i][1] for i in candidate)
+        content = sum(shapes[i][0] * shapes[i][1] for i in candidate)
+        if current and (len(candidate) > max_batch or len(candidate) * padded_h * padded_w > content * (1 + max_padding)):
+            groups.append(current)
+            candidate = [index]
+        current = candidate
+    if current:
+        groups.append(current)
+    return groups
+
+
+class PaddleOCRBatchRunner:
+    """
+    PaddleOCR 2.x 모델의 검출기/인식기를 직접 호출해 여러 이미지를 한 번에 처리합니다.
+
+    - 검출: 전처리된 입력을 비슷한 크기끼리 묶고 패딩해 predictor를 배치로 한 번 실행한 뒤,
+      이미지별로 패딩을 잘라낸 확률 맵에서 박스를 추출합니다.
+    - 인식: 배치에 속한 모든 이미지의 텍스트 crop을 모아 인식기에 한 번에 넘깁니다
+      (인식기가 rec_batch_num 단위로 나눠 추론).
+    결과 형식은 ocr_model.ocr(img, True)[0]과 같습니다. 배치 검출을 쓸 수 없는 모델
+    (ONNX, DB 외 알고리즘)은 이미지별 ocr() 호출로 처리합니다.
+    전용 추론 스레드 하나에서만 호출해야 합니다 (predictor는 스레드 안전하지 않음).
+    """
+
+    def __init__(self, model, max_padding: float = 0.3, max_det_batch: int = 8):
+        """
+        Args:
+            model: PaddleOCR 인스턴스
+            max_padding: 같은 검출 배치로 묶을 때 허용하는 패딩 픽셀 비율
+            max_det_batch: 검출 배치 하나의 최대 이미지 수
+        """
+        self.model = model
+        self.detector = model.text_detector
+        self.recognizer = model.text_recognizer
+        self.classifier = model.text_classifier if getattr(model, "use_angle_cls", False) else None
+        self.drop_score = model.drop_score
+        self.max_padding = max_padding
+        self.max_det_batch = max(1, max_det_batch)
+        self.poly_boxes = getattr(model.args, "det_box_type", "quad") == "poly"
+        self.batched_detection = (
+            not getattr(self.detector, "use_onnx", False)
+            and getattr(self.detector, "det_algorithm", "DB") in ("DB", "DB++")
+        )
+        try:
+            # paddleocr 패키지가 sys.path에 추가한 내부 모듈 (PaddleOCR 인스턴스가 있으면 이미 로드됨)
+            from ppocr.data import transform
+            from tools.infer.predict_system import sorted_boxes
+            from tools.infer.utility import get_rotate_crop_image
+            self._transform = transform
+            self._sorted_boxes = sorted_boxes
+            self._crop = get_rotate_crop_image
+            if self.poly_boxes:
+                from tools.infer.utility import get_minarea_rect_crop
+                self._crop = get_minarea_rect_crop
+        except ImportError as e:
+            logger.warning(f"PaddleOCR internals not importable ({e})")
+            self.batched_detection = False
+        if not self.batched_detection:
+            logger.warning("Batched detection is not supported for this model, falling back to per-image ocr()")
+
+        # 지표
+        self.det_batches = 0
+        self.det_images = 0
+        self.rec_crops = 0
+        self.det_time = 0.0
+        self.rec_time = 0.0
+
+    def _detect_group(self, images: List[np.ndarray], inputs: List[np.ndarray], shape_lists: List[np.ndarray]) -> List[np.ndarray]:
+        padded_h = max(x.shape[1] for x in inputs)
+        padded_w = max(x.shape[2] for x in inputs)
+        batch = np.zeros((len(inputs), inputs[0].shape[0], padded_h, padded_w), dtype=np.float32)
+        for i, x in enumerate(inputs):
+            batch[i, :, :x.shape[1], :x.shape[2]] = x
+
+        self.detector.input_tensor.copy_from_cpu(batch)
+        self.detector.predictor.run()
+        maps = self.detector.output_tensors[0].copy_to_cpu()
+
+        boxes = []
+        for i, (image, x) in enumerate(zip(images, inputs)):
+            # 패딩 영역을 잘라내야 후처리의 원본 크기 환산 비율이 맞음
+            preds = {"maps": maps[i:i + 1, :, :x.shape[1], :x.shape[2]]}
+            points = self.detector.postprocess_op(preds, np.expand_dims(shape_lists[i], axis=0))[0]["points"]
+            if self.poly_boxes:
+                boxes.append(self.detector.filter_tag_det_res_only_clip(points, image.shape))
+            else:
+                boxes.append(self.detector.filter_tag_det_res(points, image.shape))
+        return boxes
+
+    def detect(self, images: List[np.ndarray]) -> List[np.ndarray]:
+        """이미지별 텍스트 박스 배열 목록을 반환합니다."""
+        start = time.perf_counter()
+        inputs, shape_lists = [], []
+        for image in images:
+            x, shape_list = self._transform({"image": image}, self.detector.preprocess_op)
+            inputs.append(x)
+            shape_lists.append(shape_list)
+
+        boxes: List[Optional[np.ndarray]] = [None] * len(images)
+        for group in group_by_shape([x.shape[1:] for x in inputs], self.max_det_batch, self.max_padding):
+            group_boxes = self._detect_group([images[i] for i in group], [inputs[i] for i in group], [shape_lists[i] for i in group])
+            for i, b in zip(group, group_boxes):
+                boxes[i] = b
+            self.det_batches += 1
+        self.det_images += len(images)
+        self.det_time += time.perf_counter() - start
+        return boxes
+
+    def run(self, images: List[np.ndarray]) -> List[list]:
+        """이미지 목록을 OCR하여 이미지별 [[박스 좌표, (텍스트, 점수)], ...] 목록을 반환합니다."""
+        if not self.batched_detection:
+            return [self._ocr_single(image) for image in images]
+
+        crops, owners, owner_boxes = [], [], []
+        for index, (image, dt_boxes) in enumerate(zip(images, self.detect(images))):
+            if dt_boxes is None or len(dt_boxes) == 0:
+                continue
+            for box in self._sorted_boxes(dt_boxes):
+                crops.append(self._crop(image, np.array(box, dtype=np.float32)))
+                owners.append(index)
+                owner_boxes.append(box)
+
+        results: List[list] = [[] for _ in images]
+        if not crops:
+            return results
+
+        start = time.perf_counter()
+        if self.classifier is not None:
+            crops, _, _ = self.classifier(crops)
+        rec_res, _ = self.recognizer(crops)
+        self.rec_time += time.perf_counter() - start
+        self.rec_crops += len(crops)
+
+        for index, box, (text, score) in zip(owners, owner_boxes, rec_res):
+            if score >= self.drop_score:
+                results[index].append([np.asarray(box).tolist(), (text, score)])
+        return results
+
+    def _ocr_single(self, image: np.ndarray) -> list:
+        raw_result = self.model.ocr(image, True)
+        if not raw_result or raw_result[0] is None:
+            return []
+        return raw_result[0]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "det_batches": self.det_batches,
+            "det_images": self.det_images,
+            "avg_det_batch": self.det_images / self.det_batches if self.det_batches else 0.0,
+            "rec_crops": self.rec_crops,
+            "det_time": self.det_time,
+            "rec_time": self.rec_time
+        }
+
+
+class OCREngine:
+    """
+    OCR 추론을 전용 스레드에서 실행하는 배치 엔진.
+
+    이벤트 루프는 이미지를 제한된 크기의 입력 큐에 넣고 Future를 기다리기만 하므로
+    Redis 수신/다운로드가 추론과 독립적으로 진행됩니다. 추론 스레드는 첫 이미지가 들어오면
+    batch_wait 동안 max_batch_images까지 더 모아 runner.run()으로 한 번에 처리합니다.
+    배치 처리가 실패하거나 결과 수가 입력 수와 다르면 이미지별로 다시 실행해 문제 이미지의 Future에만 예외를 전달합니다.
+    close() 이후의 제출은 RuntimeError로 거부합니다.
+    """
+
+    def __init__(self, runner, max_batch_images: int = 8, batch_wait: float = 0.02, queue_size: int = 32):
+        """
+        Args:
+            runner: run(images) -> 이미지별 OCR 결과 목록을 제공하는 객체 (PaddleOCRBatchRunner)
+            max_batch_images: 한 번에 처리할 최대 이미지 수
+            batch_wait: 첫 이미지 이후 배치를 채우기 위해 기다리는 최대 시간 (초)
+            queue_size: 입력 큐 최대 크기 (가득 차면 submit이 대기)
+        """
+        self.runner = runner
+        self.max_batch_images = max(1, max_batch_images)
+        self.batch_wait = batch_wait
+        self._queue: "queue.Queue[Tuple[np.ndarray, concurrent.futures.Future]]" = queue.Queue(maxsize=max(1, queue_size))
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # 지표
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.images = 0
+        self.failed = 0
+        self.infer_time = 0.0
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="ocr-infer", daemon=True)
+            self._thread.start()
+
+    def _ensure_open(self):
+        if self._stop.is_set():
+            raise RuntimeError("OCR engine is closed")
+
+    def submit(self, image: np.ndarray) -> concurrent.futures.Future:
+        """
+        이미지를 입력 큐에 넣고 OCR 결과를 돌려줄 Future를 반환합니다 (큐가 가득 차면 대기).
+
+        Raises:
+            RuntimeError: close() 이후에 호출한 경우
+        """
+        self._ensure_open()
+        future = concurrent.futures.Future()
+        self._queue.put((image, future))
+        return future
+
+    async def recognize(self, image: np.ndarray) -> list:
+        """이벤트 루프를 막지 않고 이미지를 제출한 뒤 OCR 결과를 기다립니다 (close() 이후에는 RuntimeError)."""
+        self._ensure_open()
+        future = concurrent.futures.Future()
+        try:
+            self._queue.put_nowait((image, future))
+        except queue.Full:
+            await asyncio.get_running_loop().run_in_executor(None, self._queue.put, (image, future))
+        return await asyncio.wrap_future(future)
+
+    def _collect_batch(self) -> List[Tuple[np.ndarray, concurrent.futures.Future]]:
+        try:
+            batch = [self._queue.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.max_batch_images:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run_images(self, images: List[np.ndarray]) -> List[list]:
+        results = self.runner.run(images)
+        if len(results) != len(images):
+            # 결과를 입력과 짝지을 수 없으므로 실패로 처리 (대기 중인 Future가 끝나지 않는 것을 막음)
+            raise ValueError(f"OCR runner returned {len(results)} results for {len(images)} images")
+        return results
+
+    def _run_batch(self, batch: List[Tuple[np.ndarray, concurrent.futures.Future]]):
+        batch = [(image, future) for image, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        start = time.perf_counter()
+        outcomes: List[Tuple[Any, Optional[Exception]]] = []
+        try:
+            outcomes = [(result, None) for result in self._run_images([image for image, _ in batch])]
+        except Exception as e:
+            logger.warning(f"Batched OCR failed for {len(batch)} images, retrying one by one: {e}", exc_info=True)
+            for image, _ in batch:
+                try:
+                    outcomes.append((self._run_images([image])[0], None))
+                except Exception as single_error:
+                    outcomes.append((None, single_error))
+        elapsed = time.perf_counter() - start
+
+        # 지표를 먼저 갱신한 뒤 결과를 전달 (Future 완료 시점에 stats()가 이 배치를 포함하도록)
+        with self._stats_lock:
+            self.batches += 1
+            self.images += len(batch)
+            self.failed += sum(1 for _, error in outcomes if error is not None)
+            self.infer_time += elapsed
+        for (_, future), (result, error) in zip(batch, outcomes):
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        logger.debug(f"OCR batch of {len(batch)} images done in {elapsed * 1000:.0f}ms")
+
+    def _loop(self):
+        while not self._stop.is_set() or not self._queue.empty():
+            batch = self._collect_batch()
+            if batch:
+                self._run_batch(batch)
+
+    def stats(self) -> Dict[str, Any]:
+        """처리한 배치/이미지 수, 평균 배치 크기, 이미지당 추론 시간을 반환합니다."""
+        with self._stats_lock:
+            result = {
+                "batches": self.batches,
+                "images": self.images,
+                "failed": self.failed,
+                "queued": self._queue.qsize(),
+                "avg_batch": self.images / self.batches if self.batches else 0.0,
+                "infer_time_per_image": self.infer_time / self.images if self.images else 0.0
+            }
+        if hasattr(self.runner, "stats"):
+            result["runner"] = self.runner.stats()
+        return result
+
+    def close(self, timeout: Optional[float] = None):
+        """큐에 남은 이미지를 모두 처리한 뒤 추론 스레드를 종료합니다."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                return
+            self._thread = None
+        # 종료 직전에 들어와 처리되지 못한 이미지는 실패로 끝냄
+        while True:
+            try:
+                _, future = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if future.set_running_or_notify_cancel():
+                future.set_exception(RuntimeError("OCR engine is closed"))
@@ -5,31 +5,31 @@ import signal
 import time
 import numpy as np
 from paddleocr import PaddleOCR
-import os
 import aiohttp
-import cv2
-from PIL import Image
-import io
-import tempfile
-import shutil
-from collections import deque
-from typing import Dict, List, Optional
-
-from core.redis_client import initialize_redis, close_redis, get_redis_client
+import concurrent.futures
+from typing import Dict, Tuple, Optional
+
+from core.redis_client import initialize_redis, close_redis
 from core.config import (
-    OCR_TASK_QUEUE, LOG_LEVEL, OCR_RESULT_QUEUE, JPEG_QUALITY,
+    OCR_TASK_QUEUE, LOG_LEVEL, OCR_RESULT_QUEUE,
     MAX_CONCURRENT_DOWNLOADS, MAX_PENDING_IMAGES, DOWNLOAD_COOLDOWN,
-    ERROR_QUEUE
+    ERROR_QUEUE, OCR_MAX_BATCH_IMAGES, OCR_BATCH_WAIT_MS, OCR_QUEUE_SIZE,
+    OCR_DET_MAX_PADDING, OCR_REC_BATCH_SIZE, OCR_DET_MAX_SIDE_LEN,
+    OCR_DECODE_WORKERS, OCR_DECODE_DOWNSCALE, IMAGE_HANDOFF_DIR, IMAGE_HANDOFF_TTL,
+    IMAGE_HANDOFF_MAX_MB, IMAGE_HANDOFF_SWEEP_INTERVAL, SUCCESS_QUEUE, IMAGE_DEDUP_ENABLED,
+    IMAGE_DEDUP_TTL, IMAGE_DEDUP_LOCK_TTL, IMAGE_DEDUP_SWEEP_INTERVAL, QUEUE_BACKEND, QUEUE_CONSUMER_GROUP,
+    QUEUE_READ_BATCH, QUEUE_CLAIM_IDLE_MS, QUEUE_MAX_DELIVERIES, RESULT_PUSH_BATCH, RESULT_PUSH_DELAY_MS
 )
+from ocr_engine import OCREngine, PaddleOCRBatchRunner
+from image_decode import decode_image, scale_ocr_result
+from image_handoff import ImageHandoffStore
+from image_dedup import ImageDedup, HIT, WAITING, content_hash, initialize_image_dedup, get_image_dedup
+from task_queue import create_task_queue, QueueMessage, initialize_result_pusher, push_result
 
 # 로깅 설정
 logging.basicConfig(level=LOG_LEVEL)
 logger = logging.getLogger(__name__)
 
-# 임시 디렉토리 생성
-TEMP_DIR = tempfile.mkdtemp()
-logger.info(f"임시 디렉토리 생성: {TEMP_DIR}")
-
 # PaddleOCR 모델 로드 (GPU 사용)
 try:
     logger.info("Loading PaddleOCR model with GPU...")
@@ -37,7 +37,7 @@ try:
         #감지 관련
             det_algorithm="DB", # DB고정임
             det_model_dir="/root/.paddleocr/whl/det/ch/ch_PP-OCRv4_det_infer", # PP-OCRv4 detection 모델 경로
-            det_max_side_len=1504, #  이미지의 긴 변 최대 크기,이 값 이상인 이미지는 비율에 맞춰 축소
+            det_max_side_len=OCR_DET_MAX_SIDE_LEN, #  이미지의 긴 변 최대 크기,이 값 이상인 이미지는 비율에 맞춰 축소
             det_db_thresh=0.3, # DB 바이너리 맵 임계값. 낮게 설정하면(예: 0.2) 더 많은 영역을 검출(기본 0.3)
             det_db_box_thresh=0.5, # DB 박스 임계값. 낮게 설정하면(예: 0.2) 더 많은 영역을 검출(기본 0.5)
             det_db_unclip_ratio=2.0,  # DB 박스 확장 비율.더 큰 박스-하나의 박스에 더 많은 문자 포함(기본 2.0)
@@ -61,7 +61,8 @@ try:
             show_log=True, # 로그 출력 여부 (기본값: True)
             gpu_mem=500, # GPU 메모리 제한 (MB).
             precision='fp32', # 추론 정밀도 (FP32 -> FP16 변경).
-            max_batch_size=10 # 최대 배치 크기
+            max_batch_size=OCR_REC_BATCH_SIZE, # 최대 배치 크기
+            rec_batch_num=OCR_REC_BATCH_SIZE # 인식 배치 크기 (여러 이미지의 crop을 합쳐 추론)
         )
     logger.info("PaddleOCR model loaded successfully.")
 except Exception as e:
@@ -70,96 +71,99 @@ except Exception as e:
     exit(1)
 
 class ImageDownloadManager:
-    def __init__(self):
-        self.pending_images: deque = deque()  # OCR 처리를 대기 중인 이미지 큐
+    """이미지별 다운로드 → OCR → 결과 전송 작업을 관리합니다. 각 이미지는 독립된 asyncio 작업으로 진행됩니다."""
+
+    def __init__(self, ocr_engine: OCREngine, decode_executor: concurrent.futures.ThreadPoolExecutor,
+                 task_queue, result_queue, handoff: Optional[ImageHandoffStore] = None):
+        self.ocr_engine = ocr_engine
+        self.task_queue = task_queue  # 작업을 가져온 큐 (이미지 작업이 끝나면 ack)
+        self.result_queue = result_queue  # OCR 결과를 보내는 큐 (ocr:results)
+        self.decode_executor = decode_executor  # 이미지 디코딩 전용 스레드 풀
+        self.handoff = handoff  # 원본 바이트를 operate_worker에 넘기는 로컬 저장소 (None이면 사용 안 함)
         self.download_semaphore = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)  # 동시 다운로드 제어
-        self.download_tasks: Dict[str, asyncio.Task] = {}  # 진행 중인 다운로드 작업 추적
+        self.download_tasks: Dict[str, asyncio.Task] = {}  # 진행 중인 이미지 작업 (다운로드 + OCR) 추적
+        self.pending_ocr = 0  # 다운로드가 끝나고 OCR 결과를 기다리는 이미지 수
 
-    async def add_download_task(self, session: aiohttp.ClientSession, image_url: str, image_id: str, task_data: dict):
-        """새로운 이미지 다운로드 작업을 추가합니다. 부하 확인은 외부에서 수행됩니다."""
+    async def add_download_task(self, session: aiohttp.ClientSession, image_url: str, image_id: str, task_data: dict,
+                                message: QueueMessage):
+        """새로운 이미지 작업을 추가합니다. 부하 확인은 외부에서 수행됩니다."""
         task = asyncio.create_task(
-            self._download_with_semaphore(session, image_url, image_id, task_data)
+            self._download_and_ocr(session, image_url, image_id, task_data, message)
         )
         self.download_tasks[image_id] = task
 
-    async def _download_with_semaphore(self, session: aiohttp.ClientSession, image_url: str, image_id: str, task_data: dict):
-        """세마포어를 사용하여 이미지를 다운로드하고 결과를 대기열에 추가합니다."""
+    async def _download_and_ocr(self, session: aiohttp.ClientSession, image_url: str, image_id: str, task_data: dict,
+                                message: QueueMessage):
+        """
+        세마포어를 사용하여 이미지를 다운로드한 뒤 OCR 엔진에 넘기고 결과를 전송합니다.
+        결과(OCR/성공/에러)를 보낸 뒤 작업을 ack하므로, 도중에 워커가 죽으면 스트림 백엔드에서 다른 워커가 다시 처리합니다.
+        """
         request_id = task_data.get("request_id", "N/A")
+        dedup_info = None
         try:
-            async with self.download_semaphore:
-                logger.info(f"[{request_id}] Starting image download: {image_id}")
-                img_array = await download_and_prepare_image(session, image_url, image_id)
-                if img_array is not None:
-                    self.pending_images.append((img_array, task_data))
-                    logger.info(f"[{request_id}] Image download complete, added to OCR queue: {image_id}")
-                else:
-                    # 이미지 다운로드 실패 시 에러 큐로 전송
-                    redis_client = get_redis_client()
-                    await enqueue_error_result(redis_client, request_id, image_id, "Image download failed")
-        except Exception as e:
-            logger.error(f"[{request_id}] Image download failed for {image_id}: {e}", exc_info=True)
-            # 다운로드 예외 발생 시 에러 큐로 전송
             try:
-                redis_client = get_redis_client()
-                await enqueue_error_result(redis_client, request_id, image_id, f"Image download error: {str(e)}")
-            except Exception as eq_error:
-                logger.error(f"[{request_id}] Failed to send download error to queue: {eq_error}")
+                async with self.download_semaphore:
+                    # 같은 URL의 이전 결과가 있으면 다운로드 없이 재사용
+                    if await reuse_result_by_url(task_data):
+                        return
+                    logger.info(f"[{request_id}] Starting image download: {image_id}")
+                    image_bytes = await download_image_bytes(session, image_url)
+                    # 같은 내용의 이미지를 이미 처리했거나 다른 요청이 처리 중이면 여기서 끝
+                    handled, dedup_info = await acquire_by_content(task_data, image_bytes)
+                    if handled:
+                        return
+                    img_array, scale, image_handle = await prepare_image(image_bytes, self.decode_executor, self.handoff)
+            except Exception as e:
+                logger.error(f"[{request_id}] Image download failed for {image_id}: {e}", exc_info=True)
+                await release_dedup(dedup_info)
+                # 다운로드 예외 발생 시 에러 큐로 전송
+                try:
+                    await enqueue_error_result(request_id, image_id, f"Image download error: {str(e)}")
+                except Exception as eq_error:
+                    logger.error(f"[{request_id}] Failed to send download error to queue: {eq_error}")
+                return
+
+            if img_array is None:
+                # 이미지 다운로드 실패 시 에러 큐로 전송
+                await release_dedup(dedup_info)
+                await enqueue_error_result(request_id, image_id, "Image download failed")
+                return
+
+            logger.info(f"[{request_id}] Image download complete, submitted to OCR engine: {image_id}")
+            self.pending_ocr += 1
+            try:
+                await process_ocr_task(self.ocr_engine, self.result_queue, img_array, task_data, scale, image_handle, dedup_info)
+            finally:
+                self.pending_ocr -= 1
         finally:
             # 작업이 완료되었으므로 추적에서 제거
             self.download_tasks.pop(image_id, None)
-
-    def get_pending_image(self) -> Optional[tuple]:
-        """대기 중인 이미지를 가져옵니다."""
-        return self.pending_images.popleft() if self.pending_images else None
-
-    def has_pending_images(self) -> bool:
-        """대기 중인 이미지가 있는지 확인합니다."""
-        return len(self.pending_images) > 0
+            try:
+                await self.task_queue.ack(message)
+            except Exception as e:
+                logger.warning(f"[{request_id}] Failed to ack task for {image_id}: {e}")
 
     def get_pending_count(self) -> int:
-        """OCR 대기열에 있는 이미지 개수를 반환합니다."""
-        return len(self.pending_images)
+        """OCR 결과를 기다리는 이미지 개수를 반환합니다."""
+        return self.pending_ocr
 
     def get_downloading_count(self) -> int:
-        """현재 다운로드 중인 작업 개수를 반환합니다."""
-        return len(self.download_tasks)
+        """현재 다운로드 중(또는 다운로드 대기 중)인 작업 개수를 반환합니다."""
+        return len(self.download_tasks) - self.pending_ocr
 
     def get_total_load(self) -> int:
         """총 부하 (OCR 대기 중 + 다운로드 중)를 반환합니다."""
-        return self.get_pending_count() + self.get_downloading_count()
+        return len(self.download_tasks)
 
-def ensure_compatible_format(file_path: str) -> str:
-    """이미지 형식을 확인하고 필요시 JPG로 변환하는 함수"""
-    try:
-        # 파일 확장자 확인
-        _, ext = os.path.splitext(file_path)
-        ext = ext.lower()
-        compatible_exts = ['.jpg', '.jpeg', '.png']
-        
-        # 호환되는 형식이면 원본 경로 반환
-        if ext in compatible_exts:
-            return file_path
-        
-        # 호환되지 않는 형식이면 JPG로 변환
-        logger.debug(f"호환되지 않는 이미지 형식({ext}) 감지, JPG로 변환 중: {file_path}")
-        converted_path = file_path + '.converted.jpg'
-        
-        # PIL로 이미지 열고 JPG로 저장
-        with Image.open(file_path) as img:
-            # RGBA인 경우 RGB로 변환
-            if img.mode in ('RGBA', 'LA', 'P'):
-                img = img.convert('RGB')
-            img.save(converted_path, 'JPEG', quality=JPEG_QUALITY)
-        
-        return converted_path
-        
-    except Exception as e:
-        logger.error(f"이미지 형식 변환 중 오류 ({file_path}): {e}")
-        raise Exception(f"이미지 형식 변환 실패: {e}")
+    async def wait_all(self):
+        """진행 중인 모든 이미지 작업이 끝날 때까지 기다립니다."""
+        tasks = list(self.download_tasks.values())
+        if tasks:
+            logger.info(f"Waiting for {len(tasks)} in-flight images to finish...")
+            await asyncio.gather(*tasks, return_exceptions=True)
 
-async def download_and_prepare_image(session: aiohttp.ClientSession, image_url: str, image_id: str) -> np.ndarray:
-    """이미지 URL에서 이미지를 다운로드하고 전처리한 후 NumPy 배열로 변환합니다."""
-    temp_files = []  # 정리할 임시 파일들
+async def download_image_bytes(session: aiohttp.ClientSession, image_url: str) -> bytes:
+    """이미지 URL에서 원본 바이트를 다운로드합니다 (420 응답은 재시도)."""
     max_retries = 3
     retry_delay = 2  # 초
     
@@ -190,54 +194,119 @@ async def download_and_prepare_image(session: aiohttp.ClientSession, image_url:
                     await asyncio.sleep(wait_time)
                     continue
                 raise
+        return image_bytes
         
-        # 2. 임시 파일로 저장
-        original_path = os.path.join(TEMP_DIR, f"{image_id}")
-        with open(original_path, 'wb') as f:
-            f.write(image_bytes)
-        temp_files.append(original_path)
-        
-        # 3. 호환 가능한 형식으로 변환 (필요한 경우)
-        compatible_path = ensure_compatible_format(original_path)
-        if compatible_path != original_path:
-            temp_files.append(compatible_path)
-        
-        # 4. 최종 이미지를 NumPy 배열로 변환
-        with Image.open(compatible_path) as image:
-            # RGB로 변환 (RGBA인 경우 등)
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
-                
-            # NumPy 배열로 변환 (OpenCV 형식: BGR)
-            img_array = np.array(image)
-            # RGB -> BGR 변환 (PaddleOCR이 BGR을 예상하는 경우)
-            img_array = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
+    except Exception as e:
+        logger.error(f"Failed to download image from {image_url}: {e}", exc_info=True)
+        raise
+
+async def prepare_image(image_bytes: bytes, decode_executor: concurrent.futures.ThreadPoolExecutor,
+                        handoff: Optional[ImageHandoffStore] = None) -> Tuple[np.ndarray, Tuple[float, float], Optional[dict]]:
+    """
+    다운로드한 바이트를 메모리에서 바로 BGR NumPy 배열로 디코딩합니다 (임시 파일 없음).
+    handoff 저장소가 있으면 디코딩과 함께 원본 바이트를 저장해 operate_worker가 다시 다운로드하지 않게 합니다.
+
+    Returns:
+        (이미지 배열, (x 배율, y 배율), 핸드오프 핸들 또는 None)
+        배율은 OCR_DECODE_DOWNSCALE로 축소 디코딩한 경우의 원본 좌표 환산 배율입니다.
+    """
+    try:
+        # 바이트 -> 배열 디코딩 (스레드 풀, 필요 시 검출 입력 크기까지 축소 디코딩)
+        max_side = OCR_DET_MAX_SIDE_LEN if OCR_DECODE_DOWNSCALE else 0
+        loop = asyncio.get_running_loop()
+        decode_future = loop.run_in_executor(decode_executor, decode_image, image_bytes, max_side)
+        if handoff is not None:
+            (img_array, scale), image_handle = await asyncio.gather(
+                decode_future, loop.run_in_executor(decode_executor, handoff.put, image_bytes)
+            )
+        else:
+            (img_array, scale), image_handle = await decode_future, None
         
-        logger.info(f"Image processed successfully. Final shape: {img_array.shape}")
-        return img_array
+        logger.info(f"Image processed successfully. Final shape: {img_array.shape}, scale: {scale}")
+        return img_array, scale, image_handle
         
     except Exception as e:
-        logger.error(f"Failed to download and prepare image from {image_url}: {e}", exc_info=True)
+        logger.error(f"Failed to decode image ({len(image_bytes)} bytes): {e}", exc_info=True)
         raise
-    finally:
-        # 임시 파일들 정리
-        for temp_file in temp_files:
-            try:
-                if os.path.exists(temp_file):
-                    os.remove(temp_file)
-            except Exception as e:
-                logger.warning(f"임시 파일 삭제 실패 ({temp_file}): {e}")
 
-async def enqueue_ocr_result(redis_client, result_data: dict):
-    """OCR 처리 결과를 JSON으로 직렬화하여 Redis 큐에 추가합니다."""
+def _dedup_variant(task_data: dict) -> str:
+    """같은 이미지라도 결과가 달라지는 처리 옵션 (긴 이미지 여부)."""
+    return "long" if task_data.get("is_long") else "short"
+
+async def enqueue_success_result(request_id: str, image_id: str, image_url: str):
+    """재사용한 결과 URL을 성공 큐에 바로 추가합니다 (operate_worker의 성공 메시지와 같은 형식)."""
+    success_data = {
+        "request_id": request_id,
+        "image_id": image_id,
+        "image_url": image_url
+    }
+    await push_result(SUCCESS_QUEUE, json.dumps(success_data).encode('utf-8'))
+    logger.info(f"[{request_id}] Reused deduplicated result for {image_id}: {image_url}")
+
+async def reuse_result_by_url(task_data: dict) -> bool:
+    """다운로드 전 빠른 경로: 같은 URL의 결과가 있으면 성공 큐로 보내고 True를 반환합니다."""
+    dedup = get_image_dedup()
+    if dedup is None or not task_data.get("image_url"):
+        return False
+    version = await dedup.current_version()
+    if version is None:
+        return False
+    result_url = await dedup.lookup_url(version, task_data["image_url"], _dedup_variant(task_data))
+    if not result_url:
+        return False
+    await enqueue_success_result(task_data.get("request_id"), task_data.get("image_id"), result_url)
+    return True
+
+async def acquire_by_content(task_data: dict, image_bytes: bytes) -> Tuple[bool, Optional[dict]]:
+    """
+    원본 바이트 해시로 중복을 확인합니다.
+
+    Returns:
+        (처리 완료 여부, dedup 정보)
+        - 이전 결과가 있으면 성공 큐로 보내고 (True, None)
+        - 다른 요청이 처리 중이면 대기 목록에 등록하고 (True, None)
+        - 이 작업이 leader면 (False, dedup 정보) - ocr:results에 실어 operate_worker가 완료를 기록
+        - 중복 제거를 쓸 수 없으면 (False, None)
+    """
+    dedup = get_image_dedup()
+    if dedup is None:
+        return False, None
+    version = await dedup.current_version()
+    if version is None:
+        return False, None
+    digest = content_hash(image_bytes)
+    variant = _dedup_variant(task_data)
+    request_id = task_data.get("request_id")
+    try:
+        status, result_url = await dedup.acquire(version, digest, variant, task_data)
+    except Exception as e:
+        # Redis 오류 시 중복 제거 없이 그대로 처리
+        logger.warning(f"[{request_id}] Image dedup acquire failed, processing without dedup: {e}")
+        return False, None
+    if status == HIT:
+        await enqueue_success_result(request_id, task_data.get("image_id"), result_url)
+        return True, None
+    if status == WAITING:
+        logger.info(f"[{request_id}] Identical image is already in progress, waiting for its result: {task_data.get('image_id')}")
+        return True, None
+    return False, {"version": version, "hash": digest, "variant": variant, "url": task_data.get("image_url")}
+
+async def release_dedup(dedup_info: Optional[dict]):
+    """leader 작업이 OCR Worker에서 실패하면 잠금을 풀어 대기 요청이 다시 처리되게 합니다."""
+    dedup = get_image_dedup()
+    if dedup is not None and dedup_info:
+        await dedup.release(dedup_info["version"], dedup_info["hash"], dedup_info["variant"])
+
+async def enqueue_ocr_result(result_queue, result_data: dict):
+    """OCR 처리 결과를 JSON으로 직렬화하여 결과 큐(ocr:results)에 추가합니다."""
     try:
         result_json = json.dumps(result_data).encode('utf-8')
-        await redis_client.rpush(OCR_RESULT_QUEUE, result_json)
-        logger.info(f"[{result_data.get('request_id')}] OCR result enqueued to {OCR_RESULT_QUEUE} (RPUSH)")
+        await push_result(result_queue, result_json)
+        logger.info(f"[{result_data.get('request_id')}] OCR result enqueued to {OCR_RESULT_QUEUE} ({result_queue.backend})")
     except Exception as e:
         logger.error(f"[{result_data.get('request_id')}] Failed to enqueue OCR result: {e}", exc_info=True)
 
-async def enqueue_error_result(redis_client, request_id: str, image_id: str, error_message: str):
+async def enqueue_error_result(request_id: str, image_id: str, error_message: str):
     """에러 결과를 에러 큐에 추가합니다."""
     try:
         error_data = {
@@ -247,13 +316,15 @@ async def enqueue_error_result(redis_client, request_id: str, image_id: str, err
             "timestamp": time.time()
         }
         error_json = json.dumps(error_data).encode('utf-8')
-        await redis_client.rpush(ERROR_QUEUE, error_json)
+        await push_result(ERROR_QUEUE, error_json)
         logger.info(f"[{request_id}] Error result enqueued to {ERROR_QUEUE}: {error_message}")
     except Exception as e:
         logger.error(f"[{request_id}] Failed to enqueue error result: {e}", exc_info=True)
 
-async def process_ocr_task(img_array: np.ndarray, task_data: dict):
-    """단일 OCR 작업을 처리합니다."""
+async def process_ocr_task(ocr_engine: OCREngine, result_queue, img_array: np.ndarray, task_data: dict,
+                           scale: Tuple[float, float] = (1.0, 1.0), image_handle: Optional[dict] = None,
+                           dedup_info: Optional[dict] = None):
+    """단일 OCR 작업을 처리합니다. 추론은 OCR 엔진 스레드에서 다른 이미지와 함께 배치로 실행됩니다."""
     request_id = task_data.get("request_id")
     image_id = task_data.get("image_id")
     image_url = task_data.get("image_url")
@@ -262,18 +333,12 @@ async def process_ocr_task(img_array: np.ndarray, task_data: dict):
     logger.info(f"[{request_id}] Processing OCR for image: {image_id}")
 
     try:
-        # PaddleOCR 실행
-        loop = asyncio.get_running_loop()
-        raw_result = await loop.run_in_executor(None, ocr_model.ocr, img_array, True)
-
-        # 결과 형식 처리
-        if raw_result is None or not raw_result or raw_result[0] is None:
+        # PaddleOCR 실행 (결과 형식: [[박스 좌표, (텍스트, 점수)], ...])
+        ocr_result = await ocr_engine.recognize(img_array)
+        # 축소 디코딩한 경우 박스를 원본 이미지 좌표로 환산 (operate_worker는 원본 이미지를 사용)
+        ocr_result = scale_ocr_result(ocr_result, scale)
+        if not ocr_result:
             logger.warning(f"[{request_id}] No OCR results found for image {image_id}.")
-            ocr_result = []
-        elif isinstance(raw_result[0], list) and isinstance(raw_result[0][0], list) and isinstance(raw_result[0][0][0], list):
-            ocr_result = raw_result[0]
-        else:
-            ocr_result = raw_result
 
         # 결과 데이터 생성
         result_data = {
@@ -283,28 +348,155 @@ async def process_ocr_task(img_array: np.ndarray, task_data: dict):
             "is_long": is_long,
             "ocr_result": ocr_result
         }
+        if image_handle:
+            # 같은 호스트의 operate_worker가 원본 바이트를 다시 다운로드하지 않도록 핸들 전달
+            result_data["image_handle"] = image_handle
+        if dedup_info:
+            # 이 이미지의 leader 작업: operate_worker가 최종 URL을 기록하고 대기 요청에 전달
+            result_data["dedup"] = dedup_info
 
         # 결과 큐에 저장
-        redis_client = get_redis_client()
-        await enqueue_ocr_result(redis_client, result_data)
+        await enqueue_ocr_result(result_queue, result_data)
 
     except Exception as e:
         logger.error(f"[{request_id}] Error processing OCR task: {e}", exc_info=True)
+        await release_dedup(dedup_info)
         # OCR 처리 실패 시 에러 큐로 전송
         try:
-            redis_client = get_redis_client()
-            await enqueue_error_result(redis_client, request_id, image_id, f"OCR processing error: {str(e)}")
+            await enqueue_error_result(request_id, image_id, f"OCR processing error: {str(e)}")
         except Exception as eq_error:
             logger.error(f"[{request_id}] Failed to send OCR error to queue: {eq_error}")
 
+async def listen_for_tasks(task_queue, session: aiohttp.ClientSession, download_manager: ImageDownloadManager,
+                           stop_event: asyncio.Event):
+    """작업 큐에서 작업을 가져와 이미지 작업으로 넘기는 수신 루프. OCR 처리를 기다리지 않습니다."""
+    while not stop_event.is_set():
+        try:
+            # 1. 부하 확인 (선 상태 확인)
+            current_load = download_manager.get_total_load()
+
+            # 2. 부하에 따라 작업 가져오기 또는 휴식 결정
+            if current_load >= MAX_PENDING_IMAGES:
+                # 부하가 임계치 이상이면 휴식
+                logger.warning(
+                    f"Backpressure: System load ({current_load}, OCR waiting {download_manager.get_pending_count()}) is high. "
+                    f"Pausing task fetching for {DOWNLOAD_COOLDOWN}s."
+                )
+                await asyncio.sleep(DOWNLOAD_COOLDOWN)
+                continue
+
+            # 부하가 낮으면 남은 용량만큼 새로운 작업을 가져옴
+            messages = await task_queue.get(min(MAX_PENDING_IMAGES - current_load, QUEUE_READ_BATCH), block_ms=1000)
+
+            # 3. 가져온 작업을 download_manager에 추가
+            for message in messages:
+                await dispatch_task(task_queue, session, download_manager, message)
+
+        except asyncio.CancelledError:
+            logger.info("Listener loop cancelled.")
+            break
+        except Exception as e:
+            logger.error(f"An error occurred in the listener loop: {e}", exc_info=True)
+            await asyncio.sleep(5)
+
+async def dispatch_task(task_queue, session: aiohttp.ClientSession, download_manager: ImageDownloadManager,
+                        message: QueueMessage):
+    """작업 하나를 이미지 작업으로 넘깁니다. 넘기지 못한 작업은 에러 큐로 보내고 바로 ack합니다."""
+    task_bytes = message.data
+    try:
+        task_data = json.loads(task_bytes.decode('utf-8'))
+        image_url = task_data.get("image_url")
+        image_id = task_data.get("image_id", image_url.split('/')[-1])
+
+        await download_manager.add_download_task(session, image_url, image_id, task_data, message)
+        return
+
+    except json.JSONDecodeError as e:
+        logger.error(f"Failed to decode task JSON: {e}. Raw data: {task_bytes}")
+        # JSON 파싱 실패 시 에러 큐로 전송 (request_id를 알 수 없으므로 N/A로 처리)
+        try:
+            await enqueue_error_result("N/A", "N/A", f"JSON decode error: {str(e)}")
+        except Exception as eq_error:
+            logger.error(f"Failed to send JSON decode error to queue: {eq_error}")
+    except Exception as e:
+        logger.error(f"Error adding download task: {e}", exc_info=True)
+        # 기타 에러 시 에러 큐로 전송
+        try:
+            task_data = json.loads(task_bytes.decode('utf-8'))
+            request_id = task_data.get("request_id", "N/A")
+            image_id = task_data.get("image_id", "N/A")
+            await enqueue_error_result(request_id, image_id, f"Task processing error: {str(e)}")
+        except Exception as eq_error:
+            logger.error(f"Failed to send task error to queue: {eq_error}")
+    await task_queue.ack(message)
+
+async def run_handoff_janitor(handoff: ImageHandoffStore, stop_event: asyncio.Event):
+    """만료되었거나 남겨진(소비되지 않은) 핸드오프 파일을 주기적으로 정리합니다."""
+    loop = asyncio.get_running_loop()
+    while not stop_event.is_set():
+        try:
+            await loop.run_in_executor(None, handoff.sweep)
+        except Exception as e:
+            logger.warning(f"Image handoff sweep failed: {e}")
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=IMAGE_HANDOFF_SWEEP_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+async def run_dedup_sweeper(dedup: ImageDedup, task_queue, stop_event: asyncio.Event):
+    """leader가 끝내지 못한(실패/만료) 중복 이미지의 대기 요청을 작업 큐로 다시 보냅니다."""
+    while not stop_event.is_set():
+        try:
+            version = await dedup.current_version()
+            if version is not None:
+                await dedup.sweep(version, OCR_TASK_QUEUE, SUCCESS_QUEUE, requeue=task_queue.put)
+        except Exception as e:
+            logger.warning(f"Image dedup sweep failed: {e}")
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=IMAGE_DEDUP_SWEEP_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
 async def main():
     """메인 워커 루프"""
     await initialize_redis()
-    redis_client = get_redis_client()
-    logger.info(f"OCR Worker started. Listening to queue: {OCR_TASK_QUEUE}")
+    # 결과/에러 푸시는 동시에 끝난 이미지끼리 모아 파이프라인으로 전송
+    result_pusher = initialize_result_pusher(max_batch=RESULT_PUSH_BATCH, max_delay_ms=RESULT_PUSH_DELAY_MS)
+    # 작업 큐 (스트림 백엔드면 ack 전까지 작업이 남아 죽은 워커의 작업을 다른 워커가 다시 가져감)
+    task_queue = create_task_queue(
+        OCR_TASK_QUEUE, QUEUE_BACKEND, group=QUEUE_CONSUMER_GROUP, claim_idle_ms=QUEUE_CLAIM_IDLE_MS,
+        max_deliveries=QUEUE_MAX_DELIVERIES, dead_letter_queue=ERROR_QUEUE
+    )
+    await task_queue.ensure()
+    result_queue = create_task_queue(OCR_RESULT_QUEUE, QUEUE_BACKEND)
+    logger.info(f"OCR Worker started. Listening to queue: {OCR_TASK_QUEUE} ({QUEUE_BACKEND})")
 
     stop_event = asyncio.Event()
-    download_manager = ImageDownloadManager()
+
+    # OCR 추론 전용 스레드 (검출/인식 배치 처리)
+    ocr_engine = OCREngine(
+        PaddleOCRBatchRunner(ocr_model, max_padding=OCR_DET_MAX_PADDING, max_det_batch=OCR_MAX_BATCH_IMAGES),
+        max_batch_images=OCR_MAX_BATCH_IMAGES,
+        batch_wait=OCR_BATCH_WAIT_MS / 1000,
+        queue_size=OCR_QUEUE_SIZE
+    )
+    ocr_engine.start()
+    decode_executor = concurrent.futures.ThreadPoolExecutor(max_workers=OCR_DECODE_WORKERS, thread_name_prefix="decode")
+    # 같은 호스트의 operate_worker에 원본 바이트 전달 (IMAGE_HANDOFF_DIR 미설정 시 비활성화)
+    handoff = None
+    janitor_task = None
+    if IMAGE_HANDOFF_DIR:
+        handoff = ImageHandoffStore(IMAGE_HANDOFF_DIR, ttl_seconds=IMAGE_HANDOFF_TTL, max_bytes=IMAGE_HANDOFF_MAX_MB * 1024 * 1024)
+        janitor_task = asyncio.create_task(run_handoff_janitor(handoff, stop_event))
+        logger.info(f"Image handoff enabled: {IMAGE_HANDOFF_DIR} (ttl {IMAGE_HANDOFF_TTL}s)")
+    # 같은 원본 이미지는 한 번만 처리 (버전은 operate_worker가 기록)
+    dedup = None
+    dedup_task = None
+    if IMAGE_DEDUP_ENABLED:
+        dedup = initialize_image_dedup(ttl_seconds=IMAGE_DEDUP_TTL, lock_ttl=IMAGE_DEDUP_LOCK_TTL)
+        dedup_task = asyncio.create_task(run_dedup_sweeper(dedup, task_queue, stop_event))
+        logger.info("Image dedup enabled")
+    download_manager = ImageDownloadManager(ocr_engine, decode_executor, task_queue, result_queue, handoff)
 
     def signal_handler():
         logger.info("Stop signal received. Shutting down gracefully...")
@@ -315,79 +507,26 @@ async def main():
         loop.add_signal_handler(sig, signal_handler)
 
     async with aiohttp.ClientSession() as session:
-        while not stop_event.is_set():
-            try:
-                # 1. 부하 확인 (선 상태 확인)
-                current_load = download_manager.get_total_load()
-                task_tuple = None
-
-                # 2. 부하에 따라 작업 가져오기 또는 휴식 결정
-                if current_load >= MAX_PENDING_IMAGES:
-                    # 부하가 임계치 이상이면 휴식
-                    logger.warning(
-                        f"Backpressure: System load ({current_load}) is high. "
-                        f"Pausing task fetching for {DOWNLOAD_COOLDOWN}s."
-                    )
-                    await asyncio.sleep(DOWNLOAD_COOLDOWN)
-                else:
-                    # 부하가 낮으면 Redis에서 새로운 작업을 가져옴
-                    task_tuple = await redis_client.blpop([OCR_TASK_QUEUE], timeout=1)
-
-                if task_tuple:
-                    # 3. 가져온 작업을 download_manager에 추가
-                    list_key, task_bytes = task_tuple
-                    try:
-                        task_data = json.loads(task_bytes.decode('utf-8'))
-                        image_url = task_data.get("image_url")
-                        image_id = task_data.get("image_id", image_url.split('/')[-1])
-                        
-                        await download_manager.add_download_task(session, image_url, image_id, task_data)
-                        
-                    except json.JSONDecodeError as e:
-                        logger.error(f"Failed to decode task JSON: {e}. Raw data: {task_bytes}")
-                        # JSON 파싱 실패 시 에러 큐로 전송 (request_id를 알 수 없으므로 N/A로 처리)
-                        try:
-                            await enqueue_error_result(redis_client, "N/A", "N/A", f"JSON decode error: {str(e)}")
-                        except Exception as eq_error:
-                            logger.error(f"Failed to send JSON decode error to queue: {eq_error}")
-                    except Exception as e:
-                        logger.error(f"Error adding download task: {e}", exc_info=True)
-                        # 기타 에러 시 에러 큐로 전송
-                        try:
-                            task_data = json.loads(task_bytes.decode('utf-8')) if 'task_bytes' in locals() else {}
-                            request_id = task_data.get("request_id", "N/A")
-                            image_id = task_data.get("image_id", "N/A")
-                            await enqueue_error_result(redis_client, request_id, image_id, f"Task processing error: {str(e)}")
-                        except Exception as eq_error:
-                            logger.error(f"Failed to send task error to queue: {eq_error}")
-
-                # 4. 대기 중인 이미지 OCR 처리 (항상 시도)
-                if download_manager.has_pending_images():
-                    img_array, task_data = download_manager.get_pending_image()
-                    if img_array is not None:
-                        await process_ocr_task(img_array, task_data)
-                
-                # 할 일이 없었던 경우 (Redis 큐 비어있고, 처리할 이미지도 없음) CPU 과사용 방지
-                if not task_tuple and not download_manager.has_pending_images():
-                    await asyncio.sleep(0.1)
-
-            except asyncio.CancelledError:
-                logger.info("Main loop cancelled.")
-                break
-            except Exception as e:
-                logger.error(f"An error occurred in the main loop: {e}", exc_info=True)
-                await asyncio.sleep(5)
+        await listen_for_tasks(task_queue, session, download_manager, stop_event)
+        # 수신을 멈춘 뒤 이미 가져온 작업은 끝까지 처리
+        await download_manager.wait_all()
+
+    ocr_engine.close(timeout=30)
+    decode_executor.shutdown(wait=False)
+    logger.info(f"OCR engine stats: {ocr_engine.stats()}")
+    logger.info(f"Task queue stats: {task_queue.stats()}")
+    if janitor_task is not None:
+        await janitor_task
+        logger.info(f"Image handoff stats: {handoff.stats()}")
+    if dedup_task is not None:
+        await dedup_task
+        logger.info(f"Image dedup stats: {dedup.stats()}")
+    await result_pusher.close()
+    logger.info(f"Result pusher stats: {result_pusher.stats()}")
 
     logger.info("Closing Redis connection...")
     await close_redis()
-    
-    # 임시 디렉토리 정리
-    try:
-        shutil.rmtree(TEMP_DIR)
-        logger.info(f"임시 디렉토리 정리 완료: {TEMP_DIR}")
-    except Exception as e:
-        logger.warning(f"임시 디렉토리 정리 실패: {e}")
-    
+
     logger.info("OCR Worker stopped.")
 
 if __name__ == "__main__":
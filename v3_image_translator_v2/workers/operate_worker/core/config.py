@@ -35,6 +35,8 @@ INPAINTING_BATCH_SIZE_LONG = int(os.environ.get("INPAINTING_BATCH_SIZE_LONG", "4
 INPAINTING_LONG_SIZE = (864, 1504)
 # 짧은 이미지 목표 크기 (높이, 너비)
 INPAINTING_SHORT_SIZE = (1024, 1024)
+# 추론 파이프라인 깊이 (배치 N 추론 중 N+1을 준비할 수 있도록 동시에 띄우는 배치 수)
+INFERENCE_PIPELINE_DEPTH = int(os.environ.get("INFERENCE_PIPELINE_DEPTH", "2"))
 
 # === 동시성 제어 설정 ===
 # 동시에 처리할 수 있는 최대 작업 수
@@ -49,6 +51,13 @@ INFERENCE_QUEUE_SIZE_LONG = int(os.environ.get("INFERENCE_QUEUE_SIZE_LONG", "30"
 # 후처리 큐 최대 크기
 POSTPROCESSING_QUEUE_SIZE = int(os.environ.get("POSTPROCESSING_QUEUE_SIZE", "50"))
 
+# === SHM 슬랩 풀 설정 ===
+# 전처리 결과(LaMa 입력)를 미리 할당된 고정 크기 슬롯에 기록할지 여부
+SHM_POOL_ENABLED = os.environ.get("SHM_POOL_ENABLED", "1") == "1"
+# shape별 슬롯 수 (기본값: 인퍼런스 큐 크기 + 처리 중인 배치 2개분). 소진 시 개별 세그먼트로 대체
+SHM_POOL_SLOTS_SHORT = int(os.environ.get("SHM_POOL_SLOTS_SHORT", str(INFERENCE_QUEUE_SIZE_SHORT + 2 * INPAINTING_BATCH_SIZE_SHORT)))
+SHM_POOL_SLOTS_LONG = int(os.environ.get("SHM_POOL_SLOTS_LONG", str(INFERENCE_QUEUE_SIZE_LONG + 2 * INPAINTING_BATCH_SIZE_LONG)))
+
 # === 타임아웃 설정 ===
 # 큐에서 작업을 가져올 때 타임아웃 (초)
 QUEUE_GET_TIMEOUT = float(os.environ.get("QUEUE_GET_TIMEOUT", "2.0"))
@@ -56,6 +65,59 @@ QUEUE_GET_TIMEOUT = float(os.environ.get("QUEUE_GET_TIMEOUT", "2.0"))
 POSTPROCESS_QUEUE_TIMEOUT = float(os.environ.get("POSTPROCESS_QUEUE_TIMEOUT", "2.0"))
 # 배치 수집 타임아웃 (초)
 BATCH_COLLECT_TIMEOUT = float(os.environ.get("BATCH_COLLECT_TIMEOUT", "0.1"))
+# 인퍼런스 큐 최대 대기 시간 SLO (초) - 가장 오래 기다린 작업이 이 시간에 도달하면 부분 배치라도 실행
+BATCH_MAX_QUEUE_DELAY = float(os.environ.get("BATCH_MAX_QUEUE_DELAY", "0.2"))
+# short/long 배치 간 가중 공정성 비율 (처리 이미지 수 기준)
+BATCH_WEIGHT_SHORT = float(os.environ.get("BATCH_WEIGHT_SHORT", "1.0"))
+BATCH_WEIGHT_LONG = float(os.environ.get("BATCH_WEIGHT_LONG", "1.0"))
+
+# === 영역(crop) 인페인팅 설정 ===
+# 전체 이미지 대신 텍스트 주변 영역만 잘라 원본 해상도로 인페인팅할지 여부
+INPAINT_REGION_MODE = os.environ.get("INPAINT_REGION_MODE", "0") == "1"
+# 마스크 주변에 포함할 문맥 여백 (픽셀)
+INPAINT_REGION_MARGIN = int(os.environ.get("INPAINT_REGION_MARGIN", "48"))
+# 영역 크기 정렬 단위 (비슷한 크기의 영역이 같은 배치 shape를 갖도록 올림)
+INPAINT_REGION_ALIGN = int(os.environ.get("INPAINT_REGION_ALIGN", "128"))
+# 영역 한 변의 최대 길이 (초과 시 이 크기로 축소하여 인페인팅)
+INPAINT_REGION_MAX_SIDE = int(os.environ.get("INPAINT_REGION_MAX_SIDE", "1024"))
+# 영역 면적 합이 전체 이미지 인페인팅 면적의 이 비율을 넘으면 전체 이미지 방식 사용
+INPAINT_REGION_MAX_AREA_RATIO = float(os.environ.get("INPAINT_REGION_MAX_AREA_RATIO", "0.8"))
+# 결과를 원본에 붙일 때 마스크 가장자리 블렌딩 폭 (픽셀, 여백보다 작아야 함)
+INPAINT_REGION_FEATHER = int(os.environ.get("INPAINT_REGION_FEATHER", "8"))
+# 영역 입력을 나눌 shape 버킷 목록 (높이x너비, 쉼표 구분) - 배치는 같은 버킷끼리만 만들어짐
+INPAINT_SHAPE_BUCKETS = os.environ.get(
+    "INPAINT_SHAPE_BUCKETS",
+    "128x512,256x256,256x512,512x256,256x1024,512x512,1024x256,512x1024,1024x512,1024x1024"
+)
+# 버킷 배치 하나의 입력 픽셀 예산 (버킷별 배치 크기 = 예산 // 버킷 면적, 기본값: 1024x1024 4장)
+INPAINT_BUCKET_BATCH_PIXELS = int(os.environ.get("INPAINT_BUCKET_BATCH_PIXELS", str(4 * 1024 * 1024)))
+# 버킷별 배치 크기 상한
+INPAINT_BUCKET_MAX_BATCH = int(os.environ.get("INPAINT_BUCKET_MAX_BATCH", "16"))
+# 버킷별 큐 크기 / 가중치
+INFERENCE_QUEUE_SIZE_REGION = int(os.environ.get("INFERENCE_QUEUE_SIZE_REGION", "60"))
+BATCH_WEIGHT_REGION = float(os.environ.get("BATCH_WEIGHT_REGION", "1.0"))
+
+# === 번역 API 클라이언트 설정 ===
+# Gemini 연결 풀 크기 (동시 번역 요청 수 상한, 워커 전체가 하나의 세션을 공유)
+TRANSLATION_MAX_CONNECTIONS = int(os.environ.get("TRANSLATION_MAX_CONNECTIONS", "16"))
+# 유휴 연결 유지 시간 (초) - 다음 요청이 TLS 핸드셰이크 없이 재사용
+TRANSLATION_KEEPALIVE_TIMEOUT = float(os.environ.get("TRANSLATION_KEEPALIVE_TIMEOUT", "60"))
+# 요청 전체 / 연결 수립 타임아웃 (초)
+TRANSLATION_REQUEST_TIMEOUT = float(os.environ.get("TRANSLATION_REQUEST_TIMEOUT", "60"))
+TRANSLATION_CONNECT_TIMEOUT = float(os.environ.get("TRANSLATION_CONNECT_TIMEOUT", "10"))
+# 일시적 오류(연결/타임아웃, 429/5xx, 잘못된 응답) 재시도 횟수
+TRANSLATION_MAX_RETRIES = int(os.environ.get("TRANSLATION_MAX_RETRIES", "3"))
+# 재시도 대기 시간 (초, 지수 증가 + 지터, 최대값까지)
+TRANSLATION_RETRY_BASE_DELAY = float(os.environ.get("TRANSLATION_RETRY_BASE_DELAY", "0.5"))
+TRANSLATION_RETRY_MAX_DELAY = float(os.environ.get("TRANSLATION_RETRY_MAX_DELAY", "8"))
+# 번역 메모리 (원문 정확 일치 캐시: 로컬 LRU + 공유 Redis) 사용 여부
+TRANSLATION_MEMORY_ENABLED = os.environ.get("TRANSLATION_MEMORY_ENABLED", "1") == "1"
+# 번역 메모리 Redis 키 접두사 (키 = 접두사 + 모델/프롬프트 버전 + ":" + 원문 SHA-1)
+TRANSLATION_MEMORY_KEY_PREFIX = "translation_memory:"
+# 프로세스 로컬 LRU 최대 항목 수
+TRANSLATION_MEMORY_LOCAL_SIZE = int(os.environ.get("TRANSLATION_MEMORY_LOCAL_SIZE", "50000"))
+# Redis 항목별 만료 시간 (초, 항목의 마지막 쓰기 기준, 기본 30일)
+TRANSLATION_MEMORY_TTL = int(os.environ.get("TRANSLATION_MEMORY_TTL", str(30 * 24 * 3600)))
 
 # === Rendering Worker 설정 ===
 # 렌더링 작업 큐
@@ -64,8 +126,20 @@ RENDERING_TASKS_QUEUE = "rendering_tasks"
 RENDERING_RESULT_HASH_PREFIX = "rendering_result:"
 # 렌더링 결과 이미지 저장 디렉토리
 RENDERING_OUTPUT_DIR = os.environ.get("RENDERING_OUTPUT_DIR", "/app/output/rendered")
+# 인페인팅 결과(렌더링 대기) 메모리 보관 한도 (MB) - 초과 시 디스크로 내려씀
+INPAINTED_MEMORY_BUDGET_MB = int(os.environ.get("INPAINTED_MEMORY_BUDGET_MB", "2048"))
+# 한도 초과 시 디스크 스필 사용 여부 (0이면 한도와 관계없이 메모리에 보관)
+INPAINTED_SPILL_TO_DISK = os.environ.get("INPAINTED_SPILL_TO_DISK", "1") == "1"
+# 스필 파일 저장 디렉토리
+INPAINTED_SPILL_DIR = os.environ.get("INPAINTED_SPILL_DIR", "/app/output/temp_inpainted")
+# 번역/인페인팅 중 한쪽 결과만 도착한 채 기다리는 최대 시간 (초) - 넘으면 버리고 에러 처리
+RESULT_JOIN_TIMEOUT = float(os.environ.get("RESULT_JOIN_TIMEOUT", "600"))
+# 오래된 부분 결과 정리 주기 (초)
+RESULT_JOIN_SWEEP_INTERVAL = float(os.environ.get("RESULT_JOIN_SWEEP_INTERVAL", "30"))
 # 폰트 파일 경로.... 아니 gmarketSansTTFBold.ttf 개미쳤는데?
 FONT_PATH = os.environ.get("FONT_PATH", "/app/workers/operate_worker/rendering_worker/modules/fonts/GmarketSansTTFBold.ttf")
+# 모든 텍스트를 한 번의 PIL 변환으로 그릴지 여부 ("0"이면 항목마다 이미지 변환하는 기존 방식)
+RENDER_SINGLE_PASS = os.environ.get("RENDER_SINGLE_PASS", "1") == "1"
 # 리사이즈 목표 크기 (높이, 너비) - is_long=false일 때 사용
 RESIZE_TARGET_SIZE = (
     int(os.environ.get("RESIZE_TARGET_HEIGHT", "1024")), 
@@ -85,3 +159,51 @@ USE_FP16 = os.environ.get("USE_FP16", "1") == "1"
 IMAGE_DOWNLOAD_MAX_RETRIES = int(os.environ.get("IMAGE_DOWNLOAD_MAX_RETRIES", "3"))
 # 재시도 간격 (초)
 IMAGE_DOWNLOAD_RETRY_DELAY = int(os.environ.get("IMAGE_DOWNLOAD_RETRY_DELAY", "2"))
+
+# === 원본 이미지 캐시 설정 ===
+# 다운로드 바이트 + 디코딩 배열 캐시 최대 크기 (MB)
+IMAGE_CACHE_MAX_MB = int(os.environ.get("IMAGE_CACHE_MAX_MB", "512"))
+# 항목 최대 수명 (초) - 요청이 끝나지 않아도 이 시간 동안 접근이 없으면 만료
+IMAGE_CACHE_TTL = float(os.environ.get("IMAGE_CACHE_TTL", "300"))
+# 사용하는 요청이 모두 끝난 뒤 유지 시간 (초) - 같은 URL을 쓰는 후속 요청 재사용용
+IMAGE_CACHE_IDLE_TTL = float(os.environ.get("IMAGE_CACHE_IDLE_TTL", "30"))
+
+# === OCR 핸드오프 설정 ===
+# OCR Worker와 공유하는 원본 바이트 디렉토리 (OCR Worker와 같은 값, 비어 있으면 항상 URL로 다운로드)
+IMAGE_HANDOFF_DIR = os.environ.get("IMAGE_HANDOFF_DIR", "")
+
+# === R2 업로드 설정 ===
+# 동시 업로드 수 (전용 업로드 스레드 수 = HTTP 연결 풀 크기, CPU 스레드풀과 분리)
+R2_UPLOAD_MAX_CONCURRENCY = int(os.environ.get("R2_UPLOAD_MAX_CONCURRENCY", "8"))
+# 일시적 오류 시 재시도 횟수
+R2_UPLOAD_MAX_RETRIES = int(os.environ.get("R2_UPLOAD_MAX_RETRIES", "3"))
+# 첫 재시도 대기 시간 (초, 이후 지수 증가)
+R2_UPLOAD_RETRY_BASE_DELAY = float(os.environ.get("R2_UPLOAD_RETRY_BASE_DELAY", "0.5"))
+# 연결/읽기 타임아웃 (초)
+R2_UPLOAD_TIMEOUT = float(os.environ.get("R2_UPLOAD_TIMEOUT", "30"))
+
+# === 이미지 중복 제거 설정 ===
+# 같은 원본 이미지(내용 해시/URL)는 한 번만 처리하고 결과 URL 재사용 (OCR Worker와 같은 값)
+IMAGE_DEDUP_ENABLED = os.environ.get("IMAGE_DEDUP_ENABLED", "1") == "1"
+# 결과 URL 재사용 기간 (초)
+IMAGE_DEDUP_TTL = int(os.environ.get("IMAGE_DEDUP_TTL", str(7 * 24 * 3600)))
+# leader 잠금 만료 시간 (초, OCR Worker와 같은 값)
+IMAGE_DEDUP_LOCK_TTL = int(os.environ.get("IMAGE_DEDUP_LOCK_TTL", "900"))
+# 결과에 영향을 주는 변경(렌더링 코드 등)을 배포할 때 바꾸면 이전 결과를 재사용하지 않음
+IMAGE_DEDUP_VERSION_SALT = os.environ.get("IMAGE_DEDUP_VERSION_SALT", "")
+
+# === 작업 큐 설정 (core/task_queue.py) ===
+# "list"(BLPOP, 기존 방식) 또는 "stream"(Redis Streams 컨슈머 그룹, Redis 6.2 이상). OCR Worker와 같은 값
+QUEUE_BACKEND = os.environ.get("QUEUE_BACKEND", "list")
+# ocr:results 스트림의 컨슈머 그룹
+QUEUE_CONSUMER_GROUP = os.environ.get("QUEUE_CONSUMER_GROUP", "operate_worker")
+# 한 번에 가져오는 최대 작업 수 (동시 처리 슬롯이 남은 만큼만)
+QUEUE_READ_BATCH = int(os.environ.get("QUEUE_READ_BATCH", "8"))
+# 이 시간 이상 ack되지 않은 작업은 죽은 워커의 것으로 보고 다시 가져옴 (ms, 이미지 한 장의 전체 처리 시간보다 길게)
+QUEUE_CLAIM_IDLE_MS = int(os.environ.get("QUEUE_CLAIM_IDLE_MS", "600000"))
+# 최대 전달 횟수 (넘으면 ERROR_QUEUE로 dead-letter)
+QUEUE_MAX_DELIVERIES = int(os.environ.get("QUEUE_MAX_DELIVERIES", "3"))
+# 성공/에러 메시지 푸시를 파이프라인 한 번으로 묶는 최대 개수
+RESULT_PUSH_BATCH = int(os.environ.get("RESULT_PUSH_BATCH", "64"))
+# 첫 푸시 후 묶음을 보내기까지 기다리는 최대 시간 (ms)
+RESULT_PUSH_DELAY_MS = float(os.environ.get("RESULT_PUSH_DELAY_MS", "2"))
@@ -0,0 +1,172 @@
+import threading
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Set
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_image_url(image_url: str) -> str:
+    """캐시 키로 사용할 URL 정규화 (//로 시작하는 경우 https: 추가)"""
+    if image_url.startswith('//'):
+        return 'https:' + image_url
+    return image_url
+
+
+class _CacheEntry:
+    __slots__ = ("image_bytes", "decoded", "size", "expires_at", "request_ids")
+
+    def __init__(self):
+        self.image_bytes: Optional[bytes] = None
+        self.decoded: Optional[np.ndarray] = None
+        self.size = 0
+        self.expires_at = 0.0
+        self.request_ids: Set[str] = set()
+
+
+class ImageCache:
+    """
+    원본 이미지의 인코딩 바이트와 디코딩된 BGR 배열을 함께 보관하는 프로세스 내 LRU 캐시.
+
+    키는 정규화된 이미지 URL이며, 같은 URL을 쓰는 요청(request_id)이 남아 있는 동안은 유지됩니다.
+    요청이 모두 release()되면 idle_ttl 후 만료되고, 크기 한도를 넘으면 사용 중이 아닌 항목부터 제거합니다.
+    다운로드(이벤트 루프)와 디코딩(CPU 스레드풀)에서 동시에 접근하므로 스레드 안전하게 동작합니다.
+    디코딩 배열은 여러 단계가 공유하므로 읽기 전용으로 저장됩니다.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float, idle_ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.idle_ttl = idle_ttl
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._request_urls: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+
+        # 지표
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _get_entry(self, url: str, now: float) -> Optional[_CacheEntry]:
+        entry = self._entries.get(url)
+        if entry is None:
+            return None
+        if entry.expires_at <= now:
+            self._remove(url)
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(url)
+        return entry
+
+    def _remove(self, url: str):
+        entry = self._entries.pop(url)
+        self.total_bytes -= entry.size
+        for request_id in entry.request_ids:
+            if self._request_urls.get(request_id) == url:
+                del self._request_urls[request_id]
+
+    def _update_size(self, entry: _CacheEntry):
+        size = 0
+        if entry.image_bytes is not None:
+            size += len(entry.image_bytes)
+        if entry.decoded is not None:
+            size += entry.decoded.nbytes
+        self.total_bytes += size - entry.size
+        entry.size = size
+
+    def _evict(self, keep_url: str):
+        """크기 한도를 넘으면 사용 중이 아닌 항목부터, 그래도 넘으면 오래된 항목부터 제거합니다."""
+        if self.total_bytes <= self.max_bytes:
+            return
+        for pinned in (False, True):
+            for url in list(self._entries.keys()):
+                if self.total_bytes <= self.max_bytes:
+                    return
+                if url == keep_url or bool(self._entries[url].request_ids) != pinned:
+                    continue
+                self._remove(url)
+                self.evictions += 1
+
+    def _store(self, image_url: str, request_id: Optional[str], image_bytes: Optional[bytes] = None,
+               decoded: Optional[np.ndarray] = None):
+        url = normalize_image_url(image_url)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._get_entry(url, now)
+            if entry is None:
+                entry = _CacheEntry()
+                self._entries[url] = entry
+            if image_bytes is not None:
+                entry.image_bytes = image_bytes
+            if decoded is not None:
+                decoded.flags.writeable = False
+                entry.decoded = decoded
+            if request_id:
+                entry.request_ids.add(request_id)
+                self._request_urls[request_id] = url
+            entry.expires_at = now + self.ttl
+            self._update_size(entry)
+            self._evict(keep_url=url)
+
+    def get_bytes(self, image_url: str, request_id: Optional[str] = None) -> Optional[bytes]:
+        """캐시된 인코딩 바이트를 반환합니다. request_id를 주면 해당 요청이 항목을 사용 중으로 표시됩니다."""
+        return self._lookup(image_url, request_id, "image_bytes")
+
+    def get_decoded(self, image_url: str, request_id: Optional[str] = None) -> Optional[np.ndarray]:
+        """캐시된 디코딩 BGR 배열(읽기 전용)을 반환합니다."""
+        return self._lookup(image_url, request_id, "decoded")
+
+    def _lookup(self, image_url: str, request_id: Optional[str], field: str):
+        url = normalize_image_url(image_url)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._get_entry(url, now)
+            value = getattr(entry, field) if entry is not None else None
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            if request_id:
+                entry.request_ids.add(request_id)
+                self._request_urls[request_id] = url
+            entry.expires_at = now + self.ttl
+            return value
+
+    def put_bytes(self, image_url: str, image_bytes: bytes, request_id: Optional[str] = None):
+        """다운로드한 인코딩 바이트를 저장합니다."""
+        self._store(image_url, request_id, image_bytes=image_bytes)
+
+    def put_decoded(self, image_url: str, decoded: np.ndarray, request_id: Optional[str] = None):
+        """디코딩한 BGR 배열을 저장합니다 (이후 읽기 전용)."""
+        self._store(image_url, request_id, decoded=decoded)
+
+    def release(self, request_id: str):
+        """요청이 끝났음을 알립니다. 항목을 쓰는 요청이 더 없으면 idle_ttl 후 만료됩니다."""
+        now = time.monotonic()
+        with self._lock:
+            url = self._request_urls.pop(request_id, None)
+            entry = self._entries.get(url) if url else None
+            if entry is None:
+                return
+            entry.request_ids.discard(request_id)
+            if not entry.request_ids:
+                entry.expires_at = min(entry.expires_at, now + self.idle_ttl)
+
+    def stats(self) -> Dict[str, Any]:
+        """hit/miss/eviction 등 캐시 지표를 반환합니다."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
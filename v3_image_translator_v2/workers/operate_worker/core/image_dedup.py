@@ -0,0 +1,325 @@
+import json
+import time
+import hashlib
+import logging
+from typing import List, Dict, Any, Optional, Callable, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+from core.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# 결과 (acquire 반환값 종류)
+HIT = "hit"
+LEADER = "leader"
+WAITING = "waiting"
+
+
+def normalize_image_url(image_url: str) -> str:
+    """중복 판단용 URL 정규화: //는 https:로, scheme/host는 소문자로, fragment는 제거합니다 (쿼리는 내용이 바뀔 수 있어 유지)."""
+    if image_url.startswith('//'):
+        image_url = 'https:' + image_url
+    parts = urlsplit(image_url.strip())
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, parts.query, ""))
+
+
+def content_hash(image_bytes: bytes) -> str:
+    return hashlib.sha1(image_bytes).hexdigest()
+
+
+def dedup_version(*parts: Any) -> str:
+    """결과 이미지를 바꾸는 설정(모델, 폰트, 프롬프트 등)으로 캐시 버전을 만듭니다. 하나라도 바뀌면 이전 결과는 재사용하지 않습니다."""
+    payload = json.dumps([str(p) for p in parts], ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:12]
+
+
+class ImageDedup:
+    """
+    같은 이미지(원본 바이트 해시)를 여러 요청이 보낼 때 한 번만 처리하고 결과 URL을 재사용하는 중복 제거 계층.
+
+    - 결과: {접두사}{버전}:hash:{해시}:{변형} -> 최종(R2) URL, {접두사}{버전}:url:{정규화 URL}:{변형} -> 최종 URL (TTL)
+    - single-flight: 처음 온 요청만 잠금(SET NX EX)을 얻어 처리하고(leader), 나머지는 대기 목록에 등록됩니다.
+      leader가 complete()하면 결과를 먼저 저장한 뒤 대기 목록을 LPOP으로 비우며 대기 요청들의 성공 메시지를 만듭니다.
+      대기 요청은 등록 후 결과를 다시 확인해 이미 결과가 있으면 LREM으로 자신을 빼내므로, 각 대기 항목은
+      leader 또는 자기 자신 중 정확히 한쪽에서만 처리됩니다.
+    - leader가 실패하거나 죽으면 잠금이 풀리거나(fail_pending) 만료되고, sweep()이 대기 요청 하나를 작업 큐로
+      다시 보내 새 leader가 되게 합니다. 대기 중인 (해시, 변형) 목록은 sorted set 색인으로 찾으므로 키 스캔이 없습니다.
+    - 버전은 operate_worker가 publish_version()으로 {접두사}version에 기록하고, OCR Worker는 그 값을 읽어 씁니다.
+      버전이 아직 없으면 중복 제거를 건너뜁니다.
+    변형(variant)은 같은 이미지라도 결과가 달라지는 처리 옵션(is_long)입니다.
+    """
+
+    def __init__(
+        self,
+        prefix: str = "dedup:",
+        ttl_seconds: int = 7 * 24 * 3600,
+        lock_ttl: int = 900,
+        version_refresh: float = 30.0,
+        redis_getter: Callable = get_redis_client
+    ):
+        """
+        Args:
+            prefix: Redis 키 접두사
+            ttl_seconds: 결과 매핑 유지 시간 (초)
+            lock_ttl: leader 잠금 만료 시간 (초, 파이프라인 전체 처리 시간보다 길어야 함)
+            version_refresh: OCR Worker가 버전 키를 다시 읽는 주기 (초)
+            redis_getter: 비동기 Redis 클라이언트를 반환하는 함수
+        """
+        self.prefix = prefix
+        self.ttl_seconds = ttl_seconds
+        self.lock_ttl = lock_ttl
+        self.version_refresh = version_refresh
+        self._redis_getter = redis_getter
+        self._version: Optional[str] = None
+        self._version_read_at = 0.0
+        # operate_worker: 처리 중인 leader 작업 {(request_id, image_id): dedup 정보}
+        self._pending: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+        # 지표
+        self.url_hits = 0
+        self.hash_hits = 0
+        self.leaders = 0
+        self.waiters = 0
+        self.fanned_out = 0
+        self.redriven = 0
+        self.errors = 0
+
+    @property
+    def version_key(self) -> str:
+        return f"{self.prefix}version"
+
+    def _key(self, version: str, kind: str, *parts: str) -> str:
+        return f"{self.prefix}{version}:{kind}:" + ":".join(parts)
+
+    def _waiting_index(self, version: str) -> str:
+        return f"{self.prefix}{version}:waiting"
+
+    # === 버전 ===
+
+    async def publish_version(self, version: str):
+        """operate_worker 시작 시 현재 설정 버전을 기록합니다."""
+        await self._redis_getter().set(self.version_key, version.encode("utf-8"))
+        self._version, self._version_read_at = version, time.monotonic()
+        logger.info(f"Image dedup version published: {version}")
+
+    async def current_version(self) -> Optional[str]:
+        """기록된 버전을 (version_refresh 동안 캐시해) 반환합니다. 없거나 읽기 실패 시 None."""
+        now = time.monotonic()
+        if self._version is None or now - self._version_read_at >= self.version_refresh:
+            try:
+                value = await self._redis_getter().get(self.version_key)
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"Image dedup version lookup failed: {e}")
+                return self._version
+            self._version = value.decode("utf-8") if isinstance(value, bytes) else value
+            self._version_read_at = now
+        return self._version
+
+    # === 조회 / single-flight (OCR Worker) ===
+
+    async def _get_str(self, key: str) -> Optional[str]:
+        value = await self._redis_getter().get(key)
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    async def lookup_url(self, version: str, image_url: str, variant: str) -> Optional[str]:
+        """다운로드 전 빠른 경로: 같은 URL의 이전 결과 URL."""
+        try:
+            result = await self._get_str(self._key(version, "url", normalize_image_url(image_url), variant))
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Image dedup URL lookup failed, treating as miss: {e}")
+            return None
+        if result:
+            self.url_hits += 1
+        return result
+
+    async def acquire(self, version: str, digest: str, variant: str, task_data: dict) -> Tuple[str, Optional[str]]:
+        """
+        해시로 이전 결과를 찾고, 없으면 leader 잠금을 시도하며, 실패하면 대기 목록에 등록합니다.
+
+        Returns:
+            (HIT, 결과 URL) / (LEADER, None) / (WAITING, None)
+        """
+        redis_client = self._redis_getter()
+        result_key = self._key(version, "hash", digest, variant)
+        result = await self._get_str(result_key)
+        if result:
+            self.hash_hits += 1
+            return HIT, result
+
+        lock_value = f"{task_data.get('request_id')}:{task_data.get('image_id')}".encode("utf-8")
+        if await redis_client.set(self._key(version, "lock", digest, variant), lock_value, nx=True, ex=self.lock_ttl):
+            self.leaders += 1
+            return LEADER, None
+
+        waiter = json.dumps(task_data, ensure_ascii=False).encode("utf-8")
+        waiters_key = self._key(version, "waiters", digest, variant)
+        await redis_client.rpush(waiters_key, waiter)
+        await redis_client.expire(waiters_key, self.lock_ttl * 4)
+        await redis_client.zadd(self._waiting_index(version), {f"{digest}:{variant}": time.time()})
+
+        # 등록 사이에 leader가 끝났다면 대기 목록을 이미 비웠을 수 있으므로 결과를 다시 확인
+        result = await self._get_str(result_key)
+        if result and await redis_client.lrem(waiters_key, 1, waiter):
+            self.hash_hits += 1
+            return HIT, result
+        self.waiters += 1
+        return WAITING, None
+
+    async def release(self, version: str, digest: str, variant: str):
+        """leader가 처리를 포기할 때 잠금을 풉니다 (대기 요청은 sweep()이 다시 보냄)."""
+        try:
+            await self._redis_getter().delete(self._key(version, "lock", digest, variant))
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Image dedup lock release failed: {e}")
+
+    # === 완료 / 실패 (operate_worker) ===
+
+    def register_pending(self, request_id: str, image_id: str, dedup_info: Optional[dict]):
+        """leader 작업이 operate_worker에 도착하면 완료/실패 시 사용할 dedup 정보를 기억합니다."""
+        if dedup_info and dedup_info.get("version") and dedup_info.get("hash"):
+            self._pending[(request_id, image_id)] = dedup_info
+
+    async def _drain_waiters(self, version: str, digest: str, variant: str) -> List[dict]:
+        redis_client = self._redis_getter()
+        waiters_key = self._key(version, "waiters", digest, variant)
+        drained = []
+        while True:
+            items = await redis_client.lpop(waiters_key, 100)
+            if not items:
+                break
+            for item in items:
+                try:
+                    drained.append(json.loads(item))
+                except (ValueError, TypeError):
+                    logger.warning(f"Dropping malformed dedup waiter entry: {item!r}")
+        await redis_client.zrem(self._waiting_index(version), f"{digest}:{variant}")
+        return drained
+
+    async def _record(self, dedup_info: dict, final_url: str) -> List[dict]:
+        version, digest, variant = dedup_info["version"], dedup_info["hash"], dedup_info.get("variant", "")
+        redis_client = self._redis_getter()
+        encoded = final_url.encode("utf-8")
+        # 결과를 먼저 저장해야 이후 등록하는 대기 요청이 결과를 볼 수 있음
+        await redis_client.set(self._key(version, "hash", digest, variant), encoded, ex=self.ttl_seconds)
+        if dedup_info.get("url"):
+            await redis_client.set(self._key(version, "url", normalize_image_url(dedup_info["url"]), variant), encoded, ex=self.ttl_seconds)
+        await redis_client.delete(self._key(version, "lock", digest, variant))
+        return await self._drain_waiters(version, digest, variant)
+
+    async def complete_pending(self, request_id: str, image_id: str, final_url: str, success_queue: str):
+        """
+        leader 작업이 최종 URL로 끝났을 때 결과를 기록하고, 대기 중이던 요청들에 같은 URL로 성공 메시지를 보냅니다.
+        이 작업이 leader가 아니면 아무것도 하지 않습니다.
+        """
+        dedup_info = self._pending.pop((request_id, image_id), None)
+        if dedup_info is None:
+            return
+        try:
+            waiters = await self._record(dedup_info, final_url)
+            await self.send_success(waiters, final_url, success_queue)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"[{request_id}] Image dedup completion failed: {e}", exc_info=True)
+
+    async def fail_pending(self, request_id: str, image_id: str):
+        """leader 작업이 실패하면 잠금을 풀어 sweep()이 대기 요청을 다시 처리하게 합니다."""
+        dedup_info = self._pending.pop((request_id, image_id), None)
+        if dedup_info is not None:
+            await self.release(dedup_info["version"], dedup_info["hash"], dedup_info.get("variant", ""))
+
+    async def send_success(self, waiters: List[dict], final_url: str, success_queue: str):
+        """대기 요청들에 결과 URL로 성공 메시지를 보냅니다 (일반 성공 메시지와 같은 형식)."""
+        if not waiters:
+            return
+        redis_client = self._redis_getter()
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for waiter in waiters:
+                pipe.rpush(success_queue, json.dumps({
+                    "request_id": waiter.get("request_id"),
+                    "image_id": waiter.get("image_id"),
+                    "image_url": final_url
+                }).encode("utf-8"))
+            await pipe.execute()
+        self.fanned_out += len(waiters)
+        logger.info(f"Image dedup: forwarded shared result to {len(waiters)} waiting requests")
+
+    # === 복구 (OCR Worker janitor) ===
+
+    async def sweep(self, version: str, task_queue: str, success_queue: str, min_age: float = 30.0,
+                    requeue: Optional[Callable] = None) -> int:
+        """
+        잠금이 없어진 (해시, 변형)의 대기 요청을 처리합니다.
+        결과가 있으면 대기 요청에 성공 메시지를 보내고, 없으면(leader 실패/만료) 대기 요청 하나를 작업 큐로 다시 보냅니다.
+        requeue(작업 bytes)가 주어지면 RPUSH 대신 사용합니다 (스트림 작업 큐).
+        다시 보낸 요청 수를 반환합니다.
+        """
+        redis_client = self._redis_getter()
+        index_key = self._waiting_index(version)
+        members = await redis_client.zrangebyscore(index_key, "-inf", time.time() - min_age)
+        redriven = 0
+        for member in members:
+            member = member.decode("utf-8") if isinstance(member, bytes) else member
+            digest, _, variant = member.partition(":")
+            if await redis_client.exists(self._key(version, "lock", digest, variant)):
+                continue
+            result = await self._get_str(self._key(version, "hash", digest, variant))
+            if result:
+                await self.send_success(await self._drain_waiters(version, digest, variant), result, success_queue)
+                continue
+            waiter = await redis_client.lpop(self._key(version, "waiters", digest, variant))
+            if waiter is None:
+                await redis_client.zrem(index_key, member)
+                continue
+            if requeue is not None:
+                await requeue(waiter)
+            else:
+                await redis_client.rpush(task_queue, waiter)
+            # 다시 보낸 요청이 leader가 될 시간을 준 뒤 다음 sweep에서 다시 확인
+            await redis_client.zadd(index_key, {member: time.time()})
+            redriven += 1
+        self.redriven += redriven
+        if redriven:
+            logger.info(f"Image dedup: re-enqueued {redriven} waiting requests whose leader did not finish")
+        return redriven
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": self._version,
+            "url_hits": self.url_hits,
+            "hash_hits": self.hash_hits,
+            "leaders": self.leaders,
+            "waiters": self.waiters,
+            "fanned_out": self.fanned_out,
+            "redriven": self.redriven,
+            "pending": len(self._pending),
+            "errors": self.errors
+        }
+
+
+# 워커 전체에서 공유하는 인스턴스 (initialize_image_dedup()로 생성, 비활성화 시 None)
+_image_dedup: Optional[ImageDedup] = None
+
+
+def initialize_image_dedup(**kwargs) -> ImageDedup:
+    global _image_dedup
+    _image_dedup = ImageDedup(**kwargs)
+    return _image_dedup
+
+
+def get_image_dedup() -> Optional[ImageDedup]:
+    return _image_dedup
+
+
+async def complete_image_dedup(request_id: str, image_id: str, final_url: str, success_queue: str):
+    """성공 메시지를 보낸 곳에서 호출: leader 작업이면 결과를 기록하고 대기 요청에 전달합니다."""
+    if _image_dedup is not None:
+        await _image_dedup.complete_pending(request_id, image_id, final_url, success_queue)
+
+
+async def fail_image_dedup(request_id: str, image_id: str):
+    """에러 메시지를 보낸 곳에서 호출: leader 작업이면 잠금을 풀어 대기 요청이 다시 처리되게 합니다."""
+    if _image_dedup is not None:
+        await _image_dedup.fail_pending(request_id, image_id)
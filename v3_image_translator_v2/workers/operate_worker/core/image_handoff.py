@@ -0,0 +1,170 @@
+import os
+import re
+import time
+import hashlib
+import logging
+import threading
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+_KEY_PATTERN = re.compile(r"^[0-9a-f]{40}$")
+_SUFFIX = ".img"
+_TEMP_SUFFIX = ".tmp"
+
+
+class ImageHandoffStore:
+    """
+    같은 호스트의 워커끼리 원본 이미지 바이트를 넘겨주는 내용 주소(content-addressed) 파일 저장소.
+
+    OCR Worker가 다운로드한 바이트를 SHA-1 이름의 파일로 저장하고 핸들({key, size, expires_at})을
+    ocr:results에 실어 보내면, operate_worker는 같은 디렉토리에서 바이트를 읽어 다시 다운로드하지 않습니다.
+    디렉토리를 tmpfs(/dev/shm, 두 컨테이너 모두 ipc: host)에 두면 공유 메모리로 동작합니다.
+    같은 이미지는 파일 하나를 공유하므로 읽는 쪽은 파일을 지우지 않으며, 정리는 sweep()(janitor)이
+    수정 시각 기준 TTL과 전체 용량 한도로 수행합니다.
+    핸들이 없거나, 만료되었거나, 파일이 이미 지워졌으면 get()은 None을 반환하므로 호출자는 다운로드로 대체합니다.
+    """
+
+    def __init__(self, root: str, ttl_seconds: float = 600.0, max_bytes: int = 1024 * 1024 * 1024):
+        """
+        Args:
+            root: 저장 디렉토리 (생산자/소비자가 같은 경로로 공유)
+            ttl_seconds: 파일 유지 시간 (초, 마지막 저장 기준)
+            max_bytes: 저장소 전체 크기 한도 (넘으면 put()을 건너뛰고 sweep()이 오래된 파일부터 삭제)
+        """
+        self.root = root
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._approx_bytes = 0  # 마지막 sweep 이후 추정 사용량 (put에서 증가)
+
+        # 지표
+        self.stored = 0
+        self.reused = 0
+        self.skipped = 0
+        self.hits = 0
+        self.misses = 0
+        self.swept = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key + _SUFFIX)
+
+    def put(self, image_bytes: bytes) -> Optional[Dict[str, Any]]:
+        """
+        바이트를 저장하고 ocr:results에 실을 핸들을 반환합니다.
+        저장소가 가득 찼거나 쓰기에 실패하면 None (소비자는 URL로 다운로드).
+        """
+        key = hashlib.sha1(image_bytes).hexdigest()
+        path = self._path(key)
+        size = len(image_bytes)
+        try:
+            if os.path.exists(path):
+                # 같은 내용이 이미 있으면 수정 시각만 갱신해 TTL 연장
+                os.utime(path)
+                with self._lock:
+                    self.reused += 1
+            else:
+                with self._lock:
+                    if self._approx_bytes + size > self.max_bytes:
+                        self.skipped += 1
+                        return None
+                    self._approx_bytes += size
+                os.makedirs(self.root, exist_ok=True)
+                # 임시 파일에 쓴 뒤 rename (소비자가 쓰는 중인 파일을 읽지 않도록)
+                temp_path = os.path.join(self.root, f".{key}.{os.getpid()}.{threading.get_ident()}{_TEMP_SUFFIX}")
+                with open(temp_path, "wb") as f:
+                    f.write(image_bytes)
+                os.replace(temp_path, path)
+                with self._lock:
+                    self.stored += 1
+        except OSError as e:
+            logger.warning(f"Image handoff store failed ({self.root}): {e}")
+            with self._lock:
+                self.skipped += 1
+            return None
+        return {"key": key, "size": size, "expires_at": time.time() + self.ttl_seconds}
+
+    def get(self, handle: Optional[Dict[str, Any]]) -> Optional[bytes]:
+        """핸들이 가리키는 바이트를 읽습니다. 잘못된/만료된 핸들이거나 파일이 없으면 None."""
+        try:
+            key = handle["key"]
+            size = int(handle["size"])
+            expires_at = float(handle["expires_at"])
+        except (TypeError, KeyError, ValueError):
+            return None
+        if not isinstance(key, str) or not _KEY_PATTERN.match(key) or expires_at <= time.time():
+            with self._lock:
+                self.misses += 1
+            return None
+        try:
+            with open(self._path(key), "rb") as f:
+                image_bytes = f.read()
+        except OSError:
+            image_bytes = None
+        with self._lock:
+            if image_bytes is None or len(image_bytes) != size:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return image_bytes
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """
+        만료된 파일과 남겨진 임시 파일(이전 프로세스가 쓰다 죽은 경우 등)을 지우고,
+        한도를 넘으면 오래된 파일부터 지웁니다. 삭제한 파일 수를 반환합니다.
+        """
+        now = time.time() if now is None else now
+        try:
+            entries = list(os.scandir(self.root))
+        except FileNotFoundError:
+            return 0
+
+        removed = 0
+        alive = []
+        for entry in entries:
+            if not entry.is_file(follow_symlinks=False) or not entry.name.endswith((_SUFFIX, _TEMP_SUFFIX)):
+                continue
+            try:
+                stat = entry.stat(follow_symlinks=False)
+            except FileNotFoundError:
+                continue
+            if stat.st_mtime + self.ttl_seconds <= now:
+                removed += self._unlink(entry.path)
+            elif entry.name.endswith(_SUFFIX):
+                alive.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in alive)
+        if total > self.max_bytes:
+            for _, size, path in sorted(alive):
+                if total <= self.max_bytes:
+                    break
+                removed += self._unlink(path)
+                total -= size
+
+        with self._lock:
+            self._approx_bytes = total
+            self.swept += removed
+        if removed:
+            logger.debug(f"Image handoff sweep removed {removed} files, {total} bytes remain")
+        return removed
+
+    @staticmethod
+    def _unlink(path: str) -> int:
+        try:
+            os.unlink(path)
+            return 1
+        except FileNotFoundError:
+            return 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "root": self.root,
+                "bytes": self._approx_bytes,
+                "stored": self.stored,
+                "reused": self.reused,
+                "skipped": self.skipped,
+                "hits": self.hits,
+                "misses": self.misses,
+                "swept": self.swept
+            }
@@ -2,9 +2,17 @@ from multiprocessing import shared_memory
 import numpy as np
 import logging
 import uuid
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, Optional
 
-from core.config import SHM_NAME_PREFIX # 경로 수정
+from core.config import (
+    SHM_NAME_PREFIX, # 경로 수정
+    SHM_POOL_ENABLED,
+    SHM_POOL_SLOTS_SHORT,
+    SHM_POOL_SLOTS_LONG,
+    INPAINTING_SHORT_SIZE,
+    INPAINTING_LONG_SIZE
+)
+from core.shm_pool import ShmSlabPool
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +20,75 @@ logger = logging.getLogger(__name__)
 # 실제 프로덕션에서는 더 견고한 관리 메커니즘 필요 (예: Redis)
 _managed_shms = set()
 
+# 전처리 결과(LaMa 입력)용 슬랩 풀 - initialize_shm_pool()로 생성
+_shm_pool: Optional[ShmSlabPool] = None
+
+def initialize_shm_pool() -> Optional[ShmSlabPool]:
+    """LaMa 입력 shape(이미지 + 마스크)별 슬롯을 미리 할당한 풀을 생성합니다."""
+    global _shm_pool
+    if not SHM_POOL_ENABLED:
+        logger.info("SHM pool disabled, using per-task shared memory segments.")
+        return None
+    if _shm_pool is None:
+        slot_specs = []
+        for (h, w), slot_count in ((INPAINTING_SHORT_SIZE, SHM_POOL_SLOTS_SHORT),
+                                   (INPAINTING_LONG_SIZE, SHM_POOL_SLOTS_LONG)):
+            slot_specs.append(((h, w, 3), "uint8", slot_count))  # 전처리된 RGB 이미지
+            slot_specs.append(((h, w), "uint8", slot_count))     # 전처리된 마스크
+        _shm_pool = ShmSlabPool(slot_specs)
+    return _shm_pool
+
+def get_shm_pool() -> Optional[ShmSlabPool]:
+    """초기화된 슬랩 풀을 반환합니다 (비활성화 시 None)."""
+    return _shm_pool
+
+def close_shm_pool():
+    """슬랩 풀의 세그먼트를 모두 해제합니다."""
+    global _shm_pool
+    if _shm_pool is not None:
+        logger.info(f"Closing SHM pool: {_shm_pool.stats()}")
+        _shm_pool.close()
+        _shm_pool = None
+
+def allocate_shm_array(shape: Tuple[int, ...], dtype) -> Tuple[np.ndarray, Dict[str, Any], Optional[shared_memory.SharedMemory]]:
+    """
+    쓰기 가능한 공유 메모리 배열을 할당합니다.
+
+    풀에 맞는 슬롯이 있으면 슬롯 뷰를, 없으면(shape 불일치/풀 소진) 새 세그먼트를 만들어 반환합니다.
+    호출자는 뷰에 직접 결과를 쓴 뒤, 세 번째 반환값(새 세그먼트 핸들)이 있으면 close()해야 합니다.
+
+    Returns:
+        (numpy 뷰, shm_info, SharedMemory 핸들 또는 None)
+    """
+    if _shm_pool is not None:
+        slot = _shm_pool.acquire(shape, dtype)
+        if slot is not None:
+            view, shm_info = slot
+            return view, shm_info, None
+
+    dtype = np.dtype(dtype)
+    size = int(np.prod(shape)) * dtype.itemsize
+    shm_name = f"{SHM_NAME_PREFIX}{uuid.uuid4().hex}"
+    shm = shared_memory.SharedMemory(name=shm_name, create=True, size=size)
+    _managed_shms.add(shm_name)
+    view = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    shm_info = {
+        "shm_name": shm_name,
+        "shape": tuple(shape),
+        "dtype": str(dtype),
+        "size": size
+    }
+    return view, shm_info, shm
+
+def release_shm(shm_info: Dict[str, Any]):
+    """shm_info가 가리키는 공유 메모리를 반납합니다 (풀 슬롯이면 반납, 아니면 unlink)."""
+    if not shm_info or 'shm_name' not in shm_info:
+        return
+    if _shm_pool is not None and _shm_pool.owns(shm_info):
+        _shm_pool.release(shm_info)
+    else:
+        cleanup_shm(shm_info['shm_name'])
+
 def create_shm_from_array(img_array: np.ndarray) -> Dict[str, Any]:
     """NumPy 배열을 공유 메모리에 쓰고, 접근 정보를 반환합니다."""
     try:
@@ -74,11 +151,17 @@ def get_array_from_shm(shm_info: Dict[str, Any]) -> np.ndarray:
     shm_name = shm_info['shm_name']
     shape = tuple(shm_info['shape']) # 리스트를 튜플로 변환
     dtype = np.dtype(shm_info['dtype']) # 문자열을 dtype 객체로 변환
+
+    # 같은 프로세스의 풀 슬롯이면 세그먼트를 다시 열지 않고 뷰만 반환 (close할 핸들 없음)
+    if _shm_pool is not None and _shm_pool.owns(shm_info):
+        return _shm_pool.get_view(shm_info), None
+
     try:
         # 기존 공유 메모리 블록에 연결
         existing_shm = shared_memory.SharedMemory(name=shm_name, create=False)
         # 공유 메모리 버퍼를 사용하여 NumPy 배열 생성 (읽기 전용으로도 가능)
-        img_array = np.ndarray(shape, dtype=dtype, buffer=existing_shm.buf)
+        # 풀 슬롯(다른 프로세스)인 경우 offset 위치에서 배열 구성
+        img_array = np.ndarray(shape, dtype=dtype, buffer=existing_shm.buf, offset=int(shm_info.get('offset', 0)))
 
         # 중요: 워커는 사용 후 반드시 existing_shm.close() 를 호출해야 함
         #       unlink()는 생성한 프로세스(API 서버) 또는 별도 관리자가 담당
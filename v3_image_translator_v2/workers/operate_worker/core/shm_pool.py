@@ -0,0 +1,184 @@
+from multiprocessing import shared_memory
+import threading
+import logging
+import uuid
+from collections import deque
+from typing import Tuple, Dict, Any, Optional, List
+
+import numpy as np
+
+from core.config import SHM_NAME_PREFIX
+
+logger = logging.getLogger(__name__)
+
+# 슬롯 경계 정렬 단위 (페이지 크기)
+_SLOT_ALIGNMENT = 4096
+
+
+def _align(size: int) -> int:
+    return (size + _SLOT_ALIGNMENT - 1) // _SLOT_ALIGNMENT * _SLOT_ALIGNMENT
+
+
+class _SlabClass:
+    """동일한 shape/dtype 슬롯들을 하나의 공유 메모리 세그먼트에 묶어 관리합니다."""
+
+    def __init__(self, shape: Tuple[int, ...], dtype: np.dtype, slot_count: int):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.slot_count = slot_count
+        self.nbytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        self.slot_bytes = _align(self.nbytes)
+
+        # 세그먼트는 한 번만 생성 (이후 shm_open/mmap 없음)
+        self.shm = shared_memory.SharedMemory(
+            name=f"{SHM_NAME_PREFIX}pool_{uuid.uuid4().hex}",
+            create=True,
+            size=self.slot_bytes * slot_count
+        )
+        self._free = deque(range(slot_count))
+        self._in_use = set()
+
+        # 통계
+        self.acquired = 0
+        self.released = 0
+        self.exhausted = 0
+        self.peak_in_use = 0
+
+    def view(self, slot_index: int) -> np.ndarray:
+        return np.ndarray(
+            self.shape, dtype=self.dtype, buffer=self.shm.buf,
+            offset=slot_index * self.slot_bytes
+        )
+
+    def shm_info(self, slot_index: int) -> Dict[str, Any]:
+        # create_shm_from_array와 동일한 키 + 슬롯 위치 정보
+        return {
+            "shm_name": self.shm.name,
+            "shape": self.shape,
+            "dtype": str(self.dtype),
+            "size": self.nbytes,
+            "offset": slot_index * self.slot_bytes,
+            "slot_index": slot_index
+        }
+
+
+class ShmSlabPool:
+    """
+    고정 크기(LaMa 입력 shape) 슬롯을 미리 할당해두고 재사용하는 공유 메모리 풀.
+
+    작업마다 uuid 이름의 세그먼트를 새로 만들고 지우는 대신, 시작 시 shape별로
+    세그먼트를 하나씩 만들어 두고 슬롯 단위로 빌려주고 돌려받습니다.
+    acquire()가 돌려주는 numpy 뷰에 직접 쓰면 GPU 배치가 같은 메모리를 그대로 읽습니다.
+    스레드 풀의 여러 스레드에서 동시에 호출해도 안전합니다.
+    """
+
+    def __init__(self, slot_specs: List[Tuple[Tuple[int, ...], str, int]]):
+        """
+        Args:
+            slot_specs: (shape, dtype, 슬롯 수) 목록
+        """
+        self._lock = threading.Lock()
+        self._classes: Dict[Tuple[Tuple[int, ...], str], _SlabClass] = {}
+        self._by_name: Dict[str, _SlabClass] = {}
+        self.fallbacks = 0
+
+        for shape, dtype, slot_count in slot_specs:
+            if slot_count <= 0:
+                continue
+            key = (tuple(shape), str(np.dtype(dtype)))
+            if key in self._classes:
+                continue
+            slab = _SlabClass(shape, dtype, slot_count)
+            self._classes[key] = slab
+            self._by_name[slab.shm.name] = slab
+            logger.info(
+                f"SHM pool slab created: shape={slab.shape}, dtype={slab.dtype}, "
+                f"slots={slot_count}, total={slab.slot_bytes * slot_count / (1024 * 1024):.1f}MB"
+            )
+
+    def acquire(self, shape: Tuple[int, ...], dtype) -> Optional[Tuple[np.ndarray, Dict[str, Any]]]:
+        """
+        shape/dtype에 맞는 빈 슬롯을 빌려 (쓰기 가능한 뷰, shm_info)를 반환합니다.
+        해당 shape 슬롯이 없거나 모두 사용 중이면 None을 반환합니다.
+        """
+        key = (tuple(shape), str(np.dtype(dtype)))
+        with self._lock:
+            slab = self._classes.get(key)
+            if slab is None:
+                self.fallbacks += 1
+                return None
+            if not slab._free:
+                slab.exhausted += 1
+                self.fallbacks += 1
+                return None
+            slot_index = slab._free.popleft()
+            slab._in_use.add(slot_index)
+            slab.acquired += 1
+            slab.peak_in_use = max(slab.peak_in_use, len(slab._in_use))
+        return slab.view(slot_index), slab.shm_info(slot_index)
+
+    def owns(self, shm_info: Dict[str, Any]) -> bool:
+        """shm_info가 이 풀의 슬롯을 가리키는지 확인합니다."""
+        return (
+            isinstance(shm_info, dict)
+            and "slot_index" in shm_info
+            and shm_info.get("shm_name") in self._by_name
+        )
+
+    def get_view(self, shm_info: Dict[str, Any]) -> np.ndarray:
+        """슬롯의 numpy 뷰를 반환합니다 (복사 없음)."""
+        slab = self._by_name[shm_info["shm_name"]]
+        return slab.view(int(shm_info["slot_index"]))
+
+    def release(self, shm_info: Dict[str, Any]) -> bool:
+        """슬롯을 풀에 반납합니다. 이미 반납된 슬롯이면 False를 반환합니다."""
+        slab = self._by_name.get(shm_info.get("shm_name"))
+        if slab is None:
+            return False
+        slot_index = int(shm_info["slot_index"])
+        with self._lock:
+            if slot_index not in slab._in_use:
+                logger.warning(f"SHM pool slot {shm_info['shm_name']}#{slot_index} released twice")
+                return False
+            slab._in_use.remove(slot_index)
+            slab._free.append(slot_index)
+            slab.released += 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """슬롯 점유율 등 풀 상태를 반환합니다."""
+        with self._lock:
+            slabs = []
+            for slab in self._classes.values():
+                in_use = len(slab._in_use)
+                slabs.append({
+                    "shape": slab.shape,
+                    "dtype": str(slab.dtype),
+                    "slots": slab.slot_count,
+                    "in_use": in_use,
+                    "occupancy": in_use / slab.slot_count,
+                    "peak_in_use": slab.peak_in_use,
+                    "acquired": slab.acquired,
+                    "released": slab.released,
+                    "exhausted": slab.exhausted
+                })
+            return {"slabs": slabs, "fallbacks": self.fallbacks}
+
+    def close(self):
+        """모든 세그먼트를 해제(unlink)합니다 (애플리케이션 종료 시)."""
+        with self._lock:
+            for slab in self._classes.values():
+                if slab._in_use:
+                    logger.warning(
+                        f"SHM pool slab {slab.shape} closed with {len(slab._in_use)} slots still in use"
+                    )
+                try:
+                    slab.shm.close()
+                    slab.shm.unlink()
+                except FileNotFoundError:
+                    pass
+                except BufferError:
+                    # 외부에 남아있는 뷰가 있으면 close 불가 - unlink만 수행
+                    slab.shm.unlink()
+            self._classes.clear()
+            self._by_name.clear()
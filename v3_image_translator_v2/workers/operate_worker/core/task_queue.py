@@ -0,0 +1,473 @@
+import os
+import json
+import time
+import socket
+import asyncio
+import logging
+from typing import List, Dict, Any, Optional, Callable, Tuple, Union
+
+from redis.exceptions import ResponseError
+
+from core.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# 큐 백엔드 종류 (QUEUE_BACKEND 설정값)
+LIST_BACKEND = "list"
+STREAM_BACKEND = "stream"
+
+# 스트림 엔트리에서 작업 JSON을 담는 필드
+DATA_FIELD = "data"
+# XAUTOCLAIM 커서의 처음 위치 (PEL을 끝까지 훑으면 Redis가 이 값을 돌려줌)
+CLAIM_START_ID = "0-0"
+
+
+class QueueMessage:
+    """큐에서 꺼낸 작업 하나. id는 스트림 엔트리 ID (리스트 백엔드는 None), deliveries는 전달 횟수입니다."""
+
+    __slots__ = ("id", "data", "deliveries")
+
+    def __init__(self, id: Optional[bytes], data: bytes, deliveries: int = 1):
+        self.id = id
+        self.data = data
+        self.deliveries = deliveries
+
+    def __repr__(self) -> str:
+        return f"QueueMessage(id={self.id!r}, deliveries={self.deliveries})"
+
+
+class ListTaskQueue:
+    """
+    Redis 리스트 큐 (RPUSH / BLPOP). 기존 방식과 같으며, 꺼내는 순간 큐에서 사라지므로 ack와 재전달이 없습니다.
+    get(count)는 BLMPOP(Redis 7.0 이상) 한 번으로 최대 count개를 가져옵니다.
+    BLMPOP을 지원하지 않는 Redis에서는 BLPOP으로 첫 작업을 기다린 뒤 LPOP count로 이미 쌓인 작업을 함께 가져옵니다.
+    """
+
+    backend = LIST_BACKEND
+
+    def __init__(self, name: str, redis_getter: Callable = get_redis_client):
+        self.name = name
+        self._redis_getter = redis_getter
+        self._multi_pop = True  # BLMPOP 사용 가능 여부 (첫 실패 시 BLPOP + LPOP으로 전환)
+        self.read = 0
+        self.round_trips = 0
+        self.acked = 0
+
+    async def ensure(self):
+        """리스트 큐는 준비할 것이 없습니다."""
+
+    async def put(self, payload: bytes):
+        await self._redis_getter().rpush(self.name, payload)
+
+    def queue_puts(self, pipe, payloads: List[bytes]):
+        """파이프라인에 푸시 명령을 추가합니다 (ResultPusher). 리스트는 RPUSH 한 번에 여러 값을 넣습니다."""
+        pipe.rpush(self.name, *payloads)
+
+    async def get(self, count: int = 1, block_ms: int = 1000) -> List[QueueMessage]:
+        redis_client = self._redis_getter()
+        timeout = max(block_ms, 1) / 1000
+        if self._multi_pop:
+            try:
+                item = await redis_client.blmpop(timeout, 1, self.name, direction="LEFT", count=count)
+            except ResponseError as e:
+                if "unknown command" not in str(e).lower():
+                    raise
+                logger.warning(f"BLMPOP is not supported by this Redis server (< 7.0), using BLPOP + LPOP for {self.name}")
+                self._multi_pop = False
+                return await self.get(count, block_ms)
+            self.round_trips += 1
+            messages = [QueueMessage(None, data) for data in item[1]] if item else []
+        else:
+            item = await redis_client.blpop([self.name], timeout=timeout)
+            self.round_trips += 1
+            if not item:
+                return []
+            messages = [QueueMessage(None, item[1])]
+            if count > 1:
+                rest = await redis_client.lpop(self.name, count - 1)
+                self.round_trips += 1
+                messages.extend(QueueMessage(None, data) for data in rest or [])
+        self.read += len(messages)
+        return messages
+
+    async def ack(self, message: QueueMessage):
+        self.acked += 1
+
+    async def pending(self) -> Dict[str, Any]:
+        return {"backend": self.backend, "queued": await self._redis_getter().llen(self.name)}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend, "queue": self.name, "read": self.read, "round_trips": self.round_trips, "acked": self.acked
+        }
+
+
+class StreamTaskQueue:
+    """
+    Redis Streams 컨슈머 그룹 큐 (XADD / XREADGROUP / XACK, Redis 6.2 이상).
+
+    - 꺼낸 작업은 ack() 전까지 그룹의 PEL(pending entries list)에 남으므로, 처리 중 워커가 죽어도 사라지지 않습니다.
+    - get()은 claim_interval마다 claim_idle_ms 이상 ack되지 않은 엔트리를 XAUTOCLAIM으로 가져와 먼저 돌려줍니다.
+      XAUTOCLAIM이 돌려준 커서에서 다음 검사를 이어가며, PEL을 끝까지 훑을 때까지(커서가 0-0으로 돌아올 때까지)는
+      간격을 기다리지 않고 get()마다 이어서 확인합니다.
+    - 전달 횟수가 max_deliveries를 넘은 엔트리는 dead_letter_queue(리스트)에 에러 메시지로 보내고 ack합니다.
+    - ack()는 XACK 후 XDEL로 엔트리를 지워 XLEN이 남은 작업 수를 나타내게 합니다 (큐 하나에 그룹 하나 전제).
+    컨슈머 이름은 호스트명-PID이므로, 재시작한 워커가 남긴 작업은 claim_idle_ms 후 다른 컨슈머가 가져갑니다.
+    """
+
+    backend = STREAM_BACKEND
+
+    def __init__(
+        self,
+        name: str,
+        group: str,
+        consumer: Optional[str] = None,
+        claim_idle_ms: int = 300000,
+        claim_interval: float = 10.0,
+        max_deliveries: int = 3,
+        dead_letter_queue: Optional[str] = None,
+        redis_getter: Callable = get_redis_client
+    ):
+        """
+        Args:
+            name: 스트림 키
+            group: 컨슈머 그룹 이름 (같은 그룹의 워커들이 작업을 나눠 가짐)
+            consumer: 컨슈머 이름 (기본: 호스트명-PID)
+            claim_idle_ms: 이 시간 이상 ack되지 않은 작업은 죽은 워커의 것으로 보고 다시 가져옴
+            claim_interval: XAUTOCLAIM 확인 간격(초)
+            max_deliveries: 최대 전달 횟수 (넘으면 dead-letter)
+            dead_letter_queue: 전달 횟수를 넘은 작업의 에러 메시지를 보낼 리스트 (None이면 로그만 남기고 버림)
+        """
+        self.name = name
+        self.group = group
+        self.consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+        self.claim_idle_ms = claim_idle_ms
+        self.claim_interval = claim_interval
+        self.max_deliveries = max_deliveries
+        self.dead_letter_queue = dead_letter_queue
+        self._redis_getter = redis_getter
+        self._ready = False
+        self._last_claim = 0.0
+        self._claim_cursor = CLAIM_START_ID  # 다음 XAUTOCLAIM 시작 위치
+        # 통계
+        self.read = 0
+        self.claimed = 0
+        self.acked = 0
+        self.dead_lettered = 0
+
+    async def ensure(self):
+        """스트림과 컨슈머 그룹을 만듭니다 (이미 있으면 그대로 사용)."""
+        try:
+            await self._redis_getter().xgroup_create(self.name, self.group, id="0", mkstream=True)
+            logger.info(f"Created consumer group '{self.group}' on stream {self.name}")
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._ready = True
+
+    async def put(self, payload: bytes):
+        await self._redis_getter().xadd(self.name, {DATA_FIELD: payload})
+
+    def queue_puts(self, pipe, payloads: List[bytes]):
+        """파이프라인에 푸시 명령을 추가합니다 (ResultPusher)."""
+        for payload in payloads:
+            pipe.xadd(self.name, {DATA_FIELD: payload})
+
+    async def get(self, count: int = 1, block_ms: int = 1000) -> List[QueueMessage]:
+        if not self._ready:
+            await self.ensure()
+        messages: List[QueueMessage] = []
+        now = time.monotonic()
+        if self._claim_cursor != CLAIM_START_ID or now - self._last_claim >= self.claim_interval:
+            self._last_claim = now
+            messages = await self._claim_stale(count)
+        if len(messages) < count:
+            try:
+                response = await self._redis_getter().xreadgroup(
+                    self.group, self.consumer, {self.name: ">"}, count=count - len(messages),
+                    # 회수한 작업이 있으면 기다리지 않고 바로 반환
+                    block=None if messages else block_ms
+                )
+            except ResponseError as e:
+                if "NOGROUP" not in str(e):
+                    raise
+                # 스트림이 삭제된 경우: 다음 호출에서 그룹을 다시 만듦
+                logger.warning(f"Consumer group '{self.group}' on {self.name} is missing, recreating")
+                self._ready = False
+                self._claim_cursor = CLAIM_START_ID
+                return messages
+            for _, entries in response or []:
+                for entry_id, fields in entries:
+                    messages.append(QueueMessage(entry_id, _field(fields), 1))
+        self.read += len(messages)
+        return messages
+
+    async def _claim_stale(self, count: int) -> List[QueueMessage]:
+        """claim_idle_ms 이상 ack되지 않은 작업을 이 컨슈머로 가져옵니다. 전달 횟수를 넘은 작업은 dead-letter 처리합니다."""
+        redis_client = self._redis_getter()
+        result = await redis_client.xautoclaim(
+            self.name, self.group, self.consumer, self.claim_idle_ms, start_id=self._claim_cursor, count=count
+        )
+        # 다음 검사 시작 위치 (PEL을 끝까지 훑었으면 Redis가 0-0을 돌려줌)
+        next_id = result[0]
+        self._claim_cursor = next_id.decode("utf-8") if isinstance(next_id, bytes) else next_id
+        # 이미 지워진 엔트리는 (id, None)으로 오며, Redis 7부터는 PEL에서도 자동 제거됨
+        entries = [(entry_id, fields) for entry_id, fields in result[1] if fields]
+        if not entries:
+            return []
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for entry_id, _ in entries:
+                pipe.xpending_range(self.name, self.group, min=entry_id, max=entry_id, count=1)
+            pending = await pipe.execute()
+        messages = []
+        for (entry_id, fields), info in zip(entries, pending):
+            deliveries = info[0]["times_delivered"] if info else 1
+            message = QueueMessage(entry_id, _field(fields), deliveries)
+            if deliveries > self.max_deliveries:
+                await self._dead_letter(message)
+            else:
+                messages.append(message)
+        if messages:
+            self.claimed += len(messages)
+            logger.warning(f"Reclaimed {len(messages)} unacknowledged tasks from {self.name} (idle > {self.claim_idle_ms}ms)")
+        return messages
+
+    async def _dead_letter(self, message: QueueMessage):
+        """전달 횟수를 넘은 작업을 에러 메시지로 바꿔 dead_letter_queue에 넣고 스트림에서 지웁니다."""
+        try:
+            task_data = json.loads(message.data)
+        except (TypeError, ValueError):
+            task_data = {}
+        request_id = task_data.get("request_id", "N/A")
+        error_message = (
+            f"Task was delivered {message.deliveries - 1} times from {self.name} without being completed "
+            f"(max {self.max_deliveries})"
+        )
+        logger.error(f"[{request_id}] {error_message}. Dead-lettering entry {message.id!r}")
+        if self.dead_letter_queue:
+            error_data = {
+                "request_id": request_id,
+                "image_id": task_data.get("image_id", "N/A"),
+                "error_message": error_message,
+                "timestamp": time.time()
+            }
+            await self._redis_getter().rpush(self.dead_letter_queue, json.dumps(error_data).encode('utf-8'))
+        await self._delete(message.id)
+        self.dead_lettered += 1
+
+    async def ack(self, message: QueueMessage):
+        """처리가 끝난(성공/실패 결과를 보낸) 작업을 PEL과 스트림에서 지웁니다."""
+        if message.id is None:
+            return
+        await self._delete(message.id)
+        self.acked += 1
+
+    async def _delete(self, entry_id):
+        async with self._redis_getter().pipeline(transaction=False) as pipe:
+            pipe.xack(self.name, self.group, entry_id)
+            pipe.xdel(self.name, entry_id)
+            await pipe.execute()
+
+    async def pending(self) -> Dict[str, Any]:
+        """그룹 전체와 컨슈머별 처리 중(ack 전) 작업 수, 아직 아무도 가져가지 않은 작업 수를 포함한 현황."""
+        redis_client = self._redis_getter()
+        summary = await redis_client.xpending(self.name, self.group)
+        consumers = {
+            _text(consumer["name"]): int(consumer["pending"]) for consumer in summary.get("consumers") or []
+        }
+        return {
+            "backend": self.backend,
+            "queued": await redis_client.xlen(self.name) - summary["pending"],
+            "pending": summary["pending"],
+            "consumers": consumers
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "queue": self.name,
+            "consumer": self.consumer,
+            "read": self.read,
+            "claimed": self.claimed,
+            "acked": self.acked,
+            "dead_lettered": self.dead_lettered
+        }
+
+
+def _field(fields: Dict) -> Optional[bytes]:
+    # decode_responses=False 클라이언트는 필드 이름도 bytes로 돌려줌
+    return fields.get(DATA_FIELD.encode("utf-8"), fields.get(DATA_FIELD))
+
+
+def _text(value) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+def create_task_queue(name: str, backend: str = LIST_BACKEND, group: Optional[str] = None, **stream_options):
+    """
+    설정된 백엔드의 작업 큐를 만듭니다. 같은 큐의 생산자와 소비자는 같은 백엔드를 써야 합니다.
+
+    Args:
+        name: 큐(리스트 또는 스트림) 키
+        backend: "list" 또는 "stream"
+        group: 스트림 컨슈머 그룹 (생산자만 쓰는 경우 생략 가능)
+        stream_options: StreamTaskQueue 옵션 (리스트 백엔드에서는 redis_getter만 사용)
+    """
+    if backend == STREAM_BACKEND:
+        return StreamTaskQueue(name, group or name, **stream_options)
+    if backend == LIST_BACKEND:
+        return ListTaskQueue(name, redis_getter=stream_options.get("redis_getter", get_redis_client))
+    raise ValueError(f"Unknown queue backend: {backend!r} (expected '{LIST_BACKEND}' or '{STREAM_BACKEND}')")
+
+
+class ResultPusher:
+    """
+    결과/에러 메시지 푸시를 모아 파이프라인 한 번으로 보내는 버퍼 (그룹 커밋).
+
+    - push()는 버퍼에 넣고, 자신이 포함된 flush가 끝날 때까지 기다립니다. 반환 시점에는 Redis에 기록되어 있으므로
+      (실패하면 예외) 호출하는 쪽은 기존 RPUSH와 같이 결과 전송 후 ack 등을 진행하면 됩니다.
+    - 버퍼가 max_batch개가 되거나 첫 푸시 후 max_delay_ms가 지나면 flush합니다. 같은 큐의 메시지는 RPUSH 한 번으로 묶습니다.
+    - 큐별 카운터(pushed, flushes, errors)와 전체 flush 수/최대 배치 크기를 stats()로 제공합니다.
+    """
+
+    def __init__(self, max_batch: int = 64, max_delay_ms: float = 2.0, redis_getter: Callable = get_redis_client):
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000
+        self._redis_getter = redis_getter
+        self._buffer: List[Tuple[Any, bytes, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushing = set()
+        self._queues: Dict[str, Any] = {}
+        # 통계
+        self.flushes = 0
+        self.largest_batch = 0
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def _queue(self, queue: Union[str, Any]):
+        """큐 이름(문자열)은 리스트 큐로 취급합니다."""
+        if not isinstance(queue, str):
+            return queue
+        if queue not in self._queues:
+            self._queues[queue] = ListTaskQueue(queue, redis_getter=self._redis_getter)
+        return self._queues[queue]
+
+    async def push(self, queue: Union[str, Any], payload: bytes):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._buffer.append((self._queue(queue), payload, future))
+        if len(self._buffer) >= self.max_batch:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._start_flush)
+        await future
+
+    def _start_flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._buffer = self._buffer, []
+        if batch:
+            task = asyncio.ensure_future(self._flush(batch))
+            self._flushing.add(task)
+            task.add_done_callback(self._flushing.discard)
+
+    async def _flush(self, batch: List[Tuple[Any, bytes, asyncio.Future]]):
+        # 큐별로 순서를 유지하며 묶기
+        grouped: Dict[str, Tuple[Any, List[bytes]]] = {}
+        for queue, payload, _ in batch:
+            grouped.setdefault(queue.name, (queue, []))[1].append(payload)
+        error = None
+        try:
+            async with self._redis_getter().pipeline(transaction=False) as pipe:
+                for queue, payloads in grouped.values():
+                    queue.queue_puts(pipe, payloads)
+                await pipe.execute()
+        except Exception as e:
+            error = e
+            logger.error(f"Failed to flush {len(batch)} result pushes: {e}")
+        self.flushes += 1
+        self.largest_batch = max(self.largest_batch, len(batch))
+        for name, (_, payloads) in grouped.items():
+            counters = self._counters.setdefault(name, {"pushed": 0, "flushes": 0, "errors": 0})
+            counters["flushes"] += 1
+            if error is None:
+                counters["pushed"] += len(payloads)
+            else:
+                counters["errors"] += len(payloads)
+        for _, _, future in batch:
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(None)
+            else:
+                future.set_exception(error)
+
+    async def close(self):
+        """남은 푸시를 보내고 진행 중인 flush를 기다립니다."""
+        self._start_flush()
+        if self._flushing:
+            await asyncio.gather(*self._flushing, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "flushes": self.flushes,
+            "largest_batch": self.largest_batch,
+            "queues": {name: dict(counters) for name, counters in self._counters.items()}
+        }
+
+
+# 워커 전체에서 공유하는 결과 버퍼 (initialize_result_pusher()로 생성, 없으면 push_result()가 바로 보냄)
+_result_pusher: Optional[ResultPusher] = None
+
+
+def initialize_result_pusher(**kwargs) -> ResultPusher:
+    global _result_pusher
+    _result_pusher = ResultPusher(**kwargs)
+    return _result_pusher
+
+
+def get_result_pusher() -> Optional[ResultPusher]:
+    return _result_pusher
+
+
+async def push_result(queue: Union[str, Any], payload: bytes):
+    """
+    결과/에러 메시지 하나를 큐(이름이면 리스트, 아니면 작업 큐 객체)에 보냅니다.
+    결과 버퍼가 있으면 동시에 들어온 다른 푸시와 묶어 파이프라인으로 보내고, 없으면 바로 보냅니다.
+    """
+    if _result_pusher is not None:
+        await _result_pusher.push(queue, payload)
+    elif isinstance(queue, str):
+        await get_redis_client().rpush(queue, payload)
+    else:
+        await queue.put(payload)
+
+
+# === 여러 단계를 거쳐 끝나는 작업의 ack (operate_worker) ===
+# 작업을 꺼낸 곳과 최종 결과(성공/에러)를 보내는 곳이 다르므로, (request_id, image_id)로 메시지를 기억해 두었다가
+# 결과를 보낸 곳에서 finish_task()로 ack합니다. ack 전에 워커가 죽으면 스트림 백엔드에서 다른 워커가 다시 처리합니다.
+# 값이 없는 id는 에러 경로와 같은 "N/A"로 맞춰, 어느 쪽에서 부르든 같은 키가 되게 합니다.
+_tracked: Dict[Tuple[str, str], List[Tuple[Any, QueueMessage]]] = {}
+
+
+def _tracked_key(request_id: Optional[str], image_id: Optional[str]) -> Tuple[str, str]:
+    return (request_id or "N/A", image_id or "N/A")
+
+
+def track_task(queue, message: QueueMessage, request_id: str, image_id: str):
+    if message.id is not None:
+        _tracked.setdefault(_tracked_key(request_id, image_id), []).append((queue, message))
+
+
+async def finish_task(request_id: str, image_id: str):
+    """성공/에러 메시지를 보낸 곳에서 호출: 이 이미지 작업의 큐 메시지를 ack합니다."""
+    for queue, message in _tracked.pop(_tracked_key(request_id, image_id), []):
+        try:
+            await queue.ack(message)
+        except Exception as e:
+            # ack 실패 시 claim 후 다시 처리될 뿐이므로 결과 전송은 계속 진행
+            logger.warning(f"[{request_id}] Failed to ack task {message.id!r} for {image_id}: {e}")
+
+
+def tracked_count() -> int:
+    return sum(len(messages) for messages in _tracked.values())
@@ -9,6 +9,44 @@ from botocore.exceptions import ClientError
 
 logger = logging.getLogger(__name__)
 
+# 업로드 객체 공통 캐시 헤더 (파일명에 request_id가 들어가므로 변경되지 않음)
+CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def encode_image(image_array: np.ndarray, file_ext: str = '.jpg', quality: int = 90) -> Dict[str, Any]:
+    """
+    이미지 배열을 업로드용 바이트로 인코딩 (CPU 작업)
+
+    Returns:
+        인코딩 결과 딕셔너리 (success, data, content_type, error)
+    """
+    ext = file_ext.lower()
+    if ext in ['.jpg', '.jpeg']:
+        encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), quality]
+        success, encoded_img = cv2.imencode('.jpg', image_array, encode_param)
+        content_type = 'image/jpeg'
+    elif ext == '.png':
+        success, encoded_img = cv2.imencode('.png', image_array)
+        content_type = 'image/png'
+    else:
+        return {
+            "success": False,
+            "error": f"지원하지 않는 파일 형식: {file_ext}"
+        }
+
+    if not success:
+        return {
+            "success": False,
+            "error": "이미지 인코딩 실패"
+        }
+
+    return {
+        "success": True,
+        "data": encoded_img.tobytes(),
+        "content_type": content_type
+    }
+
+
 class R2ImageHosting:
     """R2를 사용한 이미지 호스팅 클래스"""
     
@@ -69,28 +107,13 @@ class R2ImageHosting:
         """
         try:
             # 이미지 인코딩
-            ext = file_ext.lower()
-            if ext in ['.jpg', '.jpeg']:
-                encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), quality]
-                success, encoded_img = cv2.imencode('.jpg', image_array, encode_param)
-                content_type = 'image/jpeg'
-            elif ext == '.png':
-                success, encoded_img = cv2.imencode('.png', image_array)
-                content_type = 'image/png'
-            else:
-                return {
-                    "success": False,
-                    "error": f"지원하지 않는 파일 형식: {file_ext}"
-                }
-            
-            if not success:
-                return {
-                    "success": False,
-                    "error": "이미지 인코딩 실패"
-                }
+            encoded = encode_image(image_array, file_ext, quality)
+            if not encoded["success"]:
+                return encoded
+            content_type = encoded["content_type"]
             
             # 바이트 스트림 생성
-            image_bytes = io.BytesIO(encoded_img.tobytes())
+            image_bytes = io.BytesIO(encoded["data"])
             
             # S3 키 생성
             s3_key = f"{sub_path}/{image_id}{file_ext}"
@@ -103,12 +126,12 @@ class R2ImageHosting:
                 ExtraArgs={
                     'Metadata': metadata or {},
                     'ContentType': content_type,
-                    'CacheControl': 'public, max-age=31536000, immutable'
+                    'CacheControl': CACHE_CONTROL
                 }
             )
             
             # 공개 URL 생성
-            public_url = f"{self.public_url_base.rstrip('/')}/{s3_key}"
+            public_url = self.build_public_url(s3_key)
             
             logger.info(f"이미지 업로드 성공: {image_id} -> {public_url}")
             
@@ -134,6 +157,10 @@ class R2ImageHosting:
                 "error": error_msg
             }
     
+    def build_public_url(self, s3_key: str) -> str:
+        """S3 키의 공개 URL 생성"""
+        return f"{self.public_url_base.rstrip('/')}/{s3_key}"
+    
     def delete_image(self, s3_key: str) -> bool:
         """
         R2에서 이미지 삭제
@@ -0,0 +1,189 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+import concurrent.futures
+from collections import deque
+from typing import Dict, Any, Optional
+
+import boto3
+import numpy as np
+from botocore.config import Config
+from botocore.exceptions import ClientError, BotoCoreError
+
+from hosting.r2hosting import R2ImageHosting, CACHE_CONTROL
+
+logger = logging.getLogger(__name__)
+
+# 재시도하지 않는 클라이언트 오류 코드 외의 ClientError는 일시적 오류로 보고 재시도
+_NON_RETRYABLE_ERROR_CODES = {
+    "AccessDenied", "InvalidAccessKeyId", "SignatureDoesNotMatch", "NoSuchBucket",
+    "InvalidBucketName", "InvalidArgument", "EntityTooLarge", "InvalidRequest"
+}
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, ClientError):
+        code = error.response.get("Error", {}).get("Code", "")
+        status = error.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0)
+        if code in _NON_RETRYABLE_ERROR_CODES:
+            return False
+        return status >= 500 or status in (408, 429) or code in ("SlowDown", "RequestTimeout", "Throttling")
+    # 연결/타임아웃 등 botocore 수준 오류
+    return isinstance(error, BotoCoreError)
+
+
+class R2Uploader:
+    """
+    인코딩된 이미지 바이트를 R2에 올리는 비동기 업로더.
+
+    CPU 스레드풀과 분리된 전용 업로드 스레드(max_concurrency개)와 같은 크기의 HTTP 연결 풀을 사용하므로
+    느린 업로드가 렌더링/전처리 스레드를 점유하지 않습니다.
+    upload_bytes()는 이벤트 루프에서 await하며, 일시적 오류는 지수 백오프(지터 포함)로 재시도합니다.
+    """
+
+    def __init__(
+        self,
+        hosting: R2ImageHosting,
+        max_concurrency: int = 8,
+        max_retries: int = 3,
+        retry_base_delay: float = 0.5,
+        timeout: float = 30.0,
+        s3_client=None
+    ):
+        """
+        Args:
+            hosting: 접속 정보(엔드포인트, 키, 버킷, 공개 URL)를 가진 R2ImageHosting
+            max_concurrency: 동시 업로드 수 (업로드 스레드 수 = 연결 풀 크기)
+            max_retries: 일시적 오류 시 재시도 횟수
+            retry_base_delay: 첫 재시도 대기 시간 (초, 이후 2배씩 증가)
+            timeout: 연결/읽기 타임아웃 (초)
+            s3_client: 직접 지정할 S3 클라이언트 (없으면 hosting 접속 정보로 생성)
+        """
+        self.hosting = hosting
+        self.bucket_name = hosting.bucket_name
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max(0, max_retries)
+        self.retry_base_delay = retry_base_delay
+
+        # 재시도는 이 클래스에서 백오프와 함께 처리하므로 botocore 자체 재시도는 끔
+        self.s3_client = s3_client or boto3.client(
+            's3',
+            endpoint_url=hosting.endpoint_url,
+            aws_access_key_id=hosting.access_key_id,
+            aws_secret_access_key=hosting.secret_access_key,
+            region_name='auto',
+            config=Config(
+                max_pool_connections=self.max_concurrency,
+                connect_timeout=timeout,
+                read_timeout=timeout,
+                retries={"total_max_attempts": 1, "mode": "standard"},
+                tcp_keepalive=True
+            )
+        )
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="r2-upload"
+        )
+
+        # 지표
+        self._stats_lock = threading.Lock()
+        self._latencies = deque(maxlen=1024)
+        self.in_flight = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.retries = 0
+        self.bytes_uploaded = 0
+
+    def _put_object(self, data: bytes, s3_key: str, content_type: str, metadata: Optional[Dict[str, str]]):
+        # 이미지 크기(수 MB 이하)에서는 멀티파트 전송 관리자 없이 단일 PUT이 가장 빠름
+        self.s3_client.put_object(
+            Bucket=self.bucket_name,
+            Key=s3_key,
+            Body=data,
+            ContentType=content_type,
+            CacheControl=CACHE_CONTROL,
+            Metadata=metadata or {}
+        )
+
+    async def upload_bytes(
+        self,
+        data: bytes,
+        image_id: str,
+        sub_path: str = 'translated',
+        file_ext: str = '.jpg',
+        content_type: str = 'image/jpeg',
+        metadata: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        인코딩된 이미지 바이트를 업로드합니다.
+
+        Returns:
+            업로드 결과 딕셔너리 (success, url, s3_key, bucket, error) - R2ImageHosting.upload_image_from_array와 동일
+        """
+        s3_key = f"{sub_path}/{image_id}{file_ext}"
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        with self._stats_lock:
+            self.in_flight += 1
+
+        try:
+            attempt = 0
+            while True:
+                try:
+                    await loop.run_in_executor(
+                        self._executor, self._put_object, data, s3_key, content_type, metadata
+                    )
+                    break
+                except Exception as e:
+                    if attempt >= self.max_retries or not _is_retryable(e):
+                        error_msg = f"R2 업로드 실패 ({type(e).__name__}, {attempt + 1}회 시도): {e}"
+                        logger.error(error_msg)
+                        with self._stats_lock:
+                            self.failed += 1
+                        return {"success": False, "error": error_msg}
+
+                    delay = self.retry_base_delay * (2 ** attempt) * (0.5 + random.random())
+                    attempt += 1
+                    with self._stats_lock:
+                        self.retries += 1
+                    logger.warning(f"R2 업로드 재시도 {attempt}/{self.max_retries} ({s3_key}), {delay:.2f}s 후: {e}")
+                    await asyncio.sleep(delay)
+
+            elapsed = time.perf_counter() - start
+            with self._stats_lock:
+                self.succeeded += 1
+                self.bytes_uploaded += len(data)
+                self._latencies.append(elapsed)
+
+            public_url = self.hosting.build_public_url(s3_key)
+            logger.info(f"이미지 업로드 성공: {image_id} -> {public_url} ({elapsed * 1000:.0f}ms)")
+            return {
+                "success": True,
+                "url": public_url,
+                "s3_key": s3_key,
+                "bucket": self.bucket_name
+            }
+        finally:
+            with self._stats_lock:
+                self.in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """성공/실패/재시도 수와 최근 업로드 지연시간 백분위수(초)를 반환합니다."""
+        with self._stats_lock:
+            latencies = np.array(self._latencies) if self._latencies else None
+            result = {
+                "in_flight": self.in_flight,
+                "succeeded": self.succeeded,
+                "failed": self.failed,
+                "retries": self.retries,
+                "bytes_uploaded": self.bytes_uploaded
+            }
+        if latencies is not None:
+            p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+            result.update({"latency_p50": p50, "latency_p90": p90, "latency_p99": p99, "latency_max": latencies.max()})
+        return result
+
+    def shutdown(self, wait: bool = True):
+        """업로드 스레드를 종료합니다 (진행 중인 업로드는 wait=True면 완료까지 대기)."""
+        self._executor.shutdown(wait=wait)
@@ -3,7 +3,7 @@ import yaml
 import torch
 import numpy as np
 from omegaconf import OmegaConf
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional
 import torchvision.transforms.functional as TF # Normalize 사용 위해 추가
 from tqdm import tqdm # tqdm import 추가
 from torch.cuda.amp import autocast as cuda_autocast # 명시적 import
@@ -33,18 +33,109 @@ def load_lama_model(config_path, checkpoint_path, device):
     model.eval() # 추론 모드로 설정
     return model, train_config
 
+class BatchWorkspace:
+    """
+    고정 (batch, H, W) 배치용으로 한 번만 할당해 재사용하는 입출력 버퍼 묶음.
+
+    - host_image/host_mask: uint8 호스트 버퍼 (CUDA 사용 시 page-locked)
+    - dev_image/dev_mask: uint8 장치 버퍼 (정규화는 장치에서 수행)
+    - host_output: uint8 결과 다운로드 버퍼 (CUDA 사용 시 page-locked)
+    CPU 장치에서는 호스트 버퍼를 그대로 장치 버퍼로 사용합니다.
+    """
+
+    def __init__(self, capacity: int, height: int, width: int, device: torch.device):
+        self.capacity = capacity
+        self.height = height
+        self.width = width
+        self.device = device
+        use_pinned = device.type == 'cuda'
+
+        self.host_image = torch.empty((capacity, height, width, 3), dtype=torch.uint8, pin_memory=use_pinned)
+        self.host_mask = torch.empty((capacity, height, width), dtype=torch.uint8, pin_memory=use_pinned)
+        self.host_output = torch.empty((capacity, height, width, 3), dtype=torch.uint8, pin_memory=use_pinned)
+        # 호스트 버퍼의 numpy 뷰 (복사 없이 직접 기록)
+        self.host_image_np = self.host_image.numpy()
+        self.host_mask_np = self.host_mask.numpy()
+        self.host_output_np = self.host_output.numpy()
+
+        if use_pinned:
+            self.dev_image = torch.empty((capacity, height, width, 3), dtype=torch.uint8, device=device)
+            self.dev_mask = torch.empty((capacity, height, width), dtype=torch.uint8, device=device)
+            # 업로드 전용 스트림 (다른 배치의 추론과 업로드를 겹치기 위함)
+            self.upload_stream = torch.cuda.Stream(device=device)
+        else:
+            self.dev_image = self.host_image
+            self.dev_mask = self.host_mask
+            self.upload_stream = None
+
+
+class StagedBatch:
+    """장치에 올라가 추론만 남은 배치 (stage_batch 결과)."""
+
+    def __init__(self, batch: Dict[str, torch.Tensor], original_sizes: List[Tuple[int, int]],
+                 workspace: BatchWorkspace = None, ready_event=None):
+        self.batch = batch
+        self.original_sizes = original_sizes
+        self.workspace = workspace
+        self.ready_event = ready_event  # 업로드 스트림 완료 이벤트 (CUDA 전용)
+
+
+# (H, W, device, slot) -> BatchWorkspace. 고정 입력 크기(짧은/긴 이미지) x 파이프라인 슬롯 수만큼이면 충분
+_workspaces: Dict[Tuple[int, int, str, int], BatchWorkspace] = {}
+MAX_WORKSPACES = 8
+
+
+def get_batch_workspace(batch_size: int, height: int, width: int, device: torch.device, slot: int = 0) -> BatchWorkspace:
+    """
+    (H, W, 장치, 슬롯)별 워크스페이스를 반환합니다. 배치 크기가 더 크면 새로 할당합니다.
+    파이프라인에서 여러 배치를 동시에 다룰 때는 배치마다 다른 slot을 사용해야 합니다.
+    """
+    key = (height, width, str(device), slot)
+    workspace = _workspaces.get(key)
+    if workspace is None or workspace.capacity < batch_size:
+        if workspace is None and len(_workspaces) >= MAX_WORKSPACES:
+            # 가장 오래된 워크스페이스 제거
+            _workspaces.pop(next(iter(_workspaces)))
+        print(f"배치 워크스페이스 할당: batch={batch_size}, 크기=({height}, {width}), 장치={device}, 슬롯={slot}")
+        workspace = BatchWorkspace(batch_size, height, width, device)
+        _workspaces[key] = workspace
+    return workspace
+
+
+def _write_symmetric_padded(dst: np.ndarray, src: np.ndarray):
+    """src를 dst 좌상단에 쓰고 남는 영역을 np.pad(mode='symmetric')와 같이 채웁니다."""
+    h, w = src.shape[:2]
+    pad_h = dst.shape[0] - h
+    pad_w = dst.shape[1] - w
+    if pad_h > h or pad_w > w:
+        # 패딩이 원본보다 큰 경우 (거의 없음) np.pad에 맡김
+        pad_width = ((0, pad_h), (0, pad_w)) + ((0, 0),) * (src.ndim - 2)
+        dst[...] = np.pad(src, pad_width, mode='symmetric')
+        return
+    dst[:h, :w] = src
+    if pad_w:
+        dst[:h, w:] = src[:, w - pad_w:][:, ::-1]
+    if pad_h:
+        dst[h:] = dst[h - pad_h:h][::-1]
+
+
 def batch_inference(
     images_np: List[np.ndarray],  # 이미 전처리된 RGB 이미지들
     masks_np: List[np.ndarray],   # 이미 전처리된 그레이스케일 마스크들
     model: torch.nn.Module,       # Pre-loaded model object
     train_config: OmegaConf,    # Loaded train config from model
     device: str = 'cuda',
-    use_fp16: bool = False        # FP16 inference flag
+    use_fp16: bool = False,       # FP16 inference flag
+    use_workspace: bool = True    # 사전 할당 워크스페이스 사용 여부
 ) -> List[np.ndarray]:
     """
     이미 전처리된 배치를 한번에 처리하는 최적화된 추론 함수.
     LaMa 모델 요구사항에 맞는 배수 패딩을 배치 단위로 효율적으로 처리.
 
+    use_workspace=True이면 (batch, H, W)별로 재사용되는 워크스페이스에 uint8 그대로 기록하고,
+    업로드(non_blocking) 후 정규화/uint8 변환을 장치에서 수행해 호스트 CPU 작업을 최소화합니다.
+    내부적으로 stage_batch() + run_staged_batch()를 차례로 호출합니다.
+
     Args:
         images_np: 이미 전처리된 RGB 이미지 배열들 (uint8, HWC).
         masks_np: 이미 전처리된 그레이스케일 마스크 배열들 (uint8).
@@ -52,22 +143,42 @@ def batch_inference(
         train_config: 모델 설정 객체.
         device: 사용할 장치 ('cuda' 또는 'cpu').
         use_fp16: FP16 추론 사용 여부.
+        use_workspace: 사전 할당 워크스페이스 사용 여부 (False면 기존 샘플별 텐서 변환 경로).
 
     Returns:
         인페인팅 결과 이미지 배열들 (RGB, uint8, HWC).
     """
     print(f"최적화된 배치 추론 시작: {len(images_np)}개 이미지, 장치: {device}, FP16: {use_fp16}")
+    staged = stage_batch(images_np, masks_np, train_config, device, use_workspace=use_workspace)
+    if staged is None:
+        return []
+    return run_staged_batch(staged, model, train_config, device, use_fp16)
+
+
+def stage_batch(
+    images_np: List[np.ndarray],
+    masks_np: List[np.ndarray],
+    train_config: OmegaConf,
+    device: str = 'cuda',
+    use_workspace: bool = True,
+    workspace_slot: int = 0
+) -> Optional[StagedBatch]:
+    """
+    배치 추론의 호스트 단계: 패딩, 워크스페이스 기록, 장치 업로드, 정규화.
+    모델을 사용하지 않으므로 다른 배치의 run_staged_batch()와 별도 스레드에서 겹쳐 실행할 수 있습니다.
+
+    Returns:
+        StagedBatch 또는 None (유효한 샘플이 없을 때)
+    """
     torch_device = torch.device(device)
 
     # 모델 설정에서 필요한 값들 가져오기
     dataset_config = train_config.get('data', {}).get('visual_test', train_config.get('data', {}).get('val', {}))
     pad_out_to_modulo = dataset_config.get('pad_out_to_modulo', 8)
-    out_key = train_config.get('evaluator', {}).get('inpainted_key', 'inpainted')
-    print(f"패딩 배수: {pad_out_to_modulo}, 출력 키: {out_key}")
 
     if not images_np:
         print("경고: 입력 이미지가 없습니다")
-        return []
+        return None
 
     # 1. 배치 내 최대 크기 계산 및 배수 패딩 준비
     max_h = max(img.shape[0] for img in images_np)
@@ -77,73 +188,62 @@ def batch_inference(
     padded_h = ceil_modulo(max_h, pad_out_to_modulo)
     padded_w = ceil_modulo(max_w, pad_out_to_modulo)
     
-    print(f"배치 최대 크기: ({max_h}, {max_w}) → 패딩 후: ({padded_h}, {padded_w})")
+    print(f"배치 최대 크기: ({max_h}, {max_w}) → 패딩 후: ({padded_h}, {padded_w}), 패딩 배수: {pad_out_to_modulo}")
 
-    # 2. 배치 단위로 패딩 및 텐서 변환
-    processed_samples = []
+    # 2. 유효한 샘플 선별
+    valid_samples = []
     original_sizes = []  # 언패딩을 위한 원본 크기 저장
     
     for i, (img_np, mask_np) in enumerate(zip(images_np, masks_np)):
-        try:
-            # 마스크 차원 확인 및 조정
-            if mask_np.ndim == 2:
-                mask_np = np.expand_dims(mask_np, axis=-1)
-            elif mask_np.ndim == 3 and mask_np.shape[2] == 1:
-                pass  # 이미 올바른 형태
-            else:
-                print(f"경고: 샘플 {i}의 마스크 형태가 예상과 다름: {mask_np.shape}")
-                continue
-
-            # 이미지와 마스크 크기 일치 확인
-            if img_np.shape[:2] != mask_np.shape[:2]:
-                print(f"경고: 샘플 {i}의 이미지와 마스크 크기 불일치. 이미지: {img_np.shape[:2]}, 마스크: {mask_np.shape[:2]}")
-                continue
-
-            # 원본 크기 저장 (언패딩용)
-            orig_h, orig_w = img_np.shape[:2]
-            original_sizes.append((orig_h, orig_w))
-
-            # 배치 통일 크기로 패딩
-            pad_h = padded_h - orig_h
-            pad_w = padded_w - orig_w
-            
-            # 이미지 패딩 (symmetric mode)
-            img_padded = np.pad(img_np, ((0, pad_h), (0, pad_w), (0, 0)), mode='symmetric')
-            
-            # 마스크 패딩 (symmetric mode)  
-            mask_padded = np.pad(mask_np, ((0, pad_h), (0, pad_w), (0, 0)), mode='symmetric')
-
-            # 텐서 변환 [0, 1] 범위로 정규화
-            img_tensor = TF.to_tensor(img_padded)  # HWC -> CHW, [0,255] -> [0,1]
-            mask_tensor = TF.to_tensor(mask_padded)  # HWC -> CHW, [0,255] -> [0,1]
-
-            # 마스크 이진화 (0.5 임계값)
-            mask_tensor = (mask_tensor > 0.5) * 1.0
-
-            processed_samples.append({
-                'image': img_tensor,
-                'mask': mask_tensor
-            })
-
-        except Exception as e:
-            print(f"샘플 {i} 전처리 중 오류: {e}")
-            original_sizes.append(None)  # 실패한 샘플 표시
+        # 마스크 차원 확인 및 조정
+        if mask_np.ndim == 3 and mask_np.shape[2] == 1:
+            mask_np = mask_np[:, :, 0]
+        elif mask_np.ndim != 2:
+            print(f"경고: 샘플 {i}의 마스크 형태가 예상과 다름: {mask_np.shape}")
             continue
 
-    if not processed_samples:
+        # 이미지와 마스크 크기 일치 확인
+        if img_np.shape[:2] != mask_np.shape[:2]:
+            print(f"경고: 샘플 {i}의 이미지와 마스크 크기 불일치. 이미지: {img_np.shape[:2]}, 마스크: {mask_np.shape[:2]}")
+            continue
+
+        # 원본 크기 저장 (언패딩용)
+        original_sizes.append(img_np.shape[:2])
+        valid_samples.append((img_np, mask_np))
+
+    if not valid_samples:
         print("오류: 유효한 샘플이 없습니다")
-        return []
+        return None
 
-    # 3. 전체 배치를 한번에 스택 (모두 동일한 크기로 통일됨)
-    try:
-        batch = {
-            'image': torch.stack([s['image'] for s in processed_samples]).to(torch_device),
-            'mask': torch.stack([s['mask'] for s in processed_samples]).to(torch_device)
-        }
-        print(f"배치 텐서 형태: Image={batch['image'].shape}, Mask={batch['mask'].shape}")
-    except RuntimeError as e:
-        print(f"배치 스택 오류: {e}")
-        raise e
+    # 3. 배치 텐서 구성
+    if use_workspace:
+        workspace = get_batch_workspace(len(valid_samples), padded_h, padded_w, torch_device, slot=workspace_slot)
+        batch, ready_event = _stage_batch_to_workspace(workspace, valid_samples)
+        staged = StagedBatch(batch, original_sizes, workspace, ready_event)
+    else:
+        batch = _stage_batch_legacy(valid_samples, padded_h, padded_w, torch_device)
+        staged = StagedBatch(batch, original_sizes)
+    print(f"배치 텐서 형태: Image={batch['image'].shape}, Mask={batch['mask'].shape}")
+    return staged
+
+
+def run_staged_batch(
+    staged: StagedBatch,
+    model: torch.nn.Module,
+    train_config: OmegaConf,
+    device: str = 'cuda',
+    use_fp16: bool = False
+) -> List[np.ndarray]:
+    """배치 추론의 장치 단계: 추론 후 uint8 변환 및 다운로드."""
+    out_key = train_config.get('evaluator', {}).get('inpainted_key', 'inpainted')
+    batch = staged.batch
+
+    if staged.ready_event is not None:
+        # 업로드 스트림 작업이 끝난 뒤 추론하도록 대기, 텐서 수명은 현재 스트림 기준으로 연장
+        compute_stream = torch.cuda.current_stream(staged.workspace.device)
+        compute_stream.wait_event(staged.ready_event)
+        for tensor in batch.values():
+            tensor.record_stream(compute_stream)
 
     # 4. 전체 배치를 한번에 추론 (미니배치 분할 없음!)
     with torch.no_grad():
@@ -155,23 +255,101 @@ def batch_inference(
                 raise KeyError(f"모델 출력에 '{out_key}' 키가 없음. 사용 가능한 키: {prediction.keys()}")
             output_batch_tensor = prediction[out_key]
     
-    print(f"추론 출력 텐서 형태: {output_batch_tensor.shape}")
+        print(f"추론 출력 텐서 형태: {output_batch_tensor.shape}")
+
+        # 5. 후처리 - 언패딩 및 NumPy 변환
+        if staged.workspace is not None:
+            results = _download_batch_from_workspace(staged.workspace, output_batch_tensor, staged.original_sizes)
+        else:
+            results = _download_batch_legacy(output_batch_tensor, staged.original_sizes)
+
+    print(f"배치 추론 완료: {len(results)}개 결과 반환")
+    return results
+
+
+def _stage_batch_to_workspace(workspace: BatchWorkspace, samples: List[Tuple[np.ndarray, np.ndarray]]):
+    """uint8 그대로 워크스페이스에 기록하고, 장치로 올린 뒤 장치에서 정규화합니다."""
+    n = len(samples)
+    for i, (img_np, mask_np) in enumerate(samples):
+        _write_symmetric_padded(workspace.host_image_np[i], img_np)
+        _write_symmetric_padded(workspace.host_mask_np[i], mask_np)
+
+    stream_context = torch.cuda.stream(workspace.upload_stream) if workspace.upload_stream is not None else nullcontext()
+    with stream_context:
+        dev_image = workspace.dev_image[:n]
+        dev_mask = workspace.dev_mask[:n]
+        if workspace.dev_image is not workspace.host_image:
+            dev_image.copy_(workspace.host_image[:n], non_blocking=True)
+            dev_mask.copy_(workspace.host_mask[:n], non_blocking=True)
+
+        # NHWC uint8 -> NCHW float [0, 1], 마스크 이진화 (to_tensor 후 > 0.5와 동일)
+        image = dev_image.permute(0, 3, 1, 2).float().div_(255.0)
+        mask = (dev_mask > 127).unsqueeze(1).float()
+
+        ready_event = None
+        if workspace.upload_stream is not None:
+            ready_event = torch.cuda.Event()
+            ready_event.record(workspace.upload_stream)
+    return {'image': image, 'mask': mask}, ready_event
+
+
+def _download_batch_from_workspace(workspace: BatchWorkspace, output_batch_tensor: torch.Tensor,
+                                   original_sizes: List[Tuple[int, int]]) -> List[np.ndarray]:
+    """장치에서 uint8 NHWC로 변환한 뒤 한 번에 내려받고, 샘플별 원본 크기로 잘라 반환합니다."""
+    n = output_batch_tensor.shape[0]
+    # [0,1] -> [0,255] uint8 (np.clip(...).astype(np.uint8)과 동일하게 버림)
+    output_uint8 = output_batch_tensor.float().mul(255.0).clamp_(0, 255).to(torch.uint8)
+    output_uint8 = output_uint8.permute(0, 2, 3, 1)
+
+    host_output = workspace.host_output[:n]
+    host_output.copy_(output_uint8, non_blocking=True)
+    if workspace.device.type == 'cuda':
+        torch.cuda.current_stream(workspace.device).synchronize()
 
-    # 5. 후처리 - 언패딩 및 NumPy 변환
-    output_batch_tensor = output_batch_tensor.detach().cpu()
     results = []
+    for i in range(n):
+        orig_h, orig_w = original_sizes[i]
+        # 워크스페이스는 다음 배치에서 재사용되므로 복사해서 반환
+        results.append(workspace.host_output_np[i, :orig_h, :orig_w].copy())
+    return results
+
+
+def _stage_batch_legacy(samples: List[Tuple[np.ndarray, np.ndarray]], padded_h: int, padded_w: int,
+                        torch_device: torch.device) -> Dict[str, torch.Tensor]:
+    """기존 경로: 샘플별 np.pad + to_tensor 후 stack, 동기 업로드."""
+    processed_samples = []
+    for img_np, mask_np in samples:
+        orig_h, orig_w = img_np.shape[:2]
+        pad_h = padded_h - orig_h
+        pad_w = padded_w - orig_w
+        mask_np = np.expand_dims(mask_np, axis=-1)
+
+        # 이미지/마스크 패딩 (symmetric mode)
+        img_padded = np.pad(img_np, ((0, pad_h), (0, pad_w), (0, 0)), mode='symmetric')
+        mask_padded = np.pad(mask_np, ((0, pad_h), (0, pad_w), (0, 0)), mode='symmetric')
+
+        # 텐서 변환 [0, 1] 범위로 정규화
+        img_tensor = TF.to_tensor(img_padded)  # HWC -> CHW, [0,255] -> [0,1]
+        mask_tensor = TF.to_tensor(mask_padded)  # HWC -> CHW, [0,255] -> [0,1]
+
+        # 마스크 이진화 (0.5 임계값)
+        mask_tensor = (mask_tensor > 0.5) * 1.0
+        processed_samples.append({'image': img_tensor, 'mask': mask_tensor})
 
+    return {
+        'image': torch.stack([s['image'] for s in processed_samples]).to(torch_device),
+        'mask': torch.stack([s['mask'] for s in processed_samples]).to(torch_device)
+    }
+
+
+def _download_batch_legacy(output_batch_tensor: torch.Tensor, original_sizes: List[Tuple[int, int]]) -> List[np.ndarray]:
+    """기존 경로: cpu()로 내려받은 뒤 샘플별 permute/clip/astype."""
+    output_batch_tensor = output_batch_tensor.detach().cpu()
+    results = []
     for i in range(output_batch_tensor.shape[0]):
-        result_tensor = output_batch_tensor[i]  # CHW
-        
-        # 원본 크기로 언패딩
-        if i < len(original_sizes) and original_sizes[i] is not None:
-            orig_h, orig_w = original_sizes[i]
-            result_tensor = result_tensor[:, :orig_h, :orig_w]  # 패딩 제거
-        
-        result_np = result_tensor.permute(1, 2, 0).numpy()  # CHW -> HWC
+        orig_h, orig_w = original_sizes[i]
+        result_tensor = output_batch_tensor[i][:, :orig_h, :orig_w]  # 패딩 제거
+        result_np = result_tensor.permute(1, 2, 0).float().numpy()  # CHW -> HWC
         result_np = np.clip(result_np * 255, 0, 255).astype(np.uint8)  # [0,1] -> [0,255]
         results.append(result_np)
-
-    print(f"배치 추론 완료: {len(results)}개 결과 반환")
     return results
@@ -0,0 +1,210 @@
+import asyncio
+import logging
+import time
+from collections import deque, Counter
+from typing import List, Dict, Tuple, Any, Optional, Callable
+
+logger = logging.getLogger(__name__)
+
+# 도착 간격/배치 지연시간 EWMA 계수
+_EWMA_ALPHA = 0.2
+
+
+def _waste_percent(content_pixels: int, computed_pixels: int) -> float:
+    if not computed_pixels:
+        return 0.0
+    return 100.0 * (1.0 - content_pixels / computed_pixels)
+
+
+class _ShapeQueue:
+    """한 입력 shape(short/long/영역 버킷)의 대기열과 통계."""
+
+    def __init__(self, name: str, max_batch: int, weight: float, maxsize: int):
+        self.name = name
+        self.max_batch = max(1, max_batch)
+        self.weight = max(weight, 1e-6)
+        self.items: deque = deque()  # (enqueued_at, task)
+        self.space = asyncio.Semaphore(maxsize)  # 큐 크기 제한 (가득 차면 put 대기)
+
+        # 적응형 배치 크기 결정용
+        self.arrival_interval: Optional[float] = None  # 도착 간격 EWMA (초)
+        self.last_arrival: Optional[float] = None
+        self.batch_latency: Optional[float] = None     # 배치 추론 시간 EWMA (초)
+
+        # 가중 공정성용 가상 시간 (처리한 이미지 수 / 가중치)
+        self.virtual_time = 0.0
+
+        # 지표
+        self.batches = 0
+        self.items_dispatched = 0
+        self.fill_ratio_sum = 0.0
+        self.wait_sum = 0.0
+        self.wait_max = 0.0
+        self.reasons: Counter = Counter()
+        # 패딩 낭비율 계산용 (실제 내용 픽셀 / 모델이 계산한 픽셀)
+        self.content_pixels = 0
+        self.computed_pixels = 0
+
+    def arrival_rate(self) -> float:
+        if not self.arrival_interval:
+            return 0.0
+        return 1.0 / self.arrival_interval
+
+
+class BatchScheduler:
+    """
+    short/long 인퍼런스 큐를 함께 관리하는 마감시간 기반 적응형 배치 스케줄러.
+
+    - 배치가 가득 차면 즉시, 가장 오래 기다린 작업이 max_queue_delay(SLO)에 도달하면 즉시 배치를 내보냅니다.
+    - 그 외에는 관측된 도착률로 배치가 찰 때까지의 예상 시간을 계산하여,
+      남은 SLO와 측정된 배치 추론 시간보다 짧을 때만 기다리고 아니면 부분 배치를 바로 내보냅니다.
+    - 둘 다 내보낼 수 있으면 SLO 초과 큐를 우선하고, 그 다음 가중치 기준 처리량이 적은 쪽을 고릅니다.
+    """
+
+    def __init__(self, shapes: Dict[str, Tuple[int, float, int]], max_queue_delay: float,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            shapes: {이름: (최대 배치 크기, 가중치, 큐 최대 크기)}
+            max_queue_delay: 작업이 큐에서 기다릴 수 있는 최대 시간 (초)
+            clock: 도착/대기 시간 측정용 시계 (테스트에서 교체)
+        """
+        self.max_queue_delay = max_queue_delay
+        self._clock = clock
+        self._queues: Dict[str, _ShapeQueue] = {
+            name: _ShapeQueue(name, max_batch, weight, maxsize)
+            for name, (max_batch, weight, maxsize) in shapes.items()
+        }
+        self._wakeup = asyncio.Event()
+
+    async def put(self, kind: str, task: Dict[str, Any]):
+        """작업을 해당 shape 큐에 넣습니다. 큐가 가득 차 있으면 자리가 날 때까지 대기합니다."""
+        queue = self._queues[kind]
+        await queue.space.acquire()
+        now = self._clock()
+
+        if not queue.items:
+            # 비어 있던 큐가 다시 활성화되면 쉬는 동안 쌓인 몫을 몰아 쓰지 않도록 가상 시간 보정
+            active = [q.virtual_time for q in self._queues.values() if q.items]
+            if active:
+                queue.virtual_time = max(queue.virtual_time, min(active))
+
+        if queue.last_arrival is not None:
+            interval = now - queue.last_arrival
+            if queue.arrival_interval is None:
+                queue.arrival_interval = interval
+            else:
+                queue.arrival_interval = _EWMA_ALPHA * interval + (1 - _EWMA_ALPHA) * queue.arrival_interval
+        queue.last_arrival = now
+
+        queue.items.append((now, task))
+        self._wakeup.set()
+
+    def qsize(self, kind: str) -> int:
+        return len(self._queues[kind].items)
+
+    def record_latency(self, kind: str, seconds: float):
+        """배치 추론 시간을 기록합니다 (대기 여부 판단에 사용)."""
+        queue = self._queues[kind]
+        if queue.batch_latency is None:
+            queue.batch_latency = seconds
+        else:
+            queue.batch_latency = _EWMA_ALPHA * seconds + (1 - _EWMA_ALPHA) * queue.batch_latency
+
+    def record_padding(self, kind: str, content_pixels: int, computed_pixels: int):
+        """배치 하나의 실제 내용 픽셀 수와 패딩을 포함해 모델이 계산한 픽셀 수를 기록합니다."""
+        queue = self._queues[kind]
+        queue.content_pixels += content_pixels
+        queue.computed_pixels += computed_pixels
+
+    def padding_waste(self) -> float:
+        """전체 큐의 패딩 낭비율 (%) - 모델이 계산한 픽셀 중 실제 내용이 아닌 비율."""
+        content = sum(q.content_pixels for q in self._queues.values())
+        computed = sum(q.computed_pixels for q in self._queues.values())
+        return _waste_percent(content, computed)
+
+    def _time_until_dispatch(self, queue: _ShapeQueue, now: float) -> Tuple[float, str]:
+        """배치를 내보내기까지 더 기다릴 시간(0이면 즉시)과 그 이유를 반환합니다."""
+        depth = len(queue.items)
+        if depth >= queue.max_batch:
+            return 0.0, "full"
+
+        slack = self.max_queue_delay - (now - queue.items[0][0])
+        if slack <= 0:
+            return 0.0, "deadline"
+
+        rate = queue.arrival_rate()
+        if rate <= 0:
+            return 0.0, "partial"
+        expected_fill = (queue.max_batch - depth) / rate
+
+        # 채우는 데 걸릴 시간이 남은 SLO나 배치 한 번의 추론 시간보다 길면 기다리는 이득이 없음
+        limit = slack if queue.batch_latency is None else min(slack, queue.batch_latency)
+        if expected_fill > limit:
+            return 0.0, "partial"
+        return min(slack, expected_fill), "waiting"
+
+    async def next_batch(self) -> Tuple[str, List[Dict[str, Any]]]:
+        """다음에 실행할 배치를 (shape 이름, 작업 목록)으로 반환합니다. 작업이 없으면 대기합니다."""
+        while True:
+            self._wakeup.clear()
+            now = self._clock()
+
+            ready = []
+            next_wait = None
+            for queue in self._queues.values():
+                if not queue.items:
+                    continue
+                wait, reason = self._time_until_dispatch(queue, now)
+                if wait <= 0:
+                    ready.append((queue, reason))
+                elif next_wait is None or wait < next_wait:
+                    next_wait = wait
+
+            if ready:
+                # SLO 초과 큐 우선, 그 다음 가중 공정성 (가상 시간이 작은 큐)
+                queue, reason = min(ready, key=lambda r: (r[1] != "deadline", r[0].virtual_time))
+                return queue.name, self._take(queue, now, reason)
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=next_wait)
+            except asyncio.TimeoutError:
+                pass
+
+    def _take(self, queue: _ShapeQueue, now: float, reason: str) -> List[Dict[str, Any]]:
+        count = min(len(queue.items), queue.max_batch)
+        tasks = []
+        for _ in range(count):
+            enqueued_at, task = queue.items.popleft()
+            wait = now - enqueued_at
+            queue.wait_sum += wait
+            queue.wait_max = max(queue.wait_max, wait)
+            tasks.append(task)
+            queue.space.release()
+
+        queue.virtual_time += count / queue.weight
+        queue.batches += 1
+        queue.items_dispatched += count
+        queue.fill_ratio_sum += count / queue.max_batch
+        queue.reasons[reason] += 1
+        logger.debug(f"Batch scheduled: {queue.name} x{count} ({reason}), remaining={len(queue.items)}")
+        return tasks
+
+    def stats(self) -> Dict[str, Any]:
+        """shape별 배치 채움률, 대기 시간, 배치 결정 사유, 패딩 낭비율(%) 등 지표를 반환합니다."""
+        result = {}
+        for queue in self._queues.values():
+            batches = queue.batches
+            result[queue.name] = {
+                "pending": len(queue.items),
+                "batches": batches,
+                "items": queue.items_dispatched,
+                "avg_fill_ratio": queue.fill_ratio_sum / batches if batches else 0.0,
+                "avg_wait": queue.wait_sum / queue.items_dispatched if queue.items_dispatched else 0.0,
+                "max_wait": queue.wait_max,
+                "arrival_rate": queue.arrival_rate(),
+                "batch_latency": queue.batch_latency,
+                "reasons": dict(queue.reasons),
+                "padding_waste": _waste_percent(queue.content_pixels, queue.computed_pixels)
+            }
+        return result
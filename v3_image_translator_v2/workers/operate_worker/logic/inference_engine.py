@@ -0,0 +1,140 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+import concurrent.futures
+from typing import List, Dict, Tuple, Any, Callable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceEngine:
+    """
+    LaMa 배치 추론을 전용 스레드에서 실행하는 2단계 파이프라인 엔진.
+
+    - stage 스레드: 배치 N+1의 패딩/워크스페이스 기록/장치 업로드
+    - compute 스레드: 배치 N의 추론과 결과 다운로드
+    두 단계가 서로 다른 워크스페이스 슬롯을 사용하므로 동시에 진행되며,
+    슬롯 수(pipeline_depth)만큼만 배치가 동시에 떠 있을 수 있습니다.
+    결과는 Future로 돌려주므로 이벤트 루프는 추론 중에도 막히지 않습니다.
+    gpu-short / gpu-long 워커가 하나의 엔진을 공유합니다.
+    """
+
+    def __init__(
+        self,
+        use_fp16: bool,
+        pipeline_depth: int = 2,
+        stage_fn: Callable = None,
+        run_fn: Callable = None
+    ):
+        if stage_fn is None or run_fn is None:
+            # 기본은 LaMa 단계 함수 (torch/lama 의존성은 엔진을 만들 때 불러옴)
+            from logic.lama_gpu import stage_batch_inference, run_staged_inference
+            stage_fn = stage_fn or stage_batch_inference
+            run_fn = run_fn or run_staged_inference
+        self.use_fp16 = use_fp16
+        self.pipeline_depth = max(1, pipeline_depth)
+        self._stage_fn = stage_fn
+        self._run_fn = run_fn
+
+        self._stage_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="gpu-stage")
+        self._compute_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="gpu-compute")
+
+        # 사용 가능한 워크스페이스 슬롯 번호
+        self._free_slots: "queue.Queue[int]" = queue.Queue()
+        for slot in range(self.pipeline_depth):
+            self._free_slots.put(slot)
+
+        # 단계별 누적 시간 통계
+        self._stats_lock = threading.Lock()
+        self._batch_count = 0
+        self._image_count = 0
+        self._timing_totals = {"slot_wait": 0.0, "stage": 0.0, "queue_wait": 0.0, "compute": 0.0, "total": 0.0}
+        self._last_timings: Dict[str, float] = {}
+
+    def submit(self, images_np: List[np.ndarray], masks_np: List[np.ndarray]) -> concurrent.futures.Future:
+        """
+        배치를 파이프라인에 넣고 (결과 배열 목록, 단계별 시간) 튜플을 돌려줄 Future를 반환합니다.
+        입력 배열은 stage 단계에서 워크스페이스로 복사되므로 Future 완료 전까지 유지되어야 합니다.
+        """
+        future = concurrent.futures.Future()
+        submitted_at = time.perf_counter()
+        self._stage_executor.submit(self._stage_job, future, images_np, masks_np, submitted_at)
+        return future
+
+    async def infer(self, images_np: List[np.ndarray], masks_np: List[np.ndarray]) -> Tuple[List[np.ndarray], Dict[str, float]]:
+        """이벤트 루프에서 사용하는 submit()의 awaitable 버전입니다."""
+        return await asyncio.wrap_future(self.submit(images_np, masks_np))
+
+    def _stage_job(self, future: concurrent.futures.Future, images_np, masks_np, submitted_at: float):
+        if not future.set_running_or_notify_cancel():
+            return
+
+        # 이전 배치들이 워크스페이스를 모두 쓰고 있으면 하나가 끝날 때까지 대기 (stage 스레드만 대기)
+        slot = self._free_slots.get()
+        stage_start = time.perf_counter()
+        timings = {"slot_wait": stage_start - submitted_at}
+
+        try:
+            staged = self._stage_fn(images_np, masks_np, slot)
+        except Exception as e:
+            self._free_slots.put(slot)
+            future.set_exception(e)
+            return
+
+        staged_at = time.perf_counter()
+        timings["stage"] = staged_at - stage_start
+
+        if staged is None:
+            self._free_slots.put(slot)
+            timings.update({"queue_wait": 0.0, "compute": 0.0, "total": staged_at - submitted_at})
+            future.set_result(([], timings))
+            return
+
+        self._compute_executor.submit(self._compute_job, future, staged, slot, timings, submitted_at, staged_at)
+
+    def _compute_job(self, future: concurrent.futures.Future, staged, slot: int,
+                     timings: Dict[str, float], submitted_at: float, staged_at: float):
+        compute_start = time.perf_counter()
+        timings["queue_wait"] = compute_start - staged_at
+        try:
+            results = self._run_fn(staged, self.use_fp16)
+        except Exception as e:
+            future.set_exception(e)
+            return
+        finally:
+            # 다운로드까지 끝났으므로 워크스페이스 슬롯 반납
+            self._free_slots.put(slot)
+
+        finished_at = time.perf_counter()
+        timings["compute"] = finished_at - compute_start
+        timings["total"] = finished_at - submitted_at
+        self._record(timings, len(results))
+        future.set_result((results, timings))
+
+    def _record(self, timings: Dict[str, float], image_count: int):
+        with self._stats_lock:
+            self._batch_count += 1
+            self._image_count += image_count
+            for key in self._timing_totals:
+                self._timing_totals[key] += timings.get(key, 0.0)
+            self._last_timings = dict(timings)
+
+    def stats(self) -> Dict[str, Any]:
+        """처리한 배치 수와 단계별 평균/최근 시간(초)을 반환합니다."""
+        with self._stats_lock:
+            count = self._batch_count
+            return {
+                "batches": count,
+                "images": self._image_count,
+                "avg": {key: (total / count if count else 0.0) for key, total in self._timing_totals.items()},
+                "last": dict(self._last_timings)
+            }
+
+    def shutdown(self, wait: bool = True):
+        """stage/compute 스레드를 종료합니다."""
+        self._stage_executor.shutdown(wait=wait)
+        self._compute_executor.shutdown(wait=wait)
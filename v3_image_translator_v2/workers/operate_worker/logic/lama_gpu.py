@@ -1,11 +1,11 @@
 import logging
 import torch
-from typing import List
+from typing import List, Optional
 import numpy as np
 
 # lama.bin.inference 모듈에서 필요한 함수들을 직접 가져옵니다.
 # 이 경로는 Docker 컨테이너의 PYTHONPATH에 /app/lama가 포함되어 있다고 가정합니다.
-from lama.bin.inference import load_lama_model, batch_inference
+from lama.bin.inference import load_lama_model, batch_inference, stage_batch, run_staged_batch, StagedBatch
 
 # 로거 설정
 logger = logging.getLogger(__name__)
@@ -53,3 +53,15 @@ def run_batch_inference(images_np: List[np.ndarray], masks_np: List[np.ndarray],
         use_fp16=use_fp16
     )
     return results_np
+
+def stage_batch_inference(images_np: List[np.ndarray], masks_np: List[np.ndarray], workspace_slot: int = 0) -> Optional[StagedBatch]:
+    """배치 추론의 호스트 단계(패딩, 업로드, 정규화)만 실행합니다. 모델은 사용하지 않습니다."""
+    if model is None or train_config is None:
+        raise RuntimeError("LaMa 모델이 로드되지 않았습니다. load_model()을 먼저 호출해야 합니다.")
+    return stage_batch(images_np, masks_np, train_config, device, workspace_slot=workspace_slot)
+
+def run_staged_inference(staged: StagedBatch, use_fp16: bool) -> List[np.ndarray]:
+    """stage_batch_inference()로 준비된 배치의 추론과 결과 다운로드를 실행합니다."""
+    if model is None or train_config is None:
+        raise RuntimeError("LaMa 모델이 로드되지 않았습니다. load_model()을 먼저 호출해야 합니다.")
+    return run_staged_batch(staged, model, train_config, device, use_fp16)
@@ -2,6 +2,7 @@ import os
 import sys
 import logging
 import re
+from typing import Optional
 
 import numpy as np
 import cv2
@@ -12,7 +13,6 @@ ROOT_DIR = os.path.dirname(os.path.dirname(WORKER_DIR))
 sys.path.insert(0, ROOT_DIR)
 
 from core.config import MASK_PADDING_PIXELS
-from core.shm_manager import create_shm_from_array
 
 logger = logging.getLogger(__name__)
 
@@ -51,14 +51,16 @@ def filter_chinese_ocr_result(ocr_result: list, request_id: str) -> list:
 
 
 
-def generate_mask_pure_sync(image_bytes: bytes, ocr_result: list, request_id: str, image_id: str, is_long: bool = False):
-    """마스크 생성 순수 동기 함수 (100% CPU 작업만)"""
+def generate_mask_pure_sync(image_bytes: bytes, ocr_result: list, request_id: str, image_id: str, is_long: bool = False,
+                            img: Optional[np.ndarray] = None):
+    """마스크 생성 순수 동기 함수 (100% CPU 작업만). img가 주어지면 디코딩을 생략합니다."""
     try:
         logger.debug(f"[{request_id}] Pure CPU mask generation in thread")
         
-        # 1. 이미지 디코딩 (CPU 작업)
-        img_array = np.frombuffer(image_bytes, dtype=np.uint8)
-        img = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
+        # 1. 이미지 디코딩 (CPU 작업, 이미 디코딩된 배열이 있으면 재사용)
+        if img is None:
+            img_array = np.frombuffer(image_bytes, dtype=np.uint8)
+            img = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
         
         if img is None:
             logger.error(f"[{request_id}] Failed to decode image")
@@ -100,24 +102,14 @@ def generate_mask_pure_sync(image_bytes: bytes, ocr_result: list, request_id: st
                     
             logger.debug(f"[{request_id}] Generated mask from {processed_boxes} boxes")
         
-        # 4. 전처리 작업 정보 생성 (SHM 정보 포함)
+        # 4. 전처리 작업 정보 생성
+        # 원본 이미지와 마스크는 같은 스레드에서 바로 전처리되므로 SHM에 복사하지 않고 배열로 반환
         preprocessing_task = {
             "request_id": request_id,
             "image_id": image_id,  # 실제 image_id 사용
             "is_long": is_long  # 외부에서 전달받은 is_long 값 사용
         }
         
-        # 🔧 이미지와 마스크를 공유 메모리에 저장
-        img_shm_info = create_shm_from_array(img)
-        mask_shm_info = create_shm_from_array(mask)
-        
-        if img_shm_info and mask_shm_info:
-            preprocessing_task["shm_info"] = img_shm_info
-            preprocessing_task["mask_shm_info"] = mask_shm_info
-        else:
-            logger.error(f"[{request_id}] Failed to create shared memory")
-            return None
-        
         return img, mask, preprocessing_task
         
     except Exception as e:
@@ -2,7 +2,7 @@ import os
 import sys
 import logging
 import time
-from typing import List, Dict, Tuple, Any
+from typing import List, Dict, Tuple, Any, Optional
 
 import numpy as np
 import cv2
@@ -17,17 +17,28 @@ from core.config import (
     INPAINTING_LONG_SIZE,
     INPAINTING_SHORT_SIZE
 )
-from core.shm_manager import get_array_from_shm, create_shm_from_array, cleanup_shm
+from core.shm_manager import get_array_from_shm, allocate_shm_array, release_shm, cleanup_shm
 
 logger = logging.getLogger(__name__)
 
-def resize_with_padding(img: np.ndarray, target_size: Tuple[int, int]) -> Tuple[np.ndarray, Tuple[int, int, int, int]]:
+def _copy_make_border(img: np.ndarray, pad: Tuple[int, int, int, int], out: Optional[np.ndarray]) -> np.ndarray:
+    """copyMakeBorder 결과를 out 버퍼(있는 경우)에 직접 기록합니다."""
+    pad_top, pad_bottom, pad_left, pad_right = pad
+    if out is None:
+        return cv2.copyMakeBorder(img, pad_top, pad_bottom, pad_left, pad_right, cv2.BORDER_REFLECT_101)
+    result = cv2.copyMakeBorder(img, pad_top, pad_bottom, pad_left, pad_right, cv2.BORDER_REFLECT_101, dst=out)
+    if result is not out:
+        np.copyto(out, result.reshape(out.shape))
+    return out
+
+def resize_with_padding(img: np.ndarray, target_size: Tuple[int, int], out: Optional[np.ndarray] = None) -> Tuple[np.ndarray, Tuple[int, int, int, int]]:
     """
     이미지 비율을 유지하면서 지정된 크기로 조절하고 패딩을 추가합니다.
     
     Args:
         img: 원본 이미지 (HWC format, BGR/RGB)
         target_size: 목표 크기 (height, width)
+        out: 결과를 기록할 버퍼 (예: SHM 풀 슬롯 뷰). None이면 새 배열 생성
         
     Returns:
         조절된 이미지와 패딩 정보 (top, right, bottom, left)
@@ -42,10 +53,7 @@ def resize_with_padding(img: np.ndarray, target_size: Tuple[int, int]) -> Tuple[
         pad_left = (target_w - w) // 2
         pad_right = target_w - w - pad_left
         
-        padded_img = cv2.copyMakeBorder(
-            img, pad_top, pad_bottom, pad_left, pad_right,
-            cv2.BORDER_REFLECT_101
-        )
+        padded_img = _copy_make_border(img, (pad_top, pad_bottom, pad_left, pad_right), out)
         return padded_img, (pad_top, pad_right, pad_bottom, pad_left)
     
     # 비율 유지하면서 리사이징
@@ -64,20 +72,21 @@ def resize_with_padding(img: np.ndarray, target_size: Tuple[int, int]) -> Tuple[
     pad_left = (target_w - new_w) // 2
     pad_right = target_w - new_w - pad_left
     
-    padded_img = cv2.copyMakeBorder(
-        resized_img, pad_top, pad_bottom, pad_left, pad_right,
-        cv2.BORDER_REFLECT_101
-    )
+    padded_img = _copy_make_border(resized_img, (pad_top, pad_bottom, pad_left, pad_right), out)
     
     return padded_img, (pad_top, pad_right, pad_bottom, pad_left)
 
-def process_single_task_pure_sync(task: Dict[str, Any], is_long: bool) -> Dict[str, Any]:
+def process_single_task_pure_sync(task: Dict[str, Any], is_long: bool,
+                                  img_array: Optional[np.ndarray] = None,
+                                  mask_array: Optional[np.ndarray] = None) -> Dict[str, Any]:
     """
     단일 전처리 작업을 순수 동기로 처리합니다 (스레드 풀용 - 100% CPU 작업만)
     
     Args:
         task: 전처리할 작업 데이터
         is_long: 긴 작업인지 여부
+        img_array: 같은 프로세스에서 생성한 원본 이미지 (주어지면 SHM 로드 생략)
+        mask_array: 같은 프로세스에서 생성한 마스크 (주어지면 SHM 로드 생략)
         
     Returns:
         전처리된 작업 데이터 또는 None (실패 시)
@@ -89,8 +98,8 @@ def process_single_task_pure_sync(task: Dict[str, Any], is_long: bool) -> Dict[s
 
     # 필수 정보 확인
     valid_request_id = bool(request_id)
-    valid_mask_info = bool(mask_shm_info and isinstance(mask_shm_info, dict) and mask_shm_info.get('shm_name'))
-    valid_original_info = bool(original_shm_info and isinstance(original_shm_info, dict) and original_shm_info.get('shm_name'))
+    valid_mask_info = mask_array is not None or bool(mask_shm_info and isinstance(mask_shm_info, dict) and mask_shm_info.get('shm_name'))
+    valid_original_info = img_array is not None or bool(original_shm_info and isinstance(original_shm_info, dict) and original_shm_info.get('shm_name'))
 
     if not (valid_request_id and valid_mask_info and valid_original_info):
         logger.error(
@@ -102,17 +111,21 @@ def process_single_task_pure_sync(task: Dict[str, Any], is_long: bool) -> Dict[s
         return None
 
     shm_handles = []  # SHM 핸들 추적
+    preprocessed_shm_infos = []  # 실패 시 반납할 전처리 결과 SHM
+    success = False
     
     try:
         # 원본 이미지 로드
-        img_array, img_shm = get_array_from_shm(original_shm_info)
-        if img_shm:
-            shm_handles.append(img_shm)
+        if img_array is None:
+            img_array, img_shm = get_array_from_shm(original_shm_info)
+            if img_shm:
+                shm_handles.append(img_shm)
         
         # 마스크 이미지 로드
-        mask_array, mask_shm = get_array_from_shm(mask_shm_info)
-        if mask_shm:
-            shm_handles.append(mask_shm)
+        if mask_array is None:
+            mask_array, mask_shm = get_array_from_shm(mask_shm_info)
+            if mask_shm:
+                shm_handles.append(mask_shm)
         
         if img_array is None or mask_array is None:
             logger.error(f"[{request_id}] 공유 메모리에서 이미지 또는 마스크 로드 실패")
@@ -120,6 +133,7 @@ def process_single_task_pure_sync(task: Dict[str, Any], is_long: bool) -> Dict[s
             
         # 타겟 크기 결정
         target_size = INPAINTING_LONG_SIZE if is_long else INPAINTING_SHORT_SIZE
+        target_h, target_w = target_size
         
         # CPU 디노이징 적용 (Bilateral Filter)
         denoise_start_time = time.time()
@@ -146,8 +160,18 @@ def process_single_task_pure_sync(task: Dict[str, Any], is_long: bool) -> Dict[s
         # BGR -> RGB 변환 (LaMa 모델 입력 형식)
         img_rgb = cv2.cvtColor(img_array, cv2.COLOR_BGR2RGB)
         
-        # 이미지와 마스크 크기 조절
-        resized_img, padding_info = resize_with_padding(img_rgb, target_size)
+        # 전처리 결과를 기록할 공유 메모리 확보 (풀 슬롯 우선, 소진 시 개별 세그먼트)
+        img_view, preprocessed_img_shm_info, img_out_shm = allocate_shm_array((target_h, target_w, 3), np.uint8)
+        preprocessed_shm_infos.append(preprocessed_img_shm_info)
+        if img_out_shm:
+            shm_handles.append(img_out_shm)
+        mask_view, preprocessed_mask_shm_info, mask_out_shm = allocate_shm_array((target_h, target_w), np.uint8)
+        preprocessed_shm_infos.append(preprocessed_mask_shm_info)
+        if mask_out_shm:
+            shm_handles.append(mask_out_shm)
+        
+        # 이미지와 마스크 크기 조절 (결과를 SHM 뷰에 직접 기록)
+        _, padding_info = resize_with_padding(img_rgb, target_size, out=img_view)
         
         # 마스크를 그레이스케일(단일 채널)로 변환
         if mask_array.ndim == 3 and mask_array.shape[2] > 1:
@@ -155,15 +179,7 @@ def process_single_task_pure_sync(task: Dict[str, Any], is_long: bool) -> Dict[s
         else:
             mask_gray = mask_array.squeeze() if mask_array.ndim == 3 else mask_array
             
-        resized_mask, _ = resize_with_padding(mask_gray, target_size)
-        
-        # 전처리된 이미지와 마스크를 새로운 공유 메모리에 저장
-        preprocessed_img_shm_info = create_shm_from_array(resized_img)
-        preprocessed_mask_shm_info = create_shm_from_array(resized_mask)
-        
-        if not preprocessed_img_shm_info or not preprocessed_mask_shm_info:
-            logger.error(f"[{request_id}] 전처리된 데이터 공유 메모리 생성 실패")
-            return None
+        resize_with_padding(mask_gray, target_size, out=mask_view)
         
         # 전처리된 작업 정보 생성
         processed_task = {
@@ -177,6 +193,7 @@ def process_single_task_pure_sync(task: Dict[str, Any], is_long: bool) -> Dict[s
         }
         
         logger.debug(f"[{request_id}] 전처리 완료. 타겟 크기: {target_size}")
+        success = True
         return processed_task
         
     except Exception as e:
@@ -191,6 +208,11 @@ def process_single_task_pure_sync(task: Dict[str, Any], is_long: bool) -> Dict[s
             except Exception as e:
                 logger.warning(f"SHM 핸들 닫기 중 오류: {e}")
         
+        # 실패 시 확보했던 전처리 결과 SHM 반납
+        if not success:
+            for shm_info in preprocessed_shm_infos:
+                release_shm(shm_info)
+        
         # 마스크 공유 메모리 정리 (원본 이미지는 유지)
         if mask_shm_info and isinstance(mask_shm_info, dict) and 'shm_name' in mask_shm_info:
             mask_shm_name = mask_shm_info['shm_name']
@@ -0,0 +1,223 @@
+import os
+import sys
+import logging
+import threading
+from typing import List, Dict, Tuple, Any, Optional
+
+import numpy as np
+import cv2
+
+# 프로젝트 루트 설정
+WORKER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROOT_DIR = os.path.dirname(os.path.dirname(WORKER_DIR))
+sys.path.insert(0, ROOT_DIR)
+
+from core.config import (
+    INPAINTING_LONG_SIZE,
+    INPAINTING_SHORT_SIZE,
+    INPAINT_REGION_MARGIN,
+    INPAINT_REGION_ALIGN,
+    INPAINT_REGION_MAX_SIDE,
+    INPAINT_REGION_MAX_AREA_RATIO,
+    INPAINT_REGION_FEATHER
+)
+
+logger = logging.getLogger(__name__)
+
+# (top, left, bottom, right) - bottom/right는 포함하지 않음
+Box = Tuple[int, int, int, int]
+
+
+def _overlaps(a: Box, b: Box) -> bool:
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def _merge_overlapping(boxes: List[Box]) -> List[Box]:
+    """겹치는 박스를 더 이상 겹치지 않을 때까지 합칩니다."""
+    boxes = list(boxes)
+    merged = True
+    while merged:
+        merged = False
+        result: List[Box] = []
+        for box in boxes:
+            for i, other in enumerate(result):
+                if _overlaps(box, other):
+                    result[i] = (min(box[0], other[0]), min(box[1], other[1]),
+                                 max(box[2], other[2]), max(box[3], other[3]))
+                    merged = True
+                    break
+            else:
+                result.append(box)
+        boxes = result
+    return boxes
+
+
+def _align_span(start: int, end: int, limit: int, align: int) -> Tuple[int, int]:
+    """[start, end) 구간을 align 배수 길이로 늘리고 (가능하면 가운데 기준) [0, limit) 안으로 옮깁니다."""
+    length = min(limit, -(-(end - start) // align) * align)
+    start = max(0, min(start - (length - (end - start)) // 2, limit - length))
+    return start, start + length
+
+
+def plan_regions(mask: np.ndarray, margin: int = INPAINT_REGION_MARGIN,
+                 align: int = INPAINT_REGION_ALIGN) -> List[Box]:
+    """
+    마스크의 연결 요소를 문맥 여백만큼 넓혀 겹치는 것끼리 묶고, 각 묶음을 align 배수 크기의 영역으로 만듭니다.
+
+    정렬로 늘어난 영역끼리는 겹칠 수 있습니다 (겹친 부분의 마스크는 두 영역 모두에서 인페인팅됨).
+
+    Returns:
+        영역 목록 (top, left, bottom, right)
+    """
+    h, w = mask.shape[:2]
+    count, _, stats, _ = cv2.connectedComponentsWithStats((mask > 0).astype(np.uint8), connectivity=8)
+
+    boxes: List[Box] = []
+    for label in range(1, count):
+        x, y, bw, bh = stats[label, :4]
+        boxes.append((max(0, y - margin), max(0, x - margin), min(h, y + bh + margin), min(w, x + bw + margin)))
+
+    regions = []
+    for top, left, bottom, right in _merge_overlapping(boxes):
+        top, bottom = _align_span(top, bottom, h, align)
+        left, right = _align_span(left, right, w, align)
+        regions.append((top, left, bottom, right))
+    return regions
+
+
+def _region_scale(box: Box, max_side: int) -> float:
+    """영역을 인페인팅할 배율 (한 변이 max_side를 넘으면 축소)."""
+    side = max(box[2] - box[0], box[3] - box[1])
+    return min(1.0, max_side / side)
+
+
+def choose_regions(mask: np.ndarray, is_long: bool) -> Optional[List[Box]]:
+    """
+    영역 인페인팅이 전체 이미지 인페인팅보다 연산량이 적을 때만 영역 목록을 반환합니다.
+
+    Returns:
+        영역 목록 또는 None (전체 이미지 방식을 사용해야 하는 경우)
+    """
+    regions = plan_regions(mask)
+    if not regions:
+        return None
+
+    target_h, target_w = INPAINTING_LONG_SIZE if is_long else INPAINTING_SHORT_SIZE
+    region_area = 0.0
+    for box in regions:
+        scale = _region_scale(box, INPAINT_REGION_MAX_SIDE)
+        region_area += (box[2] - box[0]) * (box[3] - box[1]) * scale * scale
+    if region_area > INPAINT_REGION_MAX_AREA_RATIO * target_h * target_w:
+        return None
+    return regions
+
+
+def feather_alpha(mask: np.ndarray, feather: int = INPAINT_REGION_FEATHER) -> np.ndarray:
+    """
+    마스크 영역은 1이고 마스크 바깥으로 부드럽게 0으로 줄어드는 블렌딩 가중치 (HxWx1 float32).
+    feather 픽셀만큼 팽창한 뒤 가우시안으로 흐리므로, 가중치는 마스크 가장자리에서 약 3 * feather 픽셀까지 남습니다.
+    """
+    alpha = (mask > 0).astype(np.float32)
+    if feather > 0:
+        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (2 * feather + 1, 2 * feather + 1))
+        soft = cv2.GaussianBlur(cv2.dilate(alpha, kernel), (0, 0), sigmaX=feather / 2)
+        alpha = np.maximum(alpha, soft)
+    return alpha[:, :, None]
+
+
+class RegionAssembly:
+    """
+    한 요청의 영역별 인페인팅 결과를 모아 원본 해상도 이미지에 합성합니다.
+
+    잘라낸 영역 밖의 픽셀은 원본 그대로 유지됩니다. 영역 안에서는 마스크 픽셀이 인페인팅 결과로 바뀌고,
+    마스크 바깥 가장자리 부근(feather_alpha 참고)의 원본 픽셀도 결과와 섞입니다.
+    후처리 스레드들이 동시에 add()를 호출해도 안전합니다.
+    """
+
+    def __init__(self, request_id: str, original_bgr: np.ndarray, mask: np.ndarray, regions: List[Box]):
+        self.request_id = request_id
+        self.original = original_bgr
+        self.regions = regions
+        # 합성용 원본 해상도 영역 마스크 (영역 크기만큼만 보관)
+        self.region_masks = [mask[t:b, l:r].copy() for t, l, b, r in regions]
+        self._results: List[Optional[np.ndarray]] = [None] * len(regions)
+        self._remaining = len(regions)
+        self._lock = threading.Lock()
+
+    def add(self, index: int, region_bgr: np.ndarray) -> bool:
+        """영역 결과를 등록하고, 모든 영역이 모였으면 True를 반환합니다."""
+        with self._lock:
+            if self._results[index] is None:
+                self._remaining -= 1
+            self._results[index] = region_bgr
+            return self._remaining == 0
+
+    def compose(self) -> np.ndarray:
+        """모인 영역 결과를 원본 복사본에 블렌딩하여 반환합니다 (BGR)."""
+        canvas = self.original.copy()
+        for (top, left, bottom, right), region_mask, result in zip(self.regions, self.region_masks, self._results):
+            if result is None:
+                continue
+            alpha = feather_alpha(region_mask)
+            roi = canvas[top:bottom, left:right].astype(np.float32)
+            blended = roi + (result.astype(np.float32) - roi) * alpha
+            canvas[top:bottom, left:right] = np.clip(blended + 0.5, 0, 255).astype(np.uint8)
+        return canvas
+
+
+def build_region_tasks(task: Dict[str, Any], is_long: bool, img_array: np.ndarray, mask_array: np.ndarray,
+                       regions: List[Box]) -> Tuple[List[Dict[str, Any]], RegionAssembly]:
+    """
+    영역별 인페인팅 작업(LaMa 입력 RGB 이미지/마스크)과 결과 합성기를 만듭니다.
+
+    각 작업은 원본 해상도 그대로, 한 변이 INPAINT_REGION_MAX_SIDE를 넘으면 그 크기로 축소하여 잘라냅니다.
+    작업이 들어갈 스케줄러 큐(shape 버킷)는 워커가 region_image 크기로 정합니다.
+    """
+    request_id = task.get("request_id")
+    if mask_array.ndim == 3:
+        mask_array = cv2.cvtColor(mask_array, cv2.COLOR_BGR2GRAY) if mask_array.shape[2] > 1 else mask_array[:, :, 0]
+
+    region_tasks = []
+    for index, (top, left, bottom, right) in enumerate(regions):
+        crop = img_array[top:bottom, left:right]
+        crop_mask = mask_array[top:bottom, left:right]
+
+        # 전체 이미지 방식과 동일한 디노이징을 영역에만 적용
+        crop = cv2.bilateralFilter(src=crop, d=9, sigmaColor=75, sigmaSpace=75)
+
+        scale = _region_scale((top, left, bottom, right), INPAINT_REGION_MAX_SIDE)
+        if scale < 1.0:
+            new_w = max(1, int(round((right - left) * scale)))
+            new_h = max(1, int(round((bottom - top) * scale)))
+            crop = cv2.resize(crop, (new_w, new_h), interpolation=cv2.INTER_AREA)
+            # 얇은 획이 사라지지 않도록 조금이라도 걸친 픽셀은 마스크로 유지
+            crop_mask = cv2.resize(crop_mask, (new_w, new_h), interpolation=cv2.INTER_AREA)
+            crop_mask = np.where(crop_mask > 0, 255, 0).astype(np.uint8)
+        else:
+            crop_mask = np.ascontiguousarray(crop_mask)
+
+        region_tasks.append({
+            "request_id": request_id,
+            "image_id": task.get("image_id"),
+            "is_long": is_long,
+            "region_index": index,
+            "region_count": len(regions),
+            "region_box": (top, left, bottom, right),
+            "region_image": cv2.cvtColor(crop, cv2.COLOR_BGR2RGB),
+            "region_mask": crop_mask
+        })
+
+    logger.debug(
+        f"[{request_id}] 영역 인페인팅 작업 {len(region_tasks)}개 생성: "
+        f"{[(b - t, r - l) for t, l, b, r in regions]}"
+    )
+    return region_tasks, RegionAssembly(request_id, img_array, mask_array, regions)
+
+
+def restore_region(result_rgb: np.ndarray, region_box: Box) -> np.ndarray:
+    """영역 인페인팅 결과(RGB)를 원본 해상도 영역 크기의 BGR 이미지로 되돌립니다."""
+    top, left, bottom, right = region_box
+    h, w = bottom - top, right - left
+    if result_rgb.shape[:2] != (h, w):
+        result_rgb = cv2.resize(result_rgb, (w, h), interpolation=cv2.INTER_LINEAR)
+    return cv2.cvtColor(result_rgb, cv2.COLOR_RGB2BGR)
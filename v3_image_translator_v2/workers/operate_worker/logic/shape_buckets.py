@@ -0,0 +1,96 @@
+import logging
+from typing import List, Dict, Tuple, Any, Sequence
+
+logger = logging.getLogger(__name__)
+
+# 어떤 버킷에도 들어가지 않는 작업이 모이는 큐 이름 (배치 크기 1, 패딩은 modulo 정렬분만)
+OVERFLOW_BUCKET = "region_overflow"
+
+
+def parse_buckets(spec: str) -> List[Tuple[int, int]]:
+    """
+    "256x512,512x512" 형태(높이x너비)의 버킷 설정 문자열을 (높이, 너비) 목록으로 바꿉니다.
+
+    Raises:
+        ValueError: 형식이 잘못되었거나 크기가 0 이하인 경우.
+    """
+    buckets = []
+    for item in spec.split(","):
+        item = item.strip().lower()
+        if not item:
+            continue
+        try:
+            height, width = (int(v) for v in item.split("x"))
+        except ValueError:
+            raise ValueError(f"잘못된 버킷 형식: {item!r} (예: 256x512)")
+        if height <= 0 or width <= 0:
+            raise ValueError(f"버킷 크기는 0보다 커야 합니다: {item!r}")
+        buckets.append((height, width))
+    # 면적이 작은 버킷부터 검사하도록 정렬 (중복 제거)
+    return sorted(set(buckets), key=lambda b: (b[0] * b[1], b))
+
+
+def _ceil_modulo(value: int, modulo: int) -> int:
+    return -(-value // modulo) * modulo
+
+
+def batch_padding(content_sizes: Sequence[Tuple[int, int]], input_sizes: Sequence[Tuple[int, int]],
+                  modulo: int = 8) -> Tuple[int, int]:
+    """
+    배치 하나의 (실제 내용 픽셀 수, 모델이 계산하는 픽셀 수)를 반환합니다.
+
+    stage_batch와 같이 배치 전체를 가장 큰 입력의 높이/너비(modulo 배수로 올림)로 패딩한다고 보고 계산합니다.
+
+    Args:
+        content_sizes: 작업별 실제 내용 크기 (레터박스 여백을 뺀 높이, 너비)
+        input_sizes: 작업별 모델 입력 크기 (높이, 너비)
+    """
+    if not input_sizes:
+        return 0, 0
+    padded_h = _ceil_modulo(max(h for h, _ in input_sizes), modulo)
+    padded_w = _ceil_modulo(max(w for _, w in input_sizes), modulo)
+    content = sum(h * w for h, w in content_sizes)
+    return content, len(input_sizes) * padded_h * padded_w
+
+
+class ShapeBuckets:
+    """
+    가변 크기 인페인팅 입력(영역 crop)을 소수의 shape 버킷으로 나눕니다.
+
+    각 입력은 높이/너비가 모두 들어가는 가장 작은 버킷에 배정되고, 버킷마다 별도의 스케줄러 큐가 있어
+    배치는 같은 버킷의 작업끼리만 만들어집니다. 따라서 배치 패딩은 버킷 크기 이하로 제한됩니다.
+    버킷별 최대 배치 크기는 픽셀 예산(batch_pixels)을 버킷 면적으로 나눠 정하므로
+    작은 버킷일수록 한 번에 더 많이 처리합니다.
+    """
+
+    def __init__(self, buckets: List[Tuple[int, int]], batch_pixels: int, max_batch: int):
+        """
+        Args:
+            buckets: 버킷 크기 목록 (높이, 너비)
+            batch_pixels: 배치 하나에 허용할 입력 픽셀 수 (배치 크기 = batch_pixels // 버킷 면적)
+            max_batch: 버킷별 배치 크기 상한
+        """
+        self.buckets = sorted(set(buckets), key=lambda b: (b[0] * b[1], b))
+        self.batch_pixels = batch_pixels
+        self.max_batch = max(1, max_batch)
+        self._names = {bucket: f"region_{bucket[0]}x{bucket[1]}" for bucket in self.buckets}
+
+    def assign(self, height: int, width: int) -> str:
+        """입력 크기가 들어가는 가장 작은 버킷의 큐 이름을 반환합니다 (없으면 OVERFLOW_BUCKET)."""
+        for bucket in self.buckets:
+            if height <= bucket[0] and width <= bucket[1]:
+                return self._names[bucket]
+        logger.debug(f"No shape bucket fits ({height}, {width}), using {OVERFLOW_BUCKET}")
+        return OVERFLOW_BUCKET
+
+    def batch_size(self, bucket: Tuple[int, int]) -> int:
+        return max(1, min(self.max_batch, self.batch_pixels // (bucket[0] * bucket[1])))
+
+    def scheduler_shapes(self, weight: float, maxsize: int) -> Dict[str, Tuple[int, float, int]]:
+        """BatchScheduler에 넘길 버킷별 큐 설정 {이름: (최대 배치 크기, 가중치, 큐 최대 크기)}."""
+        shapes = {self._names[bucket]: (self.batch_size(bucket), weight, maxsize) for bucket in self.buckets}
+        shapes[OVERFLOW_BUCKET] = (1, weight, maxsize)
+        return shapes
+
+    def describe(self) -> Dict[str, Any]:
+        return {self._names[bucket]: self.batch_size(bucket) for bucket in self.buckets}
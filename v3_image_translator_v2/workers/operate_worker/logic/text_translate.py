@@ -2,11 +2,9 @@ import os
 import sys
 import json
 import logging
-import asyncio
 import time
-from typing import List
+from typing import List, Optional
 
-import aiohttp
 import numpy as np
 
 # 프로젝트 루트 설정
@@ -14,17 +12,24 @@ WORKER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 ROOT_DIR = os.path.dirname(os.path.dirname(WORKER_DIR))
 sys.path.insert(0, ROOT_DIR)
 
-from core.config import TRANSLATE_TEXT_RESULT_HASH_PREFIX, HOSTING_TASKS_QUEUE, SUCCESS_QUEUE, ERROR_QUEUE
-from core.redis_client import get_redis_client
+from core.config import (
+    TRANSLATE_TEXT_RESULT_HASH_PREFIX, HOSTING_TASKS_QUEUE, SUCCESS_QUEUE, ERROR_QUEUE,
+    TRANSLATION_MAX_CONNECTIONS, TRANSLATION_KEEPALIVE_TIMEOUT, TRANSLATION_REQUEST_TIMEOUT,
+    TRANSLATION_CONNECT_TIMEOUT, TRANSLATION_MAX_RETRIES, TRANSLATION_RETRY_BASE_DELAY, TRANSLATION_RETRY_MAX_DELAY,
+    TRANSLATION_MEMORY_ENABLED, TRANSLATION_MEMORY_KEY_PREFIX, TRANSLATION_MEMORY_LOCAL_SIZE, TRANSLATION_MEMORY_TTL
+)
+from core.image_dedup import complete_image_dedup, fail_image_dedup
+from core.task_queue import finish_task, push_result
 from hosting.r2hosting import R2ImageHosting
 from logic.mask import filter_chinese_ocr_result
+from logic.translation_client import GeminiTranslationClient, TRANSLATION_LIST_SCHEMA
+from logic.translation_memory import TranslationMemory, translation_memory_version
 
 logger = logging.getLogger(__name__)
 
 async def enqueue_error_result(request_id: str, image_id: str, error_message: str):
     """에러 결과를 에러 큐에 추가합니다."""
     try:
-        redis_client = get_redis_client()
         error_data = {
             "request_id": request_id,
             "image_id": image_id,
@@ -32,10 +37,17 @@ async def enqueue_error_result(request_id: str, image_id: str, error_message: st
             "timestamp": time.time()
         }
         error_json = json.dumps(error_data).encode('utf-8')
-        await redis_client.rpush(ERROR_QUEUE, error_json)
+        await push_result(ERROR_QUEUE, error_json)
         logger.info(f"[{request_id}] Error result enqueued to {ERROR_QUEUE}: {error_message}")
     except Exception as e:
         logger.error(f"[{request_id}] Failed to enqueue error result: {e}", exc_info=True)
+    try:
+        # 중복 이미지의 leader 작업이었다면 잠금을 풀어 대기 요청이 다시 처리되게 함
+        await fail_image_dedup(request_id, image_id)
+    except Exception as e:
+        logger.error(f"[{request_id}] Failed to release dedup lock: {e}", exc_info=True)
+    finally:
+        await finish_task(request_id, image_id)
 
 # API 키 (환경 변수 사용 권장)
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
@@ -44,149 +56,46 @@ if not GEMINI_API_KEY:
     raise ValueError("API 키가 필요합니다.")
 
 # Gemini API 엔드포인트
-API_URL = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={GEMINI_API_KEY}"
+GEMINI_MODEL_NAME = "gemini-2.0-flash"
+API_URL = f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_MODEL_NAME}:generateContent?key={GEMINI_API_KEY}"
 
-# JSON 응답 스키마 정의 (문자열 배열)
-TRANSLATION_LIST_SCHEMA = {
-    "type": "ARRAY",
-    "description": "입력된 텍스트 배열에 대한 번역된 텍스트 문자열 배열. 순서는 원본 배열과 동일해야 합니다.",
-    "items": {
-        "type": "STRING"
-    }
-}
+# 번역 지침 (시스템 프롬프트)
+SYSTEM_INSTRUCTION = (
+    "You are a helpful translation assistant. "
+    "Translate each of the following texts from the input JSON array into Korean. "
+    "I am translating texts that appear in product detail images, and the Korean translations should be natural. "
+    "Ensure the output array has the same number of elements as the input array and maintains the original order. "
+)
 
 # R2 호스팅 인스턴스 생성
 r2_hosting = R2ImageHosting()
 
-async def call_gemini_translate_list(texts_to_translate: List[str], request_id: str = "N/A") -> List[str]:
-    """
-    Gemini API를 JSON 모드로 호출하여 텍스트 리스트 전체를 번역합니다.
-
-    Args:
-        texts_to_translate: 번역할 텍스트 문자열 리스트.
-        request_id: 로깅을 위한 요청 ID.
-
-    Returns:
-        번역된 텍스트 문자열 리스트.
-
-    Raises:
-        aiohttp.ClientError: 네트워크 또는 API 호출 중 에러 발생 시.
-        ValueError: API 응답 구문 분석 실패, 스키마 불일치, 길이 불일치 또는 API 에러 메시지 포함 시.
-        json.JSONDecodeError: 입력 리스트를 JSON으로 변환 실패 시.
-    """
-    if not texts_to_translate:
-        logger.info(f"[{request_id}] 번역할 텍스트 리스트가 비어있습니다. 빈 리스트 반환.")
-        return []
-
-    # 시스템 지침 정의
-    system_instruction = (
-        "You are a helpful translation assistant. "
-        "Translate each of the following texts from the input JSON array into Korean. "
-        "I am translating texts that appear in product detail images, and the Korean translations should be natural. "
-        "Ensure the output array has the same number of elements as the input array and maintains the original order. "
+def create_translation_client() -> GeminiTranslationClient:
+    """설정값으로 워커 전체가 공유할 번역 클라이언트를 만듭니다."""
+    return GeminiTranslationClient(
+        api_url=API_URL,
+        system_instruction=SYSTEM_INSTRUCTION,
+        max_connections=TRANSLATION_MAX_CONNECTIONS,
+        keepalive_timeout=TRANSLATION_KEEPALIVE_TIMEOUT,
+        request_timeout=TRANSLATION_REQUEST_TIMEOUT,
+        connect_timeout=TRANSLATION_CONNECT_TIMEOUT,
+        max_retries=TRANSLATION_MAX_RETRIES,
+        retry_base_delay=TRANSLATION_RETRY_BASE_DELAY,
+        retry_max_delay=TRANSLATION_RETRY_MAX_DELAY
     )
 
-    # 입력 텍스트 리스트를 JSON 문자열로 변환
-    try:
-        prompt_content = json.dumps(texts_to_translate, ensure_ascii=False)
-    except json.JSONDecodeError as e:
-        logger.error(f"[{request_id}] 입력 텍스트 리스트를 JSON으로 변환 실패: {e}")
-        raise e
-
-    headers = {
-        'Content-Type': 'application/json'
-    }
-    request_data = {
-        "system_instruction": {
-            "parts": [{"text": system_instruction}]
-        },
-        "contents": [
-            {
-                "role": "user",
-                "parts": [{"text": prompt_content}]
-            }
-        ],
-        "generationConfig": {
-            "responseMimeType": "application/json",
-            "responseSchema": TRANSLATION_LIST_SCHEMA
-        }
-    }
-
-    logger.debug(f"[{request_id}] Calling Gemini API (JSON List). URL: {API_URL.split('?')[0]}, Num Texts: {len(texts_to_translate)}, Prompt (partial): {prompt_content[:100]}...")
-
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.post(API_URL, headers=headers, json=request_data) as response:
-                response_text = await response.text()
-                response.raise_for_status()
-
-                try:
-                    response_data = json.loads(response_text)
-                except json.JSONDecodeError:
-                    logger.error(f"[{request_id}] Gemini API JSON 응답 파싱 실패 (List). 응답: {response_text}")
-                    raise ValueError("Failed to parse Gemini API JSON response (List)")
-
-                # JSON 모드 응답 구조 파싱
-                if response_data.get("candidates") and \
-                   len(response_data["candidates"]) > 0 and \
-                   response_data["candidates"][0].get("content") and \
-                   response_data["candidates"][0]["content"].get("parts") and \
-                   len(response_data["candidates"][0]["content"]["parts"]) > 0 and \
-                   isinstance(response_data["candidates"][0]["content"]["parts"][0].get("text"), str):
-
-                    translated_list_json = response_data["candidates"][0]["content"]["parts"][0]["text"]
-                    try:
-                        translated_list = json.loads(translated_list_json)
-                    except json.JSONDecodeError:
-                        logger.error(f"[{request_id}] Gemini API 반환 JSON 내부 파싱 실패 (List). 내부 JSON: {translated_list_json}")
-                        raise ValueError("Failed to parse inner JSON from Gemini API response (List)")
-
-                    # 반환된 것이 리스트인지 확인
-                    if not isinstance(translated_list, list):
-                        logger.error(f"[{request_id}] Gemini API가 JSON 배열을 반환하지 않음 (List). 반환값 타입: {type(translated_list)}")
-                        raise ValueError("Gemini API did not return a JSON array as expected (List)")
-
-                    # 입력과 출력 리스트 길이 비교
-                    if len(translated_list) != len(texts_to_translate):
-                         logger.error(f"[{request_id}] Gemini API 번역 결과 길이 불일치 (List). 입력: {len(texts_to_translate)}, 출력: {len(translated_list)}")
-                         raise ValueError(f"Length mismatch between input ({len(texts_to_translate)}) and translated output ({len(translated_list)}) (List)")
-
-                    logger.debug(f"[{request_id}] Gemini API 응답 수신 (List). 번역된 항목 수: {len(translated_list)}")
-                    return translated_list
-                else:
-                    logger.error(f"[{request_id}] Gemini API 응답 구조가 예상과 다릅니다 (List): {response_data}")
-                    if response_data.get("promptFeedback") and response_data["promptFeedback"].get("blockReason"):
-                        reason = response_data['promptFeedback']['blockReason']
-                        ratings = response_data['promptFeedback'].get('safetyRatings', 'N/A')
-                        logger.error(f"[{request_id}] Gemini API 요청 차단됨 (List): {reason}, 이유: {ratings}")
-                        raise ValueError(f"Gemini API request blocked (List): {reason}")
-                    raise ValueError("Unexpected Gemini API response structure (List)")
-
-        except aiohttp.ClientResponseError as e:
-            logger.error(f"[{request_id}] Gemini API HTTP 에러 (List): {e.status} {e.message}. 응답: {response_text}")
-            try:
-                error_details = json.loads(response_text)
-                if error_details.get("error") and error_details["error"].get("message"):
-                    logger.error(f"[{request_id}] 상세 Gemini API 에러 (List): {error_details['error']['message']}")
-                    raise ValueError(f"Gemini API Error (List): {error_details['error']['message']}") from e
-            except json.JSONDecodeError:
-                pass
-            raise e
-        except aiohttp.ClientError as e:
-            logger.error(f"[{request_id}] Gemini API 호출 중 네트워크/클라이언트 에러 (List): {e}")
-            raise e
-        except Exception as e:
-             logger.error(f"[{request_id}] Gemini API 호출 중 예상치 못한 에러 (List): {e}", exc_info=True)
-             raise e
-
-async def call_translation_api(texts: List[str], request_id: str) -> List[str]:
+async def call_translation_api(texts: List[str], request_id: str, translation_client: GeminiTranslationClient,
+                               translation_memory: Optional[TranslationMemory] = None) -> List[str]:
     """
-    Gemini API (JSON 모드)를 호출하여 텍스트 리스트 전체를 한 번에 번역합니다.
-    API 호출 실패 시 한 번 재시도하며, 최종 실패 시 빈 리스트를 반환합니다.
+    공유 번역 클라이언트로 텍스트 리스트 전체를 한 번에 번역합니다.
+    번역 메모리가 있으면 캐시에 없는 원문(중복 제거)만 API로 보내고 결과를 원래 순서로 합칩니다.
+    일시적 오류는 클라이언트가 백오프와 함께 재시도하며, 최종 실패 시 빈 리스트를 반환합니다.
 
     Args:
         texts: 번역할 텍스트 문자열 리스트.
         request_id: 로깅을 위한 요청 ID.
+        translation_client: 워커가 소유한 GeminiTranslationClient.
+        translation_memory: 워커가 소유한 TranslationMemory (None이면 캐시 미사용).
 
     Returns:
         번역된 텍스트 문자열 리스트. 최종 실패 시 빈 리스트 `[]` 반환.
@@ -195,28 +104,44 @@ async def call_translation_api(texts: List[str], request_id: str) -> List[str]:
         logger.info(f"[{request_id}] No texts provided for translation.")
         return []
 
-    logger.info(f"[{request_id}] Calling Gemini translation API (JSON List) for {len(texts)} texts...")
-
-    max_retries = 1
-    for attempt in range(max_retries + 1):
-        try:
-            translated_texts = await call_gemini_translate_list(
-                texts_to_translate=texts,
-                request_id=request_id
-            )
-            logger.info(f"[{request_id}] Gemini translation (JSON List) finished on attempt {attempt + 1}. Processed {len(texts)} texts, received {len(translated_texts)} translations.")
-            return translated_texts
+    cached = await translation_memory.lookup(texts) if translation_memory else {}
+    to_translate = [text for text in dict.fromkeys(texts) if text not in cached]
+    if not to_translate:
+        logger.info(f"[{request_id}] All {len(texts)} texts served from translation memory.")
+        return [cached[text] for text in texts]
 
-        except Exception as e:
-            logger.error(f"[{request_id}] Attempt {attempt + 1} failed to translate text list using Gemini API (JSON List): {e}", exc_info=False)
-            if attempt < max_retries:
-                logger.info(f"[{request_id}] Retrying translation...")
-                await asyncio.sleep(1)
-            else:
-                logger.error(f"[{request_id}] All translation attempts failed.")
-                return []
+    logger.info(
+        f"[{request_id}] Calling Gemini translation API (JSON List) for {len(to_translate)} texts "
+        f"({len(texts)} requested, {len(cached)} cached)..."
+    )
+    try:
+        translated_texts = await translation_client.translate_list(to_translate, request_id)
+        logger.info(f"[{request_id}] Gemini translation (JSON List) finished. Processed {len(to_translate)} texts, received {len(translated_texts)} translations.")
+    except Exception as e:
+        logger.error(f"[{request_id}] All translation attempts failed: {e}")
+        return []
 
-    return []
+    fresh = dict(zip(to_translate, translated_texts))
+    if translation_memory:
+        # 빈 번역은 일시적인 모델 출력일 수 있으므로 저장하지 않음
+        await translation_memory.store({text: translated for text, translated in fresh.items() if isinstance(translated, str) and translated.strip()})
+    cached.update(fresh)
+    return [cached[text] for text in texts]
+
+def translation_config_version() -> str:
+    """번역 결과를 바꾸는 설정(모델, 프롬프트, 응답 스키마)의 버전."""
+    return translation_memory_version(GEMINI_MODEL_NAME, SYSTEM_INSTRUCTION, TRANSLATION_LIST_SCHEMA)
+
+def create_translation_memory() -> Optional[TranslationMemory]:
+    """설정값으로 워커 전체가 공유할 번역 메모리를 만듭니다 (비활성화 시 None)."""
+    if not TRANSLATION_MEMORY_ENABLED:
+        return None
+    return TranslationMemory(
+        version=translation_config_version(),
+        key_prefix=TRANSLATION_MEMORY_KEY_PREFIX,
+        max_local_entries=TRANSLATION_MEMORY_LOCAL_SIZE,
+        ttl_seconds=TRANSLATION_MEMORY_TTL
+    )
 
 async def save_result_to_internal_storage(result_checker, request_id: str, result_data: dict):
     """번역 결과를 ResultChecker의 내부 메모리 저장소에 저장합니다."""
@@ -228,10 +153,13 @@ async def save_result_to_internal_storage(result_checker, request_id: str, resul
         logger.error(f"[{request_id}] Failed to save result to internal storage: {e}", exc_info=True)
         return False
 
-async def process_and_save_translation(task_data: dict, image_url: str, result_checker):
+async def process_and_save_translation(task_data: dict, image_url: str, result_checker, translation_client: GeminiTranslationClient,
+                                      translation_memory: Optional[TranslationMemory] = None):
     """
     번역의 전체 과정을 처리하고, 결과를 ResultChecker의 내부 저장소에 저장합니다.
     result_checker: ResultChecker 인스턴스 (내부 저장소 접근용)
+    translation_client: 워커가 소유한 번역 클라이언트 (연결 풀 공유)
+    translation_memory: 워커가 소유한 번역 메모리 (None이면 캐시 미사용)
     """
     request_id = task_data.get("request_id")
     image_id = task_data.get("image_id")
@@ -268,7 +196,7 @@ async def process_and_save_translation(task_data: dict, image_url: str, result_c
             if texts_to_translate:
                 # 번역 API 호출 (순수 async I/O)
                 logger.info(f"[{request_id}] Calling translation API for {len(texts_to_translate)} texts")
-                translated_texts = await call_translation_api(texts_to_translate, request_id)
+                translated_texts = await call_translation_api(texts_to_translate, request_id, translation_client, translation_memory)
 
                 # 번역 결과 처리
                 translate_result_for_rendering = []
@@ -303,9 +231,10 @@ async def process_and_save_translation(task_data: dict, image_url: str, result_c
                     "image_id": image_id,
                     "image_url": image_url  # 원본 URL 그대로 전송
                 }
-                redis_client = get_redis_client()
-                await redis_client.rpush(HOSTING_TASKS_QUEUE, json.dumps(hosting_task).encode('utf-8'))
+                await push_result(HOSTING_TASKS_QUEUE, json.dumps(hosting_task).encode('utf-8'))
                 logger.info(f"[{request_id}] No texts to translate, forwarded to hosting queue")
+                await complete_image_dedup(request_id, image_id, image_url, SUCCESS_QUEUE)
+                await finish_task(request_id, image_id)
         else:
             # 필터링된 결과가 없는 경우 - 호스팅 큐로 바로 전송
             hosting_task = {
@@ -313,9 +242,10 @@ async def process_and_save_translation(task_data: dict, image_url: str, result_c
                 "image_id": image_id,
                 "image_url": image_url  # 원본 URL 그대로 전송
             }
-            redis_client = get_redis_client()
-            await redis_client.rpush(HOSTING_TASKS_QUEUE, json.dumps(hosting_task).encode('utf-8'))
+            await push_result(HOSTING_TASKS_QUEUE, json.dumps(hosting_task).encode('utf-8'))
             logger.info(f"[{request_id}] No Chinese text found, forwarded to hosting queue")
+            await complete_image_dedup(request_id, image_id, image_url, SUCCESS_QUEUE)
+            await finish_task(request_id, image_id)
             
     except Exception as e:
         logger.error(f"[{request_id}] Error in translation process: {e}", exc_info=True)
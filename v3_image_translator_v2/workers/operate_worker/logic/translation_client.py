@@ -0,0 +1,244 @@
+import json
+import random
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import List, Dict, Any, Optional
+
+import aiohttp
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# JSON 응답 스키마 정의 (문자열 배열)
+TRANSLATION_LIST_SCHEMA = {
+    "type": "ARRAY",
+    "description": "입력된 텍스트 배열에 대한 번역된 텍스트 문자열 배열. 순서는 원본 배열과 동일해야 합니다.",
+    "items": {
+        "type": "STRING"
+    }
+}
+
+# 재시도해도 결과가 바뀌지 않는 HTTP 상태 (요청/키 오류)
+_NON_RETRYABLE_STATUSES = {400, 401, 403, 404}
+
+
+class NonRetryableTranslationError(ValueError):
+    """요청 차단, 잘못된 요청/키 등 재시도해도 성공할 수 없는 번역 오류."""
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, NonRetryableTranslationError):
+        return False
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status not in _NON_RETRYABLE_STATUSES
+    # 연결 끊김/타임아웃, 응답 파싱 실패 및 길이 불일치(모델 출력 문제)는 다시 시도
+    return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError, ValueError))
+
+
+def build_translation_request(texts: List[str], system_instruction: str) -> Dict[str, Any]:
+    """텍스트 리스트를 JSON 배열 프롬프트로 담은 Gemini generateContent 요청 본문을 만듭니다."""
+    return {
+        "system_instruction": {
+            "parts": [{"text": system_instruction}]
+        },
+        "contents": [
+            {
+                "role": "user",
+                "parts": [{"text": json.dumps(texts, ensure_ascii=False)}]
+            }
+        ],
+        "generationConfig": {
+            "responseMimeType": "application/json",
+            "responseSchema": TRANSLATION_LIST_SCHEMA
+        }
+    }
+
+
+def parse_translation_response(response_data: Dict[str, Any], expected_count: int, request_id: str = "N/A") -> List[str]:
+    """
+    Gemini JSON 모드 응답에서 번역 문자열 리스트를 꺼냅니다.
+
+    Raises:
+        NonRetryableTranslationError: 요청이 차단된 경우.
+        ValueError: 응답 구조/내부 JSON이 잘못되었거나 길이가 입력과 다른 경우.
+    """
+    try:
+        translated_list_json = response_data["candidates"][0]["content"]["parts"][0]["text"]
+    except (KeyError, IndexError, TypeError):
+        translated_list_json = None
+
+    if not isinstance(translated_list_json, str):
+        logger.error(f"[{request_id}] Gemini API 응답 구조가 예상과 다릅니다 (List): {response_data}")
+        feedback = response_data.get("promptFeedback") or {}
+        if feedback.get("blockReason"):
+            reason = feedback["blockReason"]
+            logger.error(f"[{request_id}] Gemini API 요청 차단됨 (List): {reason}, 이유: {feedback.get('safetyRatings', 'N/A')}")
+            raise NonRetryableTranslationError(f"Gemini API request blocked (List): {reason}")
+        raise ValueError("Unexpected Gemini API response structure (List)")
+
+    try:
+        translated_list = json.loads(translated_list_json)
+    except json.JSONDecodeError:
+        logger.error(f"[{request_id}] Gemini API 반환 JSON 내부 파싱 실패 (List). 내부 JSON: {translated_list_json}")
+        raise ValueError("Failed to parse inner JSON from Gemini API response (List)")
+
+    # 반환된 것이 리스트인지 확인
+    if not isinstance(translated_list, list):
+        logger.error(f"[{request_id}] Gemini API가 JSON 배열을 반환하지 않음 (List). 반환값 타입: {type(translated_list)}")
+        raise ValueError("Gemini API did not return a JSON array as expected (List)")
+
+    # 입력과 출력 리스트 길이 비교
+    if len(translated_list) != expected_count:
+        logger.error(f"[{request_id}] Gemini API 번역 결과 길이 불일치 (List). 입력: {expected_count}, 출력: {len(translated_list)}")
+        raise ValueError(f"Length mismatch between input ({expected_count}) and translated output ({len(translated_list)}) (List)")
+
+    return translated_list
+
+
+class GeminiTranslationClient:
+    """
+    워커 수명 동안 하나의 aiohttp 세션(연결 풀)을 재사용하는 Gemini 번역 클라이언트.
+
+    요청마다 세션을 새로 만들면 매번 DNS 조회 + TCP + TLS 핸드셰이크를 거치므로,
+    keep-alive 연결 풀과 DNS 캐시를 유지해 두 번째 요청부터는 연결 비용 없이 바로 보냅니다.
+    일시적 오류(연결/타임아웃, 429/5xx, 잘못된 응답)는 지터를 섞은 지수 백오프로 재시도합니다.
+    세션은 첫 요청 때 현재 이벤트 루프에서 만들어지며, 종료 시 close()를 호출해야 합니다.
+    """
+
+    def __init__(
+        self,
+        api_url: str,
+        system_instruction: str,
+        max_connections: int = 16,
+        keepalive_timeout: float = 60.0,
+        request_timeout: float = 60.0,
+        connect_timeout: float = 10.0,
+        max_retries: int = 3,
+        retry_base_delay: float = 0.5,
+        retry_max_delay: float = 8.0
+    ):
+        """
+        Args:
+            api_url: generateContent 엔드포인트 (API 키 포함)
+            system_instruction: 번역 지침 (시스템 프롬프트)
+            max_connections: 연결 풀 크기 (동시 요청 수 상한)
+            keepalive_timeout: 유휴 연결 유지 시간 (초)
+            request_timeout: 요청 한 번의 전체 타임아웃 (초)
+            connect_timeout: 연결 수립 타임아웃 (초)
+            max_retries: 일시적 오류 시 재시도 횟수
+            retry_base_delay: 첫 재시도 대기 시간 상한 (초, 이후 2배씩 증가)
+            retry_max_delay: 재시도 대기 시간 상한 (초)
+        """
+        self.api_url = api_url
+        self.system_instruction = system_instruction
+        self.max_connections = max(1, max_connections)
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = aiohttp.ClientTimeout(total=request_timeout, connect=connect_timeout)
+        self.max_retries = max(0, max_retries)
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self._session: Optional[aiohttp.ClientSession] = None
+
+        # 지표
+        self._stats_lock = threading.Lock()
+        self._latencies = deque(maxlen=1024)
+        self.succeeded = 0
+        self.failed = 0
+        self.retries = 0
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self._session
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """full jitter: 0 ~ min(상한, base * 2^attempt) 사이에서 무작위로 대기 (동시 재시도가 몰리지 않도록)."""
+        return random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * (2 ** attempt)))
+
+    async def _post(self, request_data: Dict[str, Any], expected_count: int, request_id: str) -> List[str]:
+        session = self._get_session()
+        async with session.post(self.api_url, json=request_data) as response:
+            response_text = await response.text()
+            if response.status >= 400:
+                message = response.reason or ""
+                try:
+                    message = json.loads(response_text)["error"]["message"]
+                except (ValueError, KeyError, TypeError):
+                    pass
+                logger.error(f"[{request_id}] Gemini API HTTP 에러 (List): {response.status} {message}")
+                raise aiohttp.ClientResponseError(
+                    response.request_info, response.history, status=response.status, message=message
+                )
+            try:
+                response_data = json.loads(response_text)
+            except json.JSONDecodeError:
+                logger.error(f"[{request_id}] Gemini API JSON 응답 파싱 실패 (List). 응답: {response_text}")
+                raise ValueError("Failed to parse Gemini API JSON response (List)")
+        return parse_translation_response(response_data, expected_count, request_id)
+
+    async def translate_list(self, texts: List[str], request_id: str = "N/A") -> List[str]:
+        """
+        텍스트 리스트 전체를 한 번의 Gemini JSON 모드 호출로 번역합니다 (일시적 오류는 재시도).
+
+        Returns:
+            번역된 텍스트 문자열 리스트 (입력과 같은 길이/순서).
+
+        Raises:
+            aiohttp.ClientError, asyncio.TimeoutError, ValueError: 재시도 후에도 실패한 경우 마지막 오류.
+        """
+        if not texts:
+            return []
+
+        request_data = build_translation_request(texts, self.system_instruction)
+        logger.debug(f"[{request_id}] Calling Gemini API (JSON List). URL: {self.api_url.split('?')[0]}, Num Texts: {len(texts)}")
+
+        start = time.perf_counter()
+        attempt = 0
+        while True:
+            try:
+                translated = await self._post(request_data, len(texts), request_id)
+                break
+            except Exception as e:
+                if attempt >= self.max_retries or not _is_retryable(e):
+                    with self._stats_lock:
+                        self.failed += 1
+                    logger.error(f"[{request_id}] Gemini 번역 실패 ({type(e).__name__}, {attempt + 1}회 시도): {e}")
+                    raise
+                delay = self._backoff_delay(attempt)
+                attempt += 1
+                with self._stats_lock:
+                    self.retries += 1
+                logger.warning(f"[{request_id}] Gemini 번역 재시도 {attempt}/{self.max_retries}, {delay:.2f}s 후: {type(e).__name__}: {e}")
+                await asyncio.sleep(delay)
+
+        elapsed = time.perf_counter() - start
+        with self._stats_lock:
+            self.succeeded += 1
+            self._latencies.append(elapsed)
+        logger.debug(f"[{request_id}] Gemini API 응답 수신 (List). 번역된 항목 수: {len(translated)}, {elapsed * 1000:.0f}ms")
+        return translated
+
+    def stats(self) -> Dict[str, Any]:
+        """성공/실패/재시도 수와 최근 호출 지연시간 백분위수(초)를 반환합니다."""
+        with self._stats_lock:
+            latencies = np.array(self._latencies) if self._latencies else None
+            result = {"succeeded": self.succeeded, "failed": self.failed, "retries": self.retries}
+        if latencies is not None:
+            p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+            result.update({"latency_p50": p50, "latency_p90": p90, "latency_p99": p99})
+        return result
+
+    async def close(self):
+        """세션과 연결 풀을 닫습니다."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
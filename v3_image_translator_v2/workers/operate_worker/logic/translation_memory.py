@@ -0,0 +1,155 @@
+import json
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import List, Dict, Any, Iterable, Optional, Callable
+
+from core.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+def translation_memory_version(model_name: str, system_instruction: str, response_schema: Optional[dict] = None) -> str:
+    """모델 이름과 프롬프트(지침, 응답 스키마)로 캐시 버전을 만듭니다. 어느 하나라도 바뀌면 이전 번역은 재사용하지 않습니다."""
+    payload = json.dumps([model_name, system_instruction, response_schema], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:12]
+
+
+class TranslationMemory:
+    """
+    원문 문자열 -> 번역 결과 정확 일치 캐시 (번역 메모리).
+
+    프로세스 로컬 LRU를 먼저 보고, 없으면 여러 워커가 공유하는 Redis를 조회합니다.
+    Redis에는 원문마다 키 하나(접두사 + 버전 + 원문 SHA-1)를 SET EX로 저장하므로 항목마다 따로 만료되고,
+    자주 쓰이지 않는 번역이 계속 쌓이지 않습니다. 모델/프롬프트가 바뀌면 버전이 바뀌어 이전 항목은 TTL 후 사라집니다.
+    Redis 오류는 캐시 미스로 취급하므로 번역 자체를 막지 않습니다.
+    이벤트 루프 한 곳에서만 사용한다고 가정합니다 (잠금 없음).
+    """
+
+    def __init__(
+        self,
+        version: str,
+        key_prefix: str = "translation_memory:",
+        max_local_entries: int = 50000,
+        ttl_seconds: int = 30 * 24 * 3600,
+        redis_getter: Callable = get_redis_client
+    ):
+        """
+        Args:
+            version: translation_memory_version()으로 만든 캐시 버전
+            key_prefix: Redis 키 접두사 (키 = 접두사 + 버전 + ":" + 원문 SHA-1)
+            max_local_entries: 로컬 LRU 최대 항목 수 (0이면 로컬 캐시 없이 Redis만 사용)
+            ttl_seconds: Redis 항목별 만료 시간 (초, 해당 항목의 마지막 쓰기 기준)
+            redis_getter: 비동기 Redis 클라이언트를 반환하는 함수 (None 반환/예외 시 Redis 미사용)
+        """
+        self.version = version
+        self.key_prefix = f"{key_prefix}{version}:"
+        self.max_local_entries = max(0, max_local_entries)
+        self.ttl_seconds = ttl_seconds
+        self._redis_getter = redis_getter
+        self._local: "OrderedDict[str, str]" = OrderedDict()
+
+        # 지표 (문자열 단위)
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.redis_errors = 0
+
+    def _local_get(self, text: str) -> Optional[str]:
+        translated = self._local.get(text)
+        if translated is not None:
+            self._local.move_to_end(text)
+        return translated
+
+    def _local_put(self, text: str, translated: str):
+        if not self.max_local_entries:
+            return
+        self._local[text] = translated
+        self._local.move_to_end(text)
+        while len(self._local) > self.max_local_entries:
+            self._local.popitem(last=False)
+
+    def _entry_key(self, text: str) -> str:
+        # 원문 길이와 상관없이 키 길이를 고정
+        return self.key_prefix + hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def _redis(self):
+        try:
+            return self._redis_getter()
+        except Exception as e:
+            logger.debug(f"Translation memory: Redis unavailable ({e})")
+            return None
+
+    async def lookup(self, texts: Iterable[str]) -> Dict[str, str]:
+        """
+        캐시된 번역을 찾아 {원문: 번역}으로 반환합니다 (중복 원문은 한 번만 조회).
+        찾지 못한 원문은 결과에 포함되지 않습니다.
+        """
+        found: Dict[str, str] = {}
+        missing: List[str] = []
+        for text in dict.fromkeys(texts):
+            translated = self._local_get(text)
+            if translated is not None:
+                found[text] = translated
+                self.local_hits += 1
+            else:
+                missing.append(text)
+
+        redis_client = self._redis() if missing else None
+        if redis_client is not None:
+            try:
+                values = await redis_client.mget([self._entry_key(t) for t in missing])
+            except Exception as e:
+                self.redis_errors += 1
+                logger.warning(f"Translation memory lookup failed, treating as miss: {e}")
+                values = [None] * len(missing)
+
+            still_missing = []
+            for text, value in zip(missing, values):
+                if value is None:
+                    still_missing.append(text)
+                    continue
+                translated = value.decode("utf-8") if isinstance(value, bytes) else value
+                found[text] = translated
+                self._local_put(text, translated)
+                self.redis_hits += 1
+            missing = still_missing
+
+        self.misses += len(missing)
+        return found
+
+    async def store(self, translations: Dict[str, str]):
+        """새 번역을 로컬 LRU와 Redis(항목별 키, TTL 포함)에 저장합니다."""
+        if not translations:
+            return
+        for text, translated in translations.items():
+            self._local_put(text, translated)
+        self.stored += len(translations)
+
+        redis_client = self._redis()
+        if redis_client is None:
+            return
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for text, translated in translations.items():
+                    pipe.set(self._entry_key(text), translated.encode("utf-8"), ex=self.ttl_seconds)
+                await pipe.execute()
+        except Exception as e:
+            self.redis_errors += 1
+            logger.warning(f"Translation memory store failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """로컬/Redis 적중 수, 미스 수와 적중률(문자열 단위)을 반환합니다."""
+        hits = self.local_hits + self.redis_hits
+        total = hits + self.misses
+        return {
+            "version": self.version,
+            "local_entries": len(self._local),
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_rate": hits / total if total else 0.0,
+            "stored": self.stored,
+            "redis_errors": self.redis_errors
+        }
@@ -1,7 +1,7 @@
 // Redis 큐 스키마 - Image Translation Pipeline (URL 방식)
 
 // ===== 워커 간 큐 (Redis BLPOP) =====
-// Queue: processor_tasks (BLPOP)
+// Queue: processor_tasks (BLPOP, QUEUE_BACKEND=stream이면 XREADGROUP - 스트림 엔트리의 data 필드에 아래 JSON)
 // Processor 워커에서 Unified 워커로 전달되는 OCR 작업
 const processor_tasks = {
     "request_id": "647c390b-6279-4633-aa9a-c657379488f8",
@@ -21,9 +21,32 @@ const processor_tasks = {
             [[213.0, 250.0], [657.0, 250.0], [657.0, 317.0], [213.0, 317.0]],
             ["360°套包工艺", 0.9992042183876038]
         ]
-    ]
+    ],
+    // (선택) 같은 호스트의 OCR Worker가 IMAGE_HANDOFF_DIR에 저장한 원본 바이트 핸들
+    // 없거나 만료/삭제되었으면 image_url로 다운로드
+    "image_handle": {
+        "key": "3f786850e387550fdab836ed7e6dc881de23001b", // 원본 바이트 SHA-1 (파일 이름)
+        "size": 482113,
+        "expires_at": 1750000000.0
+    },
+    // (선택) 같은 원본 이미지를 처리하는 leader 작업일 때만 포함 (IMAGE_DEDUP_ENABLED)
+    // 최종 URL이 나오면 dedup:{version}:hash / url 키에 기록하고 대기 요청들에 같은 URL로 성공 메시지 전송
+    "dedup": {
+        "version": "5d41402abc4b", // operate_worker가 기록한 설정 버전 (dedup:version)
+        "hash": "3f786850e387550fdab836ed7e6dc881de23001b", // 원본 바이트 SHA-1
+        "variant": "long", // is_long에 따라 "long" / "short"
+        "url": "https://img.alicdn.com/example.jpg"
+    }
 }
 
+// ===== 이미지 중복 제거 키 (core/image_dedup.py) =====
+// dedup:version                              -> 현재 설정 버전 (operate_worker 시작 시 기록)
+// dedup:{version}:hash:{sha1}:{variant}      -> 최종 이미지 URL (TTL IMAGE_DEDUP_TTL)
+// dedup:{version}:url:{정규화 URL}:{variant}  -> 최종 이미지 URL (TTL IMAGE_DEDUP_TTL, 다운로드 전 빠른 경로)
+// dedup:{version}:lock:{sha1}:{variant}      -> leader 잠금 (SET NX EX IMAGE_DEDUP_LOCK_TTL)
+// dedup:{version}:waiters:{sha1}:{variant}   -> 대기 요청의 원본 작업 JSON 리스트 (leader 완료 시 LPOP으로 비움)
+// dedup:{version}:waiting                    -> 대기 요청이 있는 "{sha1}:{variant}" sorted set (OCR Worker sweeper가 확인)
+
 // ===== Unified 워커 내부 프로세스 큐 (asyncio.Queue) =====
 // 내부 처리용 프로세스 큐들 - Redis가 아닌 메모리 큐 (SHM 사용)
 
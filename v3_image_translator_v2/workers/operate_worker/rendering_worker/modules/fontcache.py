@@ -0,0 +1,72 @@
+import threading
+import logging
+from typing import Dict, Any
+
+from PIL import ImageFont
+
+logger = logging.getLogger(__name__)
+
+
+class FontCache:
+    """
+    하나의 폰트 파일에 대한 크기별 FreeTypeFont 객체와 글자별 advance 폭 캐시.
+
+    TextSizeCalculator(크기 계산)와 RenderingProcessor(텍스트 그리기)가 같은 인스턴스를 공유하여
+    같은 크기의 폰트를 두 번 로드하지 않습니다. 렌더링 스레드풀의 여러 스레드에서 동시에 사용할 수 있습니다.
+    """
+
+    def __init__(self, font_path: str):
+        self.font_path = font_path
+        self._fonts: Dict[int, ImageFont.FreeTypeFont] = {}
+        self._advances: Dict[int, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+        # 지표
+        self.font_loads = 0
+        self.advance_misses = 0
+
+    def get(self, size: int) -> ImageFont.FreeTypeFont:
+        """
+        지정된 크기의 폰트 객체를 캐시에서 가져오거나 로드하여 캐시에 저장합니다.
+
+        Raises:
+            IOError: 폰트 파일 로드 실패 시
+        """
+        font = self._fonts.get(size)
+        if font is not None:
+            return font
+        with self._lock:
+            font = self._fonts.get(size)
+            if font is None:
+                font = ImageFont.truetype(self.font_path, size)
+                # 잠금 없는 경로에서 폰트가 보이는 순간 advance 캐시도 있어야 하므로 먼저 만들어 둠
+                self._advances[size] = {}
+                self._fonts[size] = font
+                self.font_loads += 1
+        return font
+
+    def text_width(self, text: str, size: int) -> float:
+        """
+        글자별 advance 폭의 합으로 텍스트 폭을 계산합니다 (커닝/잉크 경계 미반영 추정치).
+        처음 보는 글자만 폰트에 질의하고 이후에는 캐시된 값을 더합니다.
+        """
+        font = self.get(size)
+        advances = self._advances[size]
+        width = 0.0
+        for ch in text:
+            advance = advances.get(ch)
+            if advance is None:
+                advance = font.getlength(ch)
+                advances[ch] = advance
+                self.advance_misses += 1
+            width += advance
+        return width
+
+    def stats(self) -> Dict[str, Any]:
+        """로드된 폰트 크기 수와 advance 캐시 크기를 반환합니다."""
+        return {
+            "font_sizes": len(self._fonts),
+            "font_loads": self.font_loads,
+            "cached_advances": sum(len(a) for a in self._advances.values()),
+            "advance_misses": self.advance_misses
+        }
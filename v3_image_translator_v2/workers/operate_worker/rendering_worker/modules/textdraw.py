@@ -0,0 +1,90 @@
+import logging
+from typing import Dict, Any, List, Callable, Optional
+
+import numpy as np
+import cv2
+from PIL import Image, ImageDraw, ImageFont
+
+logger = logging.getLogger(__name__)
+
+
+def draw_text_in_box(draw: ImageDraw.ImageDraw, text: str, box: List[List[float]],
+                     text_color: Dict[str, int], font: ImageFont.FreeTypeFont):
+    """
+    박스 중앙에 (여러 줄) 텍스트를 그립니다.
+
+    Args:
+        draw: RGB 이미지에 연결된 ImageDraw
+        text: 텍스트 ('\\n'으로 줄 구분)
+        box: 텍스트 박스 좌표
+        text_color: {"r", "g", "b"} 텍스트 색상
+        font: 사용할 폰트
+    """
+    box = np.array(box, dtype=np.int32)
+    x_min, y_min = box.min(axis=0)
+    x_max, y_max = box.max(axis=0)
+    width = x_max - x_min
+    height = y_max - y_min
+
+    rgb_text_color = (text_color.get("r", 0), text_color.get("g", 0), text_color.get("b", 0))
+
+    # 줄별 크기를 먼저 모두 계산한 뒤 그리기 (계산 중 오류가 나면 아무것도 그리지 않음)
+    lines = text.split('\n')
+    total_text_width = 0
+    total_text_height = 0
+    line_heights = []
+
+    for line in lines:
+        text_bbox = draw.textbbox((0, 0), line, font=font)
+        line_width = text_bbox[2] - text_bbox[0]
+        line_height = text_bbox[3] - text_bbox[1]
+        total_text_width = max(total_text_width, line_width)
+        line_heights.append(line_height)
+        total_text_height += line_height
+
+    text_x = x_min + (width - total_text_width) // 2
+    text_y = y_min + (height - total_text_height) // 2
+
+    current_y = text_y
+    for i, line in enumerate(lines):
+        draw.text((text_x, current_y), line, fill=rgb_text_color, font=font)
+        current_y += line_heights[i]
+
+
+def render_text_items(image: np.ndarray, items: List[Dict[str, Any]],
+                      get_font: Callable[[int], Optional[ImageFont.FreeTypeFont]],
+                      default_font_size: int = 20) -> np.ndarray:
+    """
+    모든 번역 항목을 하나의 PIL 이미지에 그립니다 (BGR<->RGB 변환과 전체 프레임 복사는 1회).
+
+    항목 순서대로 그리므로 박스가 겹치는 경우에도 항목별로 따로 그리던 결과와 같습니다.
+    입력 이미지는 수정하지 않습니다.
+
+    Args:
+        image: BGR 이미지
+        items: translate_result 항목 목록 (translated_text, box, text_color, font_size_px)
+        get_font: 크기 -> 폰트 (로드 실패 시 None)
+        default_font_size: font_size_px가 없을 때 사용할 크기
+
+    Returns:
+        np.ndarray: 텍스트가 그려진 BGR 이미지
+    """
+    pil_image = Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+    draw = ImageDraw.Draw(pil_image)
+
+    for item_index, item in enumerate(items):
+        text = item.get("translated_text")
+        box = item.get("box")
+        text_color = item.get("text_color")
+        if not (text and box and text_color):
+            continue
+
+        try:
+            font = get_font(max(1, int(item.get("font_size_px", default_font_size))))
+            if font is None:
+                continue
+            draw_text_in_box(draw, text, box, text_color, font)
+        except Exception as e:
+            logger.error(f"Text rendering error for item {item_index}: {e}", exc_info=True)
+
+    return cv2.cvtColor(np.asarray(pil_image), cv2.COLOR_RGB2BGR)
@@ -1,10 +1,12 @@
 import numpy as np
 import cv2
-from typing import Dict, Tuple, Any, List
+from typing import Dict, Tuple, Any, List, Optional
 import logging
 import math
 from PIL import ImageFont
 
+from rendering_worker.modules.fontcache import FontCache
+
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -14,7 +16,8 @@ class TextSizeCalculator:
     텍스트 박스에 맞는 적절한 텍스트 크기를 계산하는 클래스 (Pillow 사용)
     """
     
-    def __init__(self, font_path: str, initial_size_ratio: float = 1.0, min_font_size: int = 1):
+    def __init__(self, font_path: str, initial_size_ratio: float = 1.0, min_font_size: int = 1,
+                 font_cache: Optional[FontCache] = None):
         """
         TextSizeCalculator 초기화
         
@@ -22,11 +25,12 @@ class TextSizeCalculator:
             font_path: 사용할 TTF 폰트 파일 경로
             initial_size_ratio: 텍스트 박스 높이 대비 초기 글자 크기 비율 (기본값 1.0)
             min_font_size: 최소 폰트 크기 (픽셀 단위)
+            font_cache: 렌더링과 공유할 폰트 캐시 (없으면 새로 생성)
         """
         self.font_path = font_path
         self.initial_size_ratio = initial_size_ratio
         self.min_font_size = min_font_size
-        self.font_cache: Dict[int, ImageFont.FreeTypeFont] = {} # 폰트 캐시 딕셔너리 추가
+        self.font_cache = font_cache if font_cache is not None else FontCache(font_path)
         try:
             # 폰트 존재 여부 확인 및 테스트 로드 (캐시에 저장)
             self._get_font(10)
@@ -51,17 +55,14 @@ class TextSizeCalculator:
         Raises:
             IOError: 폰트 파일 로드 실패 시
         """
-        if size not in self.font_cache:
-            try:
-                self.font_cache[size] = ImageFont.truetype(self.font_path, size)
-                # logger.debug(f"Font size {size} loaded and cached.") # 필요시 DEBUG 로그 활성화
-            except IOError as e:
-                logger.error(f"Error loading font '{self.font_path}' at size {size}: {e}")
-                raise # 오류를 다시 발생시켜 호출한 쪽에서 처리하도록 함
-            except Exception as e:
-                logger.error(f"Unexpected error loading font at size {size}: {e}", exc_info=True)
-                raise
-        return self.font_cache[size]
+        try:
+            return self.font_cache.get(size)
+        except IOError as e:
+            logger.error(f"Error loading font '{self.font_path}' at size {size}: {e}")
+            raise # 오류를 다시 발생시켜 호출한 쪽에서 처리하도록 함
+        except Exception as e:
+            logger.error(f"Unexpected error loading font at size {size}: {e}", exc_info=True)
+            raise
     
     def _calculate_box_dimensions(self, box: List[List[float]]) -> Tuple[float, float]:
         """
@@ -93,16 +94,24 @@ class TextSizeCalculator:
             # 오류 발생 시 0, 0 반환하여 이후 단계에서 처리되도록 함
             return 0.0, 0.0
     
+    def _fits(self, text: str, size: int, box_width: float) -> bool:
+        """실제 렌더링 경계(getbbox) 기준으로 텍스트 폭이 박스 폭 안에 들어오는지 확인"""
+        text_bbox = self._get_font(size).getbbox(text)
+        return text_bbox[2] - text_bbox[0] <= box_width
+
     def calculate_font_size(self, text: str, box: List[List[float]]) -> int:
         """
         텍스트가 박스 안에 맞도록 Pillow를 사용하여 폰트 크기(픽셀 단위) 계산
         
+        박스 높이 기준 크기가 맞지 않으면, 텍스트 폭이 폰트 크기에 거의 비례한다는 점을 이용해
+        시작 크기를 추정하고 글자별 advance 합으로 이진 탐색한 뒤, getbbox로 최종 크기를 확정합니다.
+        
         Args:
             text: 텍스트 내용 (단일 라인 가정)
             box: 텍스트 박스 좌표
             
         Returns:
-            int: 계산된 폰트 크기 (픽셀 단위)
+            int: 박스에 맞는 가장 큰 폰트 크기 (픽셀 단위)
         """
         try:
             # 박스 크기 계산
@@ -113,48 +122,44 @@ class TextSizeCalculator:
                 logger.warning(f"Invalid input for font size calculation: text='{text}', box_width={box_width}, box_height={box_height}. Returning min font size.")
                 return self.min_font_size
 
-            # 초기 폰트 크기 설정 (박스 높이를 기준으로)
-            # 정수형 픽셀 크기로 시작
-            current_font_size = max(self.min_font_size, int(box_height * self.initial_size_ratio))
+            # 상한: 박스 높이 기준 크기 (높이는 여기서만 고려, 단일 라인 가정)
+            max_font_size = max(self.min_font_size, int(box_height * self.initial_size_ratio))
             
-            logger.debug(f"Calculating font size for text: '{text[:20]}...', box_width: {box_width:.2f}, box_height: {box_height:.2f}, initial_font_size: {current_font_size}")
-
-            while current_font_size >= self.min_font_size:
-                try:
-                    # 현재 크기로 폰트 로드 (캐싱된 함수 사용)
-                    font = self._get_font(current_font_size)
-                    # Pillow의 getbbox 사용 (left, top, right, bottom)
-                    # textbbox는 (0,0) 기준이므로 bbox[2]가 너비, bbox[3]이 높이
-                    text_bbox = font.getbbox(text)
-                    text_width = text_bbox[2] - text_bbox[0] 
-                    text_height = text_bbox[3] - text_bbox[1] # 실제 렌더링 높이
+            logger.debug(f"Calculating font size for text: '{text[:20]}...', box_width: {box_width:.2f}, box_height: {box_height:.2f}, max_font_size: {max_font_size}")
 
-                    # 텍스트 너비가 박스 너비 안에 들어오는지 확인
-                    # 높이는 초기 크기 설정 시 고려되었으므로 너비만 체크 (단일 라인 가정)
-                    if text_width <= box_width:
-                        logger.debug(f"Font size {current_font_size} fits.")
-                        # 가장 큰 적합한 크기 반환
-                        return current_font_size
-                    
-                except OSError as e:
-                    logger.error(f"Error using font '{self.font_path}' at size {current_font_size}: {e}. Trying smaller size.")
-                    # 폰트 관련 오류 시 크기 줄이기 시도
-                except Exception as e:
-                    logger.error(f"Unexpected error during font size calculation at size {current_font_size}: {e}", exc_info=True)
-                    # 예기치 않은 오류 발생 시 안전하게 최소 크기 반환 또는 루프 중단
-                    break
+            if self._fits(text, max_font_size, box_width):
+                return max_font_size
 
-                # 폰트 크기 축소 (예: 1픽셀씩 또는 비율로)
-                # current_font_size -= 1 
-                new_size = int(current_font_size * 0.95) # 비율로 줄이기
-                if new_size < current_font_size: # 최소 1씩은 줄어들도록 보장
-                    current_font_size = new_size
+            # 1. advance 합 기준 이진 탐색 (lo: 맞는 크기 후보, hi: 안 맞는 것이 확인된 크기)
+            lo, hi = self.min_font_size, max_font_size
+            max_width = self.font_cache.text_width(text, max_font_size)
+            if max_width > 0:
+                # 폭 ∝ 크기 가정으로 첫 탐색 지점을 추정 (대부분 추정치 근처에서 바로 수렴)
+                guess = int(max_font_size * box_width / max_width)
+                if lo < guess < hi:
+                    if self.font_cache.text_width(text, guess) <= box_width:
+                        lo = guess
+                    else:
+                        hi = guess
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                if self.font_cache.text_width(text, mid) <= box_width:
+                    lo = mid
                 else:
-                    current_font_size -= 1 # 비율 감소가 효과 없으면 1씩 줄임
+                    hi = mid
 
-                # current_font_size = max(self.min_font_size, current_font_size) # 최소 크기 보장
+            # 2. advance 합은 추정치이므로 실제 경계(getbbox)로 확정
+            size = lo
+            if self._fits(text, size, box_width):
+                while size + 1 < max_font_size and self._fits(text, size + 1, box_width):
+                    size += 1
+                return size
+            while size > self.min_font_size:
+                size -= 1
+                if self._fits(text, size, box_width):
+                    return size
 
-            # 루프를 빠져나왔지만 적합한 크기를 찾지 못한 경우 (매우 작은 박스 등)
+            # 적합한 크기를 찾지 못한 경우 (매우 작은 박스 등)
             logger.warning(f"Could not find a fitting font size for text '{text[:20]}...' within box width {box_width:.2f}. Returning minimum size {self.min_font_size}.")
             return self.min_font_size
             
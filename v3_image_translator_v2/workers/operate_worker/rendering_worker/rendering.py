@@ -20,14 +20,19 @@ from core.config import (
     SUCCESS_QUEUE,
     ERROR_QUEUE,
     RESIZE_TARGET_SIZE,
-    FONT_PATH
+    FONT_PATH,
+    RENDER_SINGLE_PASS
 )
-from core.redis_client import get_redis_client
-from hosting.r2hosting import R2ImageHosting
+from core.image_dedup import complete_image_dedup, fail_image_dedup
+from core.task_queue import finish_task, push_result
+from hosting.r2hosting import R2ImageHosting, encode_image
+from hosting.r2uploader import R2Uploader
 
 # 렌더링 관련 모듈 임포트
 from rendering_worker.modules.selectTextColor import TextColorSelector
 from rendering_worker.modules.textsize import TextSizeCalculator
+from rendering_worker.modules.fontcache import FontCache
+from rendering_worker.modules.textdraw import draw_text_in_box, render_text_items
 
 # 로깅 설정
 logger = logging.getLogger(__name__)
@@ -35,7 +40,6 @@ logger = logging.getLogger(__name__)
 async def enqueue_error_result(request_id: str, image_id: str, error_message: str):
     """에러 결과를 에러 큐에 추가합니다."""
     try:
-        redis_client = get_redis_client()
         error_data = {
             "request_id": request_id,
             "image_id": image_id,
@@ -43,23 +47,31 @@ async def enqueue_error_result(request_id: str, image_id: str, error_message: st
             "timestamp": time.time()
         }
         error_json = json.dumps(error_data).encode('utf-8')
-        await redis_client.rpush(ERROR_QUEUE, error_json)
+        await push_result(ERROR_QUEUE, error_json)
         logger.info(f"[{request_id}] Error result enqueued to {ERROR_QUEUE}: {error_message}")
     except Exception as e:
         logger.error(f"[{request_id}] Failed to enqueue error result: {e}", exc_info=True)
+    try:
+        # 중복 이미지의 leader 작업이었다면 잠금을 풀어 대기 요청이 다시 처리되게 함
+        await fail_image_dedup(request_id, image_id)
+    except Exception as e:
+        logger.error(f"[{request_id}] Failed to release dedup lock: {e}", exc_info=True)
+    finally:
+        await finish_task(request_id, image_id)
 
 class RenderingProcessor:
     """
     ThreadPool에서 실행되는 렌더링 처리기
     """
     
-    def __init__(self, loop, font_path: str = FONT_PATH):
+    def __init__(self, loop, font_path: str = FONT_PATH, uploader: Optional[R2Uploader] = None):
         """
         RenderingProcessor 초기화
         
         Args:
             loop: 메인 asyncio 이벤트 루프
             font_path: 사용할 폰트 파일 경로
+            uploader: 최종 이미지 업로더 (없으면 새로 생성)
         """
         self.main_loop = loop
         # 폰트 파일 경로 저장
@@ -67,19 +79,20 @@ class RenderingProcessor:
         if not os.path.exists(self.font_path):
             logger.warning(f"폰트 파일을 찾을 수 없습니다: {self.font_path}")
         
-        # 렌더링 워커용 폰트 캐시
-        self.font_cache: Dict[int, ImageFont.FreeTypeFont] = {}
+        # 폰트 캐시 (크기 계산과 텍스트 렌더링이 공유)
+        self.font_cache = FontCache(self.font_path)
         
         # 필요한 모듈 인스턴스 생성
         self.text_color_selector = TextColorSelector()
         try:
-            self.text_size_calculator = TextSizeCalculator(font_path=self.font_path)
+            self.text_size_calculator = TextSizeCalculator(font_path=self.font_path, font_cache=self.font_cache)
         except Exception as e:
             logger.error(f"Failed to initialize TextSizeCalculator: {e}", exc_info=True)
             self.text_size_calculator = None 
         
-        # R2 호스팅 인스턴스 (최종 결과용만)
+        # R2 호스팅 인스턴스 (최종 결과용만) - 업로드는 전용 업로더가 이벤트 루프에서 수행
         self.r2_hosting = R2ImageHosting()
+        self.uploader = uploader or R2Uploader(self.r2_hosting)
         
         logger.info("RenderingProcessor 초기화 완료")
     
@@ -90,16 +103,14 @@ class RenderingProcessor:
              logger.warning(f"Requested font size {size} is invalid. Returning None.")
              return None
 
-        if size not in self.font_cache:
-            try:
-                self.font_cache[size] = ImageFont.truetype(self.font_path, size)
-            except IOError as e:
-                logger.error(f"Worker failed to load font '{self.font_path}' at size {size}: {e}")
-                return None
-            except Exception as e:
-                logger.error(f"Worker encountered unexpected error loading font at size {size}: {e}", exc_info=True)
-                return None
-        return self.font_cache[size]
+        try:
+            return self.font_cache.get(size)
+        except IOError as e:
+            logger.error(f"Worker failed to load font '{self.font_path}' at size {size}: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Worker encountered unexpected error loading font at size {size}: {e}", exc_info=True)
+            return None
 
     def process_rendering_sync(self, task_data: dict):
         """렌더링 처리 (순수 동기 함수 - ThreadPool에서 실행)"""
@@ -111,12 +122,13 @@ class RenderingProcessor:
             image_id = task_data["image_id"]
             translate_data = task_data["translate_data"]
             inpainted_image = task_data["inpainted_image"]
-            original_image_bytes = task_data["original_image_bytes"]
             is_long = task_data["is_long"]
             
-            # 원본 이미지 디코딩
-            original_img_array = np.frombuffer(original_image_bytes, dtype=np.uint8)
-            original_image = cv2.imdecode(original_img_array, cv2.IMREAD_COLOR)
+            # 원본 이미지 (캐시된 디코딩 배열이 없을 때만 디코딩)
+            original_image = task_data.get("original_image")
+            if original_image is None:
+                original_img_array = np.frombuffer(task_data["original_image_bytes"], dtype=np.uint8)
+                original_image = cv2.imdecode(original_img_array, cv2.IMREAD_COLOR)
             
             if original_image is None:
                 raise ValueError("Failed to decode original image")
@@ -195,7 +207,11 @@ class RenderingProcessor:
                 logger.error(f"[{request_id}] Text color selection failed: {e}")
             
             # 텍스트 렌더링
-            if translate_data and "translate_result" in translate_data:
+            if translate_data and "translate_result" in translate_data and RENDER_SINGLE_PASS:
+                # 모든 항목을 한 번의 RGB 변환 위에 그림
+                rendered_image = render_text_items(rendered_image, translate_data["translate_result"], self._get_font)
+                logger.debug(f"[{request_id}] Rendered {len(translate_data['translate_result'])} items in single pass")
+            elif translate_data and "translate_result" in translate_data:
                 for item_index, item in enumerate(translate_data["translate_result"]):
                     text = item.get("translated_text")
                     box = item.get("box")
@@ -222,62 +238,101 @@ class RenderingProcessor:
             # 파일명 구성: remaining_part + '-' + request_id의 첫 5글자
             final_image_id = f"{remaining_part}-{request_id[:5]}" if remaining_part else f"{image_id}-{request_id[:5]}"
             
-            upload_result = self.r2_hosting.upload_image_from_array(
-                image_array=rendered_image,
+            # 인코딩까지만 CPU 스레드에서 수행하고, 업로드는 이벤트 루프의 업로더에 넘겨 스레드를 바로 반환
+            encoded = encode_image(rendered_image, file_ext='.jpg', quality=90)
+            if not encoded["success"]:
+                raise ValueError(encoded["error"])
+            
+            coro = self._upload_and_forward(
+                request_id,
+                image_id,
+                encoded["data"],
+                final_image_id,
+                f'translated_image/{current_date}/{product_id}',
+                encoded["content_type"]
+            )
+            future = asyncio.run_coroutine_threadsafe(coro, self.main_loop)
+            future.add_done_callback(partial(self._on_forward_done, request_id, image_id))
+                
+        except Exception as e:
+            logger.error(f"[{request_id}] Rendering error in ThreadPool: {e}", exc_info=True)
+            # 렌더링 전반적인 오류 시 에러 큐로 전송
+            coro = enqueue_error_result(request_id, task_data.get("image_id", "N/A"), f"Rendering error: {str(e)}")
+            future = asyncio.run_coroutine_threadsafe(coro, self.main_loop)
+            future.add_done_callback(partial(self._on_forward_done, request_id, None))
+
+    def _on_forward_done(self, request_id: str, image_id: Optional[str], future):
+        """
+        이벤트 루프로 넘긴 업로드/결과 전송 코루틴이 예외로 끝나면 에러 결과를 보냅니다.
+        (예외를 잃어버리면 에러 큐 전송, 중복 제거 잠금 해제, 작업 ack가 모두 빠지므로)
+        image_id가 None이면 이미 에러 전송 중이던 코루틴이므로 기록만 합니다.
+        """
+        if future.cancelled():
+            error = "cancelled"
+        elif future.exception() is not None:
+            error = future.exception()
+        else:
+            return
+        logger.error(f"[{request_id}] Result forwarding failed: {error}")
+        if image_id is not None:
+            coro = enqueue_error_result(request_id, image_id, f"Result forwarding error: {error}")
+            asyncio.run_coroutine_threadsafe(coro, self.main_loop)
+
+    async def _upload_and_forward(self, request_id: str, image_id: str, data: bytes,
+                                  final_image_id: str, sub_path: str, content_type: str):
+        """최종 이미지를 업로드하고 결과 URL을 호스팅 큐(실패 시 에러 큐)로 전송"""
+        try:
+            upload_result = await self.uploader.upload_bytes(
+                data,
                 image_id=final_image_id,
-                sub_path=f'translated_image/{current_date}/{product_id}',
+                sub_path=sub_path,
                 file_ext='.jpg',
-                quality=90,
+                content_type=content_type,
                 metadata={
                     "request_id": request_id,
                     "image_id": image_id
                 }
             )
-            
-            if upload_result["success"]:
-                final_image_url = upload_result["url"]
-                logger.info(f"[{request_id}] Final rendering uploaded: {final_image_url}")
-                
-                # 메인 이벤트 루프에서 비동기 함수를 안전하게 실행
-                coro = self._send_to_hosting_queue(request_id, image_id, final_image_url)
-                asyncio.run_coroutine_threadsafe(coro, self.main_loop)
-            else:
-                logger.error(f"[{request_id}] Final upload failed: {upload_result.get('error')}")
-                # 업로드 실패 시 에러 큐로 전송
-                coro = enqueue_error_result(request_id, image_id, f"Upload failed: {upload_result.get('error')}")
-                asyncio.run_coroutine_threadsafe(coro, self.main_loop)
-                
         except Exception as e:
-            logger.error(f"[{request_id}] Rendering error in ThreadPool: {e}", exc_info=True)
-            # 렌더링 전반적인 오류 시 에러 큐로 전송
-            coro = enqueue_error_result(request_id, task_data.get("image_id", "N/A"), f"Rendering error: {str(e)}")
-            asyncio.run_coroutine_threadsafe(coro, self.main_loop)
+            upload_result = {"success": False, "error": str(e)}
+        
+        if upload_result["success"]:
+            final_image_url = upload_result["url"]
+            logger.info(f"[{request_id}] Final rendering uploaded: {final_image_url}")
+            await self._send_to_hosting_queue(request_id, image_id, final_image_url)
+        else:
+            logger.error(f"[{request_id}] Final upload failed: {upload_result.get('error')}")
+            await enqueue_error_result(request_id, image_id, f"Upload failed: {upload_result.get('error')}")
 
     async def _send_to_hosting_queue(self, request_id: str, image_id: str, image_url: str):
-        """호스팅 큐에 최종 결과 전송"""
+        """호스팅 큐에 최종 결과 전송 (전송 실패 시 에러 큐로 보내 잠금 해제/ack까지 처리)"""
+        hosting_task = {
+            "request_id": request_id,
+            "image_id": image_id,
+            "image_url": image_url
+        }
         try:
-            redis_client = get_redis_client()
-            hosting_task = {
-                "request_id": request_id,
-                "image_id": image_id,
-                "image_url": image_url
-            }
-            await redis_client.rpush(HOSTING_TASKS_QUEUE, json.dumps(hosting_task).encode('utf-8'))
-            logger.info(f"[{request_id}] Final result sent to hosting queue: {image_url}")
+            await push_result(HOSTING_TASKS_QUEUE, json.dumps(hosting_task).encode('utf-8'))
         except Exception as e:
             logger.error(f"[{request_id}] Failed to send to hosting queue: {e}", exc_info=True)
+            # 대기 요청은 leader 잠금 해제 후 다시 처리되고, 작업 ack는 enqueue_error_result()가 수행
+            await enqueue_error_result(request_id, image_id, f"Failed to send result: {str(e)}")
+            return
+
+        logger.info(f"[{request_id}] Final result sent to hosting queue: {image_url}")
+        try:
+            # 중복 이미지의 leader 작업이었다면 결과를 기록하고 대기 요청에 같은 URL 전달
+            await complete_image_dedup(request_id, image_id, image_url, SUCCESS_QUEUE)
+        except Exception as e:
+            logger.error(f"[{request_id}] Failed to complete dedup entry: {e}", exc_info=True)
+        finally:
+            await finish_task(request_id, image_id)
 
     def _draw_text_on_image_sync(self, image: np.ndarray, text: str, box: List[List[float]], 
                                text_color: Dict[str, int], font_size: int) -> np.ndarray:
-        """이미지에 텍스트 렌더링 (순수 동기 함수)"""
+        """이미지에 텍스트 한 항목 렌더링 (순수 동기 함수, RENDER_SINGLE_PASS=0일 때 사용)"""
         try:
             result_image = image.copy()
-            box = np.array(box, dtype=np.int32)
-            x_min, y_min = box.min(axis=0)
-            x_max, y_max = box.max(axis=0)
-            width = x_max - x_min
-            height = y_max - y_min
-
             pil_image = Image.fromarray(cv2.cvtColor(result_image, cv2.COLOR_BGR2RGB))
             draw = ImageDraw.Draw(pil_image)
 
@@ -285,28 +340,7 @@ class RenderingProcessor:
             if font is None:
                 return result_image
 
-            rgb_text_color = (text_color.get("r", 0), text_color.get("g", 0), text_color.get("b", 0))
-
-            lines = text.split('\n')
-            total_text_width = 0
-            total_text_height = 0
-            line_heights = []
-
-            for line in lines:
-                text_bbox = draw.textbbox((0, 0), line, font=font)
-                line_width = text_bbox[2] - text_bbox[0]
-                line_height = text_bbox[3] - text_bbox[1]
-                total_text_width = max(total_text_width, line_width)
-                line_heights.append(line_height)
-                total_text_height += line_height
-
-            text_x = x_min + (width - total_text_width) // 2
-            text_y = y_min + (height - total_text_height) // 2
-
-            current_y = text_y
-            for i, line in enumerate(lines):
-                draw.text((text_x, current_y), line, fill=rgb_text_color, font=font)
-                current_y += line_heights[i]
+            draw_text_in_box(draw, text, box, text_color, font)
 
             result_image = cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
             return result_image
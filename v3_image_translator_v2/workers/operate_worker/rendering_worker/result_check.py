@@ -1,47 +1,99 @@
 import json
 import logging
 import asyncio
-from typing import Dict, Any
+from typing import Dict, Any, Optional, List, Tuple
 import concurrent.futures
 import os
+import time
 import cv2
 import numpy as np
 
-from core.config import HOSTING_TASKS_QUEUE
+from core.image_cache import ImageCache
+from core.config import (
+    HOSTING_TASKS_QUEUE,
+    INPAINTED_MEMORY_BUDGET_MB,
+    INPAINTED_SPILL_TO_DISK,
+    INPAINTED_SPILL_DIR,
+    RESULT_JOIN_TIMEOUT
+)
 
 # 로깅 설정
 logger = logging.getLogger(__name__)
 
-# 임시 파일 저장 경로
-TEMP_OUTPUT_DIR = "/app/output/temp_inpainted"
+# 임시 파일 저장 경로 (메모리 한도 초과 시 스필 파일 위치)
+TEMP_OUTPUT_DIR = INPAINTED_SPILL_DIR
 os.makedirs(TEMP_OUTPUT_DIR, exist_ok=True)
 
 class ResultChecker:
     def __init__(self, cpu_executor: concurrent.futures.ThreadPoolExecutor,
-                 rendering_processor, http_session):
+                 rendering_processor, http_session, image_cache: Optional[ImageCache] = None,
+                 join_timeout: float = RESULT_JOIN_TIMEOUT):
         """
         번역 결과와 인페인팅 결과를 내부 메모리에서 확인하고 렌더링 작업을 ThreadPool에 제출하는 클래스
+
+        한쪽 결과만 도착한 채 join_timeout이 지난 요청은 expire_stale_results()로 정리합니다.
         """
         self.cpu_executor = cpu_executor
         self.rendering_processor = rendering_processor
         self.http_session = http_session
+        # 워커와 공유하는 원본 이미지 캐시 (다운로드/디코딩 재사용)
+        self.image_cache = image_cache
         
         # ✨ 내부 메모리 저장소 (Redis 대신 사용)
         self.translation_results = {}  # {request_id: translation_data}
         self.inpainting_results = {}   # {request_id: inpainting_data}  
         self.result_lock = asyncio.Lock()  # 동시성 제어
+        # 첫 결과 도착 시각 (부분 결과 만료용)
+        self.join_timeout = join_timeout
+        self.first_arrival = {}        # {request_id: monotonic time}
+        self.expired_count = 0
+        
+        # 메모리에 보관 중인 인페인팅 이미지 총 크기 (바이트)
+        self.inpainted_resident_bytes = 0
+        self.inpainted_memory_budget = INPAINTED_MEMORY_BUDGET_MB * 1024 * 1024
+
+    async def save_inpainted_image(self, request_id: str, inpainted_image: np.ndarray,
+                                   image_id: str, is_long: bool):
+        """
+        인페인팅 결과 배열을 렌더링 대기 저장소에 넣습니다.
+        기본적으로 배열을 그대로 메모리에 보관하고, 보관 중인 총량이 한도를 넘을 때만 .npy로 디스크에 내려씁니다.
+        """
+        inpainting_data = {
+            "image_id": image_id,
+            "is_long": is_long
+        }
+        nbytes = inpainted_image.nbytes
+        
+        if INPAINTED_SPILL_TO_DISK and self.inpainted_resident_bytes + nbytes > self.inpainted_memory_budget:
+            spill_path = os.path.join(TEMP_OUTPUT_DIR, f"{request_id}.npy")
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self.cpu_executor, np.save, spill_path, inpainted_image)
+            inpainting_data["spill_path"] = spill_path
+            logger.info(
+                f"[{request_id}] Inpainted image spilled to disk "
+                f"(resident {self.inpainted_resident_bytes / (1024 * 1024):.1f}MB over budget)"
+            )
+        else:
+            inpainting_data["inpainted_image"] = inpainted_image
+            self.inpainted_resident_bytes += nbytes
+        
+        await self.save_inpainting_result(request_id, inpainting_data)
 
     async def save_translation_result(self, request_id: str, data: dict):
         """번역 결과를 내부 메모리에 저장하고 렌더링 가능성 확인"""
         async with self.result_lock:
             self.translation_results[request_id] = data
+            self.first_arrival.setdefault(request_id, time.monotonic())
             logger.debug(f"[{request_id}] Translation result saved to memory")
             await self._check_and_trigger_rendering(request_id)
 
     async def save_inpainting_result(self, request_id: str, data: dict):
         """인페인팅 결과를 내부 메모리에 저장하고 렌더링 가능성 확인"""
         async with self.result_lock:
+            # 재전달/재시도로 같은 요청이 다시 오면 이전 결과의 메모리 보관량과 스필 파일을 먼저 정리
+            self._discard_inpainting_result(request_id, keep_path=data.get("spill_path"))
             self.inpainting_results[request_id] = data
+            self.first_arrival.setdefault(request_id, time.monotonic())
             logger.debug(f"[{request_id}] Inpainting result saved to memory")
             await self._check_and_trigger_rendering(request_id)
 
@@ -62,21 +114,91 @@ class ResultChecker:
             finally:
                 # 메모리 정리
                 self.translation_results.pop(request_id, None)
-                self.inpainting_results.pop(request_id, None)
+                self._pop_inpainting_result(request_id)
+                self.first_arrival.pop(request_id, None)
+                if self.image_cache:
+                    self.image_cache.release(request_id)
                 logger.debug(f"[{request_id}] Results cleaned from memory")
 
+    def _pop_inpainting_result(self, request_id: str):
+        """인페인팅 결과를 저장소에서 제거하고 메모리 보관량을 갱신합니다."""
+        inpainting_data = self.inpainting_results.pop(request_id, None)
+        if inpainting_data and inpainting_data.get("inpainted_image") is not None:
+            self.inpainted_resident_bytes -= inpainting_data["inpainted_image"].nbytes
+        return inpainting_data
+
+    def _discard_inpainting_result(self, request_id: str, keep_path: Optional[str] = None):
+        """렌더링하지 않을 인페인팅 결과를 제거하고 스필 파일도 지웁니다 (keep_path는 새 결과가 쓰는 파일이므로 유지)."""
+        inpainting_data = self._pop_inpainting_result(request_id)
+        spill_path = inpainting_data.get("spill_path") if inpainting_data else None
+        if spill_path and spill_path != keep_path:
+            try:
+                os.remove(spill_path)
+            except OSError:
+                pass
+        return inpainting_data
+
+    async def expire_stale_results(self, now: Optional[float] = None) -> List[Tuple[str, str]]:
+        """
+        첫 결과 도착 후 join_timeout이 지나도록 반대쪽 결과가 오지 않은 요청을 정리합니다.
+        호출하는 쪽에서 반환된 (request_id, image_id)마다 에러 결과를 보내야 합니다.
+
+        Returns:
+            만료된 (request_id, image_id) 목록
+        """
+        cutoff = (time.monotonic() if now is None else now) - self.join_timeout
+        expired = []
+        async with self.result_lock:
+            for request_id, arrived_at in list(self.first_arrival.items()):
+                if arrived_at > cutoff:
+                    continue
+                self.first_arrival.pop(request_id, None)
+                translation_data = self.translation_results.pop(request_id, None)
+                inpainting_data = self._discard_inpainting_result(request_id)
+                if self.image_cache:
+                    self.image_cache.release(request_id)
+                image_id = (translation_data or {}).get("image_id") or (inpainting_data or {}).get("image_id")
+                arrived = "translation" if translation_data else "inpainting" if inpainting_data else "none"
+                logger.warning(f"[{request_id}] Join expired after {self.join_timeout}s with only {arrived} result")
+                expired.append((request_id, image_id))
+        self.expired_count += len(expired)
+        return expired
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending_translation": len(self.translation_results),
+            "pending_inpainting": len(self.inpainting_results),
+            "inpainted_resident_mb": self.inpainted_resident_bytes / (1024 * 1024),
+            "expired": self.expired_count
+        }
+
+    async def _load_inpainted_image(self, request_id: str, inpainting_data: dict):
+        """메모리 배열을 그대로 반환하거나, 스필/임시 파일에서 읽어옵니다."""
+        inpainted_image = inpainting_data.get("inpainted_image")
+        if inpainted_image is not None:
+            return inpainted_image, None
+        
+        file_path = inpainting_data.get("spill_path") or inpainting_data.get("temp_path")
+        if not file_path or not os.path.exists(file_path):
+            logger.error(f"[{request_id}] Inpainted image file not found: {file_path}")
+            return None, None
+        
+        loop = asyncio.get_running_loop()
+        if file_path.endswith(".npy"):
+            inpainted_image = await loop.run_in_executor(self.cpu_executor, np.load, file_path)
+        else:
+            inpainted_image = await loop.run_in_executor(self.cpu_executor, cv2.imread, file_path)
+        if inpainted_image is None:
+            logger.error(f"[{request_id}] Failed to load inpainted image from: {file_path}")
+        return inpainted_image, file_path
+
     async def _trigger_rendering_internal(self, request_id: str, translation_data: dict, inpainting_data: dict):
         """내부 메모리 데이터를 사용하여 렌더링 실행"""
+        temp_path = None
         try:
-            # 인페인팅 이미지 로드
-            temp_path = inpainting_data.get("temp_path")
-            if not temp_path or not os.path.exists(temp_path):
-                logger.error(f"[{request_id}] Inpainted image file not found: {temp_path}")
-                return
-                
-            inpainted_image = cv2.imread(temp_path)
+            # 인페인팅 이미지 (메모리 또는 스필 파일)
+            inpainted_image, temp_path = await self._load_inpainted_image(request_id, inpainting_data)
             if inpainted_image is None:
-                logger.error(f"[{request_id}] Failed to load inpainted image from: {temp_path}")
                 return
 
             # 원본 이미지 다운로드 (번역 데이터에서 URL 가져오기)
@@ -85,10 +207,16 @@ class ResultChecker:
                 logger.error(f"[{request_id}] Original image URL not found in translation data")
                 return
                 
-            original_image_bytes = await self._download_image_async(original_image_url, request_id)
-            if not original_image_bytes:
-                logger.error(f"[{request_id}] Failed to download original image")
-                return
+            # 마스크 생성 때 디코딩한 배열이 캐시에 있으면 다운로드/디코딩 모두 생략
+            original_image = None
+            original_image_bytes = None
+            if self.image_cache:
+                original_image = self.image_cache.get_decoded(original_image_url, request_id)
+            if original_image is None:
+                original_image_bytes = await self._download_image_async(original_image_url, request_id)
+                if not original_image_bytes:
+                    logger.error(f"[{request_id}] Failed to download original image")
+                    return
 
             # 렌더링 태스크 데이터 구성
             rendering_task_data = {
@@ -96,6 +224,7 @@ class ResultChecker:
                 "image_id": translation_data.get("image_id"),
                 "translate_data": translation_data,
                 "inpainted_image": inpainted_image,
+                "original_image": original_image,
                 "original_image_bytes": original_image_bytes,
                 "is_long": inpainting_data.get("is_long", False)
             }
@@ -103,17 +232,17 @@ class ResultChecker:
             # CPU 스레드풀에서 렌더링 실행 (fire-and-forget)
             logger.info(f"[{request_id}] Submitting rendering task to ThreadPool")
             self.cpu_executor.submit(self.rendering_processor.process_rendering_sync, rendering_task_data)
-            
-            # 임시 파일 정리
+                
+        except Exception as e:
+            logger.error(f"[{request_id}] Error in internal rendering trigger: {e}", exc_info=True)
+        finally:
+            # 스필/임시 파일 정리
             try:
                 if temp_path and os.path.exists(temp_path):
                     os.remove(temp_path)
                     logger.debug(f"[{request_id}] Temporary inpainted file removed: {temp_path}")
             except Exception as e:
                 logger.warning(f"[{request_id}] Failed to remove temp file {temp_path}: {e}")
-                
-        except Exception as e:
-            logger.error(f"[{request_id}] Error in internal rendering trigger: {e}", exc_info=True)
 
     # 기존 메서드들은 호환성을 위해 유지하되 내부 저장소로 리다이렉트
     async def check_and_trigger_rendering(self, request_id: str, inpainted_image: np.ndarray,
@@ -122,28 +251,7 @@ class ResultChecker:
         인페인팅 완료 후 호출됨 (호환성 유지)
         """
         logger.info(f"[{request_id}] Inpainting completed, saving to internal storage")
-        
-        # 임시 파일로 저장
-        temp_filename = f"{request_id}.png"
-        temp_path = os.path.join(TEMP_OUTPUT_DIR, temp_filename)
-        
-        # 비동기로 파일 저장
-        loop = asyncio.get_running_loop()
-        success = await loop.run_in_executor(
-            self.cpu_executor, 
-            cv2.imwrite, temp_path, inpainted_image
-        )
-        
-        if success:
-            # 내부 저장소에 인페인팅 결과 저장
-            inpainting_data = {
-                "image_id": image_id,
-                "is_long": is_long,
-                "temp_path": temp_path
-            }
-            await self.save_inpainting_result(request_id, inpainting_data)
-        else:
-            logger.error(f"[{request_id}] Failed to save inpainted image to: {temp_path}")
+        await self.save_inpainted_image(request_id, inpainted_image, image_id, is_long)
 
     async def check_and_trigger_rendering_after_translate(self, request_id: str):
         """
@@ -159,6 +267,12 @@ class ResultChecker:
             logger.error(f"[{request_id}] HTTP Session is not initialized.")
             return None
 
+        if self.image_cache:
+            cached_bytes = self.image_cache.get_bytes(image_url, request_id)
+            if cached_bytes is not None:
+                logger.debug(f"[{request_id}] Original image served from cache")
+                return cached_bytes
+
         try:
             if image_url.startswith('//'):
                 image_url = 'https:' + image_url
@@ -172,7 +286,10 @@ class ResultChecker:
                 try:
                     async with self.http_session.get(image_url) as response:
                         response.raise_for_status()
-                        return await response.read()
+                        image_bytes = await response.read()
+                        if self.image_cache:
+                            self.image_cache.put_bytes(image_url, image_bytes, request_id)
+                        return image_bytes
                 except Exception as e:
                     if attempt < max_retries - 1:
                         wait_time = retry_delay * (attempt + 1)
@@ -46,20 +46,61 @@ from core.config import (
     INFERENCE_QUEUE_SIZE_SHORT,
     INFERENCE_QUEUE_SIZE_LONG,
     POSTPROCESSING_QUEUE_SIZE,
+    INFERENCE_PIPELINE_DEPTH,
+    BATCH_MAX_QUEUE_DELAY,
+    BATCH_WEIGHT_SHORT,
+    BATCH_WEIGHT_LONG,
+    INPAINT_REGION_MODE,
+    INPAINT_SHAPE_BUCKETS,
+    INPAINT_BUCKET_BATCH_PIXELS,
+    INPAINT_BUCKET_MAX_BATCH,
+    INFERENCE_QUEUE_SIZE_REGION,
+    BATCH_WEIGHT_REGION,
     POSTPROCESS_QUEUE_TIMEOUT,
+    RESULT_JOIN_SWEEP_INTERVAL,
     IMAGE_DOWNLOAD_MAX_RETRIES,
-    IMAGE_DOWNLOAD_RETRY_DELAY
+    IMAGE_DOWNLOAD_RETRY_DELAY,
+    IMAGE_CACHE_MAX_MB,
+    IMAGE_CACHE_TTL,
+    IMAGE_CACHE_IDLE_TTL,
+    IMAGE_HANDOFF_DIR,
+    R2_UPLOAD_MAX_CONCURRENCY,
+    R2_UPLOAD_MAX_RETRIES,
+    R2_UPLOAD_RETRY_BASE_DELAY,
+    R2_UPLOAD_TIMEOUT,
+    IMAGE_DEDUP_ENABLED,
+    IMAGE_DEDUP_TTL,
+    IMAGE_DEDUP_LOCK_TTL,
+    IMAGE_DEDUP_VERSION_SALT,
+    QUEUE_BACKEND,
+    QUEUE_CONSUMER_GROUP,
+    QUEUE_READ_BATCH,
+    QUEUE_CLAIM_IDLE_MS,
+    QUEUE_MAX_DELIVERIES,
+    RESULT_PUSH_BATCH,
+    RESULT_PUSH_DELAY_MS
+)
+from core.shm_manager import get_array_from_shm, release_shm, initialize_shm_pool, close_shm_pool, get_shm_pool
+from core.redis_client import initialize_redis, close_redis
+from core.image_cache import ImageCache
+from core.image_handoff import ImageHandoffStore
+from core.image_dedup import initialize_image_dedup, complete_image_dedup, fail_image_dedup, dedup_version
+from core.task_queue import (
+    create_task_queue, QueueMessage, track_task, finish_task, tracked_count, initialize_result_pusher, push_result
 )
-from core.shm_manager import get_array_from_shm, create_shm_from_array, cleanup_shm
-from core.redis_client import initialize_redis, close_redis, get_redis_client
 
 # 통합된 로직 모듈들 임포트
 from logic.post_processing import restore_from_padding
-from logic.lama_gpu import load_model as load_lama_gpu_model, run_batch_inference
+from logic.lama_gpu import load_model as load_lama_gpu_model
+from logic.inference_engine import InferenceEngine
+from logic.batch_scheduler import BatchScheduler
 from logic.mask import filter_chinese_ocr_result, generate_mask_pure_sync
-from logic.text_translate import process_and_save_translation
+from logic.text_translate import process_and_save_translation, create_translation_client, create_translation_memory, translation_config_version
 from logic.preprocessing import process_single_task_pure_sync
-from hosting.r2hosting import R2ImageHosting
+from logic.shape_buckets import ShapeBuckets, parse_buckets, batch_padding
+from logic.regions import choose_regions, build_region_tasks, restore_region, RegionAssembly
+from hosting.r2hosting import R2ImageHosting, encode_image
+from hosting.r2uploader import R2Uploader
 
 # 분리된 렌더링 관련 모듈 임포트
 from rendering_worker.result_check import ResultChecker
@@ -70,10 +111,16 @@ logging.basicConfig(level=LOG_LEVEL)
 logging.getLogger('asyncio').setLevel(logging.WARNING) # asyncio 자체 로그는 줄이기
 logger = logging.getLogger(__name__)
 
+def _file_signature(path: str) -> str:
+    """모델/폰트 파일 교체를 버전에 반영하기 위한 경로 + 크기."""
+    try:
+        return f"{path}:{os.path.getsize(path)}"
+    except OSError:
+        return path
+
 async def enqueue_error_result(request_id: str, image_id: str, error_message: str):
     """에러 결과를 에러 큐에 추가합니다."""
     try:
-        redis_client = get_redis_client()
         error_data = {
             "request_id": request_id,
             "image_id": image_id,
@@ -81,10 +128,17 @@ async def enqueue_error_result(request_id: str, image_id: str, error_message: st
             "timestamp": time.time()
         }
         error_json = json.dumps(error_data).encode('utf-8')
-        await redis_client.rpush(ERROR_QUEUE, error_json)
+        await push_result(ERROR_QUEUE, error_json)
         logger.info(f"[{request_id}] Error result enqueued to {ERROR_QUEUE}: {error_message}")
     except Exception as e:
         logger.error(f"[{request_id}] Failed to enqueue error result: {e}", exc_info=True)
+    try:
+        # 중복 이미지의 leader 작업이었다면 잠금을 풀어 대기 요청이 다시 처리되게 함
+        await fail_image_dedup(request_id, image_id)
+    except Exception as e:
+        logger.error(f"[{request_id}] Failed to release dedup lock: {e}", exc_info=True)
+    finally:
+        await finish_task(request_id, image_id)
 
 class AsyncInpaintingWorker:
     """통합된 비동기 인페인팅 + 렌더링 워커 (ThreadPool 렌더링 적용)"""
@@ -96,8 +150,11 @@ class AsyncInpaintingWorker:
             thread_name_prefix="cpu-worker"
         )
         
-        # GPU 작업 동시성 제어
-        self.gpu_semaphore = asyncio.Semaphore(1)
+        # GPU 파이프라인 동시성 제어 (동시에 떠 있는 배치 수 = 파이프라인 깊이)
+        self.gpu_semaphore = asyncio.Semaphore(INFERENCE_PIPELINE_DEPTH)
+        
+        # LaMa 추론 엔진 (전용 stage/compute 스레드, gpu-short/gpu-long 공유)
+        self.inference_engine: Optional[InferenceEngine] = None
         
         # ✨ 신규: 동시 작업 수 제한으로 메모리 과부하 방지
         self.concurrent_task_semaphore = asyncio.Semaphore(MAX_CONCURRENT_TASKS) # 동시에 처리할 수 있는 최대 작업 수
@@ -105,20 +162,63 @@ class AsyncInpaintingWorker:
         # ✨ 신규: 후처리 동시성 제어용 세마포어
         self.postprocess_semaphore = asyncio.Semaphore(MAX_POSTPROCESS_TASKS) # 동시에 처리할 최대 후처리 작업 수
 
-        # 내부 큐들 (전처리 큐 제거)
-        self.inference_queue_short = asyncio.Queue(maxsize=INFERENCE_QUEUE_SIZE_SHORT)
-        self.inference_queue_long = asyncio.Queue(maxsize=INFERENCE_QUEUE_SIZE_LONG)
+        # 내부 큐들 (전처리 큐 제거, 인퍼런스 큐는 BatchScheduler가 관리)
+        self.batch_scheduler: Optional[BatchScheduler] = None
+        # 영역 인페인팅 중인 요청별 결과 합성기 (request_id -> RegionAssembly)
+        self._region_assemblies: Dict[str, RegionAssembly] = {}
+        # 영역 입력을 크기별 버킷(스케줄러 큐)으로 나눔
+        self.shape_buckets = ShapeBuckets(
+            parse_buckets(INPAINT_SHAPE_BUCKETS), INPAINT_BUCKET_BATCH_PIXELS, INPAINT_BUCKET_MAX_BATCH
+        )
         self.postprocessing_queue = asyncio.Queue(maxsize=POSTPROCESSING_QUEUE_SIZE)
         
         # R2 호스팅 인스턴스 (최종 결과 호스팅용만)
         self.r2_hosting = R2ImageHosting()
+        # R2 업로더 (전용 업로드 스레드/연결 풀, 렌더링과 공유)
+        self.r2_uploader = R2Uploader(
+            self.r2_hosting,
+            max_concurrency=R2_UPLOAD_MAX_CONCURRENCY,
+            max_retries=R2_UPLOAD_MAX_RETRIES,
+            retry_base_delay=R2_UPLOAD_RETRY_BASE_DELAY,
+            timeout=R2_UPLOAD_TIMEOUT
+        )
         
         # HTTP 클라이언트 세션
         self.http_session: Optional[aiohttp.ClientSession] = None
+        # 번역 API 클라이언트 (연결 풀을 가진 세션은 첫 요청 때 이벤트 루프 안에서 생성)
+        self.translation_client = create_translation_client()
+        # 번역 메모리 (반복되는 원문은 API를 호출하지 않음)
+        self.translation_memory = create_translation_memory()
+        
+        # 원본 이미지 캐시 (다운로드 바이트 + 디코딩 배열, 렌더링 단계와 공유)
+        self.image_cache = ImageCache(
+            max_bytes=IMAGE_CACHE_MAX_MB * 1024 * 1024,
+            ttl=IMAGE_CACHE_TTL,
+            idle_ttl=IMAGE_CACHE_IDLE_TTL
+        )
+        # 같은 호스트의 OCR Worker가 넘겨준 원본 바이트 (없거나 만료되면 다운로드)
+        self.image_handoff = ImageHandoffStore(IMAGE_HANDOFF_DIR) if IMAGE_HANDOFF_DIR else None
+        # 같은 원본 이미지는 한 번만 처리하고 결과 URL 재사용 (OCR Worker가 leader/대기 판정, 여기서는 완료 기록)
+        self.image_dedup = initialize_image_dedup(
+            ttl_seconds=IMAGE_DEDUP_TTL, lock_ttl=IMAGE_DEDUP_LOCK_TTL
+        ) if IMAGE_DEDUP_ENABLED else None
+        # 입력 큐 (ocr:results). 스트림 백엔드면 최종 결과(성공/에러)를 보낸 뒤 ack하므로 도중에 죽어도 작업이 남음
+        self.task_queue = create_task_queue(
+            PROCESSOR_TASK_QUEUE, QUEUE_BACKEND, group=QUEUE_CONSUMER_GROUP, claim_idle_ms=QUEUE_CLAIM_IDLE_MS,
+            max_deliveries=QUEUE_MAX_DELIVERIES, dead_letter_queue=ERROR_QUEUE
+        )
+        # 성공/에러 메시지 푸시는 동시에 끝난 작업끼리 모아 파이프라인으로 전송
+        self.result_pusher = initialize_result_pusher(max_batch=RESULT_PUSH_BATCH, max_delay_ms=RESULT_PUSH_DELAY_MS)
         
         # 워커 상태
         self._running = False
         self._workers = []
+        # 진행 중인 GPU 배치 태스크 (종료 시 자원을 닫기 전에 완료를 기다림)
+        self._batch_tasks = set()
+        self._postprocess_manager_task = None
+        self._listener_task = None
+        # 진행 중인 OCR 처리 태스크 (종료 시 작업 큐와 푸셔를 닫기 전에 완료를 기다림)
+        self._ocr_tasks = set()
         
         # 렌더링 관련 인스턴스들 (나중에 초기화)
         self.rendering_processor = None
@@ -132,22 +232,42 @@ class AsyncInpaintingWorker:
         # HTTP 클라이언트 세션 생성
         self.http_session = aiohttp.ClientSession()
 
+        # 전처리 결과용 SHM 슬랩 풀 생성 (LaMa 입력 shape별 슬롯 사전 할당)
+        initialize_shm_pool()
+
         # 메인 이벤트 루프에서 큐들과 세마포어 생성
         self.main_loop = asyncio.get_running_loop()
-        self.gpu_semaphore = asyncio.Semaphore(1)
-        self.inference_queue_short = asyncio.Queue(maxsize=INFERENCE_QUEUE_SIZE_SHORT)
-        self.inference_queue_long = asyncio.Queue(maxsize=INFERENCE_QUEUE_SIZE_LONG)
+        self.gpu_semaphore = asyncio.Semaphore(INFERENCE_PIPELINE_DEPTH)
+        self.inference_engine = InferenceEngine(use_fp16=USE_FP16, pipeline_depth=INFERENCE_PIPELINE_DEPTH)
+        self.batch_scheduler = BatchScheduler(
+            shapes={
+                "short": (INPAINTING_BATCH_SIZE_SHORT, BATCH_WEIGHT_SHORT, INFERENCE_QUEUE_SIZE_SHORT),
+                "long": (INPAINTING_BATCH_SIZE_LONG, BATCH_WEIGHT_LONG, INFERENCE_QUEUE_SIZE_LONG),
+                # 영역 인페인팅: 비슷한 크기끼리 배치되도록 shape 버킷마다 큐를 분리
+                **self.shape_buckets.scheduler_shapes(BATCH_WEIGHT_REGION, INFERENCE_QUEUE_SIZE_REGION)
+            },
+            max_queue_delay=BATCH_MAX_QUEUE_DELAY
+        )
         self.postprocessing_queue = asyncio.Queue(maxsize=POSTPROCESSING_QUEUE_SIZE)
         
         # 렌더링 관련 인스턴스 초기화
-        self.rendering_processor = RenderingProcessor(loop=self.main_loop)
+        self.rendering_processor = RenderingProcessor(loop=self.main_loop, uploader=self.r2_uploader)
         self.result_checker = ResultChecker(
             cpu_executor=self.cpu_executor,
             rendering_processor=self.rendering_processor,
-            http_session=self.http_session
+            http_session=self.http_session,
+            image_cache=self.image_cache
         )
         
         logger.info("✅ Queues and rendering modules created in correct event loop")
+        await self.task_queue.ensure()
+
+        if self.image_dedup is not None:
+            # 결과 이미지에 영향을 주는 설정이 바뀌면 버전이 바뀌어 이전 결과를 재사용하지 않음
+            await self.image_dedup.publish_version(dedup_version(
+                translation_config_version(), _file_signature(FONT_PATH), _file_signature(LAMA_CHECKPOINT_PATH),
+                INPAINT_REGION_MODE, MASK_PADDING_PIXELS, RESIZE_TARGET_SIZE, IMAGE_DEDUP_VERSION_SALT
+            ))
         
         # ✨ 변경: 범용 워커를 사용하여 매니저 태스크들을 생성
         postprocess_manager_task = asyncio.create_task(
@@ -160,37 +280,93 @@ class AsyncInpaintingWorker:
             )
         )
         
-        short_task = asyncio.create_task(self._gpu_inference_worker("gpu-short", is_long=False))
-        long_task = asyncio.create_task(self._gpu_inference_worker("gpu-long", is_long=True))
+        gpu_task = asyncio.create_task(self._gpu_inference_worker("gpu-scheduler"))
         
         # 외부 요청을 받는 Redis 리스너 워커 추가
         redis_listener_task = asyncio.create_task(self._redis_listener_worker("redis-listener"))
 
+        # 한쪽 결과만 도착한 채 오래 남은 렌더링 대기 결과 정리
+        join_sweeper_task = asyncio.create_task(self._result_join_sweeper("result-join-sweeper"))
+
+        self._postprocess_manager_task = postprocess_manager_task
+        self._listener_task = redis_listener_task
         self._workers = [
             postprocess_manager_task, 
-            short_task, 
-            long_task, 
-            redis_listener_task
+            gpu_task, 
+            redis_listener_task,
+            join_sweeper_task
         ]
         logger.info(f"🚀 Started {len(self._workers)} batch processing workers, including Redis listener")
 
     async def stop_workers(self):
         """모든 워커 정지"""
+        # 큐에서 새 작업을 더 가져오지 않도록 리스너를 먼저 멈추고 이미 시작한 OCR 처리 태스크를 기다림
+        # (GPU 스케줄러가 아직 돌고 있어야 배치 큐가 가득 찬 경우에도 put()이 끝남)
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            await asyncio.gather(self._listener_task, return_exceptions=True)
+        if self._ocr_tasks:
+            logger.info(f"Waiting for {len(self._ocr_tasks)} in-flight OCR tasks")
+            await asyncio.gather(*self._ocr_tasks, return_exceptions=True)
+
+        # 새 작업을 만드는 나머지 워커(GPU 스케줄러 등)를 취소.
+        # 후처리 매니저는 이미 띄운 배치의 결과를 받아야 하므로 배치가 끝난 뒤에 멈춤
+        producers = [worker for worker in self._workers if worker is not self._postprocess_manager_task]
+        for worker in producers:
+            worker.cancel()
+        await asyncio.gather(*producers, return_exceptions=True)
+
+        # 이미 띄운 배치는 아래에서 자원(번역 클라이언트, 푸셔, 추론 엔진, 업로더, SHM 풀)을 닫기 전에 끝까지 처리
+        if self._batch_tasks:
+            logger.info(f"Waiting for {len(self._batch_tasks)} in-flight GPU batches")
+            await asyncio.gather(*self._batch_tasks, return_exceptions=True)
+
         self._running = False
         
-        # 모든 워커 태스크 취소
+        # 남은 워커 태스크 취소
         for worker in self._workers:
             worker.cancel()
         
         await asyncio.gather(*self._workers, return_exceptions=True)
         self._workers.clear()
+        self._postprocess_manager_task = None
+        self._listener_task = None
         
         # HTTP 세션 종료
         if self.http_session:
             await self.http_session.close()
+        logger.info(f"Translation client stats: {self.translation_client.stats()}")
+        await self.translation_client.close()
+        if self.translation_memory:
+            logger.info(f"Translation memory stats: {self.translation_memory.stats()}")
             
         # 스레드풀 종료
         self.cpu_executor.shutdown(wait=True)
+        
+        # 추론 엔진 종료
+        logger.info(f"Image cache stats: {self.image_cache.stats()}")
+        if self.image_handoff is not None:
+            logger.info(f"Image handoff stats: {self.image_handoff.stats()}")
+        if self.image_dedup is not None:
+            logger.info(f"Image dedup stats: {self.image_dedup.stats()}")
+        logger.info(f"Task queue stats: {self.task_queue.stats()} (unfinished: {tracked_count()})")
+        if self.result_checker:
+            logger.info(f"Result checker stats: {self.result_checker.stats()}")
+        await self.result_pusher.close()
+        logger.info(f"Result pusher stats: {self.result_pusher.stats()}")
+        if self.batch_scheduler:
+            logger.info(f"Batch scheduler stats: {self.batch_scheduler.stats()}")
+            logger.info(f"LaMa padding waste: {self.batch_scheduler.padding_waste():.1f}%")
+        if self.inference_engine:
+            logger.info(f"Inference engine stats: {self.inference_engine.stats()}")
+            self.inference_engine.shutdown(wait=True)
+        
+        # 업로더 종료 (진행 중인 업로드 완료 대기)
+        logger.info(f"R2 uploader stats: {self.r2_uploader.stats()}")
+        self.r2_uploader.shutdown(wait=True)
+        
+        # SHM 슬랩 풀 해제
+        close_shm_pool()
         logger.info("Stopped all workers and thread pool")
 
     async def run_cpu_task(self, func, *args, **kwargs):
@@ -209,6 +385,10 @@ class AsyncInpaintingWorker:
             image_url = task_data.get("image_url")
             image_id = task_data.get("image_id")
             ocr_result = task_data.get("ocr_result")
+            image_handle = task_data.get("image_handle")
+            if self.image_dedup is not None:
+                # OCR Worker가 leader로 정한 이미지면 완료/실패 시 결과를 기록하도록 등록
+                self.image_dedup.register_pending(request_id, image_id, task_data.get("dedup"))
             
             logger.info(f"[{request_id}] Starting OCR task processing")
             
@@ -223,15 +403,14 @@ class AsyncInpaintingWorker:
                     logger.info(f"[{request_id}] No Chinese text found, processing image resize (is_long={is_long})")
                     
                     # 이미지 다운로드
-                    image_bytes = await self._download_image_async(image_url, request_id)
+                    image_bytes = await self._download_image_async(image_url, request_id, image_handle)
                     if image_bytes is None:
                         logger.error(f"[{request_id}] Image download failed")
                         await enqueue_error_result(request_id, image_id, "Image download failed")
                         return
                     
-                    # Long/Short 모두 이미지 크기 정리 처리
-                    final_image_url = await self.run_cpu_task(
-                        self._handle_no_chinese_text_sync, 
+                    # Long/Short 모두 이미지 크기 정리 처리 (리사이즈/인코딩은 CPU 스레드, 업로드는 업로더)
+                    final_image_url = await self._handle_no_chinese_text(
                         image_bytes, 
                         image_url,
                         request_id, 
@@ -239,17 +418,18 @@ class AsyncInpaintingWorker:
                         is_long
                     )
                     
+                    self.image_cache.release(request_id)
                     if final_image_url:
                         # 최종 URL을 호스팅 큐로 전송
-                        from core.redis_client import get_redis_client
-                        redis_client = get_redis_client()
                         hosting_task = {
                             "request_id": request_id,
                             "image_id": image_id,
                             "image_url": final_image_url
                         }
-                        await redis_client.rpush(HOSTING_TASKS_QUEUE, json.dumps(hosting_task).encode('utf-8'))
+                        await push_result(HOSTING_TASKS_QUEUE, json.dumps(hosting_task).encode('utf-8'))
                         logger.info(f"[{request_id}] Forwarded to hosting queue (no Chinese text, final URL: {final_image_url})")
+                        await complete_image_dedup(request_id, image_id, final_image_url, SUCCESS_QUEUE)
+                        await finish_task(request_id, image_id)
                     else:
                         await enqueue_error_result(request_id, image_id, "Failed to process no-Chinese-text image")
                     return
@@ -257,7 +437,7 @@ class AsyncInpaintingWorker:
                 # 2. 중국어가 있을 때만 이미지 다운로드 (I/O 작업)
                 logger.debug(f"[{request_id}] Chinese text found, starting inpainting pipeline")
                 logger.debug(f"[{request_id}] Downloading image (async I/O)")
-                image_bytes = await self._download_image_async(image_url, request_id)
+                image_bytes = await self._download_image_async(image_url, request_id, image_handle)
                 
                 if image_bytes is None:
                     logger.error(f"[{request_id}] Image download failed")
@@ -270,6 +450,7 @@ class AsyncInpaintingWorker:
                 processed_result = await self.run_cpu_task(
                     self._generate_mask_and_preprocess_sync, 
                     image_bytes, 
+                    image_url,
                     ocr_result, 
                     request_id,
                     image_id,
@@ -286,13 +467,23 @@ class AsyncInpaintingWorker:
                 # 이미 중국어 필터링이 완료되었으므로 filtered_ocr_result 전달
                 task_data_with_filtered = task_data.copy()
                 task_data_with_filtered["filtered_ocr_result"] = filtered_ocr_result
-                await process_and_save_translation(task_data_with_filtered, image_url, self.result_checker)
+                await process_and_save_translation(
+                    task_data_with_filtered, image_url, self.result_checker,
+                    self.translation_client, self.translation_memory
+                )
                 
                 # 5. 바로 추론 큐에 추가 (배치 처리)
-                is_long = processed_result.get("is_long", False)
-                target_queue = self.inference_queue_long if is_long else self.inference_queue_short
-                await target_queue.put(processed_result)
-                logger.debug(f"[{request_id}] ✅ Added to {'long' if is_long else 'short'} inference queue")
+                if "region_tasks" in processed_result:
+                    # 영역 인페인팅: 영역별 작업을 크기별 영역 큐에 넣고, 결과는 합성기에서 모음
+                    self._region_assemblies[request_id] = processed_result["region_assembly"]
+                    for region_task in processed_result["region_tasks"]:
+                        height, width = region_task["region_image"].shape[:2]
+                        await self.batch_scheduler.put(self.shape_buckets.assign(height, width), region_task)
+                    logger.debug(f"[{request_id}] ✅ Added {len(processed_result['region_tasks'])} regions to inference queues")
+                else:
+                    is_long = processed_result.get("is_long", False)
+                    await self.batch_scheduler.put("long" if is_long else "short", processed_result)
+                    logger.debug(f"[{request_id}] ✅ Added to {'long' if is_long else 'short'} inference queue")
                 
             except Exception as e:
                 logger.error(f"[{request_id}] Error in OCR task: {e}", exc_info=True)
@@ -302,8 +493,24 @@ class AsyncInpaintingWorker:
             self.concurrent_task_semaphore.release()
             logger.debug(f"[{request_id}] Task finished, semaphore released.")
 
-    async def _download_image_async(self, image_url: str, request_id: str) -> Optional[bytes]:
-        """이미지 다운로드 (순수 async I/O - 메인 루프에서)"""
+    async def _download_image_async(self, image_url: str, request_id: str, image_handle: Optional[dict] = None) -> Optional[bytes]:
+        """
+        이미지 다운로드 (순수 async I/O - 메인 루프에서).
+        캐시에 있거나 OCR Worker가 넘겨준 핸드오프 핸들로 읽을 수 있으면 다운로드하지 않음
+        """
+        cached_bytes = self.image_cache.get_bytes(image_url, request_id)
+        if cached_bytes is not None:
+            logger.debug(f"[{request_id}] Image served from cache")
+            return cached_bytes
+
+        if image_handle and self.image_handoff is not None:
+            handed_bytes = await self.run_cpu_task(self.image_handoff.get, image_handle)
+            if handed_bytes is not None:
+                logger.debug(f"[{request_id}] Image served from OCR handoff ({len(handed_bytes)} bytes)")
+                self.image_cache.put_bytes(image_url, handed_bytes, request_id)
+                return handed_bytes
+            logger.debug(f"[{request_id}] OCR handoff missing or expired, downloading")
+
         if not self.http_session:
             logger.error(f"[{request_id}] HTTP Session is not initialized.")
             return None
@@ -331,6 +538,7 @@ class AsyncInpaintingWorker:
                         response.raise_for_status()
                         image_bytes = await response.read()
                         logger.debug(f"[{request_id}] Downloaded {len(image_bytes)} bytes")
+                        self.image_cache.put_bytes(image_url, image_bytes, request_id)
                         return image_bytes
                             
                 except aiohttp.ClientResponseError as e:
@@ -358,32 +566,26 @@ class AsyncInpaintingWorker:
                 image_id = task_data.get("image_id")
                 is_long = postprocess_task["is_long"]
 
+                if "region_box" in task_data:
+                    # 영역 결과: 모든 영역이 모였을 때만 원본에 합성하여 저장
+                    assembly = self._region_assemblies.get(request_id)
+                    if assembly is None:
+                        logger.warning(f"[{request_id}] Region result arrived for a failed or finished request, dropping")
+                        return
+                    if not assembly.add(task_data["region_index"], restored_bgr_array):
+                        return
+                    self._region_assemblies.pop(request_id, None)
+                    restored_bgr_array = await self.run_cpu_task(assembly.compose)
+
                 logger.info(f"[{request_id}] Inpainting completed, saving to ResultChecker")
                 
-                # 임시 파일로 저장
-                temp_dir = "/app/output/temp_inpainted"
-                os.makedirs(temp_dir, exist_ok=True)
-                temp_filename = f"{request_id}.png"
-                temp_path = os.path.join(temp_dir, temp_filename)
-                
-                success = cv2.imwrite(temp_path, restored_bgr_array)
-                if success:
-                    # ResultChecker의 내부 저장소에 인페인팅 결과 저장
-                    inpainting_data = {
-                        "image_id": image_id,
-                        "is_long": is_long,
-                        "temp_path": temp_path
-                    }
-                    await self.result_checker.save_inpainting_result(request_id, inpainting_data)
-                else:
-                    logger.error(f"[{request_id}] Failed to save inpainted image to: {temp_path}")
-                    # 이미지 저장 실패 시 에러 큐로 전송
-                    await enqueue_error_result(request_id, task_data.get("image_id", "N/A"), "Failed to save inpainted image")
+                # 배열을 그대로 ResultChecker에 전달 (메모리 한도 초과 시에만 디스크 스필)
+                await self.result_checker.save_inpainted_image(request_id, restored_bgr_array, image_id, is_long)
         except Exception as e:
             request_id = postprocess_task.get("task", {}).get("request_id", "N/A")
             image_id = postprocess_task.get("task", {}).get("image_id", "N/A")
             logger.error(f"[{request_id}] Error in postprocessing handler: {e}", exc_info=True)
-            await enqueue_error_result(request_id, image_id, f"Postprocessing error: {str(e)}")
+            await self._enqueue_task_error(postprocess_task.get("task", {}), f"Postprocessing error: {str(e)}")
         finally:
             # ✨ 신규: 작업 성공/실패 여부와 관계없이 반드시 세마포어 해제
             self.postprocess_semaphore.release()
@@ -393,6 +595,10 @@ class AsyncInpaintingWorker:
         try:
             task_data = postprocess_task["task"]
             result = postprocess_task["result"]
+
+            if "region_box" in task_data:
+                # 영역 결과는 원본 해상도 영역 크기로만 되돌림 (합성은 모든 영역이 모인 뒤)
+                return restore_region(result, task_data["region_box"])
             
             padding_info = task_data.get("padding_info")
             original_size = task_data.get("original_size")
@@ -447,37 +653,11 @@ class AsyncInpaintingWorker:
     # ✨ 신규: 메인 루프에서 분리된 Redis 리스너 워커
     async def _redis_listener_worker(self, worker_name: str):
         """Redis 큐에서 작업을 지속적으로 가져와 처리 태스크를 생성하는 워커"""
-        logger.info(f"Worker {worker_name} started. Listening on: {PROCESSOR_TASK_QUEUE}")
+        logger.info(f"Worker {worker_name} started. Listening on: {PROCESSOR_TASK_QUEUE} ({self.task_queue.backend})")
         
         while self._running:
             try:
-                redis_client = get_redis_client()
-                
-                # Redis에서 OCR 작업 받기
-                ocr_task_tuple = await redis_client.blpop([PROCESSOR_TASK_QUEUE], timeout=1)
-                
-                if ocr_task_tuple:
-                    # ✨ 신규: 새로운 작업을 시작하기 전에 세마포어를 획득 (획득할 수 있을 때까지 대기)
-                    # 이를 통해 동시에 실행되는 작업의 수를 제한합니다.
-                    await self.concurrent_task_semaphore.acquire()
-                    
-                    task_bytes = ocr_task_tuple[1]
-                    try:
-                        task_data = json.loads(task_bytes.decode('utf-8'))
-                        request_id = task_data.get('request_id', 'N/A')
-                        logger.debug(f"[{request_id}] Acquired semaphore, creating task.")
-                        
-                        # OCR 작업을 비동기로 처리 (fire-and-forget)
-                        asyncio.create_task(self.process_ocr_task(task_data))
-                        
-                    except json.JSONDecodeError as e:
-                        logger.error(f"Failed to decode OCR task JSON: {e}")
-                        self.concurrent_task_semaphore.release()
-                    except Exception as e:
-                        req_id = task_data.get('request_id', 'N/A') if 'task_data' in locals() else 'N/A'
-                        logger.error(f"[{req_id}] Error creating OCR task: {e}", exc_info=True)
-                        self.concurrent_task_semaphore.release()
-                else:
+                if not await self.fetch_and_dispatch_tasks():
                     await asyncio.sleep(0.1)
 
             except asyncio.CancelledError:
@@ -490,8 +670,101 @@ class AsyncInpaintingWorker:
                 logger.error(f"Unexpected error in {worker_name}: {e}", exc_info=True)
                 await asyncio.sleep(1)
 
-    def _handle_no_chinese_text_sync(self, image_bytes: bytes, original_url: str, request_id: str, image_id: str, is_long: bool) -> str:
-        """중국어 텍스트가 없을 때 Long/Short 모두 이미지 크기 정리 처리 (순수 동기 함수)"""
+    async def _result_join_sweeper(self, worker_name: str):
+        """번역/인페인팅 중 한쪽 결과만 도착한 채 RESULT_JOIN_TIMEOUT이 지난 요청을 버리고 에러 결과를 보냅니다."""
+        while self._running:
+            try:
+                await asyncio.sleep(RESULT_JOIN_SWEEP_INTERVAL)
+                for request_id, image_id in await self.result_checker.expire_stale_results():
+                    await enqueue_error_result(request_id, image_id, "Rendering join timed out")
+            except asyncio.CancelledError:
+                logger.info(f"Worker {worker_name} cancelled")
+                break
+            except Exception as e:
+                logger.error(f"Unexpected error in {worker_name}: {e}", exc_info=True)
+
+    async def fetch_and_dispatch_tasks(self) -> int:
+        """
+        동시 처리 슬롯이 남은 만큼 작업 큐에서 OCR 결과를 가져와 처리 태스크를 만듭니다.
+        슬롯 하나를 기다려 얻은 뒤 바로 얻을 수 있는 슬롯을 QUEUE_READ_BATCH까지 더 모아 한 번에 읽고, 남은 슬롯은 돌려줍니다.
+        (처리할 수 없는 작업을 미리 꺼내 두지 않으므로, 스트림 백엔드에서는 남은 작업을 다른 워커가 가져갈 수 있음)
+
+        Returns:
+            int: 처리를 시작한 작업 수
+        """
+        semaphore = self.concurrent_task_semaphore
+        await semaphore.acquire()
+        permits = 1
+        while permits < QUEUE_READ_BATCH and not semaphore.locked():
+            await semaphore.acquire()
+            permits += 1
+        try:
+            messages = await self.task_queue.get(permits, block_ms=1000)
+        except BaseException:
+            for _ in range(permits):
+                semaphore.release()
+            raise
+        for _ in range(permits - len(messages)):
+            semaphore.release()
+        for message in messages:
+            await self._dispatch_task(message)
+        return len(messages)
+
+    async def _dispatch_task(self, message: QueueMessage):
+        """
+        세마포어 슬롯 하나를 가진 상태에서 작업 하나의 처리 태스크를 만듭니다 (태스크가 끝날 때 슬롯을 해제).
+        처리할 수 없는 작업은 에러 큐로 보내고 슬롯을 돌려준 뒤 바로 ack합니다.
+        """
+        task_data = None
+        try:
+            task_data = json.loads(message.data.decode('utf-8'))
+            request_id = task_data.get('request_id', 'N/A')
+            logger.debug(f"[{request_id}] Acquired semaphore, creating task.")
+            
+            # OCR 작업을 비동기로 처리 (fire-and-forget)
+            # 이 태스크는 완료 시 반드시 세마포어를 해제해야 합니다.
+            ocr_task = asyncio.create_task(self.process_ocr_task(task_data))
+            self._ocr_tasks.add(ocr_task)
+            ocr_task.add_done_callback(self._ocr_tasks.discard)
+            # 최종 결과(성공/에러)를 보내는 곳에서 finish_task()로 ack (에러 경로와 같은 'N/A' 기본값 사용)
+            track_task(self.task_queue, message, request_id, task_data.get('image_id', 'N/A'))
+            return
+            
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to decode OCR task JSON: {e}")
+            # JSON 파싱 실패 시 에러 큐로 전송
+            await enqueue_error_result("N/A", "N/A", f"JSON decode error: {str(e)}")
+        except Exception as e:
+            req_id = task_data.get('request_id', 'N/A') if isinstance(task_data, dict) else 'N/A'
+            img_id = task_data.get('image_id', 'N/A') if isinstance(task_data, dict) else 'N/A'
+            logger.error(f"[{req_id}] Error processing OCR task: {e}", exc_info=True)
+            await enqueue_error_result(req_id, img_id, f"Task processing error: {str(e)}")
+        self.concurrent_task_semaphore.release()
+        await self.task_queue.ack(message)
+
+    async def _handle_no_chinese_text(self, image_bytes: bytes, original_url: str, request_id: str, image_id: str, is_long: bool) -> str:
+        """중국어 텍스트가 없을 때 이미지 크기 정리 후 업로드. 실패 시 원본 URL 반환"""
+        upload_job = await self.run_cpu_task(
+            self._handle_no_chinese_text_sync,
+            image_bytes,
+            request_id,
+            image_id,
+            is_long
+        )
+        if upload_job is None:
+            return original_url  # 에러 시 원본 URL 반환
+        
+        upload_result = await self.r2_uploader.upload_bytes(**upload_job)
+        if upload_result["success"]:
+            final_image_url = upload_result["url"]
+            logger.info(f"[{request_id}] Image resized and uploaded: {final_image_url}")
+            return final_image_url
+        else:
+            logger.error(f"[{request_id}] Failed to upload resized image: {upload_result.get('error')}")
+            return original_url  # 업로드 실패 시 원본 URL 반환
+
+    def _handle_no_chinese_text_sync(self, image_bytes: bytes, request_id: str, image_id: str, is_long: bool) -> Optional[Dict[str, Any]]:
+        """중국어 텍스트가 없을 때 Long/Short 모두 이미지 크기 정리 + 인코딩 (순수 동기 함수). 업로드 인자를 반환"""
         try:
             # 1. 이미지 디코딩
             img_array = np.frombuffer(image_bytes, dtype=np.uint8)
@@ -499,7 +772,7 @@ class AsyncInpaintingWorker:
             
             if img is None:
                 logger.error(f"[{request_id}] Failed to decode image")
-                return original_url
+                return None
             
             # 2. rendering.py와 동일한 이미지 크기 정리 로직
             original_h, original_w = img.shape[:2]
@@ -533,50 +806,68 @@ class AsyncInpaintingWorker:
             # 파일명 구성: remaining_part + '-' + request_id의 첫 5글자
             final_image_id = f"{remaining_part}-{request_id[:5]}" if remaining_part else f"{image_id}-{request_id[:5]}"
             
-            upload_result = self.r2_hosting.upload_image_from_array(
-                image_array=resized_img,
-                image_id=final_image_id,
-                sub_path=f'translated_image/{current_date}/{product_id}',
-                file_ext='.jpg',
-                quality=90,
-                metadata={
+            encoded = encode_image(resized_img, file_ext='.jpg', quality=90)
+            if not encoded["success"]:
+                logger.error(f"[{request_id}] Failed to encode resized image: {encoded.get('error')}")
+                return None
+            
+            return {
+                "data": encoded["data"],
+                "image_id": final_image_id,
+                "sub_path": f'translated_image/{current_date}/{product_id}',
+                "file_ext": '.jpg',
+                "content_type": encoded["content_type"],
+                "metadata": {
                     "request_id": request_id,
                     "image_id": image_id,
                     "type": f"no_chinese_text_{'long' if is_long else 'short'}_resize"
                 }
-            )
-            
-            if upload_result["success"]:
-                final_image_url = upload_result["url"]
-                logger.info(f"[{request_id}] Image resized and uploaded: {final_image_url}")
-                return final_image_url
-            else:
-                logger.error(f"[{request_id}] Failed to upload resized image: {upload_result.get('error')}")
-                return original_url  # 업로드 실패 시 원본 URL 반환
+            }
                 
         except Exception as e:
             logger.error(f"[{request_id}] Error in no-Chinese-text handler: {e}", exc_info=True)
-            return original_url  # 에러 시 원본 URL 반환
+            return None
 
-    def _generate_mask_and_preprocess_sync(self, image_bytes: bytes, ocr_result: list, request_id: str, image_id: str, is_long: bool):
+    def _generate_mask_and_preprocess_sync(self, image_bytes: bytes, image_url: str, ocr_result: list, request_id: str, image_id: str, is_long: bool):
         """마스크 생성 + 전처리를 한번에 처리하는 순수 동기 함수 (CPU 스레드풀에서 실행)"""
         try:
             from logic.mask import generate_mask_pure_sync
             from logic.preprocessing import process_single_task_pure_sync
             
+            # 0. 원본 디코딩 (한 번만 디코딩해 캐시에 두고 렌더링 단계에서 재사용)
+            decoded_img = self.image_cache.get_decoded(image_url, request_id)
+            if decoded_img is None:
+                decoded_img = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+                if decoded_img is not None:
+                    self.image_cache.put_decoded(image_url, decoded_img, request_id)
+            
             # 1. 마스크 생성
             logger.debug(f"[{request_id}] Generating mask (pure CPU)")
-            mask_result = generate_mask_pure_sync(image_bytes, ocr_result, request_id, image_id, is_long)
+            mask_result = generate_mask_pure_sync(image_bytes, ocr_result, request_id, image_id, is_long, img=decoded_img)
             
             if not mask_result:
                 logger.error(f"[{request_id}] Mask generation failed")
                 return None
             
             img_array, mask_array, preprocessing_task = mask_result
+
+            # 2-1. 영역 인페인팅이 전체 이미지보다 가벼우면 텍스트 주변 영역만 잘라서 처리
+            if INPAINT_REGION_MODE:
+                regions = choose_regions(mask_array, is_long)
+                if regions:
+                    region_tasks, assembly = build_region_tasks(preprocessing_task, is_long, img_array, mask_array, regions)
+                    logger.debug(f"[{request_id}] Region inpainting with {len(region_tasks)} regions")
+                    return {
+                        "request_id": request_id,
+                        "image_id": image_id,
+                        "is_long": is_long,
+                        "region_tasks": region_tasks,
+                        "region_assembly": assembly
+                    }
             
-            # 2. 바로 전처리 실행
+            # 2. 바로 전처리 실행 (원본/마스크 배열을 그대로 넘기고, 결과는 SHM 풀 슬롯에 직접 기록)
             logger.debug(f"[{request_id}] Running preprocessing (pure CPU)")
-            processed_task = process_single_task_pure_sync(preprocessing_task, is_long)
+            processed_task = process_single_task_pure_sync(preprocessing_task, is_long, img_array=img_array, mask_array=mask_array)
             
             if not processed_task:
                 logger.error(f"[{request_id}] Preprocessing failed")
@@ -589,36 +880,25 @@ class AsyncInpaintingWorker:
             logger.error(f"[{request_id}] Error in mask generation and preprocessing: {e}", exc_info=True)
             return None
 
-    async def _gpu_inference_worker(self, worker_name: str, is_long: bool):
-        """GPU 인퍼런스 워커 (배치 처리) - 전처리된 데이터를 받아서 GPU 추론 실행"""
+    async def _gpu_inference_worker(self, worker_name: str):
+        """GPU 인퍼런스 워커 (배치 처리) - BatchScheduler가 고른 short/long 배치를 추론 엔진에 넘김"""
         logger.info(f"GPU inference worker {worker_name} started")
         
-        queue = self.inference_queue_long if is_long else self.inference_queue_short
-        batch_size = INPAINTING_BATCH_SIZE_LONG if is_long else INPAINTING_BATCH_SIZE_SHORT
-        
         while self._running:
             try:
-                # 배치 수집
-                batch_tasks = []
+                # 파이프라인 자리가 날 때까지 먼저 대기 (그동안 스케줄러 큐에서 배치가 더 채워짐)
+                await self.gpu_semaphore.acquire()
                 try:
-                    # 첫 번째 작업 대기
-                    task = await asyncio.wait_for(queue.get(), timeout=2.0)
-                    batch_tasks.append(task)
-                    
-                    # 나머지 배치 수집
-                    for _ in range(batch_size - 1):
-                        try:
-                            task = await asyncio.wait_for(queue.get(), timeout=0.1)
-                            batch_tasks.append(task)
-                        except asyncio.TimeoutError:
-                            break
-                            
-                except asyncio.TimeoutError:
-                    continue
+                    kind, batch_tasks = await self.batch_scheduler.next_batch()
+                except BaseException:
+                    self.gpu_semaphore.release()
+                    raise
                 
-                if batch_tasks:
-                    logger.info(f"[{worker_name}] Processing batch of {len(batch_tasks)} tasks")
-                    await self._process_gpu_batch(batch_tasks, is_long, worker_name)
+                # 파이프라인 깊이만큼만 배치를 동시에 띄움 (배치 N 추론 중 N+1 준비)
+                logger.info(f"[{worker_name}] Processing {kind} batch of {len(batch_tasks)} tasks")
+                batch_task = asyncio.create_task(self._process_gpu_batch(batch_tasks, kind, worker_name))
+                self._batch_tasks.add(batch_task)
+                batch_task.add_done_callback(self._batch_tasks.discard)
                     
             except asyncio.CancelledError:
                 logger.info(f"GPU worker {worker_name} cancelled")
@@ -627,103 +907,155 @@ class AsyncInpaintingWorker:
                 logger.error(f"Error in GPU worker {worker_name}: {e}", exc_info=True)
                 await asyncio.sleep(1)
 
-    async def _process_gpu_batch(self, batch_tasks: List[Dict[str, Any]], is_long: bool, worker_name: str):
-        """GPU 배치 처리"""
-        async with self.gpu_semaphore:  # GPU 동시성 제어
-            try:
-                batch_start_time = time.time()
-                
-                # 전처리된 데이터 로드
-                images_np = []
-                masks_np = []
-                shm_handles = []
-                
-                for task in batch_tasks:
-                    try:
-                        request_id = task.get("request_id")
-                        preprocessed_img_shm_info = task.get("preprocessed_img_shm_info")
-                        preprocessed_mask_shm_info = task.get("preprocessed_mask_shm_info")
-
-                        if not all([preprocessed_img_shm_info, preprocessed_mask_shm_info]):
-                            logger.error(f"[{request_id}] Missing preprocessed data")
-                            continue
-                        
-                        # 전처리된 이미지 로드
-                        img_array, img_shm = get_array_from_shm(preprocessed_img_shm_info)
-                        shm_handles.append(img_shm)
-                        
-                        # 전처리된 마스크 로드
-                        mask_array, mask_shm = get_array_from_shm(preprocessed_mask_shm_info)
-                        shm_handles.append(mask_shm)
-                        
-                        if img_array is None or mask_array is None:
-                            logger.error(f"[{request_id}] Failed to load from SHM")
-                            continue
-                        
-                        images_np.append(img_array)
-                        masks_np.append(mask_array)
-                        
-                    except Exception as e:
-                        logger.error(f"Error loading batch data: {e}", exc_info=True)
+    async def _process_gpu_batch(self, batch_tasks: List[Dict[str, Any]], kind: str, worker_name: str):
+        """GPU 배치 처리 (추론은 InferenceEngine 스레드에서 실행, 호출 전에 gpu_semaphore를 획득해 두어야 함)"""
+        is_long = kind == "long"
+        shm_handles = []
+        try:
+            batch_start_time = time.time()
+            
+            # 전처리된 데이터 로드
+            images_np = []
+            masks_np = []
+            valid_tasks = []
+            
+            for task in batch_tasks:
+                try:
+                    request_id = task.get("request_id")
+                    if "region_image" in task:
+                        # 영역 작업은 같은 프로세스에서 만든 작은 배열이므로 SHM을 거치지 않음
+                        images_np.append(task["region_image"])
+                        masks_np.append(task["region_mask"])
+                        valid_tasks.append(task)
                         continue
-                
-                if not images_np:
-                    logger.warning(f"[{worker_name}] No valid images in batch")
-                    return
-                
-                # GPU 추론 실행
-                logger.info(f"[{worker_name}] Running LaMa inference on {len(images_np)} images")
-                results_np = run_batch_inference(
-                    images_np=images_np,
-                    masks_np=masks_np,
-                    use_fp16=USE_FP16
-                )
-                
-                # 후처리를 위한 작업들을 큐에 추가
-                for i, result in enumerate(results_np):
-                    if i < len(batch_tasks):
-                        postprocess_task = {
-                            "task": batch_tasks[i],
-                            "result": result,
-                            "is_long": is_long
-                        }
-                        
-                        # 후처리 큐에 추가
-                        await self.postprocessing_queue.put(postprocess_task)
 
-                # 전처리된 공유 메모리 정리
-                for task in batch_tasks:
-                    self._cleanup_preprocessed_shm(task)
+                    preprocessed_img_shm_info = task.get("preprocessed_img_shm_info")
+                    preprocessed_mask_shm_info = task.get("preprocessed_mask_shm_info")
 
-                batch_time = time.time() - batch_start_time
-                logger.info(f"[{worker_name}] Batch completed in {batch_time:.2f}s")
+                    if not all([preprocessed_img_shm_info, preprocessed_mask_shm_info]):
+                        logger.error(f"[{request_id}] Missing preprocessed data")
+                        continue
                     
-            except Exception as e:
-                logger.error(f"[{worker_name}] GPU batch error: {e}", exc_info=True)
-                # GPU 배치 처리 실패 시 각 작업에 대해 에러 큐로 전송
-                for task in batch_tasks:
-                    try:
-                        request_id = task.get("request_id", "N/A")
-                        image_id = task.get("image_id", "N/A")
-                        await enqueue_error_result(request_id, image_id, f"GPU processing error: {str(e)}")
-                    except Exception as eq_error:
-                        logger.error(f"Failed to send GPU error to queue: {eq_error}")
-            finally:
-                # SHM 핸들 닫기
-                for shm in shm_handles:
-                    try:
-                        if shm:
-                            shm.close()
-                    except Exception:
-                        pass
+                    # 전처리된 이미지 로드
+                    img_array, img_shm = get_array_from_shm(preprocessed_img_shm_info)
+                    shm_handles.append(img_shm)
+                    
+                    # 전처리된 마스크 로드
+                    mask_array, mask_shm = get_array_from_shm(preprocessed_mask_shm_info)
+                    shm_handles.append(mask_shm)
+                    
+                    if img_array is None or mask_array is None:
+                        logger.error(f"[{request_id}] Failed to load from SHM")
+                        continue
+                    
+                    images_np.append(img_array)
+                    masks_np.append(mask_array)
+                    valid_tasks.append(task)
+                    
+                except Exception as e:
+                    logger.error(f"Error loading batch data: {e}", exc_info=True)
+                    continue
+            
+            if not images_np:
+                logger.warning(f"[{worker_name}] No valid images in batch")
+                return
+            
+            # GPU 추론 실행 (전용 스레드 파이프라인 - 이벤트 루프는 대기하지 않음)
+            logger.info(f"[{worker_name}] Running LaMa inference on {len(images_np)} images")
+            results_np, timings = await self.inference_engine.infer(images_np, masks_np)
+            self.batch_scheduler.record_latency(kind, timings["compute"])
+            self.batch_scheduler.record_padding(
+                kind, *batch_padding([self._content_size(t, img) for t, img in zip(valid_tasks, images_np)],
+                                     [img.shape[:2] for img in images_np])
+            )
+            
+            # 추론 결과는 새 배열이므로 입력 슬롯은 바로 반납 (후처리 큐 대기 중 슬롯 점유 방지)
+            for shm in shm_handles:
+                try:
+                    if shm:
+                        shm.close()
+                except Exception:
+                    pass
+            shm_handles.clear()
+            images_np.clear()
+            masks_np.clear()
+            for task in batch_tasks:
+                self._cleanup_preprocessed_shm(task)
+                # 영역 입력 배열도 추론이 끝났으므로 바로 해제
+                task.pop("region_image", None)
+                task.pop("region_mask", None)
+            
+            # 후처리를 위한 작업들을 큐에 추가
+            for i, result in enumerate(results_np):
+                if i < len(valid_tasks):
+                    postprocess_task = {
+                        "task": valid_tasks[i],
+                        "result": result,
+                        "is_long": valid_tasks[i].get("is_long", is_long)
+                    }
+                    
+                    # 후처리 큐에 추가
+                    await self.postprocessing_queue.put(postprocess_task)
+
+            batch_time = time.time() - batch_start_time
+            logger.info(
+                f"[{worker_name}] Batch completed in {batch_time:.2f}s "
+                f"(slot_wait={timings['slot_wait']:.3f}s, stage={timings['stage']:.3f}s, "
+                f"queue_wait={timings['queue_wait']:.3f}s, compute={timings['compute']:.3f}s)"
+            )
+            logger.debug(f"[{worker_name}] Batch scheduler stats: {self.batch_scheduler.stats()}")
+            shm_pool = get_shm_pool()
+            if shm_pool:
+                logger.debug(f"[{worker_name}] SHM pool stats: {shm_pool.stats()}")
+                
+        except Exception as e:
+            logger.error(f"[{worker_name}] GPU batch error: {e}", exc_info=True)
+            # GPU 배치 처리 실패 시 각 작업에 대해 에러 큐로 전송
+            for task in batch_tasks:
+                try:
+                    await self._enqueue_task_error(task, f"GPU processing error: {str(e)}")
+                except Exception as eq_error:
+                    logger.error(f"Failed to send GPU error to queue: {eq_error}")
+        finally:
+            # SHM 핸들 닫기
+            for shm in shm_handles:
+                try:
+                    if shm:
+                        shm.close()
+                except Exception:
+                    pass
+            # 실패한 배치의 전처리 SHM도 반드시 반납 (중복 반납은 무시됨)
+            for task in batch_tasks:
+                self._cleanup_preprocessed_shm(task)
+            # 파이프라인 슬롯 해제
+            self.gpu_semaphore.release()
+
+    @staticmethod
+    def _content_size(task: dict, image: np.ndarray) -> Tuple[int, int]:
+        """모델 입력 중 실제 이미지 내용의 크기 (전체 이미지 작업은 레터박스 여백 제외)."""
+        height, width = image.shape[:2]
+        padding_info = task.get("padding_info")
+        if padding_info and "region_box" not in task:
+            top, right, bottom, left = padding_info
+            return height - top - bottom, width - left - right
+        return height, width
+
+    async def _enqueue_task_error(self, task: dict, error_message: str):
+        """작업 실패를 에러 큐로 보냅니다. 영역 작업은 요청당 한 번만 보내고 합성기를 정리합니다."""
+        request_id = task.get("request_id", "N/A")
+        image_id = task.get("image_id", "N/A")
+        if "region_box" in task and self._region_assemblies.pop(request_id, None) is None:
+            # 같은 요청의 다른 영역에서 이미 실패 처리됨
+            return
+        await enqueue_error_result(request_id, image_id, error_message)
 
     def _cleanup_preprocessed_shm(self, task: dict):
-        """전처리된 공유 메모리 정리"""
+        """전처리된 공유 메모리 정리 (풀 슬롯은 반납, 개별 세그먼트는 unlink)"""
         try:
             for shm_key in ["preprocessed_img_shm_info", "preprocessed_mask_shm_info"]:
-                shm_info = task.get(shm_key)
+                shm_info = task.pop(shm_key, None)
                 if shm_info and 'shm_name' in shm_info:
-                    cleanup_shm(shm_info['shm_name'])
+                    release_shm(shm_info)
         except Exception as e:
             logger.error(f"Error cleaning up SHM: {e}")
 
@@ -759,38 +1091,8 @@ async def run_worker(stop_event: asyncio.Event):
         
         while not stop_event.is_set():
             try:
-                redis_client = get_redis_client()
-                
-                # Redis에서 OCR 작업 받기
-                ocr_task_tuple = await redis_client.blpop([PROCESSOR_TASK_QUEUE], timeout=1)
-                
-                if ocr_task_tuple:
-                    # ✨ 신규: 새로운 작업을 시작하기 전에 세마포어를 획득 (획득할 수 있을 때까지 대기)
-                    # 이를 통해 동시에 실행되는 작업의 수를 제한합니다.
-                    await async_worker.concurrent_task_semaphore.acquire()
-                    
-                    task_bytes = ocr_task_tuple[1]
-                    try:
-                        task_data = json.loads(task_bytes.decode('utf-8'))
-                        request_id = task_data.get('request_id', 'N/A')
-                        logger.debug(f"[{request_id}] Acquired semaphore, creating task.")
-                        
-                        # OCR 작업을 비동기로 처리 (fire-and-forget)
-                        # 이 태스크는 완료 시 반드시 세마포어를 해제해야 합니다.
-                        asyncio.create_task(async_worker.process_ocr_task(task_data))
-                        
-                    except json.JSONDecodeError as e:
-                        logger.error(f"Failed to decode OCR task JSON: {e}")
-                        # JSON 파싱 실패 시 에러 큐로 전송
-                        await enqueue_error_result("N/A", "N/A", f"JSON decode error: {str(e)}")
-                        async_worker.concurrent_task_semaphore.release() # ✨ 신규: JSON 파싱 실패 시에도 세마포어 해제
-                    except Exception as e:
-                        req_id = task_data.get('request_id', 'N/A') if 'task_data' in locals() else 'N/A'
-                        img_id = task_data.get('image_id', 'N/A') if 'task_data' in locals() else 'N/A'
-                        logger.error(f"[{req_id}] Error processing OCR task: {e}", exc_info=True)
-                        await enqueue_error_result(req_id, img_id, f"Task processing error: {str(e)}")
-                        async_worker.concurrent_task_semaphore.release() # ✨ 신규: 알 수 없는 오류 발생 시에도 세마포어 해제
-                else:
+                # 동시 처리 슬롯이 남은 만큼 OCR 작업 받기 (슬롯은 처리 태스크가 완료 시 해제)
+                if not await async_worker.fetch_and_dispatch_tasks():
                     # 잠시 대기
                     await asyncio.sleep(0.1)
                     